@@ -0,0 +1,117 @@
+"""
+Load test of purchases during a flood of full-table listings.
+
+Sends a constant stream of `GET /customers/` listings, more than the backend
+can serve, together with `POST /sales/purchase/{id}` requests, to an app
+whose routes share a backend of a few connections: a listing holds a
+connection for 200 ms, a purchase for 5 ms. Compares purchase latency
+without admission control, where purchases wait for connections behind the
+listings, and with `AdmissionMiddleware`, which caps running listings and
+sheds the excess with 503s.
+
+Usage: python -m benchmarks.bench_admission [listings_per_second ...]
+"""
+
+import asyncio
+import statistics
+import sys
+import time
+from typing import Any, Callable, Coroutine
+
+import httpx
+from fastapi import FastAPI
+
+from src.middleware.admission import AdmissionMiddleware, RouteClass
+
+CONNECTIONS = 8
+"""Connections of the shared backend."""
+
+LISTING_SECONDS = 0.2
+PURCHASE_SECONDS = 0.005
+DURATION = 3.0
+PURCHASES_PER_SECOND = 50
+
+CLASSES = {
+    "critical": RouteClass(0, limit=64, queue_size=256, deadline=5),
+    "point": RouteClass(1, limit=48, queue_size=128, deadline=1),
+    "bulk": RouteClass(2, limit=4, queue_size=8, deadline=0.5),
+}
+
+
+def make_app(admission: bool) -> FastAPI:
+    backend = asyncio.Semaphore(CONNECTIONS)
+    app = FastAPI()
+
+    @app.get("/customers/")
+    async def list_customers() -> list[str]:
+        async with backend:
+            await asyncio.sleep(LISTING_SECONDS)
+        return []
+
+    @app.post("/sales/purchase/{id}")
+    async def purchase(id: str) -> str:
+        async with backend:
+            await asyncio.sleep(PURCHASE_SECONDS)
+        return id
+
+    if admission:
+        app.add_middleware(AdmissionMiddleware, classes=CLASSES, max_concurrency=64)
+    return app
+
+
+async def load(app: FastAPI, listings_per_second: int) -> tuple[list[float], int]:
+    latencies: list[float] = []
+    shed = 0
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://api", timeout=None
+    ) as client:
+
+        async def listing() -> None:
+            nonlocal shed
+            response = await client.get("/customers/")
+            shed += response.status_code == 503
+
+        async def purchase() -> None:
+            start = time.perf_counter()
+            response = await client.post("/sales/purchase/1")
+            assert response.status_code == 200, response.text
+            latencies.append(time.perf_counter() - start)
+
+        async def send(
+            request: Callable[[], Coroutine[Any, Any, None]], rate: int
+        ) -> list[asyncio.Task[None]]:
+            tasks: list[asyncio.Task[None]] = []
+            for _ in range(int(DURATION * rate)):
+                tasks.append(asyncio.create_task(request()))
+                await asyncio.sleep(1 / rate)
+            return tasks
+
+        batches = await asyncio.gather(
+            send(listing, listings_per_second), send(purchase, PURCHASES_PER_SECOND)
+        )
+        await asyncio.gather(*(task for batch in batches for task in batch))
+    return latencies, shed
+
+
+def main(rates: list[int]) -> None:
+    print(
+        f"{CONNECTIONS} backend connections, listings {LISTING_SECONDS * 1000:.0f} ms, "
+        f"purchases {PURCHASE_SECONDS * 1000:.0f} ms at {PURCHASES_PER_SECOND}/s"
+    )
+    print(
+        f"{'listings/s':>11} {'admission':>10} {'purchase p50 ms':>16} "
+        f"{'purchase p99 ms':>16} {'listings shed':>14}"
+    )
+    for rate in rates:
+        for admission in (False, True):
+            latencies, shed = asyncio.run(load(make_app(admission), rate))
+            p50 = statistics.median(latencies) * 1000
+            p99 = statistics.quantiles(latencies, n=100)[98] * 1000
+            print(
+                f"{rate:>11} {'on' if admission else 'off':>10} {p50:>16.1f} "
+                f"{p99:>16.1f} {shed:>14}"
+            )
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [20, 60])
@@ -0,0 +1,76 @@
+"""
+Benchmark of APIResponse rendering for large item lists.
+
+Compares the old path (``BaseResponse[...].model_dump()`` followed by the
+stdlib ``json.dumps``) against passing the response model straight to
+APIResponse, which serializes it to bytes in pydantic-core.
+
+Usage: python -m benchmarks.bench_api_response [rows ...]
+"""
+
+import json
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable
+
+from src.controllers.schemas._base_schemas import BaseResponse
+from src.db.models import Inventory
+from src.utils.responses import APIResponse
+
+
+def make_items(rows: int) -> list[Inventory]:
+    return [
+        Inventory(
+            id=f"00000000-0000-0000-0000-{i:012d}",
+            product_name=f"Product {i}",
+            category="electronics",
+            price=1.0 + i % 500,
+            quantity=i % 40,
+            description=f"Description of product {i}",
+        )
+        for i in range(rows)
+    ]
+
+
+def dict_path(items: list[Inventory]) -> bytes:
+    data = BaseResponse[Inventory](items=items).model_dump()
+    content = {"message": "Inventorys found", "data": data}
+    return json.dumps(
+        content, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def model_path(items: list[Inventory]) -> bytes:
+    response_model = BaseResponse[Inventory]
+    return APIResponse(
+        message="Inventorys found", data=response_model(items=items)
+    ).body
+
+
+def measure(fn: Callable[[Any], bytes], items: list[Inventory]) -> tuple[float, int]:
+    fn(items)
+    start = time.perf_counter()
+    repeat = 5
+    for _ in range(repeat):
+        fn(items)
+    elapsed = (time.perf_counter() - start) / repeat
+    tracemalloc.start()
+    fn(items)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main(sizes: list[int]) -> None:
+    print(f"{'rows':>8} {'path':>6} {'ms':>10} {'peak KiB':>10}")
+    for rows in sizes:
+        items = make_items(rows)
+        assert json.loads(dict_path(items)) == json.loads(model_path(items))
+        for name, fn in (("dict", dict_path), ("model", model_path)):
+            elapsed, peak = measure(fn, items)
+            print(f"{rows:>8} {name:>6} {elapsed * 1000:>10.2f} {peak / 1024:>10.0f}")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [1_000, 10_000, 100_000])
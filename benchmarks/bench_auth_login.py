@@ -0,0 +1,140 @@
+"""
+Load test of concurrent logins against a slow auth server.
+
+Sends concurrent `POST /auth/login` requests to the app through an ASGI
+transport, with GoTrue replaced by a mock transport answering every call
+after a fixed latency. Compares the previous path, where the route called
+the synchronous GoTrue client and blocked the event loop for the whole
+call, with the async GoTrue client over the shared connection pool.
+
+Usage: python -m benchmarks.bench_auth_login [concurrency ...]
+"""
+
+import asyncio
+import sys
+import time
+from typing import Any
+from unittest.mock import Mock
+
+import httpx
+from fastapi import FastAPI
+from gotrue.http_clients import SyncClient  # type: ignore
+from supabase import ASupabaseAuthClient, SupabaseAuthClient
+
+from src.auth.gotrue_client import get_gotrue_client
+from src.auth.router import auth_router
+from src.auth.schemas import LoginRequest
+from src.db.dependencies import get_customer_dao_unauthenticated
+from src.db.models import Customer
+from src.session import Session
+from src.utils.responses import APIResponse, AuthResponse
+
+LATENCY = 0.05
+"""Seconds the mock auth server takes to answer."""
+
+REQUESTS = 200
+EMAIL = "rayan@mail.com"
+URL = "http://gotrue.local/auth/v1"
+
+TOKEN_RESPONSE = {
+    "access_token": "access-token",
+    "refresh_token": "refresh-token",
+    "expires_in": 3600,
+    "token_type": "bearer",
+    "user": {
+        "id": "00000000-0000-0000-0000-000000000001",
+        "aud": "authenticated",
+        "email": EMAIL,
+        "app_metadata": {},
+        "user_metadata": {
+            "fullname": "Rayan Alves",
+            "username": "rayan",
+            "age": 19,
+            "gender": "Male",
+            "address": "Riyadh",
+            "marital_status": "Single",
+        },
+        "created_at": "2021-10-10T10:10:10.000Z",
+    },
+}
+
+
+def blocking_gotrue() -> SupabaseAuthClient:
+    def handle(request: httpx.Request) -> httpx.Response:
+        time.sleep(LATENCY)
+        return httpx.Response(200, json=TOKEN_RESPONSE)
+
+    return SupabaseAuthClient(
+        url=URL,
+        http_client=SyncClient(transport=httpx.MockTransport(handle)),
+        auto_refresh_token=False,
+        persist_session=False,
+    )
+
+
+def async_app() -> FastAPI:
+    async def handle(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(LATENCY)
+        return httpx.Response(200, json=TOKEN_RESPONSE)
+
+    http_client = httpx.AsyncClient(transport=httpx.MockTransport(handle))
+    dao = Mock()
+    dao.iter_pages.return_value = iter([[{"id": "1", "email": EMAIL}]])
+
+    app = FastAPI()
+    app.include_router(auth_router)
+    app.dependency_overrides[get_customer_dao_unauthenticated] = lambda: dao
+    app.dependency_overrides[get_gotrue_client] = lambda: ASupabaseAuthClient(
+        url=URL,
+        http_client=http_client,
+        auto_refresh_token=False,
+        persist_session=False,
+    )
+    return app
+
+
+def blocking_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/auth/login", response_class=APIResponse)
+    async def login_route(request: LoginRequest) -> APIResponse:
+        result = blocking_gotrue().sign_in_with_password(request.auth_model_dump())
+        return APIResponse(
+            message="Login successful",
+            data=AuthResponse(
+                customer=Customer.validate_supabase_user(result.user),
+                session=Session.validate_supabase_session(result.session),
+            ),
+        )
+
+    return app
+
+
+async def load(app: FastAPI, concurrency: int) -> float:
+    body: dict[str, Any] = {"email": EMAIL, "password": "Password123!"}
+    semaphore = asyncio.Semaphore(concurrency)
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://api"
+    ) as client:
+
+        async def login() -> None:
+            async with semaphore:
+                response = await client.post("/auth/login", json=body)
+                assert response.status_code == 200, response.text
+
+        start = time.perf_counter()
+        await asyncio.gather(*(login() for _ in range(REQUESTS)))
+        return REQUESTS / (time.perf_counter() - start)
+
+
+def main(concurrencies: list[int]) -> None:
+    print(f"{REQUESTS} logins, auth server latency {LATENCY * 1000:.0f} ms")
+    print(f"{'concurrency':>12} {'path':>9} {'logins/s':>10}")
+    for concurrency in concurrencies:
+        for name, app in (("blocking", blocking_app()), ("async", async_app())):
+            throughput = asyncio.run(load(app, concurrency))
+            print(f"{concurrency:>12} {name:>9} {throughput:>10.1f}")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [1, 10, 50])
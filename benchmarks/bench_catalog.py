@@ -0,0 +1,76 @@
+"""
+Benchmark of catalog queries answered from the in-process snapshot.
+
+Loads a synthetic Inventory table into a `CatalogSnapshot` and times the
+vectorized search for typical catalog filters (the result indices only, and
+with the first page of rows materialized), as well as the facet counts for
+the same filters.
+
+Usage: python -m benchmarks.bench_catalog [rows ...]
+"""
+
+import sys
+import time
+from typing import Any, Callable
+
+from src.indexes.catalog import CatalogSnapshot
+from src.indexes.facets import FacetIndex
+from src.utils.types import CATEGORIES
+
+QUERIES: dict[str, dict[str, Any]] = {
+    "category": {"category": "food"},
+    "price range": {"min_price": 100, "max_price": 120},
+    "in stock, by price": {"category": "clothes", "in_stock": True, "sort": "price"},
+    "name": {"product_name": "Product 4242"},
+}
+
+FACET_FILTERS = ("category", "in_stock", "min_price", "max_price")
+
+
+def make_rows(rows: int) -> list[dict[str, Any]]:
+    return [
+        {
+            "id": f"00000000-0000-0000-0000-{i:012d}",
+            "product_name": f"Product {i}",
+            "category": CATEGORIES[i % len(CATEGORIES)],
+            "price": 1.0 + (i * 7919) % 50_000 / 100,
+            "quantity": i % 40,
+            "description": f"Description of product {i % 1000}",
+        }
+        for i in range(rows)
+    ]
+
+
+def timed(fn: Callable[[], Any], repeat: int = 20) -> float:
+    fn()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def main(sizes: list[int]) -> None:
+    print(
+        f"{'rows':>9} {'query':>20} {'matches':>9} {'search ms':>10} {'page ms':>8}"
+        f" {'facets ms':>10}"
+    )
+    for rows in sizes:
+        snapshot = CatalogSnapshot()
+        snapshot.load(make_rows(rows))
+        facets = FacetIndex(snapshot)
+        for name, filters in QUERIES.items():
+            matches = snapshot.search(**filters)
+            search = timed(lambda: snapshot.search(**filters))
+            page = timed(lambda: snapshot.to_json(snapshot.search(**filters)[:100]))
+            facet_filters = {
+                key: value for key, value in filters.items() if key in FACET_FILTERS
+            }
+            counts = timed(lambda: facets.counts(**facet_filters))
+            print(
+                f"{rows:>9} {name:>20} {matches.size:>9} {search * 1000:>10.3f}"
+                f" {page * 1000:>8.3f} {counts * 1000:>10.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [10_000, 1_000_000])
@@ -0,0 +1,84 @@
+"""
+Benchmark of the response formats offered through content negotiation.
+
+Encodes and decodes the Inventory and History list envelopes as JSON,
+MessagePack and CBOR (when the packages are installed) and reports the
+payload size and encode/decode times.
+
+Usage: python -m benchmarks.bench_response_formats [rows ...]
+"""
+
+import sys
+import time
+from typing import Any, Callable
+
+from src.controllers.schemas._base_schemas import BaseResponse
+from src.db.models import History, Inventory
+from src.utils.responses.content_negotiation import (
+    available_media_types,
+    decode,
+    encode,
+)
+
+
+def make_inventory(rows: int) -> BaseResponse[Inventory]:
+    return BaseResponse[Inventory](
+        items=[
+            Inventory(
+                id=f"00000000-0000-0000-0000-{i:012d}",
+                product_name=f"Product {i}",
+                category="electronics",
+                price=1.0 + i % 500,
+                quantity=i % 40,
+                description=f"Description of product {i}",
+            )
+            for i in range(rows)
+        ]
+    )
+
+
+def make_history(rows: int) -> BaseResponse[History]:
+    return BaseResponse[History](
+        items=[
+            History(
+                id=f"00000000-0000-0000-0000-{i:012d}",
+                customer_id=f"00000000-0000-0000-0001-{i % 997:012d}",
+                product_id=f"00000000-0000-0000-0002-{i % 251:012d}",
+                quantity=1 + i % 5,
+                total=9.99 * (1 + i % 5),
+            )
+            for i in range(rows)
+        ]
+    )
+
+
+def timed(fn: Callable[[], Any], repeat: int = 5) -> float:
+    fn()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def main(sizes: list[int]) -> None:
+    print(
+        f"{'table':>9} {'rows':>8} {'format':>20} {'KiB':>9} {'enc ms':>8} {'dec ms':>8}"
+    )
+    for rows in sizes:
+        for table, data in (
+            ("Inventory", make_inventory(rows)),
+            ("History", make_history(rows)),
+        ):
+            content = {"message": f"{table} found", "data": data}
+            for media_type in available_media_types():
+                body = encode(content, media_type)
+                enc = timed(lambda: encode(content, media_type))
+                dec = timed(lambda: decode(body, media_type))
+                print(
+                    f"{table:>9} {rows:>8} {media_type:>20} {len(body) / 1024:>9.0f}"
+                    f" {enc * 1000:>8.2f} {dec * 1000:>8.2f}"
+                )
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [1_000, 100_000])
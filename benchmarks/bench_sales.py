@@ -0,0 +1,81 @@
+"""
+Benchmark of the sales rollups.
+
+Loads synthetic History rows, then times a full rebuild, one incremental
+write and each analytics view.
+
+Usage: python -m benchmarks.bench_sales [rows ...]
+"""
+
+import sys
+import time
+from typing import Any, Callable
+
+from src.indexes.catalog import CatalogSnapshot
+from src.indexes.sales import SalesRollups
+from src.utils.types import CATEGORIES
+
+PRODUCTS = 5_000
+CUSTOMERS = 50_000
+
+
+def product_id(i: int) -> str:
+    return f"00000000-0000-0000-0000-{i:012d}"
+
+
+def make_rows(rows: int) -> list[dict[str, Any]]:
+    return [
+        {
+            "id": f"history-{i}",
+            "customer_id": f"customer-{(i * 7919) % CUSTOMERS}",
+            "product_id": product_id((i * 104729) % PRODUCTS),
+            "quantity": 1 + i % 5,
+            "total": 1.0 + (i % 997),
+            "purchase_date": f"2024-{1 + i % 12:02d}-{1 + i % 28:02d}T12:00:00+00:00",
+        }
+        for i in range(rows)
+    ]
+
+
+def timed(fn: Callable[[], Any], repeat: int = 20) -> float:
+    fn()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def main(sizes: list[int]) -> None:
+    snapshot = CatalogSnapshot()
+    snapshot.load(
+        [
+            {
+                "id": product_id(i),
+                "product_name": f"Product {i}",
+                "category": CATEGORIES[i % len(CATEGORIES)],
+                "price": 1.0,
+                "quantity": 1,
+                "description": "",
+            }
+            for i in range(PRODUCTS)
+        ]
+    )
+    print(f"{'rows':>9} {'view':>10} {'ms':>9}")
+    for rows in sizes:
+        data = make_rows(rows)
+        rollups = SalesRollups()
+        write = [dict(data[0], total=5.0)]
+        for view, fn in [
+            ("rebuild", lambda: rollups.load(data)),
+            ("write", lambda: rollups.apply("upsert", write)),
+            ("products", lambda: rollups.by_product()),
+            ("customers", lambda: rollups.by_customer()),
+            ("categories", lambda: rollups.by_category(snapshot)),
+            ("months", lambda: rollups.timeline("month")),
+        ]:
+            ms = timed(fn, repeat=3 if view == "rebuild" else 20) * 1e3
+            print(f"{rows:>9} {view:>10} {ms:>9.3f}")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [100_000, 1_000_000])
@@ -0,0 +1,73 @@
+"""
+Benchmark of product search over the catalog snapshot.
+
+Builds a synthetic catalog whose names and descriptions draw words from a
+Zipf-distributed vocabulary, then reports the index build time and the
+latency of one- to three-word queries with and without a category filter.
+
+Usage: python -m benchmarks.bench_search [rows ...]
+"""
+
+import sys
+import time
+from typing import Any, Callable
+
+import numpy as np
+
+from src.indexes.catalog import CatalogSnapshot
+from src.indexes.search import SearchIndex
+from src.utils.types import CATEGORIES
+
+VOCABULARY = 20_000
+
+
+def make_rows(rows: int) -> list[dict[str, Any]]:
+    random = np.random.default_rng(0)
+    words = random.zipf(1.3, size=(rows, 11)) % VOCABULARY
+    return [
+        {
+            "id": f"00000000-0000-0000-0000-{i:012d}",
+            "product_name": " ".join(f"w{word}" for word in words[i, :3]),
+            "category": CATEGORIES[i % len(CATEGORIES)],
+            "price": 1.0 + i % 500,
+            "quantity": i % 40,
+            "description": " ".join(f"w{word}" for word in words[i, 3:]),
+        }
+        for i in range(rows)
+    ]
+
+
+QUERIES: dict[str, dict[str, Any]] = {
+    "rare word": {"q": "w4242"},
+    "two words": {"q": "w120 w77"},
+    "three words": {"q": "w300 w41 w999"},
+    "common word": {"q": "w2"},
+    "two words, category": {"q": "w120 w77", "category": "food"},
+}
+
+
+def timed(fn: Callable[[], Any], repeat: int = 20) -> float:
+    fn()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def main(sizes: list[int]) -> None:
+    for rows in sizes:
+        snapshot = CatalogSnapshot()
+        snapshot.load(make_rows(rows))
+        index = SearchIndex(snapshot)
+        start = time.perf_counter()
+        index.rebuild()
+        print(
+            f"{rows} rows, {len(index.postings)} terms, built in {time.perf_counter() - start:.1f} s"
+        )
+        print(f"{'query':>22} {'ms':>8}")
+        for name, query in QUERIES.items():
+            print(f"{name:>22} {timed(lambda: index.search(**query)) * 1000:>8.3f}")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [10_000, 1_000_000])
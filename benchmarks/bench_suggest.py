@@ -0,0 +1,63 @@
+"""
+Benchmark of product name autocomplete.
+
+Loads a synthetic catalog of distinct product names and times prefix
+lookups of growing length, first uncached and then from the ranking cache.
+
+Usage: python -m benchmarks.bench_suggest [rows ...]
+"""
+
+import sys
+import time
+from typing import Any, Callable
+
+from src.indexes.catalog import CatalogSnapshot
+from src.indexes.suggest import SuggestIndex
+
+SYLLABLES = ["ka", "lo", "mi", "ne", "ru", "sa", "ti", "vo", "ze", "pa"]
+
+
+def make_rows(rows: int) -> list[dict[str, Any]]:
+    def name(i: int) -> str:
+        parts = []
+        for _ in range(6):
+            parts.append(SYLLABLES[i % len(SYLLABLES)])
+            i //= len(SYLLABLES)
+        return "".join(parts).capitalize()
+
+    return [
+        {
+            "id": f"00000000-0000-0000-0000-{i:012d}",
+            "product_name": name(i),
+            "category": "food",
+            "price": 1.0,
+            "quantity": (i * 7919) % 1000,
+            "description": "",
+        }
+        for i in range(rows)
+    ]
+
+
+def timed(fn: Callable[[], Any], repeat: int = 200) -> float:
+    fn()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def main(sizes: list[int]) -> None:
+    print(f"{'rows':>8} {'prefix':>8} {'uncached us':>12} {'cached us':>10}")
+    for rows in sizes:
+        snapshot = CatalogSnapshot()
+        snapshot.load(make_rows(rows))
+        index = SuggestIndex(snapshot, cache_size=0)
+        cached = SuggestIndex(snapshot)
+        for prefix in ("k", "ka", "kalo", "kalomi", "kalomine"):
+            uncached_us = timed(lambda: index.suggest(prefix)) * 1e6
+            cached_us = timed(lambda: cached.suggest(prefix)) * 1e6
+            print(f"{rows:>8} {prefix:>8} {uncached_us:>12.1f} {cached_us:>10.1f}")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [10_000, 1_000_000])
@@ -1,6 +1,7 @@
 import os
 import subprocess
 
+import httpx
 from tap import Tap
 
 SEP = os.path.sep
@@ -8,15 +9,51 @@ SEP = os.path.sep
 
 class ArgumentParser(Tap):
     command: str
+    file: str | None = None
     tests: bool = True
     fixtures: bool = False
+    url: str = "http://localhost:8000"
+    access_token: str | None = None
+    refresh_token: str | None = None
+    table: str = "inventory"
+    format: str = "csv"
+    output: str | None = None
+    chunk_size: int | None = None
+    workers: int | None = None
 
     def configure(self) -> None:
         self.add_argument("command", type=str, help="Command to run")
+        self.add_argument("file", nargs="?", type=str, help="File to import")
         self.add_argument("--tests", type=bool, help="Generate test files")
         self.add_argument(
             "--fixtures", type=bool, help="Generate fixtures for test files"
         )
+        self.add_argument("--url", type=str, help="Base URL of the running server")
+        self.add_argument(
+            "--access_token", type=str, help="Access token of an authenticated user"
+        )
+        self.add_argument(
+            "--refresh_token", type=str, help="Refresh token of an authenticated user"
+        )
+        self.add_argument(
+            "--table",
+            type=str,
+            help="Table to export: customers, inventory, reviews or history",
+        )
+        self.add_argument(
+            "--format", type=str, help="Export format: csv, ndjson or parquet"
+        )
+        self.add_argument("--output", type=str, help="File to write the export to")
+        self.add_argument(
+            "--chunk_size",
+            type=int,
+            help="Rows per insert when importing (default: IMPORT_CHUNK_SIZE)",
+        )
+        self.add_argument(
+            "--workers",
+            type=int,
+            help="Concurrent inserts when importing (default: IMPORT_WORKERS)",
+        )
 
 
 def run() -> None:
@@ -182,6 +219,135 @@ def pre_stage() -> None:
     run_tests()
 
 
+def auth_headers(
+    access_token: str | None = None, refresh_token: str | None = None
+) -> dict[str, str]:
+    headers = {}
+    if access_token:
+        headers["Authorization"] = f"Bearer {access_token}"
+    if refresh_token:
+        headers["refresh-token"] = refresh_token
+    return headers
+
+
+def export(
+    table: str = "inventory",
+    format: str = "csv",
+    output: str | None = None,
+    url: str = "http://localhost:8000",
+    access_token: str | None = None,
+    refresh_token: str | None = None,
+) -> None:
+    """
+    command: export
+    Download a whole table from a running server as a csv, ndjson or parquet
+    file (use --table, --format, --output, --url, --access_token and --refresh_token).
+    """
+    path = "sales/history" if table == "history" else table
+    output = output or f"{table}.{format}"
+    with httpx.stream(
+        "GET",
+        f"{url}/{path}/export",
+        params={"format": format},
+        headers=auth_headers(access_token, refresh_token),
+        timeout=None,
+    ) as response:
+        if response.is_error:
+            response.read()
+            print(response.json().get("message"))
+            exit(1)
+        written = 0
+        with open(output, "wb") as file:
+            for chunk in response.iter_bytes():
+                file.write(chunk)
+                written += len(chunk)
+                print(f"\r{written:,} bytes", end="", flush=True)
+    print(f"\nExported {table} to {output}")
+
+
+def import_table(
+    file: str,
+    table: str = "inventory",
+    chunk_size: int | None = None,
+    workers: int | None = None,
+    access_token: str | None = None,
+    refresh_token: str | None = None,
+) -> None:
+    """
+    command: import
+    Insert the rows of a csv or jsonl file into a table through its DAO
+    (use --table, --chunk_size, --workers, --access_token and --refresh_token).
+    --chunk_size and --workers default to the IMPORT_CHUNK_SIZE and
+    IMPORT_WORKERS settings.
+    An interrupted import resumes from `<file>.checkpoint` when run again;
+    invalid rows are written to `<file>.rejected.jsonl`.
+    """
+    from typing import Any, Callable
+
+    from supabase import Client
+
+    from src.config import Config
+    from src.db.base import get_authenticated_client, get_unauthenticated_client
+    from src.db.dao import BaseDAO, CustomerDAO, HistoryDAO, InventoryDAO, ReviewDAO
+    from src.db.importer import import_file
+
+    daos: dict[str, Callable[[Client], BaseDAO[Any]]] = {
+        "customers": CustomerDAO,
+        "inventory": InventoryDAO,
+        "reviews": ReviewDAO,
+        "history": HistoryDAO,
+    }
+    if table not in daos:
+        print(f"Unknown table {table}, expected one of {', '.join(daos)}")
+        exit(1)
+    if access_token and refresh_token:
+        client = get_authenticated_client(access_token, refresh_token)
+    else:
+        client = get_unauthenticated_client()
+
+    def report(progress: dict[str, float]) -> None:
+        print(
+            f"\r{progress['offset']:,} rows read, {progress['inserted']:,} inserted, "
+            f"{progress['rejected']:,} rejected, "
+            f"{progress['rows_per_second']:,.0f} rows/s",
+            end="",
+            flush=True,
+        )
+
+    progress = import_file(
+        daos[table](client),
+        file,
+        chunk_size=Config.IMPORT.CHUNK_SIZE if chunk_size is None else chunk_size,
+        workers=Config.IMPORT.WORKERS if workers is None else workers,
+        report=report,
+    )
+    print(
+        f"\nImported {progress['inserted']:,} rows into {table} "
+        f"in {progress['seconds']:.1f}s ({progress['rejected']:,} rejected)"
+    )
+
+
+def rebuild_ratings(
+    url: str = "http://localhost:8000",
+    access_token: str | None = None,
+    refresh_token: str | None = None,
+) -> None:
+    """
+    command: rebuild-ratings
+    Recompute the product rating summaries of a running server
+    from the Reviews table (use --url, --access_token and --refresh_token
+    of an admin user).
+    """
+    response = httpx.post(
+        f"{url}/reviews/summary/rebuild",
+        headers=auth_headers(access_token, refresh_token),
+    )
+    body = response.json()
+    print(body.get("message", body.get("detail")), body.get("data"))
+    if response.is_error:
+        exit(1)
+
+
 def help() -> None:
     """
     command: help
@@ -215,7 +381,18 @@ def help() -> None:
 
 if __name__ == "__main__":
     arg_parser = ArgumentParser()
-    args = arg_parser.parse_args()
+    # argparse binds the optional `file` positional right after `command`, so
+    # a file given after options (`import --table inventory rows.csv`) is
+    # left over and picked up here.
+    args = arg_parser.parse_args(known_only=True)
+    if (
+        args.file is None
+        and args.extra_args[:1]
+        and not args.extra_args[0].startswith("-")
+    ):
+        args.file = args.extra_args.pop(0)
+    if args.extra_args:
+        arg_parser.error(f"unrecognized arguments: {' '.join(args.extra_args)}")
 
     if args.command == "clean":
         clean()
@@ -234,6 +411,33 @@ if __name__ == "__main__":
         pre_stage()
     elif args.command == "clean-unused-files":
         clean_unused_files()
+    elif args.command == "export":
+        export(
+            table=args.table,
+            format=args.format,
+            output=args.output,
+            url=args.url,
+            access_token=args.access_token,
+            refresh_token=args.refresh_token,
+        )
+    elif args.command == "import":
+        if args.file is None:
+            print("Usage: python cli.py import --table <table> <file>")
+            exit(1)
+        import_table(
+            file=args.file,
+            table=args.table,
+            chunk_size=args.chunk_size,
+            workers=args.workers,
+            access_token=args.access_token,
+            refresh_token=args.refresh_token,
+        )
+    elif args.command == "rebuild-ratings":
+        rebuild_ratings(
+            url=args.url,
+            access_token=args.access_token,
+            refresh_token=args.refresh_token,
+        )
     elif args.command == "help":
         help()
     else:
@@ -4,20 +4,25 @@ interacting with the database and handling authentication tokens.
 """
 
 from fastapi import HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from gotrue import AuthResponse as GoTrueAuthResponse  # type: ignore
 from gotrue.errors import AuthApiError  # type: ignore
+from supabase import ASupabaseAuthClient
 
+from src.auth.gotrue_client import gotrue_call
 from src.auth.schemas import LoginRequest, RegisterRequest
 from src.db.dao import CustomerDAO
 from src.db.models import Customer
+from src.indexes.emails import email_index
 from src.session import Session
 from src.utils.responses import AuthResponse
 
 
-def register(request: RegisterRequest, customer_dao: CustomerDAO) -> AuthResponse:
+async def register(request: RegisterRequest, auth: ASupabaseAuthClient) -> AuthResponse:
     try:
-        result = customer_dao.client.auth.sign_up(request.auth_model_dump())
+        result = await gotrue_call(auth.sign_up(request.auth_model_dump()))
         customer = Customer.validate_supabase_user(result.user)
+        email_index.add(request.email, customer.id)
         return AuthResponse(customer=customer)
     except AuthApiError as e:
         if "Email rate limit exceeded" in str(e):
@@ -31,15 +36,22 @@ def register(request: RegisterRequest, customer_dao: CustomerDAO) -> AuthRespons
         )
 
 
-def login(request: LoginRequest, customer_dao: CustomerDAO) -> AuthResponse:
+async def login(
+    request: LoginRequest, customer_dao: CustomerDAO, auth: ASupabaseAuthClient
+) -> AuthResponse:
+    # An email the index has not seen may have been registered through another
+    # worker since it was loaded: skip the lookup and let GoTrue decide.
+    found = email_index.lookup(request.email)
     try:
-        if not customer_dao.get_by_query(email=request.email):
+        if found is None and not await run_in_threadpool(
+            email_index.fetch, request.email, customer_dao
+        ):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Customer not found",
             )
-        result: GoTrueAuthResponse = customer_dao.client.auth.sign_in_with_password(
-            request.auth_model_dump()
+        result: GoTrueAuthResponse = await gotrue_call(
+            auth.sign_in_with_password(request.auth_model_dump())
         )
         customer = Customer.validate_supabase_user(result.user)
         session = Session.validate_supabase_session(result.session)
@@ -50,5 +62,9 @@ def login(request: LoginRequest, customer_dao: CustomerDAO) -> AuthResponse:
     except AuthApiError:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Login failed, please check your credentials",
+            detail=(
+                "Customer not found"
+                if found is False
+                else "Login failed, please check your credentials"
+            ),
         )
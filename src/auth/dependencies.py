@@ -3,41 +3,80 @@ Defines dependencies for authentication, including JWT decoding and token extrac
 mechanisms for secured endpoints.
 """
 
-from fastapi import Depends, HTTPException, status
+from typing import Any
+
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from fastapi.security.api_key import APIKeyHeader
-from jwt import InvalidTokenError, PyJWTError, decode
+from jwt import PyJWTError
 
+from src.auth.jwt_verifier import jwt_verifier
 from src.config import Config
 
 
-def decode_jwt(token: str) -> dict[str, str]:
-    if Config.JWT.SECRET is None:
-        raise ValueError("JWT_SECRET must be set in the environment")
-    try:
-        decoded_data: dict[str, str] = decode(
-            token,
-            key=Config.JWT.SECRET,
-            algorithms=[Config.JWT.ALGORITHM],
-            audience=Config.JWT.AUDIENCE,
-        )
-        return decoded_data
-    except PyJWTError as e:
-        raise InvalidTokenError(str(e))
-
-
 async def get_access_token(
+    request: Request,
     bearer: HTTPAuthorizationCredentials = Depends(HTTPBearer(scheme_name="Bearer")),
 ) -> str:
+    """
+    Verify the bearer token and return it.
+
+    Tokens are verified through `jwt_verifier`, which caches the claims of
+    verified tokens until they expire. The claims are kept on
+    `request.state.token_claims` for `get_token_claims` and `get_user_id`,
+    so nothing downstream decodes the token again.
+    """
     try:
-        decode_jwt(bearer.credentials)
-    except InvalidTokenError as e:
+        request.state.token_claims = jwt_verifier.verify(bearer.credentials)
+    except PyJWTError as e:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail=f"Invalid token: {e}"
         )
     return bearer.credentials
 
 
+async def get_token_claims(
+    request: Request, _: str = Depends(get_access_token)
+) -> dict[str, Any]:
+    """
+    Return the claims of the verified bearer token of the request.
+
+    Empty when `get_access_token` is overridden, e.g. in tests.
+    """
+    claims: dict[str, Any] = getattr(request.state, "token_claims", {})
+    return claims
+
+
+async def get_user_id(claims: dict[str, Any] = Depends(get_token_claims)) -> str:
+    """
+    Return the id of the user of the verified bearer token (its `sub` claim).
+    """
+    if not claims.get("sub"):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Token has no subject"
+        )
+    user_id: str = claims["sub"]
+    return user_id
+
+
+async def require_admin(
+    claims: dict[str, Any] = Depends(get_token_claims),
+) -> dict[str, Any]:
+    """
+    Allow only admins, i.e. tokens whose `app_metadata.role` is
+    `Config.JWT.ADMIN_ROLE`, and return their claims.
+
+    `app_metadata` can only be written with the service role key, so users
+    cannot grant themselves the role.
+    """
+    app_metadata = claims.get("app_metadata") or {}
+    if app_metadata.get("role") != Config.JWT.ADMIN_ROLE:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Admin role required"
+        )
+    return claims
+
+
 async def get_refresh_token(
     token: str = Depends(APIKeyHeader(name="refresh-token")),
 ) -> str:
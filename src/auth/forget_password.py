@@ -4,20 +4,25 @@ and sending reset instructions via email.
 """
 
 from fastapi import HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+from supabase import ASupabaseAuthClient
 
+from src.auth.gotrue_client import gotrue_call
 from src.auth.schemas import ForgetPasswordRequest
 from src.db.dao import CustomerDAO
+from src.indexes.emails import email_index
 from src.utils.responses import AuthResponse
 
 
-def forget_password(
-    request: ForgetPasswordRequest, customer_dao: CustomerDAO
+async def forget_password(
+    request: ForgetPasswordRequest,
+    customer_dao: CustomerDAO,
+    auth: ASupabaseAuthClient,
 ) -> AuthResponse:
-    customer = customer_dao.get_by_query(email=request.email)[0]
-    if customer is None:
+    if not await run_in_threadpool(email_index.exists, request.email, customer_dao):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Customer not found",
         )
-    customer_dao.client.auth.reset_password_email(request.email)
+    await gotrue_call(auth.reset_password_email(request.email))
     return AuthResponse()
@@ -0,0 +1,89 @@
+"""
+Async GoTrue (Supabase Auth) clients for the `/auth` routes.
+
+Every request gets its own `ASupabaseAuthClient`, so sessions set by one
+request never leak into another, but all of them send their requests over a
+single `httpx.AsyncClient`: connections to the auth server are pooled
+(`Config.GOTRUE.MAX_CONNECTIONS`) and awaited on the event loop instead of
+blocking the worker.
+
+Each call is wrapped in `gotrue_call`, which gives up after
+`Config.GOTRUE.TIMEOUT` seconds with a 504, and answers a 503 when the auth
+server cannot be reached.
+"""
+
+from typing import Awaitable, Optional, TypeVar
+
+import anyio
+import httpx
+from fastapi import HTTPException, status
+from supabase import ASupabaseAuthClient, AuthRetryableError
+
+from src.config import Config
+
+T = TypeVar("T")
+
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def gotrue_http_client() -> httpx.AsyncClient:
+    """Return the connection pool shared by the GoTrue clients."""
+    global _http_client
+    if _http_client is None:
+        _http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=Config.GOTRUE.MAX_CONNECTIONS,
+                max_keepalive_connections=Config.GOTRUE.MAX_CONNECTIONS,
+            ),
+            timeout=Config.GOTRUE.TIMEOUT,
+            follow_redirects=True,
+        )
+    return _http_client
+
+
+def get_gotrue_client() -> ASupabaseAuthClient:
+    """
+    Creates a GoTrue client for one request over the shared connection pool.
+    """
+    if Config.SUPABASE.KEY is None or Config.SUPABASE.URL is None:
+        raise ValueError("SUPABASE_KEY and SUPABASE_URL must be set in the environment")
+    return ASupabaseAuthClient(
+        url=f"{Config.SUPABASE.URL}/auth/v1",
+        headers={
+            "apikey": Config.SUPABASE.KEY,
+            "Authorization": f"Bearer {Config.SUPABASE.KEY}",
+        },
+        http_client=gotrue_http_client(),
+        auto_refresh_token=False,
+        persist_session=False,
+    )
+
+
+async def gotrue_call(call: Awaitable[T], timeout: float = Config.GOTRUE.TIMEOUT) -> T:
+    """
+    Await a GoTrue call with a deadline.
+
+    Args:
+        call (Awaitable[T]): The call, e.g. `auth.sign_in_with_password(...)`.
+        timeout (float): Seconds to wait for it.
+
+    Raises:
+        HTTPException: 504 if the call timed out, 503 if the auth server could
+            not be reached.
+
+    Returns:
+        T: The result of the call.
+    """
+    try:
+        with anyio.fail_after(timeout):
+            return await call
+    except TimeoutError:
+        raise HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail="Authentication service timed out",
+        )
+    except AuthRetryableError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Authentication service unavailable",
+        )
@@ -0,0 +1,128 @@
+"""
+Verification of access tokens with a cache of verified claims.
+
+`JWTVerifier` prepares the signing key once, when it is created at startup,
+and keeps the claims of the tokens it verified in a bounded LRU cache keyed
+by a digest of the token. A cached token is answered without checking its
+signature again until its `exp`, after which the entry is dropped and the
+token is rejected like any expired token. Tokens without an `exp`, and
+tokens that fail verification, are never cached.
+
+Hits and misses are recorded in the metrics registry as
+`auth.jwt_cache_hits` and `auth.jwt_cache_misses`.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from hashlib import blake2b
+from typing import Any, Optional
+
+from jwt import PyJWT
+from jwt.algorithms import get_default_algorithms
+
+from src.config import Config
+from src.utils.metrics import metrics
+
+
+class JWTVerifier:
+    """
+    Verifier of HMAC-signed access tokens with a cache of verified claims.
+
+    Args:
+        secret (Optional[str]): The signing secret; verification raises
+            ValueError without one.
+        algorithm (str): The signing algorithm.
+        audience (str): The required `aud` claim.
+        max_entries (int): Maximum number of cached tokens.
+    """
+
+    def __init__(
+        self,
+        secret: Optional[str] = Config.JWT.SECRET,
+        algorithm: str = Config.JWT.ALGORITHM,
+        audience: str = Config.JWT.AUDIENCE,
+        max_entries: int = Config.JWT.CACHE_SIZE,
+    ) -> None:
+        self.algorithm = algorithm
+        self.audience = audience
+        self.max_entries = max_entries
+        self._key: Any = (
+            get_default_algorithms()[algorithm].prepare_key(secret)
+            if secret is not None
+            else None
+        )
+        self._jwt = PyJWT()
+        self._entries: OrderedDict[bytes, tuple[dict[str, Any], float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def decode(self, token: str) -> dict[str, Any]:
+        """
+        Verify a token's signature, audience and expiry, without the cache.
+
+        Args:
+            token (str): The encoded token.
+
+        Raises:
+            ValueError: If no secret was configured.
+            PyJWTError: If the token is invalid.
+
+        Returns:
+            dict[str, Any]: The token's claims.
+        """
+        if self._key is None:
+            raise ValueError("JWT_SECRET must be set in the environment")
+        claims: dict[str, Any] = self._jwt.decode(
+            token,
+            key=self._key,
+            algorithms=[self.algorithm],
+            audience=self.audience,
+        )
+        return claims
+
+    def verify(self, token: str) -> dict[str, Any]:
+        """
+        Return the claims of a token, verifying it unless it is cached.
+
+        Args:
+            token (str): The encoded token.
+
+        Raises:
+            ValueError: If no secret was configured.
+            PyJWTError: If the token is invalid.
+
+        Returns:
+            dict[str, Any]: The token's claims.
+        """
+        digest = blake2b(token.encode(), digest_size=16).digest()
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is not None:
+                if now < entry[1]:
+                    self._entries.move_to_end(digest)
+                    metrics.increment("auth.jwt_cache_hits")
+                    return entry[0]
+                del self._entries[digest]
+        metrics.increment("auth.jwt_cache_misses")
+        claims = self.decode(token)
+        expires_at = claims.get("exp")
+        if isinstance(expires_at, (int, float)):
+            with self._lock:
+                self._entries[digest] = (claims, float(expires_at))
+                self._entries.move_to_end(digest)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return claims
+
+    def clear(self) -> None:
+        """Drop every cached token."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+jwt_verifier = JWTVerifier()
+"""Verifier of the access tokens of this process, keyed with `Config.JWT`."""
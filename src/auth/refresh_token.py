@@ -3,14 +3,16 @@ Provides functionality to refresh authentication tokens, ensuring continuous use
 by issuing new tokens upon request.
 """
 
-from src.db.dao.customer_dao import CustomerDAO
+from supabase import ASupabaseAuthClient
+
+from src.auth.gotrue_client import gotrue_call
 from src.db.models import Customer
 from src.session import Session
 from src.utils.responses import AuthResponse
 
 
-def refresh_token(customer_dao: CustomerDAO) -> AuthResponse:
-    response = customer_dao.client.auth.refresh_session()
+async def refresh_token(refresh_token: str, auth: ASupabaseAuthClient) -> AuthResponse:
+    response = await gotrue_call(auth.refresh_session(refresh_token))
     customer = Customer.validate_supabase_user(response.user)
     session = Session.validate_supabase_session(response.session)
     return AuthResponse(customer=customer, session=session)
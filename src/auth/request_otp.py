@@ -3,11 +3,13 @@ Manages the generation and sending of OTPs (One-Time Passwords) for user authent
 purposes.
 """
 
+from supabase import ASupabaseAuthClient
+
+from src.auth.gotrue_client import gotrue_call
 from src.auth.schemas import OTPRequest
-from src.db.dao import CustomerDAO
 from src.utils.responses.auth_response import AuthResponse
 
 
-def request_otp(request: OTPRequest, customer_dao: CustomerDAO) -> AuthResponse:
-    customer_dao.client.auth.sign_in_with_otp({"email": request.email})
+async def request_otp(request: OTPRequest, auth: ASupabaseAuthClient) -> AuthResponse:
+    await gotrue_call(auth.sign_in_with_otp({"email": request.email}))
     return AuthResponse()
@@ -3,15 +3,21 @@ Handles the logic for resetting a customer's password, including updating the pa
 in the database and validating the operation.
 """
 
+from supabase import ASupabaseAuthClient
+
+from src.auth.gotrue_client import gotrue_call
 from src.auth.schemas import ResetPasswordRequest
-from src.db.dao import CustomerDAO
 from src.db.models import Customer
 from src.utils.responses import AuthResponse
 
 
-def reset_password(
-    request: ResetPasswordRequest, customer_dao: CustomerDAO
+async def reset_password(
+    request: ResetPasswordRequest,
+    access_token: str,
+    refresh_token: str,
+    auth: ASupabaseAuthClient,
 ) -> AuthResponse:
-    response = customer_dao.client.auth.update_user({"password": request.password})
+    await gotrue_call(auth.set_session(access_token, refresh_token))
+    response = await gotrue_call(auth.update_user({"password": request.password}))
     customer = Customer.validate_supabase_user(response.user)
     return AuthResponse(customer=customer)
@@ -4,9 +4,13 @@ password reset, token refresh, and OTP handling.
 """
 
 from fastapi import APIRouter, Depends, status
+from fastapi.concurrency import run_in_threadpool
+from supabase import ASupabaseAuthClient
 
 from src.auth.auth import login, register
+from src.auth.dependencies import get_access_token, get_refresh_token
 from src.auth.forget_password import forget_password
+from src.auth.gotrue_client import get_gotrue_client
 from src.auth.refresh_token import refresh_token
 from src.auth.request_otp import request_otp
 from src.auth.reset_password import reset_password
@@ -19,26 +23,42 @@ from src.auth.schemas import (
     VerifyOTPRequest,
 )
 from src.auth.verify_otp import verify_otp
+from src.config import Config
 from src.db.dao import CustomerDAO
 from src.db.dao.customer_dao import CustomerDAO
-from src.db.dependencies import get_customer_dao, get_customer_dao_unauthenticated
+from src.db.dependencies import get_customer_dao_unauthenticated
+from src.indexes.emails import email_index
+from src.utils.rate_limit import SlidingWindow, TokenBucket, rate_limit
 from src.utils.responses import APIResponse
 from src.utils.responses.API_response import APIResponse
 
 auth_router = APIRouter(prefix="/auth", tags=["Authentication"])
 
+AUTH_IP = TokenBucket(
+    "ip", Config.RATE_LIMIT.AUTH_IP_BURST, Config.RATE_LIMIT.AUTH_IP_RATE
+)
+LOGIN_EMAIL = SlidingWindow(
+    "email", Config.RATE_LIMIT.LOGIN_EMAIL_LIMIT, Config.RATE_LIMIT.LOGIN_EMAIL_WINDOW
+)
+MAIL_EMAIL = SlidingWindow(
+    "email", Config.RATE_LIMIT.MAIL_EMAIL_LIMIT, Config.RATE_LIMIT.MAIL_EMAIL_WINDOW
+)
+
 
 @auth_router.post(
     "/register",
     response_class=APIResponse,
     summary="Register",
     description="Register a new Customer",
+    dependencies=[Depends(rate_limit("auth.register", AUTH_IP, MAIL_EMAIL))],
 )
 async def register_route(
     request: RegisterRequest,
     Customer_dao: CustomerDAO = Depends(get_customer_dao_unauthenticated),
+    auth: ASupabaseAuthClient = Depends(get_gotrue_client),
 ) -> APIResponse:
-    if Customer_dao.get_by_query(email=request.email):
+    await run_in_threadpool(email_index.load_if_stale, Customer_dao)
+    if await run_in_threadpool(email_index.exists, request.email, Customer_dao):
         return APIResponse(
             message="Email already in use",
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -46,7 +66,7 @@ async def register_route(
     return APIResponse(
         message="Registration successful",
         status_code=status.HTTP_200_OK,
-        data=register(request, Customer_dao).model_dump(),
+        data=await register(request, auth),
     )
 
 
@@ -55,15 +75,18 @@ async def register_route(
     response_class=APIResponse,
     summary="Login",
     description="Login to the system",
+    dependencies=[Depends(rate_limit("auth.login", AUTH_IP, LOGIN_EMAIL))],
 )
 async def login_route(
     request: LoginRequest,
     Customer_dao: CustomerDAO = Depends(get_customer_dao_unauthenticated),
+    auth: ASupabaseAuthClient = Depends(get_gotrue_client),
 ) -> APIResponse:
+    await run_in_threadpool(email_index.load_if_stale, Customer_dao)
     return APIResponse(
         message="Login successful",
         status_code=status.HTTP_200_OK,
-        data=login(request, Customer_dao).model_dump(),
+        data=await login(request, Customer_dao, auth),
     )
 
 
@@ -75,12 +98,14 @@ async def login_route(
 )
 async def reset_password_route(
     request: ResetPasswordRequest,
-    Customer_dao: CustomerDAO = Depends(get_customer_dao),
+    access_token: str = Depends(get_access_token),
+    refresh_token: str = Depends(get_refresh_token),
+    auth: ASupabaseAuthClient = Depends(get_gotrue_client),
 ) -> APIResponse:
     return APIResponse(
         message="Password change successful",
         status_code=status.HTTP_200_OK,
-        data=reset_password(request, Customer_dao).model_dump(),
+        data=await reset_password(request, access_token, refresh_token, auth),
     )
 
 
@@ -89,15 +114,18 @@ async def reset_password_route(
     response_class=APIResponse,
     summary="Forget Password",
     description="Forget Customer password",
+    dependencies=[Depends(rate_limit("auth.forget_password", AUTH_IP, MAIL_EMAIL))],
 )
 async def forgot_password_route(
     request: ForgetPasswordRequest,
     Customer_dao: CustomerDAO = Depends(get_customer_dao_unauthenticated),
+    auth: ASupabaseAuthClient = Depends(get_gotrue_client),
 ) -> APIResponse:
+    await run_in_threadpool(email_index.load_if_stale, Customer_dao)
     return APIResponse(
         message="Forget password email sent successfully",
         status_code=status.HTTP_200_OK,
-        data=forget_password(request, Customer_dao).model_dump(),
+        data=await forget_password(request, Customer_dao, auth),
     )
 
 
@@ -108,12 +136,13 @@ async def forgot_password_route(
     description="Refresh Customer token",
 )
 async def refresh_token_route(
-    Customer_dao: CustomerDAO = Depends(get_customer_dao),
+    token: str = Depends(get_refresh_token),
+    auth: ASupabaseAuthClient = Depends(get_gotrue_client),
 ) -> APIResponse:
     return APIResponse(
         message="Token refresh successful",
         status_code=status.HTTP_200_OK,
-        data=refresh_token(Customer_dao).model_dump(),
+        data=await refresh_token(token, auth),
     )
 
 
@@ -122,15 +151,16 @@ async def refresh_token_route(
     response_class=APIResponse,
     summary="Request OTP",
     description="Request OTP",
+    dependencies=[Depends(rate_limit("auth.request_otp", AUTH_IP, MAIL_EMAIL))],
 )
 async def request_otp_route(
     request: OTPRequest,
-    Customer_dao: CustomerDAO = Depends(get_customer_dao_unauthenticated),
+    auth: ASupabaseAuthClient = Depends(get_gotrue_client),
 ) -> APIResponse:
     return APIResponse(
         message="OTP request successful",
         status_code=status.HTTP_200_OK,
-        data=request_otp(request, Customer_dao).model_dump(),
+        data=await request_otp(request, auth),
     )
 
 
@@ -142,10 +172,10 @@ async def request_otp_route(
 )
 async def verify_otp_route(
     request: VerifyOTPRequest,
-    Customer_dao: CustomerDAO = Depends(get_customer_dao_unauthenticated),
+    auth: ASupabaseAuthClient = Depends(get_gotrue_client),
 ) -> APIResponse:
     return APIResponse(
         message="OTP verification successful",
         status_code=status.HTTP_200_OK,
-        data=verify_otp(request, Customer_dao).model_dump(),
+        data=await verify_otp(request, auth),
     )
@@ -3,16 +3,22 @@ Manages the verification of OTPs (One-Time Passwords) provided by users for auth
 and account recovery purposes.
 """
 
+from supabase import ASupabaseAuthClient
+
+from src.auth.gotrue_client import gotrue_call
 from src.auth.schemas import VerifyOTPRequest
-from src.db.dao import CustomerDAO
 from src.db.models import Customer
 from src.session import Session
 from src.utils.responses.auth_response import AuthResponse
 
 
-def verify_otp(request: VerifyOTPRequest, customer_dao: CustomerDAO) -> AuthResponse:
-    response = customer_dao.client.auth.verify_otp(
-        {"email": request.email, "token": request.otp, "type": "recovery"}
+async def verify_otp(
+    request: VerifyOTPRequest, auth: ASupabaseAuthClient
+) -> AuthResponse:
+    response = await gotrue_call(
+        auth.verify_otp(
+            {"email": request.email, "token": request.otp, "type": "recovery"}
+        )
     )
     customer = Customer.validate_supabase_user(response.user)
     session = Session.validate_supabase_session(response.session)
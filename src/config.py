@@ -1,4 +1,5 @@
 import os
+import tempfile
 
 from dotenv import load_dotenv
 
@@ -19,7 +20,10 @@ class Config:
         """Supabase configuration settings."""
 
         KEY = os.getenv("SUPABASE_KEY")
+        SERVICE_KEY = os.getenv("SUPABASE_SERVICE_KEY")
         URL = os.getenv("SUPABASE_URL")
+        MAX_CONNECTIONS = int(os.getenv("SUPABASE_MAX_CONNECTIONS", 100))
+        TIMEOUT = float(os.getenv("SUPABASE_TIMEOUT", 120))
 
     class JWT:
         """JWT authentication settings."""
@@ -27,6 +31,135 @@ class Config:
         SECRET = os.getenv("JWT_SECRET")
         ALGORITHM = "HS256"
         AUDIENCE = "authenticated"
+        ADMIN_ROLE = "admin"
+        CACHE_SIZE = int(os.getenv("JWT_CACHE_SIZE", 10000))
+
+    class GOTRUE:
+        """Supabase Auth (GoTrue) client settings."""
+
+        TIMEOUT = float(os.getenv("GOTRUE_TIMEOUT", 10))
+        MAX_CONNECTIONS = int(os.getenv("GOTRUE_MAX_CONNECTIONS", 100))
+
+    class RATE_LIMIT:
+        """Rate limiter settings; counters are shared through the file at PATH."""
+
+        PATH = os.getenv(
+            "RATE_LIMIT_PATH",
+            os.path.join(
+                "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir(),
+                "ecommerce-rate-limit",
+            ),
+        )
+        SLOTS = int(os.getenv("RATE_LIMIT_SLOTS", 65536))
+        TRUSTED_PROXIES = [
+            proxy.strip()
+            for proxy in os.getenv("RATE_LIMIT_TRUSTED_PROXIES", "").split(",")
+            if proxy.strip()
+        ]
+        AUTH_IP_BURST = int(os.getenv("RATE_LIMIT_AUTH_IP_BURST", 20))
+        AUTH_IP_RATE = float(os.getenv("RATE_LIMIT_AUTH_IP_RATE", 0.5))
+        LOGIN_EMAIL_LIMIT = int(os.getenv("RATE_LIMIT_LOGIN_EMAIL_LIMIT", 5))
+        LOGIN_EMAIL_WINDOW = float(os.getenv("RATE_LIMIT_LOGIN_EMAIL_WINDOW", 300))
+        MAIL_EMAIL_LIMIT = int(os.getenv("RATE_LIMIT_MAIL_EMAIL_LIMIT", 3))
+        MAIL_EMAIL_WINDOW = float(os.getenv("RATE_LIMIT_MAIL_EMAIL_WINDOW", 3600))
+        WRITE_CUSTOMER_BURST = int(os.getenv("RATE_LIMIT_WRITE_CUSTOMER_BURST", 30))
+        WRITE_CUSTOMER_RATE = float(os.getenv("RATE_LIMIT_WRITE_CUSTOMER_RATE", 1))
+
+    class COMPRESSION:
+        """Response compression settings."""
+
+        MINIMUM_SIZE = int(os.getenv("COMPRESSION_MINIMUM_SIZE", 1024))
+        THREAD_THRESHOLD = int(os.getenv("COMPRESSION_THREAD_THRESHOLD", 256 * 1024))
+        CACHE_SIZE = int(os.getenv("COMPRESSION_CACHE_SIZE", 64))
+        GZIP_LEVEL = 6
+        BROTLI_QUALITY = 5
+        ZSTD_LEVEL = 3
+
+    class ADMISSION:
+        """Admission control settings: limits, queues and deadlines per route class."""
+
+        MAX_CONCURRENCY = int(os.getenv("ADMISSION_MAX_CONCURRENCY", 64))
+        CRITICAL_LIMIT = int(os.getenv("ADMISSION_CRITICAL_LIMIT", 64))
+        CRITICAL_QUEUE = int(os.getenv("ADMISSION_CRITICAL_QUEUE", 256))
+        CRITICAL_DEADLINE = float(os.getenv("ADMISSION_CRITICAL_DEADLINE", 5))
+        POINT_LIMIT = int(os.getenv("ADMISSION_POINT_LIMIT", 48))
+        POINT_QUEUE = int(os.getenv("ADMISSION_POINT_QUEUE", 128))
+        POINT_DEADLINE = float(os.getenv("ADMISSION_POINT_DEADLINE", 1))
+        BULK_LIMIT = int(os.getenv("ADMISSION_BULK_LIMIT", 8))
+        BULK_QUEUE = int(os.getenv("ADMISSION_BULK_QUEUE", 16))
+        BULK_DEADLINE = float(os.getenv("ADMISSION_BULK_DEADLINE", 2))
+        RETRY_AFTER = int(os.getenv("ADMISSION_RETRY_AFTER", 1))
+
+    class CACHE:
+        """Response cache settings."""
+
+        TTL = float(os.getenv("CACHE_TTL", 30))
+        MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", 1024))
+        BETA = float(os.getenv("CACHE_BETA", 1.0))
+
+    class TABLE_VERSIONS:
+        """Settings of the in-process copy of the shared table versions."""
+
+        MAX_AGE = float(os.getenv("TABLE_VERSIONS_MAX_AGE", 1))
+
+    class CATALOG:
+        """In-process catalog snapshot settings."""
+
+        MAX_AGE = float(os.getenv("CATALOG_MAX_AGE", 300))
+        INITIAL_CAPACITY = 1024
+
+    class EMAIL_INDEX:
+        """In-process index of customer emails."""
+
+        FALSE_POSITIVE_RATE = 0.01
+        VERIFIED_SIZE = int(os.getenv("EMAIL_INDEX_VERIFIED_SIZE", 100_000))
+
+    class SEARCH:
+        """Product search settings."""
+
+        K1 = 1.2
+        B = 0.75
+        NAME_WEIGHT = 2
+        LIMIT = 20
+
+    class SUGGEST:
+        """Product name autocomplete settings."""
+
+        LIMIT = 10
+        CACHE_SIZE = 256
+
+    class RATINGS:
+        """Rating aggregate settings."""
+
+        PRIOR_WEIGHT = 5
+
+    class ANALYTICS:
+        """Sales analytics settings."""
+
+        LIMIT = 20
+
+    class STREAMING:
+        """Paged, streamed response settings."""
+
+        PAGE_SIZE = int(os.getenv("STREAMING_PAGE_SIZE", 1000))
+
+    class EXPORT:
+        """Bulk export settings."""
+
+        ROW_GROUP_SIZE = int(os.getenv("EXPORT_ROW_GROUP_SIZE", 50_000))
+
+    class IMPORT:
+        """Bulk import settings."""
+
+        CHUNK_SIZE = int(os.getenv("IMPORT_CHUNK_SIZE", 500))
+        WORKERS = int(os.getenv("IMPORT_WORKERS", 4))
+
+    class INGEST:
+        """Streamed NDJSON ingestion settings."""
+
+        BATCH_SIZE = int(os.getenv("INGEST_BATCH_SIZE", 500))
+        MAX_LINE_BYTES = int(os.getenv("INGEST_MAX_LINE_BYTES", 1024 * 1024))
+        MAX_REJECTED_DETAILS = int(os.getenv("INGEST_MAX_REJECTED_DETAILS", 10))
 
     class Testing:
         """Testing configurations."""
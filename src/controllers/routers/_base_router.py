@@ -5,6 +5,7 @@ This module defines the BaseRouter class, which provides generic CRUD operations
 from enum import Enum
 from typing import (
     Any,
+    AsyncIterator,
     Callable,
     Generic,
     Optional,
@@ -14,15 +15,30 @@ from typing import (
     get_type_hints,
 )
 
-from fastapi import Depends, Query, status
+from fastapi import Depends, Query, Request, Response, status
+from fastapi.exceptions import RequestValidationError
 from fastapi.routing import APIRouter
 from pydantic import BaseModel as PydanticBaseModel
-from pydantic import create_model
+from pydantic import TypeAdapter, ValidationError, create_model
+from pydantic_core import to_json
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import ClientDisconnect
 
+from src.config import Config
 from src.controllers.schemas._base_schemas import BaseResponse
 from src.db.dao import BaseDAO
 from src.db.models import BaseModel
-from src.utils.responses import APIResponse
+from src.utils.responses import (
+    APIResponse,
+    ExportFormat,
+    NegotiatedRoute,
+    RawItems,
+    conditional_get,
+    export_table,
+    response_cache,
+    with_etag,
+)
+from src.utils.responses.streaming import NDJSON, BodyStream, ndjson_lines
 from src.utils.types import UuidStr
 
 BaseModelType = TypeVar("BaseModelType", bound=BaseModel)
@@ -38,6 +54,14 @@ class BaseRouter(Generic[BaseModelType]):
         name (str): The name of the model.
         model (Type[BaseModelType]): The Pydantic model class.
         get_dao (Callable[[], BaseDAO[BaseModelType]]): Function to get the data access object.
+        passthrough (bool): Serve `GET /` by splicing the upstream JSON rows into the
+            response envelope without parsing them. Meant for read-only listings.
+        table (Optional[str]): Table served by the router. When set, `GET /` and
+            `GET /{id}` send an ETag derived from its write version and answer a
+            matching `If-None-Match` with 304 without touching the database.
+        cache_ttl (Optional[float]): Cache `GET /` responses for this many seconds,
+            keyed by query, auth scope and the table's write version.
+        cache_scope (str): Who may share a cached response ("public", "role" or "user").
     """
 
     def __init__(
@@ -47,12 +71,23 @@ class BaseRouter(Generic[BaseModelType]):
         name: str,
         model: Type[BaseModelType],
         get_dao: Callable[[], BaseDAO[BaseModelType]],
+        passthrough: bool = False,
+        table: Optional[str] = None,
+        cache_ttl: Optional[float] = None,
+        cache_scope: str = "user",
     ):
         self.name = name
-        self.request = {
-            field: field for field in model.model_fields.keys() if field != "id"
-        }
-        self.request_many = [self.request]
+        self.passthrough = passthrough
+        self.table = table
+        self.conditional: Callable[..., Optional[str]] = (
+            conditional_get(table) if table else lambda: None
+        )
+        self.cache_ttl = cache_ttl
+        self.cache_scope = cache_scope
+        self.create_schema = model.create_schema()
+        self.create_many_schema = TypeAdapter(list[self.create_schema])  # type: ignore[name-defined]
+        self.update_schema = model.update_schema()
+        self.response_model = BaseResponse[model]  # type: ignore[valid-type]
         fields: dict[str, type] = dict(get_type_hints(model))
         queries: dict[str, Any] = {
             key: (Optional[fields[key]], Query(None)) for key in fields if key != "id"
@@ -62,6 +97,7 @@ class BaseRouter(Generic[BaseModelType]):
         self.router = APIRouter(
             prefix=prefix,
             tags=tags,
+            route_class=NegotiatedRoute,
         )
 
     async def get_by_query(
@@ -78,12 +114,24 @@ class BaseRouter(Generic[BaseModelType]):
             APIResponse: The response containing the retrieved items or an error message.
         """
         try:
+            if self.passthrough:
+                raw_items = RawItems(dao.get_raw_by_query(**query.model_dump()))
+                if raw_items:
+                    return APIResponse(
+                        status_code=status.HTTP_200_OK,
+                        message=f"{self.name}s found",
+                        data=raw_items,
+                    )
+                return APIResponse(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    message=f"{self.name}s not found",
+                )
             items = dao.get_by_query(**query.model_dump())
             if items:
                 return APIResponse(
                     status_code=status.HTTP_200_OK,
                     message=f"{self.name}s found",
-                    data=BaseResponse[BaseModelType](items=items).model_dump(),
+                    data=self.response_model(items=items),
                 )
             return APIResponse(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -97,14 +145,15 @@ class BaseRouter(Generic[BaseModelType]):
 
     async def create(
         self,
-        request: dict[str, Any],
+        request: Union[PydanticBaseModel, dict[str, Any]],
         dao: BaseDAO[BaseModelType],
     ) -> APIResponse:
         """
         Creates a new item.
 
         Args:
-            request (dict[str, Any]): The data for the new item.
+            request (Union[PydanticBaseModel, dict[str, Any]]): The data for the new item,
+                usually an instance of the model's create schema.
             dao (BaseDAO[BaseModelType]): The data access object.
 
         Returns:
@@ -116,7 +165,7 @@ class BaseRouter(Generic[BaseModelType]):
                 return APIResponse(
                     status_code=status.HTTP_201_CREATED,
                     message=f"{self.name} created",
-                    data=BaseResponse[BaseModelType](items=[item]).model_dump(),
+                    data=self.response_model(items=[item]),
                 )
             return APIResponse(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -130,14 +179,14 @@ class BaseRouter(Generic[BaseModelType]):
 
     async def create_many(
         self,
-        request: list[dict[str, Any]],
+        request: list[Union[PydanticBaseModel, dict[str, Any]]],
         dao: BaseDAO[BaseModelType],
     ) -> APIResponse:
         """
         Creates multiple new items.
 
         Args:
-            request (list[dict[str, Any]]): The data for the new items.
+            request (list[Union[PydanticBaseModel, dict[str, Any]]]): The data for the new items.
             dao (BaseDAO[BaseModelType]): The data access object.
 
         Returns:
@@ -149,7 +198,7 @@ class BaseRouter(Generic[BaseModelType]):
                 return APIResponse(
                     status_code=status.HTTP_201_CREATED,
                     message=f"{self.name}s created",
-                    data=BaseResponse[BaseModelType](items=items).model_dump(),
+                    data=self.response_model(items=items),
                 )
             return APIResponse(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -161,6 +210,91 @@ class BaseRouter(Generic[BaseModelType]):
                 message=str(e),
             )
 
+    async def create_many_ndjson(
+        self, request: Request, dao: BaseDAO[BaseModelType]
+    ) -> Response:
+        """
+        Creates items from an NDJSON body while it is being received.
+
+        Each line is validated as it arrives and valid items are inserted in
+        batches of `Config.INGEST.BATCH_SIZE`, so only the current batch of the
+        body is held in memory. The result of each batch is streamed as soon
+        as it is inserted.
+
+        The response is NDJSON with one line per batch, giving the line range
+        it covers, the number of items inserted, the number of rejected lines
+        with the details of the first `Config.INGEST.MAX_REJECTED_DETAILS` and,
+        if the insert failed, its error, then a final `{"summary": ...}` line.
+
+        Args:
+            request (Request): The request with the NDJSON body.
+            dao (BaseDAO[BaseModelType]): The data access object.
+
+        Returns:
+            Response: The streamed NDJSON batch results.
+        """
+
+        async def results() -> AsyncIterator[bytes]:
+            batch: list[PydanticBaseModel] = []
+            rejected: list[dict[str, Any]] = []
+            lines: list[int] = []
+            totals = {"batches": 0, "inserted": 0, "rejected": 0}
+
+            def reject(number: int, error: Any) -> None:
+                totals["rejected"] += 1
+                if len(rejected) < Config.INGEST.MAX_REJECTED_DETAILS:
+                    rejected.append({"line": number, "error": error})
+
+            async def flush() -> bytes:
+                result: dict[str, Any] = {
+                    "batch": totals["batches"],
+                    "lines": [lines[0], lines[-1]],
+                    "inserted": 0,
+                    "rejected": len(lines) - len(batch),
+                    "rejected_lines": list(rejected),
+                }
+                try:
+                    if batch:
+                        items = await run_in_threadpool(dao.create_many, list(batch))
+                        result["inserted"] = len(items)
+                except Exception as e:
+                    result["error"] = str(e)
+                totals["batches"] += 1
+                totals["inserted"] += result["inserted"]
+                batch.clear()
+                rejected.clear()
+                lines.clear()
+                return to_json(result) + b"\n"
+
+            try:
+                async for number, line in ndjson_lines(
+                    request.stream(), Config.INGEST.MAX_LINE_BYTES
+                ):
+                    lines.append(number)
+                    if line is None:
+                        reject(number, "Line too long")
+                    else:
+                        try:
+                            batch.append(self.create_schema.model_validate_json(line))
+                        except ValidationError as e:
+                            reject(
+                                number,
+                                e.errors(
+                                    include_url=False,
+                                    include_context=False,
+                                    include_input=False,
+                                ),
+                            )
+                    if len(lines) >= Config.INGEST.BATCH_SIZE:
+                        yield await flush()
+            except ClientDisconnect:
+                return
+            if lines:
+                yield await flush()
+            yield to_json({"summary": totals}) + b"\n"
+
+        return BodyStream(results(), media_type=NDJSON)
+
     async def get_by_id(self, id: UuidStr, dao: BaseDAO[BaseModelType]) -> APIResponse:
         """
         Retrieves an item by its ID.
@@ -178,7 +312,7 @@ class BaseRouter(Generic[BaseModelType]):
                 return APIResponse(
                     status_code=status.HTTP_200_OK,
                     message=f"{self.name} found",
-                    data=BaseResponse[BaseModelType](items=[item]).model_dump(),
+                    data=self.response_model(items=[item]),
                 )
             return APIResponse(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -193,7 +327,7 @@ class BaseRouter(Generic[BaseModelType]):
     async def update(
         self,
         id: UuidStr,
-        request: dict[str, Any],
+        request: Union[PydanticBaseModel, dict[str, Any]],
         dao: BaseDAO[BaseModelType],
     ) -> APIResponse:
         """
@@ -201,7 +335,8 @@ class BaseRouter(Generic[BaseModelType]):
 
         Args:
             id (UuidStr): The UUID of the item.
-            request (dict[str, Any]): The updated data for the item.
+            request (Union[PydanticBaseModel, dict[str, Any]]): The updated data for the item,
+                usually an instance of the model's update schema.
             dao (BaseDAO[BaseModelType]): The data access object.
 
         Returns:
@@ -213,7 +348,7 @@ class BaseRouter(Generic[BaseModelType]):
                 return APIResponse(
                     status_code=status.HTTP_200_OK,
                     message=f"{self.name} updated",
-                    data=BaseResponse[BaseModelType](items=[item]).model_dump(),
+                    data=self.response_model(items=[item]),
                 )
             return APIResponse(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -242,7 +377,7 @@ class BaseRouter(Generic[BaseModelType]):
                 return APIResponse(
                     status_code=status.HTTP_200_OK,
                     message=f"{self.name} deleted",
-                    data=BaseResponse[BaseModelType](items=[item]).model_dump(),
+                    data=self.response_model(items=[item]),
                 )
             return APIResponse(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -254,6 +389,21 @@ class BaseRouter(Generic[BaseModelType]):
                 message=str(e),
             )
 
+    async def export(
+        self, format: ExportFormat, dao: BaseDAO[BaseModelType]
+    ) -> Response:
+        """
+        Streams every item of the table as a CSV, NDJSON or Parquet file.
+
+        Args:
+            format (ExportFormat): The file format.
+            dao (BaseDAO[BaseModelType]): The data access object.
+
+        Returns:
+            Response: The streamed file or an error message.
+        """
+        return await export_table(dao, format, filename=self.router.prefix.strip("/"))
+
     def build_router(self) -> APIRouter:
         """
         Builds and returns the APIRouter with all the CRUD endpoints.
@@ -262,38 +412,89 @@ class BaseRouter(Generic[BaseModelType]):
             APIRouter: The configured router.
         """
 
-        @self.router.get("/")
         async def get_by_query(
             query: PydanticBaseModel = Depends(self.query),
+            etag: Optional[str] = Depends(self.conditional),
             dao: BaseDAO[BaseModelType] = Depends(self.get_dao),
-        ) -> APIResponse:
-            return await self.get_by_query(query, dao)
+        ) -> Response:
+            return with_etag(await self.get_by_query(query, dao), etag)
+
+        if self.cache_ttl is not None:
+            get_by_query = response_cache.cached(
+                ttl=self.cache_ttl,
+                tables=[self.table] if self.table else [],
+                scope=self.cache_scope,
+            )(get_by_query)
+        self.router.get("/")(get_by_query)
 
         @self.router.post("/")
         async def create(
-            request: dict[str, Any] = self.request,
+            request: self.create_schema,  # type: ignore[name-defined]
             dao: BaseDAO[BaseModelType] = Depends(self.get_dao),
         ) -> APIResponse:
             return await self.create(request, dao)
 
-        @self.router.post("/many")
+        @self.router.post(
+            "/many",
+            openapi_extra={
+                "requestBody": {
+                    "required": True,
+                    "content": {
+                        "application/json": {
+                            "schema": {
+                                "type": "array",
+                                "items": self.create_schema.model_json_schema(),
+                            }
+                        },
+                        NDJSON: {"schema": {"type": "string"}},
+                    },
+                }
+            },
+        )
         async def create_many(
-            request: list[dict[str, Any]] = self.request_many,
+            request: Request,
             dao: BaseDAO[BaseModelType] = Depends(self.get_dao),
-        ) -> APIResponse:
-            return await self.create_many(request, dao)
+        ) -> Response:
+            content_type = request.headers.get("content-type", "")
+            if content_type.split(";")[0].strip().lower() == NDJSON:
+                return await self.create_many_ndjson(request, dao)
+            try:
+                items = self.create_many_schema.validate_python(await request.json())
+            except ValidationError as e:
+                raise RequestValidationError(
+                    [{**error, "loc": ("body", *error["loc"])} for error in e.errors()]
+                )
+            except ValueError:
+                raise RequestValidationError(
+                    [
+                        {
+                            "type": "json_invalid",
+                            "loc": ("body",),
+                            "msg": "JSON decode error",
+                        }
+                    ]
+                )
+            return await self.create_many(items, dao)
+
+        @self.router.get("/export")
+        async def export(
+            format: ExportFormat = "csv",
+            dao: BaseDAO[BaseModelType] = Depends(self.get_dao),
+        ) -> Response:
+            return await self.export(format, dao)
 
         @self.router.get("/{id}")
         async def get_by_id(
             id: UuidStr,
+            etag: Optional[str] = Depends(self.conditional),
             dao: BaseDAO[BaseModelType] = Depends(self.get_dao),
-        ) -> APIResponse:
-            return await self.get_by_id(id, dao)
+        ) -> Response:
+            return with_etag(await self.get_by_id(id, dao), etag)
 
         @self.router.put("/{id}")
         async def update(
             id: UuidStr,
-            request: dict[str, Any] = self.request,
+            request: self.update_schema,  # type: ignore[name-defined]
             dao: BaseDAO[BaseModelType] = Depends(self.get_dao),
         ) -> APIResponse:
             return await self.update(id, request, dao)
@@ -315,6 +516,13 @@ class BaseRouter(Generic[BaseModelType]):
 # Method: GET
 # URL: http://localhost:8000/{prefix}/
 
+# GET /{prefix}/export
+# Description: Download all items as a streamed file.
+# Method: GET
+# URL: http://localhost:8000/{prefix}/export
+# Query Parameters:
+#   - format: "csv" | "ndjson" | "parquet" (optional, default "csv")
+
 # POST /{prefix}/
 # Description: Create a new item.
 # Method: POST
@@ -325,7 +533,10 @@ class BaseRouter(Generic[BaseModelType]):
 # }
 
 # POST /{prefix}/many
-# Description: Create multiple new items.
+# Description: Create multiple new items. With `Content-Type: application/x-ndjson`
+#   the body holds one item per line; it is inserted in batches while it is
+#   uploaded and the response streams one NDJSON result line per batch, with
+#   the details of at most `INGEST_MAX_REJECTED_DETAILS` rejected lines each.
 # Method: POST
 # URL: http://localhost:8000/{prefix}/many
 # Body:
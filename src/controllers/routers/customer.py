@@ -5,10 +5,12 @@ This module defines the router for handling customer-related operations, includi
 from fastapi import Depends, status
 from pydantic import PositiveFloat
 
+from src.config import Config
 from src.controllers.routers import BaseRouter
 from src.db.dao import BaseDAO
 from src.db.dependencies import get_customer_dao
 from src.db.models import Customer
+from src.utils.rate_limit import TokenBucket, rate_limit
 from src.utils.responses.API_response import APIResponse
 from src.utils.types import UuidStr
 
@@ -20,8 +22,17 @@ customers_router = BaseRouter[Customer](
     get_dao=get_customer_dao,
 ).build_router()
 
+WRITE_CUSTOMER = TokenBucket(
+    "customer",
+    Config.RATE_LIMIT.WRITE_CUSTOMER_BURST,
+    Config.RATE_LIMIT.WRITE_CUSTOMER_RATE,
+)
 
-@customers_router.put("/deduct/{id}")
+
+@customers_router.put(
+    "/deduct/{id}",
+    dependencies=[Depends(rate_limit("customers.deduct", WRITE_CUSTOMER))],
+)
 async def deduct_money(
     id: UuidStr,
     amount: PositiveFloat,
@@ -60,7 +71,7 @@ async def deduct_money(
         return APIResponse(
             status_code=status.HTTP_200_OK,
             message="Money deducted successfully",
-            data=updated_customer.model_dump(),
+            data=updated_customer,
         )
     except Exception as e:
         return APIResponse(
@@ -69,7 +80,10 @@ async def deduct_money(
         )
 
 
-@customers_router.put("/add_money/{id}")
+@customers_router.put(
+    "/add_money/{id}",
+    dependencies=[Depends(rate_limit("customers.add_money", WRITE_CUSTOMER))],
+)
 async def add_money_to_wallet(
     id: UuidStr,
     money: PositiveFloat,
@@ -108,6 +122,7 @@ async def add_money_to_wallet(
         message="Failed to update wallet",
     )
 
+
 # API Calls:
 
 # GET /customers/
@@ -2,22 +2,157 @@
 This module defines the router for handling inventory-related operations.
 """
 
-from fastapi import Depends, status
-from pydantic import PositiveInt
+from typing import Any, Literal, Optional
 
+from fastapi import APIRouter, Depends, Query, Response, status
+from pydantic import BaseModel as PydanticBaseModel
+from pydantic import NonNegativeFloat, PositiveInt, create_model
+from starlette.concurrency import run_in_threadpool
+
+from src.config import Config
 from src.controllers.routers import BaseRouter
 from src.db.dao._base_dao import BaseDAO
 from src.db.dependencies import get_inventory_dao
 from src.db.models import Inventory
-from src.utils.responses.API_response import APIResponse
-from src.utils.types import UuidStr
+from src.db.tables import SupabaseTables
+from src.indexes import catalog, facet_index
+from src.utils.responses import with_etag
+from src.utils.responses.API_response import APIResponse, RawItems
+from src.utils.types import CategoryStr, UuidStr
+
+
+class InventoryRouter(BaseRouter[Inventory]):
+    """
+    Inventory router whose filtered listings are answered from the catalog snapshot.
+
+    On top of the column filters of `BaseRouter`, `GET /inventory/` accepts
+    `min_price`, `max_price`, `in_stock` and `sort`. Filtered queries are run
+    against the in-process `catalog`; the unfiltered listing is still passed
+    through from the database. `GET /inventory/facets` counts the products
+    matching a filter per category and stock status.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.query = create_model(
+            "InventoryQuery",
+            min_price=(Optional[NonNegativeFloat], Query(None)),
+            max_price=(Optional[NonNegativeFloat], Query(None)),
+            in_stock=(Optional[bool], Query(None)),
+            sort=(
+                Optional[Literal["price", "-price", "quantity", "-quantity"]],
+                Query(None),
+            ),
+            __base__=self.query,
+        )
+
+    async def get_by_query(
+        self, query: PydanticBaseModel, dao: BaseDAO[Inventory]
+    ) -> APIResponse:
+        """
+        Retrieves inventory items, filtering them in the catalog snapshot.
+
+        Args:
+            query (PydanticBaseModel): The query parameters.
+            dao (BaseDAO[Inventory]): The data access object.
+
+        Returns:
+            APIResponse: The response containing the retrieved items or an error message.
+        """
+        filters = {key: value for key, value in query if value is not None}
+        if not filters:
+            return await super().get_by_query(query, dao)
+        try:
+            snapshot = await run_in_threadpool(catalog.load_if_stale, dao)
+            rows = snapshot.search(**filters)
+            if rows.size:
+                return APIResponse(
+                    status_code=status.HTTP_200_OK,
+                    message=f"{self.name}s found",
+                    data=RawItems(snapshot.to_json(rows)),
+                )
+            return APIResponse(
+                status_code=status.HTTP_404_NOT_FOUND,
+                message=f"{self.name}s not found",
+            )
+        except Exception as e:
+            return APIResponse(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                message=str(e),
+            )
+
+    async def get_facets(
+        self,
+        dao: BaseDAO[Inventory],
+        category: Optional[str] = None,
+        in_stock: Optional[bool] = None,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+    ) -> APIResponse:
+        """
+        Counts the inventory items matching a filter per category and stock status.
 
-inventory_router = BaseRouter[Inventory](
+        Args:
+            dao (BaseDAO[Inventory]): The data access object.
+            category (Optional[str]): Category filter.
+            in_stock (Optional[bool]): Stock filter.
+            min_price (Optional[float]): Inclusive lower price bound.
+            max_price (Optional[float]): Inclusive upper price bound.
+
+        Returns:
+            APIResponse: The response containing the facet counts or an error message.
+        """
+        try:
+            await run_in_threadpool(catalog.load_if_stale, dao)
+            counts = await run_in_threadpool(
+                facet_index.counts, category, in_stock, min_price, max_price
+            )
+            return APIResponse(
+                status_code=status.HTTP_200_OK,
+                message=f"{self.name} facets found",
+                data=counts,
+            )
+        except Exception as e:
+            return APIResponse(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                message=str(e),
+            )
+
+    def build_router(self) -> APIRouter:
+        """
+        Builds the router, registering the inventory routes before `/{id}`.
+
+        Returns:
+            APIRouter: The configured router.
+        """
+
+        @self.router.get("/facets")
+        async def get_facets(
+            category: Optional[CategoryStr] = None,
+            in_stock: Optional[bool] = None,
+            min_price: Optional[NonNegativeFloat] = None,
+            max_price: Optional[NonNegativeFloat] = None,
+            etag: Optional[str] = Depends(self.conditional),
+            dao: BaseDAO[Inventory] = Depends(self.get_dao),
+        ) -> Response:
+            return with_etag(
+                await self.get_facets(dao, category, in_stock, min_price, max_price),
+                etag,
+            )
+
+        return super().build_router()
+
+
+inventory_router = InventoryRouter(
     prefix="/inventory",
     tags=["Inventory"],
     name="Inventory",
     model=Inventory,
     get_dao=get_inventory_dao,
+    passthrough=True,
+    table=SupabaseTables.INVENTORY,
+    cache_ttl=Config.CACHE.TTL,
+    cache_scope="role",
 ).build_router()
 
 # API Calls:
@@ -26,6 +161,20 @@ inventory_router = BaseRouter[Inventory](
 # Description: Retrieve all inventory items.
 # Method: GET
 # URL: http://localhost:8000/inventory/
+# Query Parameters (all optional):
+#   - category, product_name, price, quantity, description: exact match
+#   - min_price, max_price: number
+#   - in_stock: boolean
+#   - sort: price | -price | quantity | -quantity
+
+# GET /inventory/facets
+# Description: Count inventory items per category and stock status.
+# Method: GET
+# URL: http://localhost:8000/inventory/facets
+# Query Parameters (all optional):
+#   - category: string
+#   - in_stock: boolean
+#   - min_price, max_price: number
 
 # POST /inventory/
 # Description: Add a new inventory item.
@@ -85,6 +234,7 @@ inventory_router = BaseRouter[Inventory](
 #     "amount": 5
 # }
 
+
 @inventory_router.put("/deduct/{id}")
 async def deduct_goods(
     id: UuidStr,
@@ -124,7 +274,7 @@ async def deduct_goods(
         return APIResponse(
             status_code=status.HTTP_200_OK,
             message="Goods deducted successfully",
-            data=updated_inventory.model_dump(),
+            data=updated_inventory,
         )
     except Exception as e:
         return APIResponse(
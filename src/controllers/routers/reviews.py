@@ -2,16 +2,145 @@
 This module defines the router for handling review-related operations.
 """
 
+from typing import Any
+
+from fastapi import APIRouter, Depends, Query, status
+from starlette.concurrency import run_in_threadpool
+
+from src.auth.dependencies import require_admin
 from src.controllers.routers import BaseRouter
+from src.db.dao import BaseDAO
 from src.db.dependencies import get_review_dao
 from src.db.models import Reviews
+from src.db.tables import SupabaseTables
+from src.indexes import ratings
+from src.utils.responses import APIResponse
+from src.utils.types import UuidStr
+
+
+class ReviewsRouter(BaseRouter[Reviews]):
+    """
+    Reviews router with per-product rating summaries.
+
+    `GET /reviews/summary/{product_id}` and its batch variant
+    `GET /reviews/summary?product_id=...` are served from the `ratings`
+    aggregates shared through the database; `POST /reviews/summary/rebuild`
+    recomputes them and is restricted to admins.
+    """
+
+    async def get_summaries(
+        self, product_ids: list[str], dao: BaseDAO[Reviews]
+    ) -> APIResponse:
+        """
+        Retrieves the rating summaries of products.
+
+        Args:
+            product_ids (list[str]): The products.
+            dao (BaseDAO[Reviews]): The data access object.
+
+        Returns:
+            APIResponse: The response containing the summaries or an error message.
+        """
+        try:
+            summaries = await run_in_threadpool(
+                ratings.summaries, dao.client, product_ids
+            )
+            return APIResponse(
+                status_code=status.HTTP_200_OK,
+                message="Rating summaries found",
+                data={"summaries": summaries},
+            )
+        except Exception as e:
+            return APIResponse(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                message=str(e),
+            )
+
+    async def get_summary(self, product_id: str, dao: BaseDAO[Reviews]) -> APIResponse:
+        """
+        Retrieves the rating summary of a product.
+
+        Args:
+            product_id (str): The product.
+            dao (BaseDAO[Reviews]): The data access object.
+
+        Returns:
+            APIResponse: The response containing the summary or an error message.
+        """
+        try:
+            return APIResponse(
+                status_code=status.HTTP_200_OK,
+                message="Rating summary found",
+                data=await run_in_threadpool(ratings.summary, dao.client, product_id),
+            )
+        except Exception as e:
+            return APIResponse(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                message=str(e),
+            )
+
+    async def rebuild_summaries(self, dao: BaseDAO[Reviews]) -> APIResponse:
+        """
+        Recomputes the rating summaries from the Reviews table.
+
+        Args:
+            dao (BaseDAO[Reviews]): The data access object.
+
+        Returns:
+            APIResponse: The response containing the number of reviews aggregated.
+        """
+        try:
+            return APIResponse(
+                status_code=status.HTTP_200_OK,
+                message="Rating summaries rebuilt",
+                data={"reviews": await run_in_threadpool(ratings.rebuild, dao.client)},
+            )
+        except Exception as e:
+            return APIResponse(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                message=str(e),
+            )
 
-review_router = BaseRouter[Reviews](
+    def build_router(self) -> APIRouter:
+        """
+        Builds the router, registering the summary routes before `/{id}`.
+
+        Returns:
+            APIRouter: The configured router.
+        """
+
+        @self.router.get("/summary")
+        async def get_summaries(
+            product_id: list[UuidStr] = Query(min_length=1, max_length=100),
+            dao: BaseDAO[Reviews] = Depends(self.get_dao),
+        ) -> APIResponse:
+            return await self.get_summaries(product_id, dao)
+
+        @self.router.get("/summary/{product_id}")
+        async def get_summary(
+            product_id: UuidStr,
+            dao: BaseDAO[Reviews] = Depends(self.get_dao),
+        ) -> APIResponse:
+            return await self.get_summary(product_id, dao)
+
+        @self.router.post("/summary/rebuild")
+        async def rebuild_summaries(
+            _: dict[str, Any] = Depends(require_admin),
+            dao: BaseDAO[Reviews] = Depends(self.get_dao),
+        ) -> APIResponse:
+            return await self.rebuild_summaries(dao)
+
+        return super().build_router()
+
+
+review_router = ReviewsRouter(
     prefix="/reviews",
     tags=["Reviews"],
     name="Reviews",
     model=Reviews,
     get_dao=get_review_dao,
+    table=SupabaseTables.REVIEWS,
+    passthrough=True,
 ).build_router()
 """Router instance for managing review endpoints."""
 
@@ -22,6 +151,21 @@ review_router = BaseRouter[Reviews](
 # Method: GET
 # URL: http://localhost:8000/reviews/
 
+# GET /reviews/summary/{product_id}
+# Description: Retrieve the rating summary (count, histogram, averages) of a product.
+# Method: GET
+# URL: http://localhost:8000/reviews/summary/{product_id}
+
+# GET /reviews/summary
+# Description: Retrieve the rating summaries of several products.
+# Method: GET
+# URL: http://localhost:8000/reviews/summary?product_id=uuid-1&product_id=uuid-2
+
+# POST /reviews/summary/rebuild
+# Description: Recompute the rating summaries from the reviews table (admins only).
+# Method: POST
+# URL: http://localhost:8000/reviews/summary/rebuild
+
 # POST /reviews/
 # Description: Create a new review.
 # Method: POST
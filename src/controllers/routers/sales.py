@@ -1,19 +1,49 @@
-from typing import Any, Dict, List, TypeVar
+from datetime import datetime, timezone
+from itertools import chain
+from typing import Any, Literal, Optional
 
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from starlette.concurrency import run_in_threadpool
 
-from src.db.dao import BaseDAO
-from src.db.dependencies import get_customer_dao, get_history_dao, get_inventory_dao
-from src.db.models import BaseModel, Customer, History, Inventory
-from src.utils.responses import APIResponse
-from src.utils.types import UuidStr
+from src.auth.dependencies import get_user_id, require_admin
+from src.config import Config
 from src.controllers.schemas.purchase_request_schema import PurchaseRequest
-
-ModelType = TypeVar("ModelType", bound=BaseModel)
+from src.db.dao import BaseDAO
+from src.db.dependencies import (
+    get_customer_dao,
+    get_history_dao,
+    get_inventory_dao,
+    get_service_history_dao,
+)
+from src.db.models import Customer, History, Inventory
+from src.db.tables import SupabaseTables
+from src.indexes import catalog, sales_rollups, search_index, suggest_index
+from src.utils.rate_limit import TokenBucket, rate_limit
+from src.utils.responses import (
+    APIResponse,
+    ExportFormat,
+    ItemStream,
+    NegotiatedRoute,
+    RawItems,
+    StreamFormat,
+    conditional_get,
+    export_table,
+    response_cache,
+    stream_format,
+    with_etag,
+)
+from src.utils.types import CategoryStr, EndOfDayDatetime, UuidStr
 
 sales_router = APIRouter(
     prefix="/sales",
     tags=["Sales"],
+    route_class=NegotiatedRoute,
+)
+
+WRITE_CUSTOMER = TokenBucket(
+    "customer",
+    Config.RATE_LIMIT.WRITE_CUSTOMER_BURST,
+    Config.RATE_LIMIT.WRITE_CUSTOMER_RATE,
 )
 
 # API Calls:
@@ -30,8 +60,52 @@ sales_router = APIRouter(
 # Query Parameters:
 #   - name: string
 
+# GET /sales/search
+# Description: Search goods by name and description, best match first.
+# Method: GET
+# URL: http://localhost:8000/sales/search
+# Query Parameters:
+#   - q: string
+#   - category: string (optional)
+#   - limit: integer (optional, 1-100, default 20)
+
+# GET /sales/suggest
+# Description: Autocomplete product names, most stocked first.
+# Method: GET
+# URL: http://localhost:8000/sales/suggest
+# Query Parameters:
+#   - prefix: string
+#   - limit: integer (optional, 1-50, default 10)
+
+# GET /sales/analytics/products
+# Description: Revenue, quantity sold and orders per product, highest revenue first (admins only).
+# Method: GET
+# URL: http://localhost:8000/sales/analytics/products
+# Query Parameters:
+#   - limit: integer (optional, 1-100, default 20)
+
+# GET /sales/analytics/customers
+# Description: Revenue, quantity bought and orders per customer, highest revenue first (admins only).
+# Method: GET
+# URL: http://localhost:8000/sales/analytics/customers
+# Query Parameters:
+#   - limit: integer (optional, 1-100, default 20)
+
+# GET /sales/analytics/categories
+# Description: Revenue, quantity sold and orders per product category (admins only).
+# Method: GET
+# URL: http://localhost:8000/sales/analytics/categories
+
+# GET /sales/analytics/timeline
+# Description: Revenue, quantity sold and orders per time bucket, oldest first (admins only).
+# Method: GET
+# URL: http://localhost:8000/sales/analytics/timeline
+# Query Parameters:
+#   - bucket: "day" | "week" | "month" (optional, default "day")
+
 # POST /sales/purchase
-# Description: Process the purchase of a specific good by a customer.
+# Description: Process the purchase of a specific good by a customer. The customer
+#   must be the caller (the `sub` of the bearer token), else 403.
 # Method: POST
 # URL: http://localhost:8000/sales/purchase
 # Body:
@@ -41,36 +115,59 @@ sales_router = APIRouter(
 #     "customer_id": "uuid-string"
 # }
 
+# GET /sales/history/export
+# Description: Download the whole purchase history as a streamed file, oldest first.
+# Method: GET
+# URL: http://localhost:8000/sales/history/export
+# Query Parameters:
+#   - format: "csv" | "ndjson" | "parquet" (optional, default "csv")
+
 # GET /sales/customer={id}/history
 # Description: Retrieve the purchase history for a specific customer.
 # Method: GET
 # URL: http://localhost:8000/sales/customer={id}/history
+# Query Parameters:
+#   - from: ISO 8601 datetime (optional, inclusive)
+#   - to: ISO 8601 datetime or date (optional, inclusive; a date covers the whole day)
+#   - format: "json" | "ndjson" (optional, default "json"; 406 if `Accept` excludes it)
+#   - summary: boolean (optional, adds the count and total spent at the end)
 
 # GET /sales/product={id}/history
 # Description: Retrieve the purchase history for a specific product.
 # Method: GET
 # URL: http://localhost:8000/sales/product={id}/history
+# Query Parameters:
+#   - from: ISO 8601 datetime (optional, inclusive)
+#   - to: ISO 8601 datetime or date (optional, inclusive; a date covers the whole day)
+#   - format: "json" | "ndjson" (optional, default "json"; 406 if `Accept` excludes it)
+#   - summary: boolean (optional, adds the count and total spent at the end)
+
 
 @sales_router.get("/goods")
+@response_cache.cached(
+    ttl=Config.CACHE.TTL, tables=[SupabaseTables.INVENTORY], scope="role"
+)
 async def get_goods(
+    etag: str = Depends(conditional_get(SupabaseTables.INVENTORY)),
     dao: BaseDAO[Inventory] = Depends(get_inventory_dao),
-) -> APIResponse:
+) -> Response:
     """Retrieve all available goods."""
     try:
-        all_goods = dao.get_by_query()
-        if not all_goods:
+        snapshot = await run_in_threadpool(catalog.load_if_stale, dao)
+        goods_name_price = snapshot.prices()
+        if not goods_name_price:
             return APIResponse(
                 status_code=status.HTTP_404_NOT_FOUND,
                 message="No goods found",
             )
-        goods_name_price = {}
-        for good in all_goods:
-            goods_name_price[good.product_name] = good.price
 
-        return APIResponse(
-            status_code=status.HTTP_200_OK,
-            message="Goods found",
-            data=goods_name_price,
+        return with_etag(
+            APIResponse(
+                status_code=status.HTTP_200_OK,
+                message="Goods found",
+                data=goods_name_price,
+            ),
+            etag,
         )
     except Exception as e:
         return APIResponse(
@@ -85,7 +182,8 @@ async def get_good(
 ) -> APIResponse:
     """Retrieve a specific good by name."""
     try:
-        good = dao.get_by_query(product_name=name)
+        snapshot = await run_in_threadpool(catalog.load_if_stale, dao)
+        good = snapshot.records(snapshot.search(product_name=name))
         if not good:
             return APIResponse(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -94,7 +192,118 @@ async def get_good(
         return APIResponse(
             status_code=status.HTTP_200_OK,
             message="Good found",
-            data=merge_dicts(good),
+            data=good[-1],
+        )
+    except Exception as e:
+        return APIResponse(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            message=str(e),
+        )
+
+
+@sales_router.get("/search")
+async def search_goods(
+    q: str = Query(min_length=1),
+    category: Optional[CategoryStr] = None,
+    limit: int = Query(Config.SEARCH.LIMIT, ge=1, le=100),
+    dao: BaseDAO[Inventory] = Depends(get_inventory_dao),
+) -> APIResponse:
+    """Search goods by name and description, ranked with BM25."""
+    try:
+        snapshot = await run_in_threadpool(catalog.load_if_stale, dao)
+        rows = await run_in_threadpool(search_index.search, q, category, limit)
+        if not rows.size:
+            return APIResponse(
+                status_code=status.HTTP_404_NOT_FOUND,
+                message="No goods found",
+            )
+        return APIResponse(
+            status_code=status.HTTP_200_OK,
+            message="Goods found",
+            data=RawItems(snapshot.to_json(rows)),
+        )
+    except Exception as e:
+        return APIResponse(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            message=str(e),
+        )
+
+
+@sales_router.get("/suggest")
+async def suggest_goods(
+    prefix: str = Query(min_length=1),
+    limit: int = Query(Config.SUGGEST.LIMIT, ge=1, le=50),
+    dao: BaseDAO[Inventory] = Depends(get_inventory_dao),
+) -> APIResponse:
+    """Suggest product names starting with a prefix."""
+    try:
+        await run_in_threadpool(catalog.load_if_stale, dao)
+        suggestions = await run_in_threadpool(suggest_index.suggest, prefix, limit)
+        return APIResponse(
+            status_code=status.HTTP_200_OK,
+            message="Suggestions found",
+            data={"suggestions": suggestions},
+        )
+    except Exception as e:
+        return APIResponse(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            message=str(e),
+        )
+
+
+@sales_router.get("/analytics/products", dependencies=[Depends(require_admin)])
+async def get_product_sales(
+    limit: int = Query(Config.ANALYTICS.LIMIT, ge=1, le=100),
+    dao: BaseDAO[History] = Depends(get_service_history_dao),
+) -> APIResponse:
+    """Retrieve the revenue per product."""
+    try:
+        rollups = await run_in_threadpool(sales_rollups.load_if_stale, dao)
+        return APIResponse(
+            status_code=status.HTTP_200_OK,
+            message="Product sales found",
+            data={"products": await run_in_threadpool(rollups.by_product, limit)},
+        )
+    except Exception as e:
+        return APIResponse(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            message=str(e),
+        )
+
+
+@sales_router.get("/analytics/customers", dependencies=[Depends(require_admin)])
+async def get_customer_sales(
+    limit: int = Query(Config.ANALYTICS.LIMIT, ge=1, le=100),
+    dao: BaseDAO[History] = Depends(get_service_history_dao),
+) -> APIResponse:
+    """Retrieve the revenue per customer."""
+    try:
+        rollups = await run_in_threadpool(sales_rollups.load_if_stale, dao)
+        return APIResponse(
+            status_code=status.HTTP_200_OK,
+            message="Customer sales found",
+            data={"customers": await run_in_threadpool(rollups.by_customer, limit)},
+        )
+    except Exception as e:
+        return APIResponse(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            message=str(e),
+        )
+
+
+@sales_router.get("/analytics/categories", dependencies=[Depends(require_admin)])
+async def get_category_sales(
+    dao: BaseDAO[History] = Depends(get_service_history_dao),
+    inventory_dao: BaseDAO[Inventory] = Depends(get_inventory_dao),
+) -> APIResponse:
+    """Retrieve the revenue per product category."""
+    try:
+        rollups = await run_in_threadpool(sales_rollups.load_if_stale, dao)
+        snapshot = await run_in_threadpool(catalog.load_if_stale, inventory_dao)
+        return APIResponse(
+            status_code=status.HTTP_200_OK,
+            message="Category sales found",
+            data={"categories": await run_in_threadpool(rollups.by_category, snapshot)},
         )
     except Exception as e:
         return APIResponse(
@@ -103,18 +312,47 @@ async def get_good(
         )
 
 
-@sales_router.post("/purchase/{id}")
+@sales_router.get("/analytics/timeline", dependencies=[Depends(require_admin)])
+async def get_sales_timeline(
+    bucket: Literal["day", "week", "month"] = "day",
+    dao: BaseDAO[History] = Depends(get_service_history_dao),
+) -> APIResponse:
+    """Retrieve the revenue per day, week or month."""
+    try:
+        rollups = await run_in_threadpool(sales_rollups.load_if_stale, dao)
+        return APIResponse(
+            status_code=status.HTTP_200_OK,
+            message="Sales timeline found",
+            data={"timeline": await run_in_threadpool(rollups.timeline, bucket)},
+        )
+    except Exception as e:
+        return APIResponse(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            message=str(e),
+        )
+
+
+@sales_router.post(
+    "/purchase/{id}",
+    dependencies=[Depends(rate_limit("sales.purchase", WRITE_CUSTOMER))],
+)
 async def purchase_good(
     request: PurchaseRequest,
     inventory_dao: BaseDAO[Inventory] = Depends(get_inventory_dao),
     history_dao: BaseDAO[History] = Depends(get_history_dao),
     customer_dao: BaseDAO[Customer] = Depends(get_customer_dao),
+    user_id: str = Depends(get_user_id),
 ) -> APIResponse:
     """Process the purchase of a specific good by a customer."""
     try:
         product_id = request.product_id
         customer_id = request.customer_id
         quantity = request.quantity
+        if customer_id != user_id:
+            return APIResponse(
+                status_code=status.HTTP_403_FORBIDDEN,
+                message="Customers can only purchase for themselves",
+            )
         good = inventory_dao.get_by_id(id=product_id)
         if not good:
             return APIResponse(
@@ -156,6 +394,7 @@ async def purchase_good(
                 "product_id": product_id,
                 "quantity": quantity,
                 "total": total_price,
+                "purchase_date": datetime.now(timezone.utc).isoformat(),
             }
         )
 
@@ -163,7 +402,7 @@ async def purchase_good(
             status_code=status.HTTP_200_OK,
             message="Purchase successful",
             data={
-                "history": history.model_dump(),
+                "history": history,
             },
         )
     except Exception as e:
@@ -173,23 +412,99 @@ async def purchase_good(
         )
 
 
+def purchase_period(
+    start: Optional[datetime] = Query(None, alias="from"),
+    end: Optional[EndOfDayDatetime] = Query(None, alias="to"),
+) -> dict[str, tuple[Optional[datetime], Optional[datetime]]]:
+    """
+    Read the `from`/`to` purchase date bounds of a history query.
+
+    Dates without a time zone are taken as UTC. A `to` date without a time
+    covers that whole day.
+
+    Args:
+        start (Optional[datetime]): Earliest purchase date, inclusive.
+        end (Optional[datetime]): Latest purchase date, inclusive.
+
+    Returns:
+        dict: The `ranges` argument of `BaseDAO.get_by_query`.
+    """
+    start, end = (
+        (
+            date.replace(tzinfo=timezone.utc)
+            if date is not None and date.tzinfo is None
+            else date
+        )
+        for date in (start, end)
+    )
+    if start is not None and end is not None and start > end:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="`from` must not be after `to`",
+        )
+    return {"purchase_date": (start, end)}
+
+
+async def stream_history(
+    dao: BaseDAO[History],
+    period: dict[str, tuple[Optional[datetime], Optional[datetime]]],
+    format: StreamFormat,
+    summary: bool,
+    **filters: Any,
+) -> Response:
+    """
+    Stream History rows page by page, oldest purchase first.
+
+    The first page is fetched up front so an empty history is still a 404;
+    the others are fetched in the thread pool as the response is sent.
+
+    Args:
+        dao (BaseDAO[History]): The History DAO.
+        period (dict): The purchase date range, see `purchase_period`.
+        format (StreamFormat): `"json"` or `"ndjson"`.
+        summary (bool): Whether to end with the count and total spent.
+        **filters: Equality filters on History.
+
+    Returns:
+        Response: The streamed history, or a 404 APIResponse.
+    """
+    pages = dao.iter_pages(order="purchase_date", ranges=period, **filters)
+    first = await run_in_threadpool(next, pages, None)
+    if first is None:
+        return APIResponse(
+            status_code=status.HTTP_404_NOT_FOUND,
+            message="No history found",
+        )
+    return ItemStream(
+        "History found",
+        chain([first], pages),
+        format=format,
+        summary_field="total" if summary else None,
+    )
+
+
+@sales_router.get("/history/export")
+async def export_history(
+    format: ExportFormat = "csv",
+    dao: BaseDAO[History] = Depends(get_history_dao),
+) -> Response:
+    """Download the whole purchase history as a streamed file."""
+    return await export_table(dao, format, filename="history", order="purchase_date")
+
+
 @sales_router.get("/customer={id}/history")
 async def get_customer_history(
-    id: UuidStr, dao: BaseDAO[History] = Depends(get_history_dao)
-) -> APIResponse:
-    """Retrieve the purchase history for a specific customer."""
+    id: UuidStr,
+    period: dict[str, tuple[Optional[datetime], Optional[datetime]]] = Depends(
+        purchase_period
+    ),
+    format: StreamFormat = Depends(stream_format),
+    summary: bool = False,
+    dao: BaseDAO[History] = Depends(get_history_dao),
+) -> Response:
+    """Stream the purchase history for a specific customer, oldest first."""
     try:
-        history = dao.get_by_query(customer_id=id)
-        if not history:
-            return APIResponse(
-                status_code=status.HTTP_404_NOT_FOUND,
-                message="No history found",
-            )
-        return APIResponse(
-            status_code=status.HTTP_200_OK,
-            message="History found",
-            data=merge_dicts(history),
-        )
+        return await stream_history(dao, period, format, summary, customer_id=id)
     except Exception as e:
         return APIResponse(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -199,30 +514,19 @@ async def get_customer_history(
 
 @sales_router.get("/product={id}/history")
 async def get_product_history(
-    id: UuidStr, dao: BaseDAO[History] = Depends(get_history_dao)
-) -> APIResponse:
-    """Retrieve the purchase history for a specific product."""
+    id: UuidStr,
+    period: dict[str, tuple[Optional[datetime], Optional[datetime]]] = Depends(
+        purchase_period
+    ),
+    format: StreamFormat = Depends(stream_format),
+    summary: bool = False,
+    dao: BaseDAO[History] = Depends(get_history_dao),
+) -> Response:
+    """Stream the purchase history for a specific product, oldest first."""
     try:
-        history = dao.get_by_query(product_id=id)
-        if not history:
-            return APIResponse(
-                status_code=status.HTTP_404_NOT_FOUND,
-                message="No history found",
-            )
-        return APIResponse(
-            status_code=status.HTTP_200_OK,
-            message="History found",
-            data=merge_dicts(history),
-        )
+        return await stream_history(dao, period, format, summary, product_id=id)
     except Exception as e:
         return APIResponse(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             message=str(e),
         )
-
-
-def merge_dicts(dict_list: List[ModelType]) -> Dict[str, Any]:
-    result: Dict[str, Any] = {}
-    for dictionary in dict_list:
-        result.update(dictionary)
-    return result
@@ -1,7 +1,9 @@
 """Controller for handling status check endpoints."""
 
-from fastapi import APIRouter, status
+from fastapi import APIRouter, Depends, status
 
+from src.auth.dependencies import require_admin
+from src.utils.metrics import metrics
 from src.utils.responses import APIResponse
 
 status_router = APIRouter(
@@ -25,3 +27,18 @@ async def status_check() -> APIResponse:
         message="Status check successful",
         status_code=status.HTTP_200_OK,
     )
+
+
+@status_router.get(
+    "/metrics",
+    response_class=APIResponse,
+    response_description="Process metrics",
+    dependencies=[Depends(require_admin)],
+)
+async def metrics_check() -> APIResponse:
+    """Endpoint exposing the counters and gauges of this process to admins."""
+    return APIResponse(
+        message="Metrics retrieved",
+        status_code=status.HTTP_200_OK,
+        data=metrics.snapshot(),
+    )
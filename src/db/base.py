@@ -1,9 +1,120 @@
+"""
+Clients the DAOs query Supabase with.
+
+Data routes use `get_data_client`: a PostgREST client that sends the access
+token `get_access_token` already verified as its bearer token, so Postgres
+row-level security applies to the request's user without creating a GoTrue
+session. `get_anonymous_data_client` sends the anon key instead, for routes
+without a user, and `get_service_data_client` the service role key, which
+bypasses row-level security, for loading indexes shared by every caller.
+Their connections come from a pool shared by every request.
+
+`get_authenticated_client` and `get_unauthenticated_client` build full
+Supabase clients, for scripts such as the CLI; the `/auth` routes talk to
+GoTrue through `src.auth.gotrue_client`.
+"""
+
+from typing import Optional, Union
+
+import httpx
 from fastapi import Depends
+from postgrest._sync.client import SyncPostgrestClient
+from postgrest.utils import SyncClient
 from supabase import Client, create_client
 
 from src.auth.dependencies import get_access_token, get_refresh_token
 from src.config import Config
 
+DataClient = Union[Client, SyncPostgrestClient]
+"""A client the DAOs can query tables and call functions with."""
+
+_transport: Optional[httpx.HTTPTransport] = None
+
+
+def postgrest_transport() -> httpx.HTTPTransport:
+    """Return the connection pool shared by the PostgREST data clients."""
+    global _transport
+    if _transport is None:
+        _transport = httpx.HTTPTransport(
+            limits=httpx.Limits(
+                max_connections=Config.SUPABASE.MAX_CONNECTIONS,
+                max_keepalive_connections=Config.SUPABASE.MAX_CONNECTIONS,
+            )
+        )
+    return _transport
+
+
+class BearerPostgrestClient(SyncPostgrestClient):
+    """
+    A PostgREST client authenticated with a bearer token over the shared pool.
+
+    Args:
+        access_token (str): The verified access token of the request.
+    """
+
+    def __init__(self, access_token: str) -> None:
+        if Config.SUPABASE.KEY is None or Config.SUPABASE.URL is None:
+            raise ValueError(
+                "SUPABASE_KEY and SUPABASE_URL must be set in the environment"
+            )
+        super().__init__(
+            f"{Config.SUPABASE.URL}/rest/v1",
+            headers={
+                "Accept": "application/json",
+                "Content-Type": "application/json",
+                "apikey": Config.SUPABASE.KEY,
+                "Authorization": f"Bearer {access_token}",
+            },
+            timeout=Config.SUPABASE.TIMEOUT,
+        )
+
+    def create_session(
+        self,
+        base_url: str,
+        headers: dict[str, str],
+        timeout: Union[int, float, httpx.Timeout],
+        verify: bool = True,
+        proxy: Optional[str] = None,
+    ) -> SyncClient:
+        return SyncClient(
+            base_url=base_url,
+            headers=headers,
+            timeout=timeout,
+            transport=postgrest_transport(),
+            follow_redirects=True,
+        )
+
+
+def get_data_client(
+    access_token: str = Depends(get_access_token),
+) -> BearerPostgrestClient:
+    """
+    Creates a PostgREST client acting as the user of the verified access token.
+    """
+    return BearerPostgrestClient(access_token)
+
+
+def get_anonymous_data_client() -> BearerPostgrestClient:
+    """
+    Creates a PostgREST client acting as the anonymous role.
+    """
+    if Config.SUPABASE.KEY is None:
+        raise ValueError("SUPABASE_KEY and SUPABASE_URL must be set in the environment")
+    return BearerPostgrestClient(Config.SUPABASE.KEY)
+
+
+def get_service_data_client() -> BearerPostgrestClient:
+    """
+    Creates a PostgREST client acting as the service role, which bypasses
+    row-level security.
+
+    Only for building process-wide indexes served by admin routes; never hand
+    it to a route that returns rows to ordinary users.
+    """
+    if Config.SUPABASE.SERVICE_KEY is None:
+        raise ValueError("SUPABASE_SERVICE_KEY must be set in the environment")
+    return BearerPostgrestClient(Config.SUPABASE.SERVICE_KEY)
+
 
 def get_authenticated_client(
     access_token: str = Depends(get_access_token),
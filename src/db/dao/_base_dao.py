@@ -1,81 +1,286 @@
-from typing import Any, Generic, Optional, TypeVar
+from datetime import date, datetime
+from typing import Any, Generic, Iterator, Optional, TypeVar, Union
 
-from supabase import Client
+from postgrest.exceptions import APIError
+from pydantic import BaseModel as PydanticBaseModel
+from pydantic_core import from_json
 
+from src.config import Config
+from src.db.base import DataClient
+from src.db.hooks import write_hooks
 from src.db.models import BaseModel
 from src.utils.types import UuidStr
 
 BaseModelType = TypeVar("BaseModelType", bound=BaseModel)
 
 
+def quote(value: Any) -> str:
+    """Quote a value for a PostgREST logic tree filter such as `or=(...)`."""
+    text = str(serialize(value))
+    return '"' + text.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+def serialize(value: Any) -> Any:
+    """Format a filter value for PostgREST; datetimes become ISO 8601 strings."""
+    return value.isoformat() if isinstance(value, (date, datetime)) else value
+
+
 class BaseDAO(Generic[BaseModelType]):
     """
     Generic Data Access Object providing basic CRUD operations.
 
+    Every write is dispatched to the table's `write_hooks`. (The table's
+    version, which conditional GETs use to tell whether cached responses are
+    still current, is bumped by a database trigger.)
+
     Args:
-        client (Client): Supabase client instance.
+        client (DataClient): Supabase or PostgREST client instance.
         table (str): Name of the table.
         base_model (type[BaseModelType]): Pydantic model for the table.
     """
 
     def __init__(
-        self, client: Client, table: str, base_model: type[BaseModelType]
+        self, client: DataClient, table: str, base_model: type[BaseModelType]
     ) -> None:
         self.client = client
         self.table = table
         self.base_model = base_model
 
+    def written(self, op: str, rows: Any) -> None:
+        """
+        Record a write to the table.
+
+        Args:
+            op (str): `"upsert"`, `"update"` or `"delete"`.
+            rows (Any): The rows returned by PostgREST.
+        """
+        if isinstance(rows, list) and rows:
+            write_hooks.dispatch(self.table, op, rows)
+
+    def insert_payload(
+        self, model_data: Union[dict[str, Any], PydanticBaseModel]
+    ) -> dict[str, Any]:
+        """
+        Turn create data into the JSON payload sent to the table.
+
+        Fields of a model left as None are omitted, so the table's defaults
+        apply (e.g. `History.purchase_date` defaults to `now()`) instead of
+        an explicit null.
+
+        Args:
+            model_data (dict or PydanticBaseModel): Data for the new record.
+
+        Returns:
+            The insert payload.
+        """
+        if isinstance(model_data, PydanticBaseModel):
+            return model_data.model_dump(mode="json", exclude_none=True)
+        self.base_model.model_validate(model_data)
+        return model_data
+
+    def update_payload(
+        self, model_data: Union[dict[str, Any], PydanticBaseModel]
+    ) -> dict[str, Any]:
+        """
+        Turn update data into the JSON payload sent to the table.
+
+        Args:
+            model_data (dict or PydanticBaseModel): Data to update the record with.
+
+        Returns:
+            The update payload, holding only the fields that were set.
+        """
+        if isinstance(model_data, PydanticBaseModel):
+            return model_data.model_dump(mode="json", exclude_unset=True)
+        self.base_model.model_validate_partial(model_data)
+        return model_data
+
+    @staticmethod
+    def apply_filters(
+        query: Any,
+        ranges: Optional[dict[str, tuple[Any, Any]]],
+        filters: dict[str, Any],
+    ) -> Any:
+        """
+        Add equality and range filters to a PostgREST query.
+
+        Args:
+            query (Any): The query builder.
+            ranges (Optional[dict]): Inclusive `(low, high)` bounds per column;
+                None bounds are ignored.
+            filters (dict[str, Any]): Equality filters; None values are ignored.
+
+        Returns:
+            The filtered query builder.
+        """
+        for key, value in filters.items():
+            if value is not None:
+                query = query.eq(key, value)
+        for key, (low, high) in (ranges or {}).items():
+            if low is not None:
+                query = query.gte(key, serialize(low))
+            if high is not None:
+                query = query.lte(key, serialize(high))
+        return query
+
     def get_by_query(
         self,
+        ranges: Optional[dict[str, tuple[Any, Any]]] = None,
         **kwargs: Any,
     ) -> list[BaseModelType]:
         """
         Retrieve records matching the query parameters.
 
         Args:
+            ranges (Optional[dict]): Inclusive `(low, high)` bounds per column,
+                evaluated by the database.
             **kwargs: Arbitrary keyword arguments representing query filters.
 
         Returns:
             List of validated model instances.
         """
         query = self.client.table(self.table).select("*")
-        for key, value in kwargs.items():
-            if value is not None:
-                query = query.eq(key, value)
+        query = self.apply_filters(query, ranges, kwargs)
         data = query.execute()
         if not data.data:
             return []
         return [self.base_model.model_validate(item) for item in data.data]
 
-    def create(self, model_data: dict[str, Any]) -> Optional[BaseModelType]:
+    def get_raw_by_query(
+        self,
+        ranges: Optional[dict[str, tuple[Any, Any]]] = None,
+        **kwargs: Any,
+    ) -> bytes:
+        """
+        Retrieve records matching the query parameters as the raw JSON array
+        returned by PostgREST, without parsing or validating it.
+
+        Only the model's columns are selected, so the rows have the same
+        shape as the validated models.
+
+        Args:
+            ranges (Optional[dict]): Inclusive `(low, high)` bounds per column,
+                evaluated by the database.
+            **kwargs: Arbitrary keyword arguments representing query filters.
+
+        Returns:
+            The upstream response body (a JSON array of rows).
+        """
+        query = self.client.table(self.table).select(*self.base_model.model_fields)
+        return self.fetch_raw(self.apply_filters(query, ranges, kwargs))
+
+    @staticmethod
+    def fetch_raw(query: Any) -> bytes:
+        """
+        Execute a PostgREST query and return its raw JSON body.
+
+        Args:
+            query (Any): The query builder.
+
+        Returns:
+            The upstream response body.
+        """
+        response = query.session.request(
+            query.http_method,
+            query.path,
+            params=query.params,
+            headers=query.headers,
+        )
+        if not response.is_success:
+            raise APIError(response.json())
+        content: bytes = response.content
+        return content
+
+    def iter_pages(
+        self,
+        page_size: int = Config.STREAMING.PAGE_SIZE,
+        order: str = "id",
+        ranges: Optional[dict[str, tuple[Any, Any]]] = None,
+        **kwargs: Any,
+    ) -> Iterator[list[dict[str, Any]]]:
+        """
+        Retrieve the records matching the query parameters page by page.
+
+        Pages are fetched lazily with keyset pagination on `(order, id)`:
+        each page starts after the last row of the previous one, so every
+        fetch costs the same however deep it is and only one page is held
+        in memory at a time.
+
+        Args:
+            page_size (int): Maximum number of rows per page.
+            order (str): Column to sort by; ties are broken by `id`.
+            ranges (Optional[dict]): Inclusive `(low, high)` bounds per column,
+                evaluated by the database.
+            **kwargs: Arbitrary keyword arguments representing query filters.
+
+        Yields:
+            list[dict[str, Any]]: The rows of each non-empty page, unvalidated.
+        """
+        last: Optional[dict[str, Any]] = None
+        while True:
+            query = self.client.table(self.table).select(*self.base_model.model_fields)
+            query = self.apply_filters(query, ranges, kwargs)
+            if last is not None:
+                after_id = f"id.gt.{quote(last['id'])}"
+                if order == "id":
+                    query = query.gt("id", last["id"])
+                elif last[order] is None:
+                    # Nulls sort last, so only null rows with a greater id remain.
+                    query = query.is_(order, "null").or_(after_id)
+                else:
+                    value = quote(last[order])
+                    query = query.or_(
+                        f"{order}.gt.{value},{order}.is.null,"
+                        f"and({order}.eq.{value},{after_id})"
+                    )
+            query = query.order(order)
+            if order != "id":
+                query = query.order("id")
+            rows: list[dict[str, Any]] = from_json(
+                self.fetch_raw(query.limit(page_size))
+            )
+            if rows:
+                yield rows
+            if len(rows) < page_size:
+                return
+            last = rows[-1]
+
+    def create(
+        self, model_data: Union[dict[str, Any], PydanticBaseModel]
+    ) -> Optional[BaseModelType]:
         """
         Create a new record in the table.
 
         Args:
-            model_data (dict): Data for the new record.
+            model_data (dict or PydanticBaseModel): Data for the new record. A
+                request model built by `create_schema` is already validated and
+                is only serialized; a dict is validated first.
 
         Returns:
             The created model instance or None if creation failed.
         """
-        self.base_model.model_validate(model_data)
-        data = self.client.table(self.table).insert(model_data).execute()
+        payload = self.insert_payload(model_data)
+        data = self.client.table(self.table).insert(payload).execute()
+        self.written("upsert", data.data)
         if not data.data:
             return None
         return self.base_model.model_validate(data.data[0])
 
-    def create_many(self, model_data: list[dict[str, Any]]) -> list[BaseModelType]:
+    def create_many(
+        self, model_data: list[Union[dict[str, Any], PydanticBaseModel]]
+    ) -> list[BaseModelType]:
         """
         Create multiple records in the table.
 
         Args:
-            model_data (list of dict): List of data for the new records.
+            model_data (list of dict or PydanticBaseModel): List of data for the new records.
 
         Returns:
             List of created model instances.
         """
-        for _data in model_data:
-            self.base_model.model_validate(_data)
-        data = self.client.table(self.table).insert(model_data).execute()
+        payload = [self.insert_payload(_data) for _data in model_data]
+        data = self.client.table(self.table).insert(payload).execute()
+        self.written("upsert", data.data)
         if not data.data:
             return []
         return [self.base_model.model_validate(item) for item in data.data]
@@ -96,20 +301,23 @@ class BaseDAO(Generic[BaseModelType]):
         return self.base_model.model_validate(data.data[0])
 
     def update(
-        self, id: UuidStr, model_data: dict[str, Any]
+        self, id: UuidStr, model_data: Union[dict[str, Any], PydanticBaseModel]
     ) -> Optional[BaseModelType]:
         """
         Update a record by its unique identifier.
 
         Args:
             id (UuidStr): The unique identifier of the record.
-            model_data (dict): Data to update the record with.
+            model_data (dict or PydanticBaseModel): Data to update the record with.
+                A request model built by `update_schema` is already validated and
+                only its set fields are sent; a dict is validated first.
 
         Returns:
             The updated model instance if successful, else None.
         """
-        self.base_model.model_validate_partial(model_data)
-        data = self.client.table(self.table).update(model_data).eq("id", id).execute()
+        payload = self.update_payload(model_data)
+        data = self.client.table(self.table).update(payload).eq("id", id).execute()
+        self.written("update", data.data)
         if not data.data:
             return None
         return self.base_model.model_validate(data.data[0])
@@ -125,6 +333,7 @@ class BaseDAO(Generic[BaseModelType]):
             The deleted model instance if successful, else None.
         """
         data = self.client.table(self.table).delete().eq("id", id).execute()
+        self.written("delete", data.data)
         if not data.data:
             return None
         return self.base_model.model_validate(data.data[0])
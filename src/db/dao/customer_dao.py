@@ -2,8 +2,7 @@
 Module for Customer Data Access Object.
 """
 
-from supabase import Client
-
+from src.db.base import DataClient
 from src.db.dao import BaseDAO
 from src.db.models import Customer
 from src.db.tables import SupabaseTables
@@ -16,7 +15,7 @@ class CustomerDAO(BaseDAO[Customer]):
     Inherits from BaseDAO to provide CRUD operations for Customers.
     """
 
-    def __init__(self, client: Client) -> None:
+    def __init__(self, client: DataClient) -> None:
         """
         Initialize the CustomerDAO with a Supabase client.
 
@@ -1,5 +1,4 @@
-from supabase import Client
-
+from src.db.base import DataClient
 from src.db.dao import BaseDAO
 from src.db.models import Inventory
 from src.db.tables import SupabaseTables
@@ -10,5 +9,5 @@ class InventoryDAO(BaseDAO[Inventory]):
     Data Access Object for managing Inventory items in the database.
     """
 
-    def __init__(self, client: Client) -> None:
+    def __init__(self, client: DataClient) -> None:
         super().__init__(client, SupabaseTables.INVENTORY, Inventory)
@@ -2,8 +2,7 @@
 Module for Review Data Access Object.
 """
 
-from supabase import Client
-
+from src.db.base import DataClient
 from src.db.dao import BaseDAO
 from src.db.models import Reviews
 from src.db.tables import SupabaseTables
@@ -16,7 +15,7 @@ class ReviewDAO(BaseDAO[Reviews]):
     Inherits from BaseDAO to provide CRUD operations for Reviews.
     """
 
-    def __init__(self, client: Client) -> None:
+    def __init__(self, client: DataClient) -> None:
         """
         Initialize the ReviewDAO with a Supabase client.
 
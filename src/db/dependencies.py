@@ -1,42 +1,61 @@
 from fastapi import Depends
-from supabase import Client
 
-from src.db.base import get_authenticated_client, get_unauthenticated_client
+from src.db.base import (
+    BearerPostgrestClient,
+    get_anonymous_data_client,
+    get_data_client,
+    get_service_data_client,
+)
 from src.db.dao import CustomerDAO, HistoryDAO, InventoryDAO, ReviewDAO
 
 
-def get_customer_dao(client: Client = Depends(get_authenticated_client)) -> CustomerDAO:
+def get_customer_dao(
+    client: BearerPostgrestClient = Depends(get_data_client),
+) -> CustomerDAO:
     """
-    Provides an authenticated CustomerDAO instance.
+    Provides a CustomerDAO acting as the user of the verified access token.
     """
     return CustomerDAO(client)
 
 
-def get_history_dao(client: Client = Depends(get_authenticated_client)) -> HistoryDAO:
+def get_history_dao(
+    client: BearerPostgrestClient = Depends(get_data_client),
+) -> HistoryDAO:
+    """
+    Provides a HistoryDAO acting as the user of the verified access token.
+    """
+    return HistoryDAO(client)
+
+
+def get_service_history_dao(
+    client: BearerPostgrestClient = Depends(get_service_data_client),
+) -> HistoryDAO:
     """
-    Provides an authenticated HistoryDAO instance.
+    Provides a HistoryDAO acting as the service role, for the sales rollups.
     """
     return HistoryDAO(client)
 
 
 def get_inventory_dao(
-    client: Client = Depends(get_authenticated_client),
+    client: BearerPostgrestClient = Depends(get_data_client),
 ) -> InventoryDAO:
     """
-    Provides an authenticated InventoryDAO instance.
+    Provides an InventoryDAO acting as the user of the verified access token.
     """
     return InventoryDAO(client)
 
 
-def get_review_dao(client: Client = Depends(get_authenticated_client)) -> ReviewDAO:
+def get_review_dao(
+    client: BearerPostgrestClient = Depends(get_data_client),
+) -> ReviewDAO:
     """
-    Provides an authenticated ReviewDAO instance.
+    Provides a ReviewDAO acting as the user of the verified access token.
     """
     return ReviewDAO(client)
 
 
 def get_customer_dao_unauthenticated(
-    client: Client = Depends(get_unauthenticated_client),
+    client: BearerPostgrestClient = Depends(get_anonymous_data_client),
 ) -> CustomerDAO:
     """
     Provides an unauthenticated CustomerDAO instance.
@@ -0,0 +1,42 @@
+"""
+Write hooks for in-process indexes.
+
+Every write made through `BaseDAO` is dispatched here with the rows returned
+by PostgREST, so in-memory structures derived from a table (such as the
+catalog snapshot) can be updated incrementally instead of being rebuilt.
+"""
+
+from collections import defaultdict
+from typing import Any, Callable
+
+WriteHook = Callable[[str, list[dict[str, Any]]], None]
+"""A hook called with the operation (see `WriteHooks.dispatch`) and the rows."""
+
+
+class WriteHooks:
+    """Registry of write hooks per table."""
+
+    def __init__(self) -> None:
+        self._hooks: defaultdict[str, list[WriteHook]] = defaultdict(list)
+
+    def register(self, table: str, hook: WriteHook) -> None:
+        """Call `hook` after every write to `table`."""
+        self._hooks[table].append(hook)
+
+    def dispatch(self, table: str, op: str, rows: list[dict[str, Any]]) -> None:
+        """
+        Notify the hooks of a table about a write.
+
+        Args:
+            table (str): The written table.
+            op (str): `"upsert"` for inserts, `"update"` for updates of
+                existing rows, `"delete"` for deletes. Hooks that keep whole
+                rows treat updates like upserts.
+            rows (list[dict[str, Any]]): The affected rows as returned by PostgREST.
+        """
+        for hook in self._hooks.get(table, ()):
+            hook(op, rows)
+
+
+write_hooks = WriteHooks()
+"""Write hooks of this process."""
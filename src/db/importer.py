@@ -0,0 +1,229 @@
+"""
+Resumable bulk import of CSV or JSON Lines files into a table.
+
+`import_file` streams a file through a generator pipeline: records are read
+lazily, validated against the table's create schema, grouped into chunks
+and inserted with `BaseDAO.create_many` by a pool of worker threads. At most
+two chunks per worker are in flight, so memory stays bounded whatever the
+file size.
+
+Progress is checkpointed next to the file as `<file>.checkpoint`: the number
+of leading records whose chunks were all inserted. An interrupted import
+started again resumes after that offset; the chunks that were still in
+flight are sent again, so rows should carry their own unique keys where
+duplicates matter. Rows failing validation or rejected by the database are
+written to `<file>.rejected.jsonl` with the error, and the import goes on.
+"""
+
+import csv
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from itertools import islice
+from typing import Any, BinaryIO, Callable, Iterable, Iterator, Optional
+
+from pydantic import BaseModel as PydanticBaseModel
+from pydantic import ValidationError
+from pydantic_core import from_json, to_json
+
+from src.config import Config
+from src.db.dao import BaseDAO
+
+Record = tuple[int, dict[str, Any]]
+"""A record of the file with its position."""
+
+
+def read_records(path: str, start: int = 0) -> Iterator[Record]:
+    """
+    Read the records of a CSV (with a header row) or JSON Lines file.
+
+    Empty CSV cells are read as null.
+
+    Args:
+        path (str): The file; `.csv` files are read as CSV, others as JSON Lines.
+        start (int): Number of leading records to skip.
+
+    Yields:
+        Record: Each record from `start` on, with its position.
+    """
+    with open(path, newline="", encoding="utf-8") as file:
+        if path.lower().endswith(".csv"):
+            rows: Iterable[dict[str, Any]] = (
+                {key: value if value != "" else None for key, value in row.items()}
+                for row in csv.DictReader(file)
+            )
+        else:
+            rows = (from_json(line) for line in file if line.strip())
+        yield from islice(enumerate(rows), start, None)
+
+
+def validate(
+    records: Iterable[Record],
+    schema: type[PydanticBaseModel],
+    rejected: Callable[[Record, str], None],
+) -> Iterator[tuple[int, Optional[PydanticBaseModel]]]:
+    """
+    Validate records against a create schema.
+
+    Args:
+        records (Iterable[Record]): The records.
+        schema (type[PydanticBaseModel]): The table's create schema.
+        rejected (Callable[[Record, str], None]): Called with invalid records
+            and their error.
+
+    Yields:
+        tuple[int, Optional[PydanticBaseModel]]: Each position with its
+        validated row, or None when the record was rejected.
+    """
+    for position, row in records:
+        try:
+            yield position, schema.model_validate(row)
+        except ValidationError as e:
+            rejected((position, row), str(e))
+            yield position, None
+
+
+def chunked(
+    rows: Iterable[tuple[int, Optional[PydanticBaseModel]]], size: int
+) -> Iterator[tuple[int, int, list[tuple[int, PydanticBaseModel]]]]:
+    """
+    Group validated rows into chunks of `size` records.
+
+    Yields:
+        tuple[int, int, list]: The first position after the chunk, the number
+        of records it covers and its valid rows with their positions.
+    """
+    iterator = iter(rows)
+    while batch := list(islice(iterator, size)):
+        valid = [(position, row) for position, row in batch if row is not None]
+        yield batch[-1][0] + 1, len(batch), valid
+
+
+class Checkpoint:
+    """
+    Offset of an import, stored in `<file>.checkpoint`.
+
+    Chunks may finish out of order; the stored offset only moves past a chunk
+    once every chunk before it has finished.
+
+    Args:
+        path (str): The imported file.
+        table (str): The table it is imported into.
+    """
+
+    def __init__(self, path: str, table: str) -> None:
+        self.path = f"{path}.checkpoint"
+        self.table = table
+        self.offset = 0
+        self.finished: dict[int, int] = {}
+        if os.path.exists(self.path):
+            with open(self.path) as file:
+                state = json.load(file)
+            if state.get("table") == table:
+                self.offset = state["offset"]
+
+    def finish(self, end: int, count: int) -> None:
+        """Record that the chunk of `count` records ending at `end` was inserted."""
+        self.finished[end - count] = end
+        moved = False
+        while self.offset in self.finished:
+            self.offset = self.finished.pop(self.offset)
+            moved = True
+        if moved:
+            temporary = f"{self.path}.tmp"
+            with open(temporary, "w") as file:
+                json.dump({"table": self.table, "offset": self.offset}, file)
+            os.replace(temporary, self.path)
+
+    def clear(self) -> None:
+        """Remove the checkpoint of a completed import."""
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def import_file(
+    dao: BaseDAO[Any],
+    path: str,
+    chunk_size: int = Config.IMPORT.CHUNK_SIZE,
+    workers: int = Config.IMPORT.WORKERS,
+    report: Callable[[dict[str, Any]], None] = lambda progress: None,
+) -> dict[str, Any]:
+    """
+    Import a CSV or JSON Lines file into the DAO's table, resuming from its
+    checkpoint if there is one.
+
+    Args:
+        dao (BaseDAO[Any]): The DAO of the table; shared by the worker threads.
+        path (str): The file to import.
+        chunk_size (int): Number of records per `create_many` call.
+        workers (int): Number of concurrent inserts.
+        report (Callable[[dict[str, Any]], None]): Called with the progress
+            after every chunk.
+
+    Returns:
+        dict[str, Any]: `offset` (records done, including skipped ones),
+        `inserted`, `rejected`, `seconds` and `rows_per_second`.
+    """
+    checkpoint = Checkpoint(path, dao.table)
+    progress: dict[str, Any] = {
+        "offset": checkpoint.offset,
+        "inserted": 0,
+        "rejected": 0,
+        "seconds": 0.0,
+        "rows_per_second": 0.0,
+    }
+    started = time.monotonic()
+
+    rejected_file: Optional[BinaryIO] = None
+
+    def reject(record: Record, error: str) -> None:
+        nonlocal rejected_file
+        if rejected_file is None:
+            rejected_file = open(f"{path}.rejected.jsonl", "ab")
+        position, row = record
+        rejected_file.write(
+            to_json({"position": position, "row": row, "error": error}) + b"\n"
+        )
+        progress["rejected"] += 1
+
+    def insert(chunk: list[tuple[int, PydanticBaseModel]]) -> int:
+        return len(dao.create_many([row for _, row in chunk])) if chunk else 0
+
+    def finished(future: Future[int], end: int, count: int, chunk: list[Any]) -> None:
+        try:
+            progress["inserted"] += future.result()
+        except Exception as e:
+            for position, row in chunk:
+                reject((position, row.model_dump(mode="json")), str(e))
+        checkpoint.finish(end, count)
+        progress["offset"] = checkpoint.offset
+        progress["seconds"] = time.monotonic() - started
+        progress["rows_per_second"] = progress["inserted"] / max(
+            progress["seconds"], 1e-9
+        )
+        report(dict(progress))
+
+    records = read_records(path, start=checkpoint.offset)
+    chunks = chunked(
+        validate(records, dao.base_model.create_schema(), reject), chunk_size
+    )
+    in_flight: dict[Future[int], tuple[int, int, list[Any]]] = {}
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for end, count, chunk in chunks:
+                if len(in_flight) >= 2 * workers:
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        finished(future, *in_flight.pop(future))
+                in_flight[executor.submit(insert, chunk)] = (end, count, chunk)
+            for future in list(in_flight):
+                future.exception()
+                finished(future, *in_flight.pop(future))
+    finally:
+        if rejected_file is not None:
+            rejected_file.close()
+
+    checkpoint.clear()
+    progress["seconds"] = time.monotonic() - started
+    return progress
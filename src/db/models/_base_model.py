@@ -2,12 +2,15 @@
 This module defines the BaseModel class as the base for all ORM models.
 """
 
-from typing import Any
+from typing import Any, get_type_hints
 
 from pydantic import BaseModel as PydanticBaseModel
+from pydantic import create_model
 
 from src.utils.data import ValidData
 
+_schemas: dict[tuple[type, str], type[PydanticBaseModel]] = {}
+
 
 class BaseModel(PydanticBaseModel):
     """
@@ -15,6 +18,8 @@ class BaseModel(PydanticBaseModel):
 
     Methods:
         model_validate_partial: Validates and partially updates the model with provided data.
+        create_schema: Request model for creating a record, without the `id` field.
+        update_schema: Request model for updating a record, with every field optional.
     """
 
     @classmethod
@@ -26,3 +31,47 @@ class BaseModel(PydanticBaseModel):
             else:
                 _data[field] = data[field]
         return cls.model_validate(_data)
+
+    @classmethod
+    def create_schema(cls) -> type[PydanticBaseModel]:
+        """
+        Build (once) the request model used to create a record.
+
+        The schema carries the same annotations and validators as the model,
+        minus the server-generated `id`, so a request body validated against
+        it can be inserted without being validated again.
+
+        Returns:
+            type[PydanticBaseModel]: The `<Model>Create` request model.
+        """
+        key = (cls, "Create")
+        if key not in _schemas:
+            hints = get_type_hints(cls, include_extras=True)
+            fields: dict[str, Any] = {
+                name: (hints[name], ... if field.is_required() else field.default)
+                for name, field in cls.model_fields.items()
+                if name != "id"
+            }
+            _schemas[key] = create_model(f"{cls.__name__}Create", **fields)
+        return _schemas[key]
+
+    @classmethod
+    def update_schema(cls) -> type[PydanticBaseModel]:
+        """
+        Build (once) the request model used to update a record.
+
+        Every field defaults to None, which pydantic does not validate, so
+        omitted fields are left out of `model_dump(exclude_unset=True)` while
+        an explicit null for a non-nullable field is still rejected.
+
+        Returns:
+            type[PydanticBaseModel]: The `<Model>Update` request model.
+        """
+        key = (cls, "Update")
+        if key not in _schemas:
+            hints = get_type_hints(cls, include_extras=True)
+            fields: dict[str, Any] = {
+                name: (hints[name], None) for name in cls.model_fields if name != "id"
+            }
+            _schemas[key] = create_model(f"{cls.__name__}Update", **fields)
+        return _schemas[key]
@@ -29,3 +29,4 @@ class History(BaseModel):
     product_id: UuidStr
     quantity: PositiveInt
     total: PositiveFloat
+    purchase_date: Optional[datetime] = None
@@ -0,0 +1,165 @@
+"""
+Per-table write versions used to build cheap, strong ETags.
+
+The versions live in the database: a statement-level trigger bumps the
+table's row in `table_versions` on every insert, update or delete (see the
+`table_versions` migration). They are therefore shared by every worker
+process and also change on writes made outside the API, so an ETag derived
+from them changes whenever the data behind a response may have changed.
+
+Each process keeps the versions it read for `Config.TABLE_VERSIONS.MAX_AGE`
+seconds, so a 304 or a cache hit usually costs no round trip at all. Writes
+made through this process's DAOs drop the copy of the written table at once
+(through the write hooks), so they are never answered from stale versions;
+writes made elsewhere are seen at most `MAX_AGE` seconds late.
+"""
+
+import threading
+import time
+from hashlib import blake2b
+from typing import Any, Callable, Iterable, Optional
+
+from supabase import Client
+
+from src.config import Config
+from src.db.base import get_unauthenticated_client
+from src.db.hooks import WriteHook, write_hooks
+from src.db.tables import SupabaseTables
+
+VERSIONS_TABLE = "table_versions"
+
+
+class TableVersions:
+    """
+    Reader of the shared write versions of tables.
+
+    Args:
+        get_client (Callable[[], Client]): Creates the client the versions are
+            read with; it is created once and shared by all requests.
+        max_age (float): Seconds a version read from the database is reused.
+    """
+
+    def __init__(
+        self,
+        get_client: Callable[[], Client] = get_unauthenticated_client,
+        max_age: float = Config.TABLE_VERSIONS.MAX_AGE,
+    ) -> None:
+        self.get_client = get_client
+        self.max_age = max_age
+        self._client: Optional[Client] = None
+        self._lock = threading.Lock()
+        self._versions: dict[str, tuple[int, float]] = {}
+        self._generation = 0
+
+    def get(self, tables: Iterable[str]) -> dict[str, int]:
+        """
+        Return the current versions of tables.
+
+        Versions read less than `max_age` seconds ago are reused; the others
+        are read from the database in one query.
+
+        Args:
+            tables (Iterable[str]): The tables.
+
+        Returns:
+            dict[str, int]: The version of each table; 0 if it was never written.
+        """
+        tables = list(tables)
+        now = time.monotonic()
+        with self._lock:
+            known = {
+                table: entry[0]
+                for table in tables
+                if (entry := self._versions.get(table)) is not None
+                and now - entry[1] <= self.max_age
+            }
+            generation = self._generation
+        missing = [table for table in tables if table not in known]
+        if missing:
+            read = self.read(missing)
+            with self._lock:
+                # Versions read before a write was dropped may predate it.
+                if self._generation == generation:
+                    self._versions.update(
+                        (table, (version, now)) for table, version in read.items()
+                    )
+            known.update(read)
+        return {table: known[table] for table in tables}
+
+    def read(self, tables: list[str]) -> dict[str, int]:
+        """
+        Read the versions of tables from the database.
+
+        Args:
+            tables (list[str]): The tables.
+
+        Returns:
+            dict[str, int]: The version of each table; 0 if it was never written.
+        """
+        if self._client is None:
+            self._client = self.get_client()
+        data = (
+            self._client.table(VERSIONS_TABLE)
+            .select("table_name,version")
+            .in_("table_name", tables)
+            .execute()
+        )
+        versions = {row["table_name"]: int(row["version"]) for row in data.data}
+        return {table: versions.get(table, 0) for table in tables}
+
+    def etag(self, tables: Iterable[str], variant: str = "") -> str:
+        """
+        Build a strong ETag from the current versions of the given tables.
+
+        Args:
+            tables (Iterable[str]): Tables the response is derived from.
+            variant (str): Anything else the representation depends on, e.g.
+                the negotiated media type.
+
+        Returns:
+            str: The quoted ETag.
+        """
+        return etag_of(self.get(tables), variant)
+
+    def invalidate(self, table: str) -> None:
+        """Forget the version of a table, e.g. after writing to it."""
+        with self._lock:
+            self._generation += 1
+            self._versions.pop(table, None)
+
+    def invalidator(self, table: str) -> WriteHook:
+        """Return a write hook forgetting the version of `table`."""
+
+        def hook(op: str, rows: list[dict[str, Any]]) -> None:
+            self.invalidate(table)
+
+        return hook
+
+
+def etag_of(versions: dict[str, int], variant: str = "") -> str:
+    """
+    Build a strong ETag from table versions.
+
+    Args:
+        versions (dict[str, int]): Versions of the tables a response is
+            derived from, as returned by `TableVersions.get`.
+        variant (str): Anything else the representation depends on.
+
+    Returns:
+        str: The quoted ETag.
+    """
+    state = ",".join(f"{table}={version}" for table, version in versions.items())
+    digest = blake2b(f"{state}|{variant}".encode(), digest_size=12).hexdigest()
+    return f'"{digest}"'
+
+
+table_versions = TableVersions()
+"""Versions of the tables, read from the database."""
+
+for table in (
+    SupabaseTables.CUSTOMERS,
+    SupabaseTables.INVENTORY,
+    SupabaseTables.HISTORY,
+    SupabaseTables.REVIEWS,
+):
+    write_hooks.register(table, table_versions.invalidator(table))
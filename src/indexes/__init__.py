@@ -0,0 +1,24 @@
+from .catalog import CatalogSnapshot, catalog
+from .emails import EmailIndex, email_index
+from .facets import FacetIndex, facet_index
+from .ratings import RatingAggregates, ratings
+from .sales import SalesRollups, sales_rollups
+from .search import SearchIndex, search_index
+from .suggest import SuggestIndex, suggest_index
+
+__all__ = [
+    "CatalogSnapshot",
+    "EmailIndex",
+    "FacetIndex",
+    "RatingAggregates",
+    "SalesRollups",
+    "SearchIndex",
+    "SuggestIndex",
+    "catalog",
+    "email_index",
+    "facet_index",
+    "ratings",
+    "sales_rollups",
+    "search_index",
+    "suggest_index",
+]
@@ -0,0 +1,419 @@
+"""
+Columnar in-process snapshot of the Inventory table.
+
+Catalog reads (category, price range, stock and sort-by-price queries, the
+`/sales/goods` price list and lookups by product name) are answered from
+NumPy arrays instead of a round trip to Supabase. Prices and quantities are
+stored as `float64`/`int64` columns, categories as `int8` codes into
+`CATEGORIES`, and names and descriptions as interned strings.
+
+The snapshot is loaded lazily from the first request's DAO and kept current
+by the Inventory write hooks. It remembers the shared write version of
+Inventory (see `table_versions`) it was loaded at, counting one version per
+write it applies, and is reloaded as soon as the table's version is newer,
+i.e. after a write made by another process, the same signal ETags and the
+response cache rely on. It is also reloaded once it is older than
+`Config.CATALOG.MAX_AGE`, or when the version cannot be read. Reloads
+are reconciled with the loaded rows, so the indexes derived from the
+snapshot only see the rows that changed. The table is fetched without
+holding the snapshot's lock, so queries and write hooks never wait for the
+database.
+"""
+
+import sys
+import threading
+import time
+from typing import Any, Callable, Optional, Union
+
+import numpy as np
+import numpy.typing as npt
+from pydantic_core import to_json
+
+from src.config import Config
+from src.db.dao import BaseDAO
+from src.db.hooks import write_hooks
+from src.db.models import Inventory
+from src.db.table_versions import table_versions
+from src.db.tables import SupabaseTables
+from src.utils.types import CATEGORIES
+
+CATEGORY_CODES = {category: code for code, category in enumerate(CATEGORIES)}
+"""Catalog code of each category."""
+
+
+def current_version() -> Optional[int]:
+    """Return the shared write version of Inventory, None if it cannot be read."""
+    try:
+        return table_versions.get([SupabaseTables.INVENTORY])[SupabaseTables.INVENTORY]
+    except Exception:
+        return None
+
+
+class CatalogSnapshot:
+    """
+    Columnar copy of the Inventory table supporting vectorized queries.
+
+    Rows are addressed by their position in the columns. Deleted rows are
+    tombstoned in `alive` and dropped on the next full load. Structures
+    derived from the snapshot subscribe to its changes with `subscribe`.
+
+    Args:
+        capacity (int): Initial number of rows allocated per column.
+    """
+
+    def __init__(self, capacity: int = Config.CATALOG.INITIAL_CAPACITY) -> None:
+        self._lock = threading.RLock()
+        self._reload_lock = threading.Lock()
+        self._pending: Optional[list[tuple[str, list[dict[str, Any]]]]] = None
+        self.loaded_at: Optional[float] = None
+        self.version: Optional[int] = None
+        self._listeners: list[Callable[[str, int], None]] = []
+        self._reset(capacity)
+
+    def _reset(self, capacity: int) -> None:
+        self.size = 0
+        self.ids: list[str] = []
+        self.names: list[str] = []
+        self.descriptions: list[str] = []
+        self.category = np.zeros(capacity, dtype=np.int8)
+        self.price = np.zeros(capacity, dtype=np.float64)
+        self.quantity = np.zeros(capacity, dtype=np.int64)
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.row_of: dict[str, int] = {}
+        self.rows_by_name: dict[str, set[int]] = {}
+        self._orders: dict[str, npt.NDArray[np.intp]] = {}
+
+    def subscribe(self, listener: Callable[[str, int], None]) -> None:
+        """
+        Call `listener` on every change of the snapshot.
+
+        It receives `("load", -1)` after a full load, and `("upsert", row)` or
+        `("delete", row)` after an incremental write to a row.
+        """
+        self._listeners.append(listener)
+
+    def _notify(self, event: str, row: int) -> None:
+        for listener in self._listeners:
+            listener(event, row)
+
+    @property
+    def loaded(self) -> bool:
+        """Whether the snapshot holds the table."""
+        return self.loaded_at is not None
+
+    def is_stale(
+        self, now: Optional[float] = None, version: Optional[int] = None
+    ) -> bool:
+        """
+        Whether the snapshot must be (re)loaded before answering queries.
+
+        Args:
+            now (Optional[float]): The monotonic time; the current one if None.
+            version (Optional[int]): The current write version of Inventory,
+                if known.
+
+        Returns:
+            bool: True if it was never loaded, if the table's version is newer
+            than the snapshot's or if the snapshot is older than
+            `Config.CATALOG.MAX_AGE`.
+        """
+        if self.loaded_at is None:
+            return True
+        # Only a newer version means a write the snapshot has not seen: one
+        # that was applied before its version could be read is counted twice.
+        if version is not None and self.version is not None and version > self.version:
+            return True
+        now = time.monotonic() if now is None else now
+        return now - self.loaded_at > Config.CATALOG.MAX_AGE
+
+    def load(self, rows: list[dict[str, Any]], version: Optional[int] = None) -> None:
+        """
+        Replace the snapshot with the given rows.
+
+        A reload of a loaded snapshot is reconciled in place: rows keep their
+        positions and only new, changed and missing rows are written and
+        notified as `"upsert"`/`"delete"`, so derived structures stay valid
+        and are updated incrementally. The columns are rebuilt from scratch,
+        notified as `"load"`, on the first load and once tombstones outnumber
+        live rows. Writes made while `load_if_stale` was fetching the rows are
+        then applied again, in case the fetch missed them.
+
+        Args:
+            rows (list[dict[str, Any]]): All Inventory rows.
+            version (Optional[int]): The write version of Inventory read before
+                the rows, if known.
+        """
+        with self._lock:
+            pending, self._pending = self._pending or [], None
+            if self.loaded and self.size - len(self.row_of) <= len(rows):
+                self._reconcile(rows)
+            else:
+                self._reset(max(len(rows), Config.CATALOG.INITIAL_CAPACITY))
+                for row in rows:
+                    self._upsert(row)
+                self._notify("load", -1)
+            self.loaded_at = time.monotonic()
+            for op, written in pending:
+                self._write(op, written)
+            self.version = None if version is None else version + len(pending)
+
+    def _reconcile(self, rows: list[dict[str, Any]]) -> None:
+        self._orders.clear()
+        missing = set(self.row_of)
+        for row in rows:
+            missing.discard(row["id"])
+            index = self.row_of.get(row["id"])
+            if index is None or not self._matches(index, row):
+                self._notify("upsert", self._upsert(row))
+        for id in missing:
+            index = self._delete(id)
+            if index is not None:
+                self._notify("delete", index)
+
+    def _matches(self, index: int, row: dict[str, Any]) -> bool:
+        return bool(
+            self.names[index] == row["product_name"]
+            and self.descriptions[index] == row["description"]
+            and self.category[index] == CATEGORY_CODES[row["category"].lower()]
+            and self.price[index] == row["price"]
+            and self.quantity[index] == row["quantity"]
+        )
+
+    def load_if_stale(self, dao: BaseDAO[Inventory]) -> "CatalogSnapshot":
+        """
+        Load the snapshot through a DAO unless it is loaded and fresh.
+
+        The table is read page by page with `BaseDAO.iter_pages`, since a
+        single PostgREST response is capped at its `max-rows` setting. This
+        blocks for the whole load: call it from the thread pool in async code.
+        Queries and the write hook do not wait for the fetch.
+
+        Args:
+            dao (BaseDAO[Inventory]): The Inventory DAO of the current request.
+
+        Returns:
+            CatalogSnapshot: The snapshot itself.
+        """
+        version = current_version()
+        if self.is_stale(version=version):
+            with self._reload_lock:
+                if self.is_stale(version=version):
+                    with self._lock:
+                        self._pending = []
+                    try:
+                        self.load(
+                            [row for page in dao.iter_pages() for row in page], version
+                        )
+                    finally:
+                        with self._lock:
+                            self._pending = None
+        return self
+
+    def apply(self, op: str, rows: list[dict[str, Any]]) -> None:
+        """
+        Apply a write to the snapshot; registered as the Inventory write hook.
+
+        Args:
+            op (str): `"upsert"` or `"update"` (handled alike) or `"delete"`.
+            rows (list[dict[str, Any]]): The written rows.
+        """
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append((op, rows))
+            if self.loaded:
+                self._write(op, rows)
+            if self.version is not None:
+                self.version += 1
+
+    def _write(self, op: str, rows: list[dict[str, Any]]) -> None:
+        """Apply written rows; call it while holding the lock."""
+        self._orders.clear()
+        try:
+            for row in rows:
+                if op == "delete":
+                    index = self._delete(row["id"])
+                    if index is not None:
+                        self._notify("delete", index)
+                else:
+                    self._notify("upsert", self._upsert(row))
+        except (KeyError, TypeError, ValueError):
+            self.loaded_at = None
+
+    def _grow(self) -> None:
+        capacity = 2 * len(self.price)
+        self.category = np.resize(self.category, capacity)
+        self.price = np.resize(self.price, capacity)
+        self.quantity = np.resize(self.quantity, capacity)
+        self.alive = np.concatenate([self.alive, np.zeros_like(self.alive)])
+
+    def _upsert(self, row: dict[str, Any]) -> int:
+        name = sys.intern(row["product_name"])
+        description = sys.intern(row["description"])
+        index = self.row_of.get(row["id"])
+        if index is None:
+            if self.size == len(self.price):
+                self._grow()
+            index = self.size
+            self.size += 1
+            self.ids.append(row["id"])
+            self.names.append(name)
+            self.descriptions.append(description)
+            self.row_of[row["id"]] = index
+        else:
+            self.rows_by_name[self.names[index]].discard(index)
+            self.names[index] = name
+            self.descriptions[index] = description
+        self.rows_by_name.setdefault(name, set()).add(index)
+        self.category[index] = CATEGORY_CODES[row["category"].lower()]
+        self.price[index] = row["price"]
+        self.quantity[index] = row["quantity"]
+        self.alive[index] = True
+        return index
+
+    def _delete(self, id: str) -> Optional[int]:
+        index = self.row_of.pop(id, None)
+        if index is None:
+            return None
+        self.rows_by_name[self.names[index]].discard(index)
+        self.alive[index] = False
+        return index
+
+    def search(
+        self,
+        product_name: Optional[str] = None,
+        category: Optional[str] = None,
+        price: Optional[float] = None,
+        quantity: Optional[int] = None,
+        description: Optional[str] = None,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        in_stock: Optional[bool] = None,
+        sort: Optional[str] = None,
+    ) -> npt.NDArray[np.intp]:
+        """
+        Find the rows matching all given filters.
+
+        Args:
+            product_name (Optional[str]): Exact product name.
+            category (Optional[str]): Category.
+            price (Optional[float]): Exact price.
+            quantity (Optional[int]): Exact quantity.
+            description (Optional[str]): Exact description.
+            min_price (Optional[float]): Inclusive lower price bound.
+            max_price (Optional[float]): Inclusive upper price bound.
+            in_stock (Optional[bool]): Only rows with (True) or without (False) stock.
+            sort (Optional[str]): `price` or `quantity`, prefixed with `-` for
+                descending order; table order otherwise.
+
+        Returns:
+            npt.NDArray[np.intp]: Indices of the matching rows.
+        """
+        with self._lock:
+            size = self.size
+            if product_name is not None:
+                candidates = np.array(
+                    sorted(self.rows_by_name.get(product_name, ())), dtype=np.intp
+                )
+                select: Any = candidates
+            else:
+                candidates = None
+                select = slice(0, size)
+            mask: npt.NDArray[np.bool_] = self.alive[select].copy()
+            if category is not None:
+                code = CATEGORY_CODES.get(category.lower())
+                if code is None:
+                    return np.empty(0, dtype=np.intp)
+                mask &= self.category[select] == code
+            if price is not None:
+                mask &= self.price[select] == price
+            if quantity is not None:
+                mask &= self.quantity[select] == quantity
+            if min_price is not None:
+                mask &= self.price[select] >= min_price
+            if max_price is not None:
+                mask &= self.price[select] <= max_price
+            if in_stock is not None:
+                mask &= (self.quantity[select] > 0) == in_stock
+            if description is not None:
+                texts = self.descriptions
+                indices = candidates if candidates is not None else np.arange(size)
+                mask &= np.fromiter(
+                    (texts[index] == description for index in indices.tolist()),
+                    dtype=bool,
+                    count=len(mask),
+                )
+            if candidates is not None:
+                rows = candidates[mask]
+                if sort is not None:
+                    keys = self._column(sort)[rows]
+                    rows = rows[
+                        np.argsort(-keys if sort[0] == "-" else keys, kind="stable")
+                    ]
+                return rows
+            if sort is None:
+                return np.flatnonzero(mask)
+            order = self._order(sort.lstrip("-"))
+            rows = order[mask[order]]
+            return rows[::-1] if sort[0] == "-" else rows
+
+    def _column(
+        self, sort: str
+    ) -> Union[npt.NDArray[np.float64], npt.NDArray[np.int64]]:
+        return self.price if sort.endswith("price") else self.quantity
+
+    def _order(self, column: str) -> npt.NDArray[np.intp]:
+        """Return (and memoize until the next write) the rows sorted by a column."""
+        order = self._orders.get(column)
+        if order is None:
+            order = np.argsort(self._column(column)[: self.size], kind="stable")
+            self._orders[column] = order
+        return order
+
+    def records(self, rows: npt.NDArray[np.intp]) -> list[dict[str, Any]]:
+        """
+        Materialize rows as Inventory dicts.
+
+        Args:
+            rows (npt.NDArray[np.intp]): Row indices, as returned by `search`.
+
+        Returns:
+            list[dict[str, Any]]: The rows in the given order.
+        """
+        with self._lock:
+            return [
+                {
+                    "id": self.ids[index],
+                    "product_name": self.names[index],
+                    "category": CATEGORIES[category],
+                    "price": price,
+                    "quantity": quantity,
+                    "description": self.descriptions[index],
+                }
+                for index, category, price, quantity in zip(
+                    rows.tolist(),
+                    self.category[rows].tolist(),
+                    self.price[rows].tolist(),
+                    self.quantity[rows].tolist(),
+                )
+            ]
+
+    def to_json(self, rows: npt.NDArray[np.intp]) -> bytes:
+        """Serialize rows as a JSON array of Inventory objects."""
+        return to_json(self.records(rows))
+
+    def prices(self) -> dict[str, float]:
+        """Return the price of every product by name, in table order."""
+        with self._lock:
+            rows = np.flatnonzero(self.alive[: self.size])
+            names = self.names
+            return dict(
+                zip(
+                    (names[index] for index in rows.tolist()), self.price[rows].tolist()
+                )
+            )
+
+
+catalog = CatalogSnapshot()
+"""Catalog snapshot of this process."""
+
+write_hooks.register(SupabaseTables.INVENTORY, catalog.apply)
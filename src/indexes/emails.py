@@ -0,0 +1,303 @@
+"""
+In-process index of customer emails for the `/auth` routes.
+
+Registration, login and password resets used to look the email up in the
+Customers table before calling GoTrue. `EmailIndex` answers most of those
+lookups from memory with two structures:
+
+- a Bloom filter of every email loaded from Customers or created since,
+  sized for `Config.EMAIL_INDEX.FALSE_POSITIVE_RATE`: an email it does not
+  contain is definitely absent, so the lookup is skipped;
+- a bounded LRU set of emails verified to exist, by the load, a lookup or a
+  successful registration, keyed by a digest of the email and the customer
+  id: an email it contains is definitely present.
+
+Any other email may exist and is looked up as before. Emails are compared
+case-insensitively, like GoTrue does.
+
+The index is loaded lazily through the request's DAO, kept current by the
+Customers write hook and by the `/auth` routes, and reloaded after
+`Config.CATALOG.MAX_AGE`. Customers created by another worker process are
+only seen after the next reload, so "absent" is only a hint: `exists`
+confirms it in the table, and login lets GoTrue decide (see
+`src.auth.auth.login`). The table is fetched without holding the index's
+lock, so lookups, which run on the event loop, never wait for it.
+
+Outcomes are recorded in the metrics registry as `auth.email_index` with an
+`outcome` label of `absent`, `present` or `unknown`.
+"""
+
+import math
+import threading
+import time
+from collections import OrderedDict
+from hashlib import blake2b
+from typing import Any, Optional
+
+from src.config import Config
+from src.db.dao import BaseDAO
+from src.db.hooks import write_hooks
+from src.db.models import Customer
+from src.db.tables import SupabaseTables
+from src.utils.metrics import metrics
+
+
+def digest_of(email: str) -> bytes:
+    """Digest of a case-folded email."""
+    return blake2b(email.strip().lower().encode(), digest_size=16).digest()
+
+
+class BloomFilter:
+    """
+    Bloom filter over 16-byte digests, using double hashing.
+
+    Args:
+        capacity (int): Number of items it is sized for.
+        false_positive_rate (float): Target false-positive rate at capacity.
+    """
+
+    def __init__(self, capacity: int, false_positive_rate: float) -> None:
+        self.capacity = max(capacity, 1)
+        self.size = max(
+            8,
+            math.ceil(
+                -self.capacity * math.log(false_positive_rate) / math.log(2) ** 2
+            ),
+        )
+        self.hashes = max(1, round(self.size / self.capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, digest: bytes) -> list[int]:
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        return [(first + i * second) % self.size for i in range(self.hashes)]
+
+    def add(self, digest: bytes) -> None:
+        """Add a digest."""
+        for position in self._positions(digest):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, digest: bytes) -> bool:
+        return all(
+            self.bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(digest)
+        )
+
+
+class EmailIndex:
+    """
+    Index of customer emails answering "absent", "present" or "unknown".
+
+    Args:
+        verified_size (int): Maximum number of verified emails kept.
+    """
+
+    def __init__(self, verified_size: int = Config.EMAIL_INDEX.VERIFIED_SIZE) -> None:
+        self.verified_size = verified_size
+        self._lock = threading.RLock()
+        self._reload_lock = threading.Lock()
+        self._pending: Optional[list[tuple[Optional[str], Optional[str]]]] = None
+        self.loaded_at: Optional[float] = None
+        self._reset(Config.CATALOG.INITIAL_CAPACITY)
+
+    def _reset(self, capacity: int) -> None:
+        self.bloom = BloomFilter(capacity, Config.EMAIL_INDEX.FALSE_POSITIVE_RATE)
+        self.verified: OrderedDict[bytes, str] = OrderedDict()
+        self.verified_ids: dict[str, bytes] = {}
+
+    def is_stale(self) -> bool:
+        """Whether the index must be (re)loaded before answering lookups."""
+        return (
+            self.loaded_at is None
+            or time.monotonic() - self.loaded_at > Config.CATALOG.MAX_AGE
+        )
+
+    def load(self, rows: list[dict[str, Any]]) -> None:
+        """
+        Rebuild the index from all Customers rows.
+
+        The Bloom filter is sized for twice the rows, so customers created
+        until the next reload keep it near its false-positive rate. The new
+        structures are built without the lock and swapped in under it; emails
+        written while `load_if_stale` was fetching the rows are then recorded
+        again, in case the fetch missed them.
+
+        Args:
+            rows (list[dict[str, Any]]): All Customers rows.
+        """
+        fresh = EmailIndex(self.verified_size)
+        fresh._reset(max(2 * len(rows), Config.CATALOG.INITIAL_CAPACITY))
+        for row in rows:
+            fresh._add(row["email"], row.get("id"))
+        with self._lock:
+            pending, self._pending = self._pending or [], None
+            self.bloom, self.verified, self.verified_ids = (
+                fresh.bloom,
+                fresh.verified,
+                fresh.verified_ids,
+            )
+            self.loaded_at = time.monotonic()
+            for email, customer_id in pending:
+                self._write(email, customer_id)
+
+    def load_if_stale(self, dao: BaseDAO[Customer]) -> "EmailIndex":
+        """
+        Load the index through a DAO unless it is loaded and fresh.
+
+        This blocks for the whole load: call it from the thread pool in async
+        code. Lookups and writes do not wait for the fetch.
+
+        Args:
+            dao (BaseDAO[Customer]): The Customers DAO of the current request.
+
+        Returns:
+            EmailIndex: The index itself.
+        """
+        if self.is_stale():
+            with self._reload_lock:
+                if self.is_stale():
+                    with self._lock:
+                        self._pending = []
+                    try:
+                        self.load([row for page in dao.iter_pages() for row in page])
+                    finally:
+                        with self._lock:
+                            self._pending = None
+        return self
+
+    def lookup(self, email: str) -> Optional[bool]:
+        """
+        Whether a customer has this email, if the index knows.
+
+        Args:
+            email (str): The email.
+
+        Returns:
+            Optional[bool]: False if it is definitely absent, True if it was
+            verified to exist, None if it must be looked up (including while
+            the index is not loaded).
+        """
+        if self.loaded_at is None:
+            return None
+        digest = digest_of(email)
+        with self._lock:
+            if digest not in self.bloom:
+                found: Optional[bool] = False
+            elif digest in self.verified:
+                self.verified.move_to_end(digest)
+                found = True
+            else:
+                found = None
+        metrics.increment(
+            "auth.email_index",
+            outcome={False: "absent", True: "present", None: "unknown"}[found],
+        )
+        return found
+
+    def fetch(self, email: str, dao: BaseDAO[Customer]) -> bool:
+        """
+        Look an email up in the Customers table and record it if found.
+
+        Args:
+            email (str): The email.
+            dao (BaseDAO[Customer]): The Customers DAO of the current request.
+
+        Returns:
+            bool: Whether a customer has this email.
+        """
+        customers = dao.get_by_query(email=email)
+        if customers:
+            self.add(email, customers[0].id)
+        return bool(customers)
+
+    def exists(self, email: str, dao: BaseDAO[Customer]) -> bool:
+        """
+        Whether a customer has this email, looking it up unless the index
+        verified it.
+
+        An "absent" answer is confirmed in the table too: the customer may
+        have been created by another worker since the index was loaded.
+
+        Args:
+            email (str): The email.
+            dao (BaseDAO[Customer]): The Customers DAO of the current request.
+
+        Returns:
+            bool: Whether a customer has this email.
+        """
+        return self.lookup(email) is True or self.fetch(email, dao)
+
+    def add(self, email: str, customer_id: Optional[str] = None) -> None:
+        """
+        Record that a customer has an email, e.g. after a registration or a
+        successful lookup.
+
+        Args:
+            email (str): The email.
+            customer_id (Optional[str]): The customer, so that a later change
+                of their email forgets this one.
+        """
+        with self._lock:
+            self._write(email, customer_id)
+
+    def _write(self, email: Optional[str], customer_id: Optional[str]) -> None:
+        """
+        Record an email, or forget the customer's if `email` is None; call it
+        while holding the lock.
+        """
+        if self._pending is not None:
+            self._pending.append((email, customer_id))
+        if self.loaded_at is None:
+            return
+        try:
+            if email is not None:
+                self._add(email, customer_id)
+            elif customer_id is not None:
+                self._forget(customer_id)
+        except (TypeError, AttributeError):
+            self.loaded_at = None
+        if self.bloom.count > self.bloom.capacity:
+            self.loaded_at = None
+
+    def _add(self, email: str, customer_id: Optional[str]) -> None:
+        digest = digest_of(email)
+        self.bloom.add(digest)
+        if customer_id is not None:
+            self._forget(customer_id)
+            self.verified_ids[customer_id] = digest
+        self.verified[digest] = customer_id or ""
+        self.verified.move_to_end(digest)
+        while len(self.verified) > self.verified_size:
+            _, evicted = self.verified.popitem(last=False)
+            self.verified_ids.pop(evicted, None)
+
+    def _forget(self, customer_id: str) -> None:
+        digest = self.verified_ids.pop(customer_id, None)
+        if digest is not None:
+            self.verified.pop(digest, None)
+
+    def apply(self, op: str, rows: list[dict[str, Any]]) -> None:
+        """
+        Apply a Customers write; registered as the Customers write hook.
+
+        Deleted emails stay in the Bloom filter, so they become "unknown"
+        rather than "absent" until the next reload.
+
+        Args:
+            op (str): `"upsert"` or `"update"` (handled alike) or `"delete"`.
+            rows (list[dict[str, Any]]): The written rows.
+        """
+        with self._lock:
+            try:
+                for row in rows:
+                    self._write(None if op == "delete" else row["email"], row["id"])
+            except KeyError:
+                self.loaded_at = None
+
+
+email_index = EmailIndex()
+"""Customer email index of this process."""
+
+write_hooks.register(SupabaseTables.CUSTOMERS, email_index.apply)
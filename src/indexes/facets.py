@@ -0,0 +1,206 @@
+"""
+Category and stock facet counts over the catalog snapshot.
+
+`FacetIndex` keeps packed bitmaps (one bit per catalog row, 64 rows per
+`uint64` word) of the live rows, of each category and of the rows in stock.
+Facet counts for a filter are popcounts of ANDed bitmaps, so they cost
+O(rows / 64) word operations; a price range, which has no bitmap, adds one
+vectorized comparison over the price column.
+
+Bitmaps are patched bit by bit on catalog writes and rebuilt after a full
+load. Counting may rebuild, so call `counts` from the thread pool in async
+code.
+"""
+
+import threading
+from typing import Any, Optional
+
+import numpy as np
+import numpy.typing as npt
+
+from src.indexes.catalog import CATEGORY_CODES, CatalogSnapshot, catalog
+from src.utils.types import CATEGORIES
+
+Bitmap = npt.NDArray[np.uint64]
+"""A packed bitmap, one bit per catalog row."""
+
+
+def pack(mask: npt.NDArray[np.bool_], words: int) -> Bitmap:
+    """Pack a boolean array into a little-endian bitmap of `words` uint64 words."""
+    packed = np.zeros(words * 8, dtype=np.uint8)
+    bits = np.packbits(mask, bitorder="little")
+    packed[: bits.size] = bits
+    bitmap: Bitmap = packed.view("<u8")
+    return bitmap
+
+
+def popcount(bitmap: Bitmap) -> int:
+    """Count the set bits of a bitmap."""
+    return int(np.bitwise_count(bitmap).sum())
+
+
+class FacetIndex:
+    """
+    Packed bitmaps of the catalog's categories and stock.
+
+    Args:
+        snapshot (CatalogSnapshot): The catalog to index.
+    """
+
+    def __init__(self, snapshot: CatalogSnapshot) -> None:
+        self.snapshot = snapshot
+        self._lock = threading.RLock()
+        self.dirty = True
+        self.alive = np.zeros(0, dtype=np.uint64)
+        self.in_stock = np.zeros(0, dtype=np.uint64)
+        self.categories = np.zeros((len(CATEGORIES), 0), dtype=np.uint64)
+        snapshot.subscribe(self.on_change)
+
+    def on_change(self, event: str, row: int) -> None:
+        """Follow a change of the catalog; subscribed to the snapshot."""
+        with self._lock:
+            if event == "load" or self.dirty:
+                self.dirty = True
+                return
+            word, bit = row >> 6, np.uint64(1 << (row & 63))
+            if word >= self.alive.size:
+                self._grow(word + 1)
+            self.alive[word] &= ~bit
+            self.in_stock[word] &= ~bit
+            self.categories[:, word] &= ~bit
+            if event == "upsert":
+                self.alive[word] |= bit
+                if self.snapshot.quantity[row] > 0:
+                    self.in_stock[word] |= bit
+                self.categories[self.snapshot.category[row], word] |= bit
+
+    def _grow(self, words: int) -> None:
+        words = max(words, 2 * self.alive.size)
+        self.alive = np.concatenate(
+            [self.alive, np.zeros(words - self.alive.size, dtype=np.uint64)]
+        )
+        self.in_stock = np.concatenate(
+            [self.in_stock, np.zeros(words - self.in_stock.size, dtype=np.uint64)]
+        )
+        self.categories = np.concatenate(
+            [
+                self.categories,
+                np.zeros(
+                    (len(CATEGORIES), words - self.categories.shape[1]), dtype=np.uint64
+                ),
+            ],
+            axis=1,
+        )
+
+    def rebuild(self) -> None:
+        """Build the bitmaps from the catalog columns."""
+        with self._lock:
+            snapshot = self.snapshot
+            size = snapshot.size
+            words = (size + 63) // 64
+            alive = snapshot.alive[:size]
+            self.alive = pack(alive, words)
+            self.in_stock = pack(alive & (snapshot.quantity[:size] > 0), words)
+            self.categories = np.zeros((len(CATEGORIES), words), dtype=np.uint64)
+            for code in range(len(CATEGORIES)):
+                self.categories[code] = pack(
+                    alive & (snapshot.category[:size] == code), words
+                )
+            self.dirty = False
+
+    def _base(self, min_price: Optional[float], max_price: Optional[float]) -> Bitmap:
+        base = self.alive
+        if min_price is None and max_price is None:
+            return base
+        price = self.snapshot.price[: self.snapshot.size]
+        mask = np.ones(price.size, dtype=bool)
+        if min_price is not None:
+            mask &= price >= min_price
+        if max_price is not None:
+            mask &= price <= max_price
+        return base & pack(mask, base.size)
+
+    def bitmap(
+        self,
+        category: Optional[str] = None,
+        in_stock: Optional[bool] = None,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+    ) -> Bitmap:
+        """
+        Build the bitmap of the rows matching a filter.
+
+        Args:
+            category (Optional[str]): Category.
+            in_stock (Optional[bool]): Only rows with (True) or without (False) stock.
+            min_price (Optional[float]): Inclusive lower price bound.
+            max_price (Optional[float]): Inclusive upper price bound.
+
+        Returns:
+            Bitmap: The packed bitmap.
+        """
+        with self._lock:
+            if self.dirty:
+                self.rebuild()
+            return self._select(self._base(min_price, max_price), category, in_stock)
+
+    def _select(
+        self, bitmap: Bitmap, category: Optional[str], in_stock: Optional[bool]
+    ) -> Bitmap:
+        if category is not None:
+            code = CATEGORY_CODES.get(category.lower())
+            if code is None:
+                return np.zeros_like(bitmap)
+            bitmap = bitmap & self.categories[code]
+        if in_stock is not None:
+            bitmap = bitmap & (self.in_stock if in_stock else ~self.in_stock)
+        return bitmap
+
+    def rows(self, **filters: Any) -> npt.NDArray[np.intp]:
+        """Return the catalog row indices matching a filter, see `bitmap`."""
+        bitmap = self.bitmap(**filters)
+        return np.flatnonzero(np.unpackbits(bitmap.view(np.uint8), bitorder="little"))
+
+    def counts(
+        self,
+        category: Optional[str] = None,
+        in_stock: Optional[bool] = None,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+    ) -> dict[str, Any]:
+        """
+        Count the rows matching a filter, per category and per stock status.
+
+        As usual for facets, the category counts apply every filter except the
+        category and the stock counts every filter except `in_stock`, so each
+        facet shows the alternatives to the current selection.
+
+        Args:
+            category (Optional[str]): Category.
+            in_stock (Optional[bool]): Only rows with (True) or without (False) stock.
+            min_price (Optional[float]): Inclusive lower price bound.
+            max_price (Optional[float]): Inclusive upper price bound.
+
+        Returns:
+            dict[str, Any]: `total`, `categories` and `stock` counts.
+        """
+        with self._lock:
+            base = self.bitmap(min_price=min_price, max_price=max_price)
+            by_stock = self._select(base, None, in_stock)
+            by_category = self._select(base, category, None)
+            selected = self._select(by_category, None, in_stock)
+            return {
+                "total": popcount(selected),
+                "categories": {
+                    name: popcount(by_stock & self.categories[code])
+                    for code, name in enumerate(CATEGORIES)
+                },
+                "stock": {
+                    "in_stock": popcount(by_category & self.in_stock),
+                    "out_of_stock": popcount(by_category & ~self.in_stock),
+                },
+            }
+
+
+facet_index = FacetIndex(catalog)
+"""Facet bitmaps over the catalog snapshot of this process."""
@@ -0,0 +1,133 @@
+"""
+Per-product rating aggregates.
+
+The aggregates live in the database: for every product, `rating_summaries`
+holds the number of reviews of each rating from 1 to 5, kept current by a
+row-level trigger on Reviews (see the `rating_summaries` migration), which
+also keeps the count and sum of all ratings in the single `rating_totals`
+row. Every worker process therefore serves the same summaries, including
+after writes made outside the API, with two indexed reads.
+
+Count, sum, average and the Bayesian average (the mean pulled towards the
+global mean by `Config.RATINGS.PRIOR_WEIGHT` virtual reviews) are derived
+from a histogram by `summarize`. `rebuild` recomputes the histograms from
+the Reviews table.
+"""
+
+from typing import Any, Iterable, Optional
+
+from src.config import Config
+from src.db.base import DataClient
+
+RATINGS = range(1, 6)
+
+SUMMARIES_TABLE = "rating_summaries"
+TOTALS_TABLE = "rating_totals"
+REBUILD_FUNCTION = "rebuild_rating_summaries"
+
+RATING_COLUMNS = [f"rating_{rating}" for rating in RATINGS]
+
+
+def summarize(
+    product_id: str, histogram: list[int], total_count: int, total_sum: int
+) -> dict[str, Any]:
+    """
+    Summarize the ratings of a product.
+
+    Args:
+        product_id (str): The product.
+        histogram (list[int]): The number of reviews of each rating, 1 to 5.
+        total_count (int): The number of reviews of all products.
+        total_sum (int): The sum of the ratings of all products.
+
+    Returns:
+        dict[str, Any]: `count`, `sum`, `average`, `bayesian_average` and
+        the `histogram` of ratings; averages are None without reviews.
+    """
+    count = sum(histogram)
+    total = sum(rating * n for rating, n in zip(RATINGS, histogram))
+    prior = Config.RATINGS.PRIOR_WEIGHT
+    global_mean = total_sum / total_count if total_count else None
+    return {
+        "product_id": product_id,
+        "count": count,
+        "sum": total,
+        "average": total / count if count else None,
+        "bayesian_average": (
+            (prior * global_mean + total) / (prior + count)
+            if global_mean is not None
+            else None
+        ),
+        "histogram": {str(rating): n for rating, n in zip(RATINGS, histogram)},
+    }
+
+
+class RatingAggregates:
+    """Reader of the rating histograms shared through the database."""
+
+    def summaries(
+        self, client: DataClient, product_ids: Iterable[str]
+    ) -> list[dict[str, Any]]:
+        """
+        Summarize the ratings of products.
+
+        Args:
+            client (DataClient): The Supabase client of the current request.
+            product_ids (Iterable[str]): The products.
+
+        Returns:
+            list[dict[str, Any]]: The summary of each product, in order; see
+            `summarize`.
+        """
+        product_ids = list(product_ids)
+        rows = (
+            client.table(SUMMARIES_TABLE)
+            .select(",".join(["product_id", *RATING_COLUMNS]))
+            .in_("product_id", product_ids)
+            .execute()
+            .data
+        )
+        histograms = {
+            row["product_id"]: [int(row[column]) for column in RATING_COLUMNS]
+            for row in rows
+        }
+        totals = client.table(TOTALS_TABLE).select("count,sum").execute().data
+        total_count = int(totals[0]["count"]) if totals else 0
+        total_sum = int(totals[0]["sum"]) if totals else 0
+        empty = [0] * len(RATINGS)
+        return [
+            summarize(id, histograms.get(id, empty), total_count, total_sum)
+            for id in product_ids
+        ]
+
+    def summary(self, client: DataClient, product_id: str) -> dict[str, Any]:
+        """
+        Summarize the ratings of a product, see `summaries`.
+
+        Args:
+            client (DataClient): The Supabase client of the current request.
+            product_id (str): The product.
+
+        Returns:
+            dict[str, Any]: The summary of the product.
+        """
+        return self.summaries(client, [product_id])[0]
+
+    def rebuild(self, client: DataClient) -> int:
+        """
+        Recompute the histograms from the Reviews table.
+
+        The database function refuses callers that are not admins.
+
+        Args:
+            client (DataClient): The Supabase client of the current request.
+
+        Returns:
+            int: The number of reviews aggregated.
+        """
+        reviews: Optional[int] = client.rpc(REBUILD_FUNCTION, {}).execute().data
+        return int(reviews or 0)
+
+
+ratings = RatingAggregates()
+"""Rating aggregates, read from the database."""
@@ -0,0 +1,393 @@
+"""
+Materialized sales rollups over the History table.
+
+`SalesRollups` keeps the revenue, quantity sold and number of orders per
+product, per customer and per day, in NumPy columns indexed by a dense code
+per key. A full load groups the History columns with one `np.unique` and
+`np.bincount` per dimension; History inserts and deletes made through
+`BaseDAO` reach the rollups through the History write hook and add or
+subtract a single row in O(1).
+
+Coarser views are vectorized group-bys over the materialized rollups: revenue
+per category regroups the per-product rollup by the catalog category of each
+product, and weekly and monthly buckets regroup the per-day rollup.
+
+The rollups cover every customer's purchases and are shared by the whole
+process, so they are loaded with the service role (bypassing row-level
+security) and only served to admins.
+"""
+
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+import numpy as np
+import numpy.typing as npt
+
+from src.config import Config
+from src.db.dao import BaseDAO
+from src.db.hooks import write_hooks
+from src.db.models import History
+from src.db.tables import SupabaseTables
+from src.indexes.catalog import CatalogSnapshot
+from src.utils.types import CATEGORIES
+
+BUCKETS = ("day", "week", "month")
+"""Time buckets of `SalesRollups.timeline`."""
+
+NO_DAY = np.iinfo(np.int64).min
+"""Day of the History rows without a purchase date."""
+
+Columns = tuple[
+    npt.NDArray[np.object_],
+    npt.NDArray[np.float64],
+    npt.NDArray[np.int64],
+    npt.NDArray[np.int64],
+]
+"""Keys and the revenue, quantity and order columns of a rollup."""
+
+Entry = tuple[str, str, int, int, float]
+"""The product, customer, day, quantity and revenue of a History row."""
+
+
+def day_of(purchase_date: Any) -> int:
+    """Convert a purchase date to days since the Unix epoch (UTC)."""
+    if purchase_date is None:
+        return int(NO_DAY)
+    if isinstance(purchase_date, str):
+        purchase_date = datetime.fromisoformat(purchase_date)
+    if purchase_date.tzinfo is None:
+        purchase_date = purchase_date.replace(tzinfo=timezone.utc)
+    return int(purchase_date.timestamp() // 86400)
+
+
+class Rollup:
+    """Revenue, quantity and order count per key, in columns indexed by key code."""
+
+    def __init__(self) -> None:
+        self.keys: list[Any] = []
+        self.code: dict[Any, int] = {}
+        self.revenue: npt.NDArray[np.float64] = np.zeros(0, dtype=np.float64)
+        self.quantity: npt.NDArray[np.int64] = np.zeros(0, dtype=np.int64)
+        self.orders: npt.NDArray[np.int64] = np.zeros(0, dtype=np.int64)
+
+    def build(
+        self,
+        keys: npt.NDArray[Any],
+        revenue: npt.NDArray[np.float64],
+        quantity: npt.NDArray[np.int64],
+    ) -> None:
+        """Group rows by key with one vectorized pass per column."""
+        unique, inverse = np.unique(keys, return_inverse=True)
+        self.keys = unique.tolist()
+        self.code = {key: code for code, key in enumerate(self.keys)}
+        self.revenue = np.bincount(
+            inverse, weights=revenue, minlength=len(self.keys)
+        ).astype(np.float64, copy=False)
+        self.quantity = np.bincount(
+            inverse, weights=quantity, minlength=len(self.keys)
+        ).astype(np.int64)
+        self.orders = np.bincount(inverse, minlength=len(self.keys)).astype(np.int64)
+
+    def add(self, key: Any, revenue: float, quantity: int, sign: int = 1) -> None:
+        """Add (or with `sign=-1` subtract) one row."""
+        code = self.code.get(key)
+        if code is None:
+            code = self.code[key] = len(self.keys)
+            self.keys.append(key)
+            if code >= self.revenue.size:
+                capacity = max(2 * self.revenue.size, 16)
+                self.revenue = np.resize(self.revenue, capacity)
+                self.quantity = np.resize(self.quantity, capacity)
+                self.orders = np.resize(self.orders, capacity)
+            self.revenue[code] = self.quantity[code] = self.orders[code] = 0
+        self.revenue[code] += sign * revenue
+        self.quantity[code] += sign * quantity
+        self.orders[code] += sign
+
+    def columns(self) -> Columns:
+        """Return the keys and the revenue, quantity and order columns of the live keys."""
+        size = len(self.keys)
+        orders = self.orders[:size]
+        live = orders > 0
+        return (
+            np.array(self.keys, dtype=object)[live],
+            self.revenue[:size][live],
+            self.quantity[:size][live],
+            orders[live],
+        )
+
+
+def records(
+    name: str,
+    keys: npt.NDArray[np.object_],
+    revenue: npt.NDArray[np.float64],
+    quantity: npt.NDArray[np.int64],
+    orders: npt.NDArray[np.int64],
+) -> list[dict[str, Any]]:
+    """Turn rollup columns into response rows."""
+    return [
+        {name: key, "revenue": round(total, 2), "quantity": sold, "orders": count}
+        for key, total, sold, count in zip(
+            keys.tolist(), revenue.tolist(), quantity.tolist(), orders.tolist()
+        )
+    ]
+
+
+def top(
+    name: str,
+    columns: Columns,
+    limit: int,
+) -> list[dict[str, Any]]:
+    """Return the `limit` keys with the highest revenue as response rows."""
+    keys, revenue, quantity, orders = columns
+    if keys.size > limit:
+        keep = np.argpartition(-revenue, limit - 1)[:limit]
+        keys, revenue, quantity, orders = (
+            keys[keep],
+            revenue[keep],
+            quantity[keep],
+            orders[keep],
+        )
+    order = np.lexsort((keys.astype(str), -revenue))
+    return records(name, keys[order], revenue[order], quantity[order], orders[order])
+
+
+class SalesRollups:
+    """
+    Sales rollups per product, customer and day, maintained incrementally.
+
+    Only the aggregates are kept, not the History rows. Inserted rows are
+    added and deleted rows (returned by PostgREST) subtracted; an update,
+    whose previous values are unknown, marks the rollups stale instead, which
+    History rarely sees since purchases only ever insert into it.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+        self._pending: Optional[dict[str, tuple[str, dict[str, Any]]]] = None
+        self.loaded_at: Optional[float] = None
+        self.products = Rollup()
+        self.customers = Rollup()
+        self.days = Rollup()
+
+    def is_stale(self) -> bool:
+        """Whether the rollups must be (re)built before answering queries."""
+        return (
+            self.loaded_at is None
+            or time.monotonic() - self.loaded_at > Config.CATALOG.MAX_AGE
+        )
+
+    def load(self, rows: list[dict[str, Any]]) -> None:
+        """
+        Recompute the rollups from all History rows.
+
+        The new rollups are built without the lock and swapped in under it.
+        Writes made while `load_if_stale` was fetching the rows are then
+        replayed, unless the fetched rows already reflect them.
+
+        Args:
+            rows (list[dict[str, Any]]): All History rows.
+        """
+        entries = [self._entry(row) for row in rows]
+        fetched = {str(row.get("id")) for row in rows}
+        products = np.array([entry[0] for entry in entries], dtype=object)
+        customers = np.array([entry[1] for entry in entries], dtype=object)
+        days = np.array([entry[2] for entry in entries], dtype=np.int64)
+        quantity = np.array([entry[3] for entry in entries], dtype=np.int64)
+        revenue = np.array([entry[4] for entry in entries], dtype=np.float64)
+        by_product, by_customer, by_day = Rollup(), Rollup(), Rollup()
+        by_product.build(products.astype(str), revenue, quantity)
+        by_customer.build(customers.astype(str), revenue, quantity)
+        dated = days != NO_DAY
+        by_day.build(days[dated], revenue[dated], quantity[dated])
+        with self._lock:
+            pending, self._pending = self._pending or {}, None
+            self.products, self.customers, self.days = (
+                by_product,
+                by_customer,
+                by_day,
+            )
+            self.loaded_at = time.monotonic()
+            for id, (op, row) in pending.items():
+                if op == "update" or (op == "delete") == (id in fetched):
+                    self._write(op, [row])
+
+    def load_if_stale(self, dao: BaseDAO[History]) -> "SalesRollups":
+        """
+        Build the rollups through a DAO unless they are loaded and fresh.
+
+        History is read page by page with `BaseDAO.iter_pages`, since a single
+        PostgREST response is capped at its `max-rows` setting. This blocks
+        for the whole load: call it from the thread pool in async code. The
+        write hook and queries do not wait for the fetch.
+
+        Args:
+            dao (BaseDAO[History]): A History DAO seeing every row, i.e.
+                `get_service_history_dao`, never the DAO of a user's request.
+
+        Returns:
+            SalesRollups: The rollups themselves.
+        """
+        if self.is_stale():
+            with self._reload_lock:
+                if self.is_stale():
+                    with self._lock:
+                        self._pending = {}
+                    try:
+                        self.load([row for page in dao.iter_pages() for row in page])
+                    finally:
+                        with self._lock:
+                            self._pending = None
+        return self
+
+    @staticmethod
+    def _entry(row: dict[str, Any]) -> Entry:
+        return (
+            row["product_id"],
+            row["customer_id"],
+            day_of(row.get("purchase_date")),
+            int(row["quantity"]),
+            float(row["total"]),
+        )
+
+    def apply(self, op: str, rows: list[dict[str, Any]]) -> None:
+        """
+        Apply a History write; registered as the History write hook.
+
+        Args:
+            op (str): `"upsert"`, `"update"` or `"delete"`.
+            rows (list[dict[str, Any]]): The written rows.
+        """
+        with self._lock:
+            if self._pending is not None:
+                for row in rows:
+                    id = row.get("id")
+                    # A write that cannot be matched is replayed as an update.
+                    self._pending[str(id)] = (op if id else "update", row)
+            if self.loaded_at is not None:
+                self._write(op, rows)
+
+    def _write(self, op: str, rows: list[dict[str, Any]]) -> None:
+        """Add or subtract written rows; call it while holding the lock."""
+        if op == "update":
+            self.loaded_at = None
+            return
+        try:
+            for row in rows:
+                self._add(self._entry(row), -1 if op == "delete" else 1)
+        except (KeyError, TypeError, ValueError):
+            self.loaded_at = None
+
+    def _add(self, entry: Entry, sign: int) -> None:
+        product_id, customer_id, day, quantity, revenue = entry
+        self.products.add(product_id, revenue, quantity, sign)
+        self.customers.add(customer_id, revenue, quantity, sign)
+        if day != NO_DAY:
+            self.days.add(day, revenue, quantity, sign)
+
+    def by_product(self, limit: int = Config.ANALYTICS.LIMIT) -> list[dict[str, Any]]:
+        """
+        Revenue per product, highest first.
+
+        Args:
+            limit (int): Maximum number of products to return.
+
+        Returns:
+            list[dict[str, Any]]: `product_id`, `revenue`, `quantity` and `orders`.
+        """
+        with self._lock:
+            return top("product_id", self.products.columns(), limit)
+
+    def by_customer(self, limit: int = Config.ANALYTICS.LIMIT) -> list[dict[str, Any]]:
+        """
+        Revenue per customer, highest first.
+
+        Args:
+            limit (int): Maximum number of customers to return.
+
+        Returns:
+            list[dict[str, Any]]: `customer_id`, `revenue`, `quantity` and `orders`.
+        """
+        with self._lock:
+            return top("customer_id", self.customers.columns(), limit)
+
+    def by_category(self, snapshot: CatalogSnapshot) -> list[dict[str, Any]]:
+        """
+        Revenue per category, regrouping the per-product rollup.
+
+        Products no longer in the catalog are counted under `"unknown"`.
+
+        Args:
+            snapshot (CatalogSnapshot): The loaded catalog, giving each
+                product's category.
+
+        Returns:
+            list[dict[str, Any]]: `category`, `revenue`, `quantity` and
+            `orders`, in `CATEGORIES` order.
+        """
+        with self._lock:
+            keys, revenue, quantity, orders = self.products.columns()
+            rows = np.array(
+                [snapshot.row_of.get(key, -1) for key in keys.tolist()], dtype=np.int64
+            )
+            codes = np.where(
+                rows >= 0, snapshot.category[np.maximum(rows, 0)], len(CATEGORIES)
+            )
+            size = len(CATEGORIES) + 1
+            grouped = records(
+                "category",
+                np.array([*CATEGORIES, "unknown"], dtype=object),
+                np.bincount(codes, weights=revenue, minlength=size).astype(
+                    np.float64, copy=False
+                ),
+                np.bincount(codes, weights=quantity, minlength=size).astype(np.int64),
+                np.bincount(codes, weights=orders, minlength=size).astype(np.int64),
+            )
+            return grouped if grouped[-1]["orders"] else grouped[:-1]
+
+    def timeline(self, bucket: str = "day") -> list[dict[str, Any]]:
+        """
+        Revenue per time bucket, oldest first.
+
+        Weeks start on Monday. History rows without a purchase date are left
+        out.
+
+        Args:
+            bucket (str): One of `BUCKETS`.
+
+        Returns:
+            list[dict[str, Any]]: `bucket` (the ISO date the bucket starts
+            on), `revenue`, `quantity` and `orders`.
+        """
+        if bucket not in BUCKETS:
+            raise ValueError(f"Invalid bucket {bucket}")
+        with self._lock:
+            days, revenue, quantity, orders = self.days.columns()
+            dates = days.astype(np.int64).astype("datetime64[D]")
+            if bucket == "week":
+                dates = dates - (days.astype(np.int64) + 3) % 7
+            elif bucket == "month":
+                dates = dates.astype("datetime64[M]").astype("datetime64[D]")
+            starts, inverse = np.unique(dates, return_inverse=True)
+            return records(
+                "bucket",
+                starts.astype(str).astype(object),
+                np.bincount(inverse, weights=revenue, minlength=starts.size).astype(
+                    np.float64, copy=False
+                ),
+                np.bincount(inverse, weights=quantity, minlength=starts.size).astype(
+                    np.int64
+                ),
+                np.bincount(inverse, weights=orders, minlength=starts.size).astype(
+                    np.int64
+                ),
+            )
+
+
+sales_rollups = SalesRollups()
+"""Sales rollups of this process."""
+
+write_hooks.register(SupabaseTables.HISTORY, sales_rollups.apply)
@@ -0,0 +1,270 @@
+"""
+Full-text product search over the catalog snapshot.
+
+`SearchIndex` is an inverted index over the `product_name` and `description`
+of every catalog row, ranked with BM25. Name tokens count
+`Config.SEARCH.NAME_WEIGHT` times, so a match in the name outranks one in the
+description.
+
+Postings are NumPy arrays of (row, impact, row generation), where the impact
+is the BM25 term-frequency component computed when the posting is added, so
+a query only multiplies it by the term's IDF. A write to a row bumps its
+generation and appends fresh postings; stale ones are dropped from a posting
+list the first time it is read after the write. A full catalog load
+triggers a rebuild on the next search; it builds new postings while other
+threads keep reading the current ones and swaps them in at the end. Reloads
+of a loaded catalog only notify the changed rows and need no rebuild.
+
+Searching may rebuild, so call `search` from the thread pool in async code.
+"""
+
+import re
+import threading
+from collections import Counter
+from typing import Any, Optional
+
+import numpy as np
+import numpy.typing as npt
+
+from src.config import Config
+from src.indexes.catalog import CATEGORY_CODES, CatalogSnapshot, catalog
+
+TOKEN = re.compile(r"\w+")
+
+Postings = tuple[npt.NDArray[np.int32], npt.NDArray[np.float32], npt.NDArray[np.int32]]
+"""Rows, BM25 impacts and row generations of a term's postings."""
+
+
+def tokenize(text: str) -> list[str]:
+    """Split text into lowercase word tokens."""
+    return TOKEN.findall(text.lower())
+
+
+class SearchIndex:
+    """
+    BM25 inverted index kept in step with a `CatalogSnapshot`.
+
+    Args:
+        snapshot (CatalogSnapshot): The catalog to index.
+    """
+
+    def __init__(self, snapshot: CatalogSnapshot) -> None:
+        self.snapshot = snapshot
+        self._lock = threading.RLock()
+        self._build_lock = threading.Lock()
+        self.dirty = True
+        self.missed: Optional[list[tuple[str, int]]] = None
+        self.postings: dict[str, Postings] = {}
+        self.pending: dict[str, list[tuple[int, float, int]]] = {}
+        self.generation = np.zeros(0, dtype=np.int32)
+        self.length = np.zeros(0, dtype=np.float32)
+        self.total_length = 0.0
+        self.retired = 0
+        self.checked: dict[str, int] = {}
+        snapshot.subscribe(self.on_change)
+
+    def on_change(self, event: str, row: int) -> None:
+        """Follow a change of the catalog; subscribed to the snapshot."""
+        with self._lock:
+            if self.missed is not None:
+                self.missed.append((event, row))
+            elif event == "load":
+                self.dirty = True
+            elif not self.dirty:
+                self._retire(row)
+                if event == "upsert":
+                    self._add(row)
+
+    def _terms(self, row: int) -> Counter[str]:
+        terms = Counter(tokenize(self.snapshot.descriptions[row]))
+        for token in tokenize(self.snapshot.names[row]):
+            terms[token] += Config.SEARCH.NAME_WEIGHT
+        return terms
+
+    def _impact(
+        self, frequency: npt.NDArray[np.float32], length: Any
+    ) -> npt.NDArray[np.float32]:
+        k1, b = Config.SEARCH.K1, Config.SEARCH.B
+        average_length = self.total_length / max(len(self.snapshot.row_of), 1) or 1.0
+        norm = k1 * (1 - b + b * length / average_length)
+        impact: npt.NDArray[np.float32] = (
+            frequency * (k1 + 1) / (frequency + norm)
+        ).astype(np.float32)
+        return impact
+
+    def _retire(self, row: int) -> None:
+        if row < len(self.generation):
+            self.retired += 1
+            self.generation[row] += 1
+            self.total_length -= float(self.length[row])
+            self.length[row] = 0
+
+    def _add(self, row: int) -> None:
+        if row >= len(self.generation):
+            capacity = max(2 * len(self.generation), row + 1)
+            self.generation = np.resize(self.generation, capacity)
+            self.length = np.resize(self.length, capacity)
+            self.generation[row:] = 0
+            self.length[row:] = 0
+        generation = int(self.generation[row])
+        terms = self._terms(row)
+        self.length[row] = sum(terms.values())
+        self.total_length += float(self.length[row])
+        impacts = self._impact(
+            np.array(list(terms.values()), dtype=np.float32), self.length[row]
+        )
+        for (term, _), impact in zip(terms.items(), impacts.tolist()):
+            self.pending.setdefault(term, []).append((row, impact, generation))
+
+    def rebuild(self) -> None:
+        """
+        Index every live row of the catalog from scratch.
+
+        The postings are built without holding the index lock, from a copy of
+        the catalog texts, and then swapped in; catalog changes made in the
+        meantime are replayed on the new postings. Concurrent rebuilds are
+        serialized and a rebuild that is no longer needed is skipped.
+        """
+        with self._build_lock:
+            with self._lock:
+                if not self.dirty:
+                    return
+                self.missed = []
+            snapshot = self.snapshot
+            with snapshot._lock:
+                size = snapshot.size
+                live = np.flatnonzero(snapshot.alive[:size]).tolist()
+                names = list(snapshot.names)
+                descriptions = list(snapshot.descriptions)
+            rows: dict[str, list[int]] = {}
+            frequencies: dict[str, list[int]] = {}
+            length = np.zeros(size, dtype=np.float32)
+            tokens: dict[str, list[str]] = {}
+            for row in live:
+                terms: Counter[str] = Counter()
+                for text, weight in (
+                    (descriptions[row], 1),
+                    (names[row], Config.SEARCH.NAME_WEIGHT),
+                ):
+                    if text not in tokens:
+                        tokens[text] = tokenize(text)
+                    for token in tokens[text]:
+                        terms[token] += weight
+                for term, frequency in terms.items():
+                    rows.setdefault(term, []).append(row)
+                    frequencies.setdefault(term, []).append(frequency)
+                length[row] = sum(terms.values())
+            with self._lock:
+                self.length = length
+                self.total_length = float(length.sum())
+                self.postings = {}
+                for term, term_rows in rows.items():
+                    indices = np.array(term_rows, dtype=np.int32)
+                    self.postings[term] = (
+                        indices,
+                        self._impact(
+                            np.array(frequencies[term], dtype=np.float32),
+                            length[indices],
+                        ),
+                        np.zeros(len(term_rows), dtype=np.int32),
+                    )
+                self.pending = {}
+                self.generation = np.zeros(size, dtype=np.int32)
+                self.retired = 0
+                self.checked = {}
+                missed, self.missed = self.missed, None
+                self.dirty = any(event == "load" for event, _ in missed or ())
+                if not self.dirty:
+                    for event, row in missed or ():
+                        self._retire(row)
+                        if event == "upsert":
+                            self._add(row)
+
+    def _postings(self, term: str) -> Optional[Postings]:
+        pending = self.pending.pop(term, None)
+        postings = self.postings.get(term)
+        if pending:
+            added = np.array(pending, dtype=np.float64).T
+            merged = tuple(
+                np.concatenate([current, new.astype(current.dtype)])
+                for current, new in zip(
+                    postings
+                    or (
+                        np.zeros(0, dtype=np.int32),
+                        np.zeros(0, dtype=np.float32),
+                        np.zeros(0, dtype=np.int32),
+                    ),
+                    added,
+                )
+            )
+            postings = self.postings[term] = merged
+        return postings
+
+    def search(
+        self,
+        q: str,
+        category: Optional[str] = None,
+        limit: int = Config.SEARCH.LIMIT,
+    ) -> npt.NDArray[np.intp]:
+        """
+        Rank the catalog rows matching a query.
+
+        Args:
+            q (str): Free-text query; rows matching any of its tokens are ranked.
+            category (Optional[str]): Only return rows of this category.
+            limit (int): Maximum number of rows to return.
+
+        Returns:
+            npt.NDArray[np.intp]: Catalog row indices, best match first.
+        """
+        if self.dirty:
+            self.rebuild()
+        with self._lock:
+            snapshot = self.snapshot
+            documents = len(snapshot.row_of)
+            if not documents:
+                return np.empty(0, dtype=np.intp)
+            matched: list[npt.NDArray[np.int32]] = []
+            scores: list[npt.NDArray[np.float32]] = []
+            for term in set(tokenize(q)):
+                postings = self._postings(term)
+                if postings is None:
+                    continue
+                if self.checked.get(term, 0) != self.retired:
+                    valid = postings[2] == self.generation[postings[0]]
+                    valid &= snapshot.alive[postings[0]]
+                    if not valid.all():
+                        postings = tuple(column[valid] for column in postings)
+                        self.postings[term] = postings
+                    self.checked[term] = self.retired
+                term_rows, impacts, _ = postings
+                if not term_rows.size:
+                    continue
+                idf = np.log1p(
+                    (documents - term_rows.size + 0.5) / (term_rows.size + 0.5)
+                )
+                matched.append(term_rows)
+                scores.append(impacts * np.float32(idf))
+            if not matched:
+                return np.empty(0, dtype=np.intp)
+            rows: npt.NDArray[Any] = np.concatenate(matched)
+            weights: npt.NDArray[Any] = np.concatenate(scores)
+            if len(matched) > 1:
+                rows, inverse = np.unique(rows, return_inverse=True)
+                weights = np.bincount(inverse, weights=weights)
+            if category is not None:
+                code = CATEGORY_CODES.get(category.lower())
+                if code is None:
+                    return np.empty(0, dtype=np.intp)
+                keep = snapshot.category[rows] == code
+                rows, weights = rows[keep], weights[keep]
+            if rows.size > limit:
+                top = np.argpartition(-weights, limit - 1)[:limit]
+                rows, weights = rows[top], weights[top]
+            order = np.lexsort((rows, -weights))
+            ranked: npt.NDArray[np.intp] = rows[order].astype(np.intp)
+            return ranked
+
+
+search_index = SearchIndex(catalog)
+"""Product search index over the catalog snapshot of this process."""
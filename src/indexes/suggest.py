@@ -0,0 +1,149 @@
+"""
+Prefix autocomplete over catalog product names.
+
+`SuggestIndex` keeps the distinct product names of the catalog in an array
+sorted by their lowercase form, so the names starting with a prefix form a
+contiguous range found with two bisections. Matches are ranked by total
+stock (the summed quantity of the products sharing the name), then
+alphabetically.
+
+Stock changes are patched in place; new, renamed and deleted names mark the
+index for a rebuild on the next lookup. Rankings of prefixes matching many
+names are kept in a bounded LRU cache, whose entries are dropped when the
+stock of a name they cover changes.
+"""
+
+import threading
+from bisect import bisect_left
+from collections import OrderedDict
+from typing import Optional
+
+import numpy as np
+
+from src.config import Config
+from src.indexes.catalog import CatalogSnapshot, catalog
+
+
+class SuggestIndex:
+    """
+    Sorted-array prefix index of the catalog's product names.
+
+    Args:
+        snapshot (CatalogSnapshot): The catalog to index.
+        cache_size (int): Maximum number of cached prefix rankings.
+    """
+
+    def __init__(
+        self, snapshot: CatalogSnapshot, cache_size: int = Config.SUGGEST.CACHE_SIZE
+    ) -> None:
+        self.snapshot = snapshot
+        self.cache_size = cache_size
+        self._lock = threading.RLock()
+        self.dirty = True
+        self.keys: list[str] = []
+        self.names: list[str] = []
+        self.stock = np.zeros(0, dtype=np.int64)
+        self.position: dict[str, int] = {}
+        self.row_names: list[Optional[str]] = []
+        self.cache: OrderedDict[tuple[str, int], list[str]] = OrderedDict()
+        snapshot.subscribe(self.on_change)
+
+    def _total_stock(self, name: str) -> int:
+        rows = self.snapshot.rows_by_name.get(name)
+        return int(self.snapshot.quantity[list(rows)].sum()) if rows else 0
+
+    def on_change(self, event: str, row: int) -> None:
+        """Follow a change of the catalog; subscribed to the snapshot."""
+        with self._lock:
+            if event == "load" or self.dirty:
+                self.dirty = True
+                return
+            previous = self.row_names[row] if row < len(self.row_names) else None
+            name = self.snapshot.names[row] if event == "upsert" else None
+            if name is not None and name not in self.position:
+                self.dirty = True
+                return
+            for changed in {previous, name}:
+                if changed is None:
+                    continue
+                if not self.snapshot.rows_by_name.get(changed):
+                    self.dirty = True
+                    return
+                self.stock[self.position[changed]] = self._total_stock(changed)
+                self._forget(changed)
+            if row >= len(self.row_names):
+                self.row_names.extend([None] * (row + 1 - len(self.row_names)))
+            self.row_names[row] = name
+
+    def _forget(self, name: str) -> None:
+        key = name.lower()
+        for prefix, limit in [
+            entry for entry in self.cache if key.startswith(entry[0])
+        ]:
+            del self.cache[prefix, limit]
+
+    def rebuild(self) -> None:
+        """
+        Index the names of the catalog from scratch.
+
+        The catalog is read under its lock, taken before the index's: the
+        catalog notifies the index while holding its lock, so the opposite
+        order could deadlock with a concurrent write.
+        """
+        snapshot = self.snapshot
+        with snapshot._lock, self._lock:
+            names = sorted(
+                (name for name, rows in snapshot.rows_by_name.items() if rows),
+                key=lambda name: (name.lower(), name),
+            )
+            self.names = names
+            self.keys = [name.lower() for name in names]
+            self.position = {name: index for index, name in enumerate(names)}
+            self.stock = np.array(
+                [self._total_stock(name) for name in names], dtype=np.int64
+            )
+            self.row_names = [
+                name if alive else None
+                for name, alive in zip(
+                    snapshot.names, snapshot.alive[: snapshot.size].tolist()
+                )
+            ]
+            self.cache.clear()
+            self.dirty = False
+
+    def suggest(self, prefix: str, limit: int = Config.SUGGEST.LIMIT) -> list[str]:
+        """
+        Return the product names starting with a prefix, case-insensitively.
+
+        Args:
+            prefix (str): The typed prefix.
+            limit (int): Maximum number of names to return.
+
+        Returns:
+            list[str]: Matching names, most stocked first.
+        """
+        if self.dirty:
+            self.rebuild()
+        with self._lock:
+            key = prefix.lower()
+            start = bisect_left(self.keys, key)
+            stop = bisect_left(self.keys, key + "\U0010ffff", lo=start)
+            if stop - start <= limit:
+                order = np.lexsort((np.arange(start, stop), -self.stock[start:stop]))
+                return [self.names[start + index] for index in order.tolist()]
+            cached = self.cache.get((key, limit))
+            if cached is not None:
+                self.cache.move_to_end((key, limit))
+                return cached
+            stock = self.stock[start:stop]
+            top = np.argpartition(-stock, limit - 1)[:limit]
+            top = top[np.lexsort((top, -stock[top]))]
+            names = [self.names[start + index] for index in top.tolist()]
+            self.cache[key, limit] = names
+            while len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+            return names
+
+
+suggest_index = SuggestIndex(catalog)
+"""Product name autocomplete index over the catalog snapshot of this process."""
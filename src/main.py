@@ -19,6 +19,7 @@ from src.controllers import (
     sales_router,
     status_router,
 )
+from src.middleware import AdmissionMiddleware, CompressionMiddleware
 
 # Add the project root to sys.path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
@@ -29,6 +30,8 @@ app = FastAPI(
     version=Config.APP.VERSION,
 )
 
+# Inside CORS, so that shed requests still carry the CORS headers.
+app.add_middleware(AdmissionMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:3000"],
@@ -36,6 +39,7 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(CompressionMiddleware)
 app.include_router(inventory_router)
 app.include_router(review_router)
 app.include_router(customers_router)
@@ -0,0 +1,4 @@
+from .admission import AdmissionMiddleware
+from .compression import CompressionMiddleware
+
+__all__ = ["AdmissionMiddleware", "CompressionMiddleware"]
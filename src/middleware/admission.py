@@ -0,0 +1,294 @@
+"""
+Priority-aware admission control.
+
+`AdmissionMiddleware` sorts every API request into a route class before it
+reaches the app:
+
+- `"critical"`: purchases, balance and stock updates and the `/auth` routes;
+- `"point"`: reads and writes of a single row, searches and suggestions;
+- `"bulk"`: listings, exports, history, analytics and bulk inserts.
+
+Each class runs at most its `limit` requests at once, and all classes
+together at most `Config.ADMISSION.MAX_CONCURRENCY`. A request that cannot
+run waits in its class's bounded queue; freed capacity goes to the waiting
+request of the most important class, in arrival order within a class, so a
+backlog of full-table listings cannot delay a purchase. A request is shed
+with a 503 and a Retry-After header, before it reaches the app, when its
+queue is full or when it has waited longer than its class's deadline. Other
+paths (`/status`, the docs) are never queued.
+
+Queue depth and in-flight requests are exported as gauges
+(`admission.queue_depth`, `admission.in_flight`), sheds as the
+`admission.shed` counter with `route_class` and `reason` labels.
+"""
+
+import heapq
+import itertools
+import re
+import time
+from dataclasses import dataclass, field
+from typing import Optional
+
+import anyio
+from starlette import status
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from src.config import Config
+from src.utils.metrics import metrics
+
+
+@dataclass(frozen=True)
+class RouteClass:
+    """
+    Limits of a class of routes.
+
+    Attributes:
+        priority (int): Lower values are admitted first.
+        limit (int): Requests of the class running at once.
+        queue_size (int): Requests of the class waiting at once.
+        deadline (float): Seconds a request may wait before it is shed.
+    """
+
+    priority: int
+    limit: int
+    queue_size: int
+    deadline: float
+
+
+ROUTE_CLASSES = {
+    "critical": RouteClass(
+        0,
+        Config.ADMISSION.CRITICAL_LIMIT,
+        Config.ADMISSION.CRITICAL_QUEUE,
+        Config.ADMISSION.CRITICAL_DEADLINE,
+    ),
+    "point": RouteClass(
+        1,
+        Config.ADMISSION.POINT_LIMIT,
+        Config.ADMISSION.POINT_QUEUE,
+        Config.ADMISSION.POINT_DEADLINE,
+    ),
+    "bulk": RouteClass(
+        2,
+        Config.ADMISSION.BULK_LIMIT,
+        Config.ADMISSION.BULK_QUEUE,
+        Config.ADMISSION.BULK_DEADLINE,
+    ),
+}
+"""Route classes by name, with their limits from the configuration."""
+
+RULES: tuple[tuple[str, Optional[frozenset[str]], re.Pattern[str]], ...] = (
+    ("critical", None, re.compile(r"^/auth/")),
+    ("critical", frozenset({"POST"}), re.compile(r"^/sales/purchase/")),
+    (
+        "critical",
+        frozenset({"PUT"}),
+        re.compile(r"^/(customers|inventory)/(deduct|add_money)/"),
+    ),
+    (
+        "bulk",
+        None,
+        re.compile(r"^/[^/]+/(.*/)?(many|export|history|analytics|facets|goods)(/|$)"),
+    ),
+    ("bulk", frozenset({"POST"}), re.compile(r"^/reviews/summary/rebuild/?$")),
+    ("bulk", frozenset({"GET"}), re.compile(r"^/(customers|inventory|reviews)/?$")),
+    ("bulk", frozenset({"GET"}), re.compile(r"^/reviews/summary/?$")),
+    ("point", None, re.compile(r"^/(customers|inventory|reviews|sales)/")),
+)
+"""Route class of requests by method (None for any) and path; first match wins."""
+
+
+def classify(method: str, path: str) -> Optional[str]:
+    """
+    Return the route class of a request.
+
+    Args:
+        method (str): The HTTP method.
+        path (str): The request path.
+
+    Returns:
+        Optional[str]: The name of the class, None for paths that are never
+        queued.
+    """
+    for name, methods, pattern in RULES:
+        if (methods is None or method in methods) and pattern.match(path):
+            return name
+    return None
+
+
+@dataclass(order=True)
+class Waiter:
+    """A queued request, ordered by the priority of its class then arrival."""
+
+    priority: int
+    sequence: int
+    route_class: str = field(compare=False)
+    admitted: anyio.Event = field(compare=False, default_factory=anyio.Event)
+    granted: bool = field(compare=False, default=False)
+    abandoned: bool = field(compare=False, default=False)
+
+
+class AdmissionController:
+    """
+    Concurrency limits and priority queues of the route classes of a worker.
+
+    Args:
+        classes (dict[str, RouteClass]): The route classes by name.
+        max_concurrency (int): Requests of all classes running at once.
+    """
+
+    def __init__(
+        self,
+        classes: dict[str, RouteClass],
+        max_concurrency: int = Config.ADMISSION.MAX_CONCURRENCY,
+    ) -> None:
+        self.classes = classes
+        self.max_concurrency = max_concurrency
+        self.running = dict.fromkeys(classes, 0)
+        self.queued = dict.fromkeys(classes, 0)
+        self._waiters: list[Waiter] = []
+        self._sequence = itertools.count()
+
+    def _can_run(self, route_class: str) -> bool:
+        return (
+            self.running[route_class] < self.classes[route_class].limit
+            and sum(self.running.values()) < self.max_concurrency
+        )
+
+    def _start(self, route_class: str) -> None:
+        self.running[route_class] += 1
+        metrics.set(
+            "admission.in_flight", self.running[route_class], route_class=route_class
+        )
+
+    def _set_queued(self, route_class: str, change: int) -> None:
+        self.queued[route_class] += change
+        metrics.set(
+            "admission.queue_depth", self.queued[route_class], route_class=route_class
+        )
+
+    def _shed(self, route_class: str, reason: str) -> str:
+        metrics.increment("admission.shed", route_class=route_class, reason=reason)
+        return reason
+
+    async def acquire(self, route_class: str) -> Optional[str]:
+        """
+        Wait until a request may run, or until it is shed.
+
+        Every admitted request must be released with `release`.
+
+        Args:
+            route_class (str): The class of the request.
+
+        Returns:
+            Optional[str]: None if the request is admitted, else the reason
+            it was shed: `"queue_full"` or `"deadline"`.
+        """
+        if self._can_run(route_class):
+            self._start(route_class)
+            return None
+        limits = self.classes[route_class]
+        if self.queued[route_class] >= limits.queue_size:
+            return self._shed(route_class, "queue_full")
+
+        waiter = Waiter(limits.priority, next(self._sequence), route_class)
+        heapq.heappush(self._waiters, waiter)
+        self._set_queued(route_class, 1)
+        started = time.perf_counter()
+        try:
+            with anyio.move_on_after(limits.deadline):
+                await waiter.admitted.wait()
+        except BaseException:
+            self._abandon(waiter)
+            raise
+        metrics.increment(
+            "admission.wait_seconds",
+            time.perf_counter() - started,
+            route_class=route_class,
+        )
+        if waiter.granted:
+            return None
+        self._abandon(waiter)
+        return self._shed(route_class, "deadline")
+
+    def _abandon(self, waiter: Waiter) -> None:
+        if waiter.granted:
+            # Admitted just as it gave up: hand its slot to the next waiter.
+            self.release(waiter.route_class)
+        elif not waiter.abandoned:
+            waiter.abandoned = True
+            self._set_queued(waiter.route_class, -1)
+
+    def release(self, route_class: str) -> None:
+        """
+        Free the slot of a finished request and admit the waiters it unblocks.
+
+        Args:
+            route_class (str): The class of the request.
+        """
+        self.running[route_class] -= 1
+        metrics.set(
+            "admission.in_flight", self.running[route_class], route_class=route_class
+        )
+        blocked: list[Waiter] = []
+        while self._waiters and sum(self.running.values()) < self.max_concurrency:
+            waiter = heapq.heappop(self._waiters)
+            if waiter.abandoned:
+                continue
+            if not self._can_run(waiter.route_class):
+                blocked.append(waiter)
+                continue
+            waiter.granted = True
+            self._set_queued(waiter.route_class, -1)
+            self._start(waiter.route_class)
+            waiter.admitted.set()
+        for waiter in blocked:
+            heapq.heappush(self._waiters, waiter)
+
+
+class AdmissionMiddleware:
+    """
+    ASGI middleware admitting, queueing or shedding requests by route class.
+
+    Args:
+        app (ASGIApp): The wrapped application.
+        classes (Optional[dict[str, RouteClass]]): The route classes;
+            `ROUTE_CLASSES` by default.
+        max_concurrency (int): Requests of all classes running at once.
+        retry_after (int): Seconds advertised in the Retry-After header of
+            shed requests.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        classes: Optional[dict[str, RouteClass]] = None,
+        max_concurrency: int = Config.ADMISSION.MAX_CONCURRENCY,
+        retry_after: int = Config.ADMISSION.RETRY_AFTER,
+    ) -> None:
+        self.app = app
+        self.controller = AdmissionController(classes or ROUTE_CLASSES, max_concurrency)
+        self.retry_after = retry_after
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        route_class = (
+            classify(scope["method"], scope["path"])
+            if scope["type"] == "http"
+            else None
+        )
+        if route_class is None:
+            await self.app(scope, receive, send)
+            return
+        if await self.controller.acquire(route_class) is not None:
+            response = JSONResponse(
+                {"detail": "Server overloaded, retry later"},
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                headers={"Retry-After": str(self.retry_after)},
+            )
+            await response(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release(route_class)
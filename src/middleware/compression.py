@@ -0,0 +1,311 @@
+"""
+Negotiated response compression.
+
+`CompressionMiddleware` compresses complete response bodies with the best
+encoding the client accepts (brotli, zstd or gzip, as installed) once they
+reach a size threshold. Bodies of responses carrying an ETag, i.e. catalog
+responses that rarely change, are compressed once and then served from an
+LRU cache keyed by a digest of the uncompressed body. Streaming responses
+(bodies sent in several messages) are compressed incrementally whatever
+their size: every chunk is flushed, so the client can decode each one as it
+arrives.
+
+CPU time spent compressing and bytes saved are recorded per encoding in the
+metrics registry.
+"""
+
+import gzip
+import time
+import zlib
+from collections import OrderedDict
+from hashlib import blake2b
+from typing import Callable, Optional
+
+import anyio
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.config import Config
+from src.utils.metrics import metrics
+
+try:
+    import brotli  # type: ignore
+except ImportError:  # pragma: no cover
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None  # type: ignore[assignment]
+
+
+def _compressors() -> dict[str, Callable[[bytes], bytes]]:
+    compressors: dict[str, Callable[[bytes], bytes]] = {}
+    if brotli is not None:
+        compressors["br"] = lambda body: brotli.compress(
+            body, quality=Config.COMPRESSION.BROTLI_QUALITY
+        )
+    if zstandard is not None:
+        compressors["zstd"] = lambda body: zstandard.ZstdCompressor(
+            level=Config.COMPRESSION.ZSTD_LEVEL
+        ).compress(body)
+    compressors["gzip"] = lambda body: gzip.compress(
+        body, compresslevel=Config.COMPRESSION.GZIP_LEVEL, mtime=0
+    )
+    return compressors
+
+
+COMPRESSORS = _compressors()
+"""Available encoders, in order of preference."""
+
+
+class StreamCompressor:
+    """
+    Incremental compressor of a streamed body.
+
+    Args:
+        encoding (str): One of `COMPRESSORS`.
+    """
+
+    def __init__(self, encoding: str) -> None:
+        if encoding == "br":
+            brotli_compressor = brotli.Compressor(
+                quality=Config.COMPRESSION.BROTLI_QUALITY
+            )
+            self._compress: Callable[[bytes], bytes] = lambda chunk: (
+                brotli_compressor.process(chunk) + brotli_compressor.flush()
+            )
+            self._finish: Callable[[], bytes] = brotli_compressor.finish
+        elif encoding == "zstd":
+            zstd_compressor = zstandard.ZstdCompressor(
+                level=Config.COMPRESSION.ZSTD_LEVEL
+            ).compressobj()
+            self._compress = lambda chunk: zstd_compressor.compress(
+                chunk
+            ) + zstd_compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+            self._finish = zstd_compressor.flush
+        else:
+            gzip_compressor = zlib.compressobj(
+                Config.COMPRESSION.GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS
+            )
+            self._compress = lambda chunk: gzip_compressor.compress(
+                chunk
+            ) + gzip_compressor.flush(zlib.Z_SYNC_FLUSH)
+            self._finish = gzip_compressor.flush
+
+    def compress(self, chunk: bytes) -> bytes:
+        """Compress a chunk and flush it, so it can be decoded on its own."""
+        return self._compress(chunk)
+
+    def finish(self) -> bytes:
+        """End the compressed stream."""
+        return self._finish()
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """
+    Pick the content coding for an `Accept-Encoding` header.
+
+    Args:
+        accept_encoding (Optional[str]): The raw header value.
+
+    Returns:
+        Optional[str]: The preferred available coding, or None for identity.
+    """
+    if not accept_encoding:
+        return None
+    weights: dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        coding, *params = part.strip().split(";")
+        q = 1.0
+        for param in params:
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        weights[coding.strip().lower()] = q
+    wildcard = weights.get("*", 0.0)
+    best, best_q = None, 0.0
+    for coding in COMPRESSORS:
+        q = weights.get(coding, wildcard)
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+def _timed_compress(encoding: str, body: bytes) -> tuple[bytes, float]:
+    """Compress a body and return it with the CPU time it took."""
+    started = time.thread_time()
+    compressed = COMPRESSORS[encoding](body)
+    return compressed, time.thread_time() - started
+
+
+class CompressedBodyCache:
+    """Bounded LRU cache of compressed bodies keyed by body digest and coding."""
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple[bytes, str], bytes] = OrderedDict()
+
+    def get(self, key: tuple[bytes, str]) -> Optional[bytes]:
+        body = self._entries.get(key)
+        if body is not None:
+            self._entries.move_to_end(key)
+        return body
+
+    def put(self, key: tuple[bytes, str], body: bytes) -> None:
+        self._entries[key] = body
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware compressing large responses according to `Accept-Encoding`.
+
+    Args:
+        app (ASGIApp): The wrapped application.
+        minimum_size (int): Bodies smaller than this are sent uncompressed.
+        cache_size (int): Maximum number of cached compressed bodies.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = Config.COMPRESSION.MINIMUM_SIZE,
+        cache_size: int = Config.COMPRESSION.CACHE_SIZE,
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.cache = CompressedBodyCache(cache_size)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message: Optional[Message] = None
+        passthrough = False
+        stream: Optional[StreamCompressor] = None
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start_message, passthrough, stream
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if passthrough or message["type"] != "http.response.body":
+                await send(message)
+                return
+            body: bytes = message.get("body", b"")
+            more_body: bool = message.get("more_body", False)
+            if stream is not None:
+                await send(
+                    {
+                        "type": "http.response.body",
+                        "body": self.compress_chunk(stream, encoding, body, more_body),
+                        "more_body": more_body,
+                    }
+                )
+                return
+            assert start_message is not None
+            headers = MutableHeaders(raw=start_message["headers"])
+            if "content-encoding" in headers or (
+                not more_body and len(body) < self.minimum_size
+            ):
+                passthrough = True
+                await send(start_message)
+                await send(message)
+                return
+            headers["Content-Encoding"] = encoding
+            headers.add_vary_header("Accept-Encoding")
+            if "etag" in headers and not headers["etag"].startswith("W/"):
+                headers["ETag"] = f"W/{headers['etag']}"
+            if more_body:
+                del headers["Content-Length"]
+                stream = StreamCompressor(encoding)
+                metrics.increment("compression.responses", encoding=encoding)
+                await send(start_message)
+                await send(
+                    {
+                        "type": "http.response.body",
+                        "body": self.compress_chunk(stream, encoding, body, True),
+                        "more_body": True,
+                    }
+                )
+                return
+            compressed = await self.compress(body, encoding, "etag" in headers)
+            headers["Content-Length"] = str(len(compressed))
+            await send(start_message)
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_compressed)
+
+    @staticmethod
+    def compress_chunk(
+        stream: StreamCompressor, encoding: str, chunk: bytes, more_body: bool
+    ) -> bytes:
+        """
+        Compress a chunk of a streamed body, ending the stream on the last one.
+
+        Args:
+            stream (StreamCompressor): The compressor of the response.
+            encoding (str): Its content coding, for the metrics.
+            chunk (bytes): The uncompressed chunk.
+            more_body (bool): Whether more chunks follow.
+
+        Returns:
+            bytes: The compressed chunk.
+        """
+        started = time.thread_time()
+        compressed = stream.compress(chunk) if chunk else b""
+        if not more_body:
+            compressed += stream.finish()
+        metrics.increment(
+            "compression.cpu_seconds", time.thread_time() - started, encoding=encoding
+        )
+        metrics.increment("compression.bytes_in", len(chunk), encoding=encoding)
+        metrics.increment("compression.bytes_out", len(compressed), encoding=encoding)
+        return compressed
+
+    async def compress(self, body: bytes, encoding: str, cacheable: bool) -> bytes:
+        """
+        Compress a body, reusing the cached result for repeated cacheable bodies.
+
+        Args:
+            body (bytes): The uncompressed body.
+            encoding (str): The content coding to apply.
+            cacheable (bool): Whether the result may be cached.
+
+        Returns:
+            bytes: The compressed body.
+        """
+        key = (blake2b(body, digest_size=16).digest(), encoding) if cacheable else None
+        if key is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                metrics.increment("compression.cache_hits", encoding=encoding)
+                metrics.increment("compression.bytes_in", len(body), encoding=encoding)
+                metrics.increment(
+                    "compression.bytes_out", len(cached), encoding=encoding
+                )
+                return cached
+        if len(body) >= Config.COMPRESSION.THREAD_THRESHOLD:
+            compressed, cpu_seconds = await anyio.to_thread.run_sync(
+                _timed_compress, encoding, body
+            )
+        else:
+            compressed, cpu_seconds = _timed_compress(encoding, body)
+        metrics.increment("compression.responses", encoding=encoding)
+        metrics.increment("compression.cpu_seconds", cpu_seconds, encoding=encoding)
+        metrics.increment("compression.bytes_in", len(body), encoding=encoding)
+        metrics.increment("compression.bytes_out", len(compressed), encoding=encoding)
+        if key is not None:
+            self.cache.put(key, compressed)
+        return compressed
@@ -0,0 +1,53 @@
+"""
+In-process metrics registry.
+
+Components record counters and gauges here and `GET /status/metrics` exposes a
+snapshot of them to admins. Metric names are dotted, labels are appended in braces, e.g.
+`compression.bytes_out{encoding=gzip}`.
+"""
+
+import threading
+from typing import Union
+
+
+class Metrics:
+    """Thread-safe registry of named counters and gauges."""
+
+    def __init__(self) -> None:
+        self._values: dict[str, Union[int, float]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(name: str, **labels: str) -> str:
+        """Build the registry key of a metric and its labels."""
+        if not labels:
+            return name
+        rendered = ",".join(
+            f"{label}={value}" for label, value in sorted(labels.items())
+        )
+        return f"{name}{{{rendered}}}"
+
+    def increment(self, name: str, value: Union[int, float] = 1, **labels: str) -> None:
+        """Add `value` to a counter."""
+        key = self.key(name, **labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + value
+
+    def set(self, name: str, value: Union[int, float], **labels: str) -> None:
+        """Set a gauge to `value`."""
+        key = self.key(name, **labels)
+        with self._lock:
+            self._values[key] = value
+
+    def get(self, name: str, **labels: str) -> Union[int, float]:
+        """Return the current value of a metric, 0 if it was never recorded."""
+        return self._values.get(self.key(name, **labels), 0)
+
+    def snapshot(self) -> dict[str, Union[int, float]]:
+        """Return a copy of all metrics, sorted by name."""
+        with self._lock:
+            return dict(sorted(self._values.items()))
+
+
+metrics = Metrics()
+"""Metrics of this process."""
@@ -0,0 +1,437 @@
+"""
+Rate limiting of routes, shared by every worker process.
+
+Routes configure their limits in their decorator:
+
+    @auth_router.post(
+        "/login",
+        dependencies=[Depends(rate_limit("auth.login", AUTH_IP, LOGIN_EMAIL))],
+    )
+
+Each limit counts the requests of one key of the caller: its IP address
+(`"ip"`), the `email` of its JSON body (`"email"`) or the subject of its
+verified token (`"customer"`). Two algorithms are available:
+
+- `TokenBucket` allows bursts of `capacity` requests, refilled at `rate`
+  requests per second;
+- `SlidingWindow` allows `limit` requests per `window` seconds, counting the
+  previous window in proportion to its overlap with the sliding window.
+
+A request takes one unit from every limit of its route, or none if any of
+them is exhausted, in which case the dependency answers 429 with a
+Retry-After header before the route runs, and so before any upstream call.
+
+The counters live in `SharedCounters`, a hash table in a memory-mapped file
+(`Config.RATE_LIMIT.PATH`, in /dev/shm where available) locked with
+`flock`, so every uvicorn worker mapping it sees the same counts. A full
+probe sequence evicts its least recently updated counter.
+
+The IP address is the one of the connection's peer. Behind a reverse proxy
+that is the proxy's, so every client would share one bucket: list the
+proxies' addresses or networks in `RATE_LIMIT_TRUSTED_PROXIES` (comma
+separated) and have them append the address they received the request
+from to `X-Forwarded-For`. For requests from a trusted proxy, the client is
+then the nearest address of that header that is not a trusted proxy (see
+`client_ip`). The header is ignored for other peers, since any client can
+send it.
+
+Rejections are counted in the metrics registry as `rate_limit.rejected`
+with `route` and `key` labels.
+"""
+
+import fcntl
+import ipaddress
+import math
+import mmap
+import os
+import struct
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from hashlib import blake2b
+from typing import Any, Awaitable, Callable, Iterator, Optional, Sequence, Union
+
+from fastapi import Depends, HTTPException, Request, status
+
+from src.auth.dependencies import get_token_claims
+from src.config import Config
+from src.utils.metrics import metrics
+
+State = tuple[float, float, float]
+"""The value, previous value and timestamp of a counter."""
+
+SLOT = struct.Struct("=16sddd")
+"""A counter: the digest of its key and its state."""
+
+EMPTY_KEY = bytes(16)
+
+KEYS = ("ip", "email", "customer")
+"""Keys a limit can count requests by."""
+
+Network = Union[ipaddress.IPv4Network, ipaddress.IPv6Network]
+
+TRUSTED_PROXIES: tuple[Network, ...] = tuple(
+    ipaddress.ip_network(proxy, strict=False)
+    for proxy in Config.RATE_LIMIT.TRUSTED_PROXIES
+)
+"""Networks of the reverse proxies whose `X-Forwarded-For` header is trusted."""
+
+
+@dataclass(frozen=True)
+class TokenBucket:
+    """
+    Allow bursts of `capacity` requests, refilled at `rate` per second.
+
+    The state is the number of tokens left and the time of the last refill.
+    """
+
+    key: str
+    capacity: int
+    rate: float
+
+    def take(self, state: Optional[State], now: float) -> tuple[Optional[float], State]:
+        """
+        Take a token.
+
+        Args:
+            state (Optional[State]): The counter; None for a new one.
+            now (float): The current time.
+
+        Returns:
+            tuple[Optional[float], State]: None if the request is allowed,
+            else the seconds until a token is available; and the new state.
+        """
+        tokens, _, refilled_at = state or (float(self.capacity), 0.0, now)
+        tokens = min(float(self.capacity), tokens + (now - refilled_at) * self.rate)
+        if tokens >= 1:
+            return None, (tokens - 1, 0.0, now)
+        return (1 - tokens) / self.rate, (tokens, 0.0, now)
+
+
+@dataclass(frozen=True)
+class SlidingWindow:
+    """
+    Allow `limit` requests per `window` seconds.
+
+    Windows are aligned on multiples of `window`; the count of the previous
+    window is weighted by the part of it the sliding window still covers.
+    The state is the count of the current window, the count of the previous
+    one and the start of the current one.
+    """
+
+    key: str
+    limit: int
+    window: float
+
+    def take(self, state: Optional[State], now: float) -> tuple[Optional[float], State]:
+        """
+        Count a request.
+
+        Args:
+            state (Optional[State]): The counter; None for a new one.
+            now (float): The current time.
+
+        Returns:
+            tuple[Optional[float], State]: None if the request is allowed,
+            else the seconds until it would be; and the new state.
+        """
+        start = now - now % self.window
+        count, previous, started_at = state or (0.0, 0.0, start)
+        if start - started_at >= 2 * self.window:
+            count, previous = 0.0, 0.0
+        elif start > started_at:
+            count, previous = 0.0, count
+        elapsed = now - start
+        if previous * (1 - elapsed / self.window) + count + 1 <= self.limit:
+            return None, (count + 1, previous, start)
+        if count + 1 > self.limit or not previous:
+            retry_after = self.window - elapsed
+        else:
+            retry_after = (
+                self.window * (1 - (self.limit - count - 1) / previous) - elapsed
+            )
+        return max(retry_after, 0.0), (count, previous, start)
+
+
+Limit = Union[TokenBucket, SlidingWindow]
+
+
+class SharedCounters:
+    """
+    Hash table of counters in a memory-mapped file shared between processes.
+
+    The file is mapped lazily, and again in forked children, so that every
+    process has its own file description for `flock`.
+
+    Args:
+        path (str): The file; created if missing.
+        slots (int): Number of counters.
+        probes (int): Slots tried for a key before evicting one.
+    """
+
+    def __init__(
+        self,
+        path: str = Config.RATE_LIMIT.PATH,
+        slots: int = Config.RATE_LIMIT.SLOTS,
+        probes: int = 8,
+    ) -> None:
+        self.path = path
+        self.slots = slots
+        self.probes = probes
+        self._lock = threading.Lock()
+        self._pid: Optional[int] = None
+        self._fd = -1
+        self._map: Optional[mmap.mmap] = None
+
+    def _open(self) -> mmap.mmap:
+        if self._map is None or self._pid != os.getpid():
+            size = self.slots * SLOT.size
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            try:
+                if os.fstat(fd).st_size < size:
+                    os.ftruncate(fd, size)
+            finally:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            self._map, self._fd, self._pid = mmap.mmap(fd, size), fd, os.getpid()
+        return self._map
+
+    def close(self) -> None:
+        """Unmap the file of this process."""
+        with self._lock:
+            if self._map is not None and self._pid == os.getpid():
+                self._map.close()
+                os.close(self._fd)
+            self._map, self._pid = None, None
+
+    @contextmanager
+    def locked(self) -> Iterator[mmap.mmap]:
+        """Hold the table exclusively, across threads and processes."""
+        with self._lock:
+            mapping = self._open()
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                yield mapping
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def find(self, mapping: mmap.mmap, digest: bytes) -> tuple[int, Optional[State]]:
+        """
+        Find the slot of a key; call it while holding `locked`.
+
+        Args:
+            mapping (mmap.mmap): The mapped table.
+            digest (bytes): The 16-byte digest of the key.
+
+        Returns:
+            tuple[int, Optional[State]]: The slot and the counter's state,
+            None if the key has no counter yet.
+        """
+        first = int.from_bytes(digest[:8], "little") % self.slots
+        victim, victim_time = first, math.inf
+        for probe in range(self.probes):
+            slot = (first + probe) % self.slots
+            key, value, previous, stamp = SLOT.unpack_from(mapping, slot * SLOT.size)
+            if key == digest:
+                return slot, (value, previous, stamp)
+            if key == EMPTY_KEY:
+                return slot, None
+            if stamp < victim_time:
+                victim, victim_time = slot, stamp
+        return victim, None
+
+    @staticmethod
+    def store(mapping: mmap.mmap, slot: int, digest: bytes, state: State) -> None:
+        """Write the state of a key's counter; call it while holding `locked`."""
+        SLOT.pack_into(mapping, slot * SLOT.size, digest, *state)
+
+    @staticmethod
+    def load(mapping: mmap.mmap, slot: int) -> bytes:
+        """Return the raw bytes of a slot; call it while holding `locked`."""
+        return mapping[slot * SLOT.size : (slot + 1) * SLOT.size]
+
+    @staticmethod
+    def restore(mapping: mmap.mmap, slot: int, raw: bytes) -> None:
+        """Write back the raw bytes of a slot; call it while holding `locked`."""
+        mapping[slot * SLOT.size : (slot + 1) * SLOT.size] = raw
+
+    def clear(self) -> None:
+        """Drop every counter."""
+        with self.locked() as mapping:
+            mapping[:] = bytes(len(mapping))
+
+
+class RateLimiter:
+    """
+    Applies limits to the requests of callers, with shared counters.
+
+    Args:
+        counters (SharedCounters): Where the counts are kept.
+    """
+
+    def __init__(self, counters: Optional[SharedCounters] = None) -> None:
+        self.counters = counters or SharedCounters()
+
+    def acquire(
+        self,
+        route: str,
+        limits: list[tuple[Limit, str]],
+        now: Optional[float] = None,
+    ) -> Optional[float]:
+        """
+        Count a request against every limit, or none if any is exhausted.
+
+        Args:
+            route (str): The name of the route the limits belong to.
+            limits (list[tuple[Limit, str]]): Each limit and the caller's
+                value of its key, e.g. their IP address.
+            now (Optional[float]): The current time; `time.time()` by default.
+
+        Returns:
+            Optional[float]: None if the request is allowed, else the seconds
+            until it would be.
+        """
+        now = time.time() if now is None else now
+        retry_after: Optional[float] = None
+        with self.counters.locked() as mapping:
+            originals = []
+            for index, (limit, value) in enumerate(limits):
+                digest = blake2b(
+                    f"{route}|{index}|{limit.key}|{value}".encode(), digest_size=16
+                ).digest()
+                slot, state = self.counters.find(mapping, digest)
+                wait, new_state = limit.take(state, now)
+                if wait is not None:
+                    metrics.increment("rate_limit.rejected", route=route, key=limit.key)
+                    retry_after = max(retry_after or 0.0, wait)
+                originals.append((slot, self.counters.load(mapping, slot)))
+                self.counters.store(mapping, slot, digest, new_state)
+            if retry_after is not None:
+                for slot, original in reversed(originals):
+                    self.counters.restore(mapping, slot, original)
+        return retry_after
+
+
+rate_limiter = RateLimiter()
+"""Rate limiter of this process, sharing its counters with the other workers."""
+
+
+def is_trusted(address: str, proxies: Sequence[Network]) -> bool:
+    """Whether an address belongs to one of the trusted proxies."""
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(ip in network for network in proxies)
+
+
+def client_ip(
+    request: Request, proxies: Sequence[Network] = TRUSTED_PROXIES
+) -> Optional[str]:
+    """
+    Return the IP address of the client of a request.
+
+    Args:
+        request (Request): The request.
+        proxies (Sequence[Network]): The trusted reverse proxies.
+
+    Returns:
+        Optional[str]: The connection's peer or, if it is a trusted proxy, the
+        last address of `X-Forwarded-For` that is not one, i.e. the one the
+        nearest trusted proxy received the request from. None if unknown.
+    """
+    peer = request.client.host if request.client else None
+    if peer is None or not is_trusted(peer, proxies):
+        return peer
+    hops = [
+        hop.strip()
+        for header in request.headers.getlist("x-forwarded-for")
+        for hop in header.split(",")
+        if hop.strip()
+    ]
+    for hop in reversed(hops):
+        if not is_trusted(hop, proxies):
+            return hop
+    return hops[0] if hops else peer
+
+
+async def request_keys(
+    request: Request, claims: Optional[dict[str, Any]]
+) -> dict[str, Optional[str]]:
+    """
+    Return the values of the caller's keys, None for the ones it lacks.
+
+    Args:
+        request (Request): The request.
+        claims (Optional[dict[str, Any]]): The claims of its verified token.
+
+    Returns:
+        dict[str, Optional[str]]: The value of each of `KEYS`.
+    """
+    email = None
+    if request.headers.get("content-type", "").startswith("application/json"):
+        try:
+            body = await request.json()
+        except ValueError:
+            body = None
+        if isinstance(body, dict) and isinstance(body.get("email"), str):
+            email = body["email"].strip().lower()
+    return {
+        "ip": client_ip(request),
+        "email": email,
+        "customer": (claims or {}).get("sub"),
+    }
+
+
+def rate_limit(route: str, *limits: Limit) -> Callable[..., Awaitable[None]]:
+    """
+    Create a dependency applying limits to the requests of a route.
+
+    Limits on `"customer"` make the route require a verified token.
+
+    Args:
+        route (str): The name of the route, e.g. `"auth.login"`.
+        *limits (Limit): The limits.
+
+    Raises:
+        ValueError: If a limit counts requests by an unknown key.
+
+    Returns:
+        Callable[..., Awaitable[None]]: The dependency; it raises a 429
+        HTTPException with a Retry-After header when a limit is exhausted.
+    """
+    for limit in limits:
+        if limit.key not in KEYS:
+            raise ValueError(f"Invalid rate limit key {limit.key}")
+
+    async def enforce(request: Request, claims: Optional[dict[str, Any]]) -> None:
+        keys = await request_keys(request, claims)
+        retry_after = rate_limiter.acquire(
+            route,
+            [
+                (limit, value)
+                for limit in limits
+                if (value := keys[limit.key]) is not None
+            ],
+        )
+        if retry_after is not None:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many requests",
+                headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+            )
+
+    if any(limit.key == "customer" for limit in limits):
+
+        async def limit_customer(
+            request: Request, claims: dict[str, Any] = Depends(get_token_claims)
+        ) -> None:
+            await enforce(request, claims)
+
+        return limit_customer
+
+    async def limit_anonymous(request: Request) -> None:
+        await enforce(request, None)
+
+    return limit_anonymous
@@ -1,17 +1,50 @@
 """Module defining the APIResponse class for standardized API responses."""
 
-from typing import Any, TypeVar
+from typing import Any, TypeVar, Union
 
 from fastapi import status
 from fastapi.responses import JSONResponse as FastAPIJSONResponse
+from pydantic import BaseModel as PydanticBaseModel
+from pydantic_core import to_json
 
 from src.db.models import BaseModel
+from src.utils.responses.content_negotiation import (
+    JSON,
+    decode,
+    encode,
+    response_media_type,
+)
 
 BaseModelType = TypeVar("BaseModelType", bound=BaseModel)
 
 
+class RawItems:
+    """
+    A JSON array of items that is already encoded, e.g. a PostgREST response
+    body. APIResponse splices it into the envelope as `data.items` as-is.
+    """
+
+    __slots__ = ("body",)
+
+    def __init__(self, body: bytes) -> None:
+        self.body = body
+
+    def __bool__(self) -> bool:
+        return self.body.strip() != b"[]"
+
+
 class APIResponse(FastAPIJSONResponse):
-    """A custom JSON response class for API endpoints."""
+    """
+    A custom JSON response class for API endpoints.
+
+    `data` may be a plain dict or a pydantic model (e.g. `BaseResponse[Model]`);
+    either way the envelope is serialized straight to bytes by pydantic-core,
+    so models are never dumped to intermediate dicts first. `data` may also be
+    `RawItems`, whose pre-encoded bytes are spliced in without being parsed.
+
+    On routes using `NegotiatedRoute` the envelope is rendered as MessagePack or
+    CBOR instead when the client asked for it in `Accept`.
+    """
 
     media_type = "application/json"
 
@@ -19,7 +52,7 @@ class APIResponse(FastAPIJSONResponse):
         self,
         message: str,
         status_code: int = status.HTTP_200_OK,
-        data: dict[str, Any] = {},
+        data: Union[dict[str, Any], PydanticBaseModel, RawItems] = {},
     ) -> None:
         """Initialize the APIResponse with a message, status code, and optional data."""
         if not message:
@@ -33,5 +66,17 @@ class APIResponse(FastAPIJSONResponse):
         super().__init__(
             content=content,
             status_code=status_code,
-            media_type=self.media_type,
+            media_type=response_media_type.get(),
         )
+
+    def render(self, content: Any) -> bytes:
+        """Serialize the envelope to bytes in the negotiated media type."""
+        data = content["data"]
+        if self.media_type != JSON:
+            if isinstance(data, RawItems):
+                content = {**content, "data": {"items": decode(data.body, JSON)}}
+            return encode(content, self.media_type)
+        if isinstance(data, RawItems):
+            head = to_json({"message": content["message"]})[:-1]
+            return b"".join((head, b',"data":{"items":', data.body, b"}}"))
+        return to_json(content)
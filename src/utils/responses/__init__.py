@@ -1,4 +1,24 @@
-from .API_response import APIResponse
+from .API_response import APIResponse, RawItems
 from .auth_response import AuthResponse
+from .conditional import conditional_get, with_etag
+from .content_negotiation import NegotiatedRoute
+from .export import ExportFormat, ExportStream, export_table
+from .response_cache import ResponseCache, response_cache
+from .streaming import ItemStream, StreamFormat, stream_format
 
-__all__ = ["APIResponse", "AuthResponse"]
+__all__ = [
+    "APIResponse",
+    "AuthResponse",
+    "ExportFormat",
+    "ExportStream",
+    "ItemStream",
+    "NegotiatedRoute",
+    "RawItems",
+    "ResponseCache",
+    "StreamFormat",
+    "conditional_get",
+    "export_table",
+    "response_cache",
+    "stream_format",
+    "with_etag",
+]
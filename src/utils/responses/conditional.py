@@ -0,0 +1,104 @@
+"""
+Conditional GET support based on per-table ETags.
+
+`conditional_get(*tables)` returns a dependency that computes the ETag of the
+current request from the shared table versions and, when the client's
+`If-None-Match` already holds it, answers `304 Not Modified` before any other
+dependency (such as the DAO and its database client) is resolved. List it
+before the DAO in the endpoint signature and attach the returned ETag to the
+response with `with_etag`. If the versions cannot be read, no ETag is sent
+and the request is answered normally.
+
+The versions are read once per request (see `request_versions`), so the
+response cache keys the response on the same versions as its ETag.
+"""
+
+from typing import Callable, Iterable, Optional
+
+from fastapi import Depends, HTTPException, Request, Response, status
+
+from src.auth.dependencies import get_access_token
+from src.db.table_versions import etag_of, table_versions
+from src.utils.responses.content_negotiation import response_media_type
+
+
+def etag_matches(etag: str, if_none_match: Optional[str]) -> bool:
+    """
+    Check an ETag against an `If-None-Match` header using weak comparison.
+
+    Args:
+        etag (str): The current ETag.
+        if_none_match (Optional[str]): The raw header value.
+
+    Returns:
+        bool: True if the client's copy is still current.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == opaque
+        for candidate in if_none_match.split(",")
+    )
+
+
+def request_versions(request: Request, tables: Iterable[str]) -> dict[str, int]:
+    """
+    Return the versions of tables, reading each at most once per request.
+
+    This may block on the database: call it from the thread pool in async code.
+
+    Args:
+        request (Request): The current request, whose state keeps the versions.
+        tables (Iterable[str]): The tables.
+
+    Returns:
+        dict[str, int]: The version of each table.
+    """
+    tables = list(tables)
+    known: dict[str, int] = getattr(request.state, "table_versions", {})
+    missing = [table for table in tables if table not in known]
+    if missing:
+        known = {**known, **table_versions.get(missing)}
+        request.state.table_versions = known
+    return {table: known[table] for table in tables}
+
+
+def conditional_get(*tables: str) -> Callable[..., Optional[str]]:
+    """
+    Build a dependency that short-circuits unchanged GETs with a 304.
+
+    Args:
+        *tables (str): Tables the endpoint's response is derived from.
+
+    Returns:
+        Callable[..., Optional[str]]: A dependency returning the current ETag,
+        or None when the table versions are unavailable.
+    """
+
+    def dependency(
+        request: Request, _: str = Depends(get_access_token)
+    ) -> Optional[str]:
+        try:
+            etag = etag_of(
+                request_versions(request, tables), variant=response_media_type.get()
+            )
+        except Exception:
+            return None
+        if etag_matches(etag, request.headers.get("if-none-match")):
+            raise HTTPException(
+                status_code=status.HTTP_304_NOT_MODIFIED,
+                headers={"ETag": etag},
+            )
+        return etag
+
+    return dependency
+
+
+def with_etag(response: Response, etag: Optional[str]) -> Response:
+    """Attach an ETag to a successful response."""
+    if etag is not None and response.status_code == status.HTTP_200_OK:
+        response.headers["ETag"] = etag
+    return response
@@ -0,0 +1,241 @@
+"""
+Content negotiation between JSON and compact binary formats (MessagePack, CBOR).
+
+`NegotiatedRoute` reads the `Accept` header of every request on the routers that
+use it and records the chosen media type for `APIResponse`, which renders the
+same `{"message": ..., "data": ...}` envelope in that format. Request bodies sent
+as MessagePack or CBOR are decoded before FastAPI validates them, so typed body
+parameters work unchanged.
+
+MessagePack needs the `msgpack` package and CBOR the `cbor2` package; a format
+whose package is missing is simply never negotiated.
+"""
+
+from contextvars import ContextVar
+from typing import Any, Callable, Coroutine, Optional
+
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+from pydantic_core import from_json, to_json, to_jsonable_python
+
+try:
+    import msgpack  # type: ignore
+except ImportError:  # pragma: no cover
+    msgpack = None
+
+try:
+    import cbor2
+except ImportError:  # pragma: no cover
+    cbor2 = None  # type: ignore[assignment]
+
+JSON = "application/json"
+MSGPACK = "application/msgpack"
+CBOR = "application/cbor"
+
+MEDIA_TYPE_ALIASES = {
+    JSON: JSON,
+    MSGPACK: MSGPACK,
+    "application/x-msgpack": MSGPACK,
+    "application/vnd.msgpack": MSGPACK,
+    CBOR: CBOR,
+}
+
+response_media_type: ContextVar[str] = ContextVar("response_media_type", default=JSON)
+"""Media type negotiated for the response of the current request."""
+
+
+def available_media_types() -> list[str]:
+    """Return the media types that can be produced with the installed packages."""
+    media_types = [JSON]
+    if msgpack is not None:
+        media_types.append(MSGPACK)
+    if cbor2 is not None:
+        media_types.append(CBOR)
+    return media_types
+
+
+def parse_accept(accept: str) -> list[tuple[str, float]]:
+    """
+    Split an `Accept` header into media ranges with their quality.
+
+    Aliases of the supported media types are replaced by the canonical type.
+
+    Args:
+        accept (str): The raw `Accept` header.
+
+    Returns:
+        list[tuple[str, float]]: Each lower-cased media range and its `q`.
+    """
+    ranges = []
+    for part in accept.split(","):
+        media_range, *params = part.strip().split(";")
+        media_range = media_range.strip().lower()
+        q = 1.0
+        for param in params:
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        ranges.append((MEDIA_TYPE_ALIASES.get(media_range, media_range), q))
+    return ranges
+
+
+def quality(media_type: str, ranges: list[tuple[str, float]]) -> float:
+    """
+    Return the quality an `Accept` header gives a media type.
+
+    The most specific matching range wins: the exact type, then `type/*`,
+    then `*/*`.
+
+    Args:
+        media_type (str): A supported media type.
+        ranges (list[tuple[str, float]]): The parsed `Accept` header.
+
+    Returns:
+        float: The quality, 0 when no range matches.
+    """
+    wildcards = (media_type, media_type.split("/")[0] + "/*", "*/*")
+    best, best_q = len(wildcards), 0.0
+    for media_range, q in ranges:
+        if media_range in wildcards and wildcards.index(media_range) < best:
+            best, best_q = wildcards.index(media_range), q
+    return best_q
+
+
+def accepts(accept: Optional[str], media_type: str) -> bool:
+    """
+    Whether an `Accept` header allows a media type.
+
+    Args:
+        accept (Optional[str]): The raw `Accept` header; anything is
+            acceptable without one.
+        media_type (str): The media type, e.g. of a streamed response.
+
+    Returns:
+        bool: True unless no range matches it or its quality is 0.
+    """
+    return not accept or quality(media_type, parse_accept(accept)) > 0
+
+
+def negotiate(accept: Optional[str]) -> str:
+    """
+    Pick the response media type for an `Accept` header.
+
+    Wildcard ranges (`*/*`, `application/*`) match every supported type;
+    ties go to JSON.
+
+    Args:
+        accept (Optional[str]): The raw `Accept` header.
+
+    Returns:
+        str: The supported media type with the highest quality, JSON by default.
+    """
+    if not accept:
+        return JSON
+    ranges = parse_accept(accept)
+    best, best_q = JSON, 0.0
+    for media_type in available_media_types():
+        q = quality(media_type, ranges)
+        if q > best_q:
+            best, best_q = media_type, q
+    return best
+
+
+def encode(content: Any, media_type: str) -> bytes:
+    """
+    Encode content in the given media type.
+
+    Args:
+        content (Any): Plain data or pydantic models.
+        media_type (str): One of the supported media types.
+
+    Returns:
+        bytes: The encoded body.
+    """
+    if media_type == JSON:
+        return to_json(content)
+    data = to_jsonable_python(content)
+    if media_type == MSGPACK:
+        return msgpack.packb(data)  # type: ignore[no-any-return]
+    if media_type == CBOR:
+        return cbor2.dumps(data)
+    raise ValueError(f"Unsupported media type: {media_type}")
+
+
+def decode(body: bytes, media_type: str) -> Any:
+    """
+    Decode a body in the given media type.
+
+    Args:
+        body (bytes): The encoded body.
+        media_type (str): One of the supported media types.
+
+    Returns:
+        Any: The decoded data.
+    """
+    if media_type == JSON:
+        return from_json(body)
+    if media_type == MSGPACK:
+        return msgpack.unpackb(body)
+    if media_type == CBOR:
+        return cbor2.loads(body)
+    raise ValueError(f"Unsupported media type: {media_type}")
+
+
+def request_media_type(request: Request) -> Optional[str]:
+    """Return the supported binary media type of the request body, if any."""
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    media_type = MEDIA_TYPE_ALIASES.get(content_type.lower())
+    if media_type in (None, JSON) or media_type not in available_media_types():
+        return None
+    return media_type
+
+
+class BinaryBodyRequest(Request):
+    """
+    A request whose MessagePack or CBOR body is presented to FastAPI as JSON.
+
+    The `content-type` header is rewritten to JSON so FastAPI calls `json()`,
+    which decodes the binary body instead.
+    """
+
+    def __init__(self, request: Request, media_type: str) -> None:
+        scope = dict(request.scope)
+        scope["headers"] = [
+            (key, value)
+            for key, value in request.scope["headers"]
+            if key != b"content-type"
+        ] + [(b"content-type", JSON.encode())]
+        super().__init__(scope, request.receive)
+        self.body_media_type = media_type
+
+    async def json(self) -> Any:
+        if not hasattr(self, "_json"):
+            self._json = decode(await self.body(), self.body_media_type)
+        return self._json
+
+
+class NegotiatedRoute(APIRoute):
+    """
+    An APIRoute that negotiates the response format from `Accept` and accepts
+    MessagePack or CBOR request bodies.
+    """
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        original_route_handler = super().get_route_handler()
+
+        async def custom_route_handler(request: Request) -> Response:
+            body_media_type = request_media_type(request)
+            if body_media_type is not None:
+                request = BinaryBodyRequest(request, body_media_type)
+            token = response_media_type.set(negotiate(request.headers.get("accept")))
+            try:
+                response = await original_route_handler(request)
+            finally:
+                response_media_type.reset(token)
+            response.headers.add_vary_header("Accept")
+            return response
+
+        return custom_route_handler
@@ -0,0 +1,228 @@
+"""
+Streamed bulk export of tables as CSV, NDJSON or Parquet.
+
+`ExportStream` encodes the pages of `BaseDAO.iter_pages` one at a time. Its
+chunks are produced by a generator that Starlette only advances once the
+previous chunk has been sent, so a slow client holds back the page fetches
+(backpressure) and memory stays bounded by one page, or one Parquet row
+group, whatever the table size.
+
+Parquet is written in row groups of `Config.EXPORT.ROW_GROUP_SIZE` rows with a
+schema derived from the table's model; every finished row group is sent right
+away and the footer goes out last. It needs the `pyarrow` package; without
+it the format is simply unavailable.
+"""
+
+import csv
+import io
+import types
+from datetime import date, datetime
+from itertools import chain
+from typing import Any, Iterable, Iterator, Literal, Union, get_args, get_origin
+
+from fastapi import Response, status
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+
+from src.config import Config
+from src.db.dao import BaseDAO
+from src.db.models import BaseModel
+from src.utils.responses.API_response import APIResponse
+from src.utils.responses.streaming import NDJSON, ndjson_chunks
+
+try:
+    import pyarrow  # type: ignore
+    import pyarrow.parquet  # type: ignore
+except ImportError:  # pragma: no cover
+    pyarrow = None
+
+ExportFormat = Literal["csv", "ndjson", "parquet"]
+
+MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": NDJSON,
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+def available_formats() -> list[str]:
+    """Return the export formats that can be produced with the installed packages."""
+    return [
+        format for format in MEDIA_TYPES if format != "parquet" or pyarrow is not None
+    ]
+
+
+def csv_chunks(
+    pages: Iterable[list[dict[str, Any]]], columns: list[str]
+) -> Iterator[bytes]:
+    """Encode pages as CSV with a header row, one chunk per page."""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=columns, extrasaction="ignore")
+    writer.writeheader()
+    yield buffer.getvalue().encode()
+    for page in pages:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(page)
+        yield buffer.getvalue().encode()
+
+
+def arrow_type(annotation: Any) -> Any:
+    """Map a model field annotation to an Arrow type, defaulting to string."""
+    if get_origin(annotation) in (Union, types.UnionType):
+        annotation = next(arg for arg in get_args(annotation) if arg is not type(None))
+    if not isinstance(annotation, type):
+        return pyarrow.string()
+    if issubclass(annotation, bool):
+        return pyarrow.bool_()
+    if issubclass(annotation, int):
+        return pyarrow.int64()
+    if issubclass(annotation, float):
+        return pyarrow.float64()
+    if issubclass(annotation, datetime):
+        return pyarrow.timestamp("us", tz="UTC")
+    if issubclass(annotation, date):
+        return pyarrow.date32()
+    return pyarrow.string()
+
+
+def arrow_schema(model: type[BaseModel]) -> Any:
+    """Build the Arrow schema of a model's table."""
+    return pyarrow.schema(
+        [
+            (name, arrow_type(field.annotation))
+            for name, field in model.model_fields.items()
+        ]
+    )
+
+
+class ChunkSink(io.RawIOBase):
+    """A write-only file collecting written bytes until they are drained."""
+
+    def __init__(self) -> None:
+        self.chunks: list[bytes] = []
+        self.position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data: Any) -> int:
+        chunk = bytes(data)
+        self.chunks.append(chunk)
+        self.position += len(chunk)
+        return len(chunk)
+
+    def tell(self) -> int:
+        return self.position
+
+    def drain(self) -> bytes:
+        """Return and forget the bytes written since the last drain."""
+        chunk = b"".join(self.chunks)
+        self.chunks.clear()
+        return chunk
+
+
+def parquet_chunks(
+    pages: Iterable[list[dict[str, Any]]],
+    model: type[BaseModel],
+    row_group_size: int = Config.EXPORT.ROW_GROUP_SIZE,
+) -> Iterator[bytes]:
+    """Encode pages as a Parquet file, one chunk per row group."""
+    schema = arrow_schema(model)
+    sink = ChunkSink()
+    writer = pyarrow.parquet.ParquetWriter(sink, schema, compression="zstd")
+
+    def row_group(rows: list[dict[str, Any]]) -> bytes:
+        columns = []
+        for field in schema:
+            values = [row.get(field.name) for row in rows]
+            if pyarrow.types.is_temporal(field.type):
+                columns.append(pyarrow.array(values, pyarrow.string()).cast(field.type))
+            else:
+                columns.append(pyarrow.array(values, field.type))
+        writer.write_table(pyarrow.Table.from_arrays(columns, schema=schema))
+        return sink.drain()
+
+    pending: list[dict[str, Any]] = []
+    for page in pages:
+        pending.extend(page)
+        while len(pending) >= row_group_size:
+            yield row_group(pending[:row_group_size])
+            del pending[:row_group_size]
+    if pending:
+        yield row_group(pending)
+    writer.close()
+    yield sink.drain()
+
+
+class ExportStream(StreamingResponse):
+    """
+    A streamed export file, see the module documentation.
+
+    Args:
+        pages (Iterable[list[dict[str, Any]]]): Pages of rows, fetched lazily.
+        model (type[BaseModel]): Model of the rows, giving the columns.
+        format (ExportFormat): `"csv"`, `"ndjson"` or `"parquet"`.
+        filename (str): Name of the downloaded file, without extension.
+    """
+
+    def __init__(
+        self,
+        pages: Iterable[list[dict[str, Any]]],
+        model: type[BaseModel],
+        format: ExportFormat,
+        filename: str,
+    ) -> None:
+        if format not in available_formats():
+            raise ValueError(f"Unsupported export format: {format}")
+        chunks: Iterator[bytes]
+        if format == "csv":
+            chunks = csv_chunks(pages, list(model.model_fields))
+        elif format == "parquet":
+            chunks = parquet_chunks(pages, model)
+        else:
+            chunks = ndjson_chunks(pages, None)
+        super().__init__(
+            chunks,
+            media_type=MEDIA_TYPES[format],
+            headers={
+                "Content-Disposition": f'attachment; filename="{filename}.{format}"'
+            },
+        )
+
+
+async def export_table(
+    dao: BaseDAO[Any], format: ExportFormat, filename: str, **options: Any
+) -> Response:
+    """
+    Stream every row reached by a DAO as an export file.
+
+    The first page is fetched before responding, so database errors are
+    still reported as a 500 response; the others are fetched in the thread
+    pool as the client reads the file.
+
+    Args:
+        dao (BaseDAO[Any]): The data access object of the table.
+        format (ExportFormat): The file format.
+        filename (str): Name of the downloaded file, without extension.
+        **options: Arguments of `BaseDAO.iter_pages`, e.g. `order`.
+
+    Returns:
+        Response: The streamed file, or an APIResponse describing the error.
+    """
+    if format not in available_formats():
+        return APIResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            message=f"Export format {format} is not available",
+        )
+    try:
+        pages = dao.iter_pages(**options)
+        first = await run_in_threadpool(next, pages, None)
+        return ExportStream(
+            chain([first] if first else [], pages), dao.base_model, format, filename
+        )
+    except Exception as e:
+        return APIResponse(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            message=str(e),
+        )
@@ -0,0 +1,263 @@
+"""
+Response-level cache for selected GET routes.
+
+`ResponseCache.cached(...)` decorates an endpoint so its rendered response is
+cached under a key made of the route path, the normalized query parameters,
+the caller's auth scope, the negotiated media type and the write versions of
+the tables the response is derived from. The versions are shared by every
+process (see `table_versions`), so any write invalidates the entry; they are
+the ones the request's ETag was built from (see `request_versions`), and if
+they cannot be read the endpoint is called without the cache.
+
+Concurrent misses for the same key are coalesced: one request (the leader)
+computes the response while the others await its result. If the leader is
+cancelled, e.g. because its client disconnected, a waiter takes over. Entries are
+refreshed early with probability growing as they approach expiry
+("XFetch"), so a popular key is usually recomputed by a single request
+before it expires instead of by a stampede after.
+"""
+
+import asyncio
+import functools
+import inspect
+import math
+import random
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Iterable, Optional, TypeVar
+
+from fastapi import Depends, Request, Response, status
+from starlette.concurrency import run_in_threadpool
+
+from src.auth.dependencies import get_token_claims
+from src.config import Config
+from src.utils.metrics import metrics
+from src.utils.responses.conditional import request_versions
+from src.utils.responses.content_negotiation import response_media_type
+
+EndpointType = TypeVar("EndpointType", bound=Callable[..., Awaitable[Response]])
+
+_REQUEST_PARAM = "_response_cache_request"
+_CLAIMS_PARAM = "_response_cache_claims"
+
+
+@dataclass
+class CachedResponse:
+    """A rendered response together with its freshness information."""
+
+    status_code: int
+    body: bytes
+    headers: list[tuple[bytes, bytes]]
+    expires_at: float
+    compute_seconds: float
+
+    def to_response(self) -> Response:
+        response = Response(content=self.body, status_code=self.status_code)
+        response.raw_headers = list(self.headers)
+        return response
+
+
+def auth_scope(claims: Optional[dict[str, Any]], scope: str) -> str:
+    """
+    Resolve the part of the cache key that depends on the caller.
+
+    Args:
+        claims (Optional[dict[str, Any]]): Claims of the caller's verified
+            token, as given by `get_token_claims`; None for public responses.
+        scope (str): `"public"` (shared by everyone), `"role"` (shared by
+            callers with the same JWT role) or `"user"` (per JWT subject).
+
+    Returns:
+        str: The scope component of the key.
+    """
+    if scope == "public":
+        return "public"
+    if scope == "role":
+        return f"role:{(claims or {}).get('role', 'authenticated')}"
+    subject = (claims or {}).get("sub")
+    return f"user:{subject}" if subject else "anonymous"
+
+
+class ResponseCache:
+    """
+    Bounded cache of rendered responses with single-flight recomputation.
+
+    Args:
+        max_entries (int): Maximum number of cached responses (LRU eviction).
+        beta (float): Early refresh aggressiveness; 0 disables early refresh.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = Config.CACHE.MAX_ENTRIES,
+        beta: float = Config.CACHE.BETA,
+    ) -> None:
+        self.max_entries = max_entries
+        self.beta = beta
+        self._entries: OrderedDict[tuple[str, ...], CachedResponse] = OrderedDict()
+        self._inflight: dict[
+            tuple[str, ...], asyncio.Future[Optional[CachedResponse]]
+        ] = {}
+
+    def should_refresh(self, entry: CachedResponse, now: float) -> bool:
+        """Decide whether an entry is (probabilistically) due for recomputation."""
+        if now >= entry.expires_at:
+            return True
+        if self.beta <= 0:
+            return False
+        jitter = -entry.compute_seconds * self.beta * math.log(1.0 - random.random())
+        return now + jitter >= entry.expires_at
+
+    async def get_or_compute(
+        self,
+        key: tuple[str, ...],
+        compute: Callable[[], Awaitable[Response]],
+        ttl: float,
+    ) -> Response:
+        """
+        Return the cached response for a key, computing it at most once at a time.
+
+        Args:
+            key (tuple[str, ...]): The cache key.
+            compute (Callable[[], Awaitable[Response]]): Produces the response.
+            ttl (float): Lifetime of a freshly computed response, in seconds.
+
+        Returns:
+            Response: A response for this request.
+        """
+        while True:
+            now = time.monotonic()
+            entry = self._entries.get(key)
+            if entry is not None and not self.should_refresh(entry, now):
+                self._entries.move_to_end(key)
+                metrics.increment("response_cache.hits")
+                return entry.to_response()
+
+            inflight = self._inflight.get(key)
+            if inflight is None:
+                break
+            if entry is not None and now < entry.expires_at:
+                metrics.increment("response_cache.hits")
+                return entry.to_response()
+            metrics.increment("response_cache.coalesced")
+            computed = await asyncio.shield(inflight)
+            if computed is not None:
+                return computed.to_response()
+            # The leader was cancelled: the first waiter to resume takes over.
+
+        metrics.increment("response_cache.misses")
+        future: asyncio.Future[Optional[CachedResponse]] = (
+            asyncio.get_running_loop().create_future()
+        )
+        self._inflight[key] = future
+        try:
+            started = time.monotonic()
+            response = await compute()
+            finished = time.monotonic()
+            computed = CachedResponse(
+                status_code=response.status_code,
+                body=bytes(response.body),
+                headers=list(response.raw_headers),
+                expires_at=finished + ttl,
+                compute_seconds=finished - started,
+            )
+            if response.status_code == status.HTTP_200_OK:
+                self._entries[key] = computed
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+            future.set_result(computed)
+            return response
+        except asyncio.CancelledError:
+            # Only the leader's request was cancelled: wake the waiters with
+            # None so that one of them computes the response instead.
+            future.set_result(None)
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()
+            raise
+        finally:
+            del self._inflight[key]
+
+    def cached(
+        self,
+        ttl: float = Config.CACHE.TTL,
+        tables: Iterable[str] = (),
+        scope: str = "user",
+    ) -> Callable[[EndpointType], EndpointType]:
+        """
+        Decorate a GET endpoint so its responses are cached.
+
+        Apply it below the route decorator. The endpoint's dependencies are
+        still resolved for every request; only its body is skipped on a hit.
+        Unless the scope is public, the caller's claims come from
+        `get_token_claims`, i.e. from the token `get_access_token` already
+        verified for the request.
+
+        Args:
+            ttl (float): Lifetime of a cached response, in seconds.
+            tables (Iterable[str]): Tables the response is derived from.
+            scope (str): Auth scope of the response, see `auth_scope`.
+
+        Returns:
+            Callable[[EndpointType], EndpointType]: The decorator.
+        """
+        tables = tuple(tables)
+
+        def decorator(endpoint: EndpointType) -> EndpointType:
+            signature = inspect.signature(endpoint)
+
+            @functools.wraps(endpoint)
+            async def wrapper(**kwargs: Any) -> Response:
+                request: Request = kwargs.pop(_REQUEST_PARAM)
+                claims: Optional[dict[str, Any]] = kwargs.pop(_CLAIMS_PARAM, None)
+                known: dict[str, int] = getattr(request.state, "table_versions", {})
+                try:
+                    versions = (
+                        {table: known[table] for table in tables}
+                        if all(table in known for table in tables)
+                        else await run_in_threadpool(request_versions, request, tables)
+                    )
+                except Exception:
+                    return await endpoint(**kwargs)
+                key = (
+                    request.url.path,
+                    "&".join(
+                        f"{name}={value}"
+                        for name, value in sorted(request.query_params.multi_items())
+                    ),
+                    auth_scope(claims, scope),
+                    response_media_type.get(),
+                    *(f"{table}={version}" for table, version in versions.items()),
+                )
+                return await self.get_or_compute(key, lambda: endpoint(**kwargs), ttl)
+
+            parameters = [
+                *signature.parameters.values(),
+                inspect.Parameter(
+                    _REQUEST_PARAM,
+                    inspect.Parameter.KEYWORD_ONLY,
+                    annotation=Request,
+                ),
+            ]
+            if scope != "public":
+                parameters.append(
+                    inspect.Parameter(
+                        _CLAIMS_PARAM,
+                        inspect.Parameter.KEYWORD_ONLY,
+                        annotation=dict[str, Any],
+                        default=Depends(get_token_claims),
+                    )
+                )
+            wrapper.__signature__ = signature.replace(  # type: ignore[attr-defined]
+                parameters=parameters
+            )
+            return wrapper  # type: ignore[return-value]
+
+        return decorator
+
+
+response_cache = ResponseCache()
+"""Response cache shared by the routers of this process."""
@@ -0,0 +1,212 @@
+"""
+Streamed list responses built from paged DAO fetches.
+
+`ItemStream` encodes pages of rows as they are fetched, so the first bytes go
+out before the last page is read and memory stays bounded by one page
+whatever the number of rows. Two formats are supported:
+
+- `json`: the usual `{"message": ..., "data": {"items": [...]}}` envelope,
+  sent in chunks;
+- `ndjson`: one JSON object per line (`application/x-ndjson`).
+
+An optional summary with the number of rows and the sum of a numeric field
+ends the stream: as `data.summary` in JSON and as a final
+`{"summary": {...}}` line in NDJSON.
+
+Streams are only sent in these two formats, not in the binary formats of
+content negotiation (a MessagePack or CBOR envelope needs the number of rows
+up front). Routes read the format with the `stream_format` dependency, which
+answers 406 Not Acceptable when the `Accept` header excludes it.
+
+`ndjson_lines` does the reverse for request bodies, splitting an NDJSON
+upload into lines as it is received, and `BodyStream` streams a response
+produced while the request body is still being read.
+"""
+
+from typing import Any, AsyncIterator, Iterable, Iterator, Literal, Optional
+
+from fastapi import Header, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from pydantic_core import to_json
+from starlette.types import Receive, Scope, Send
+
+from src.utils.responses.content_negotiation import JSON, accepts
+
+NDJSON = "application/x-ndjson"
+
+StreamFormat = Literal["json", "ndjson"]
+
+STREAM_MEDIA_TYPES: dict[str, str] = {"json": JSON, "ndjson": NDJSON}
+"""Media type of each stream format."""
+
+
+def stream_format(
+    format: StreamFormat = Query("json"),
+    accept: Optional[str] = Header(None),
+) -> StreamFormat:
+    """
+    Read the `format` of a streamed response and check the client accepts it.
+
+    Args:
+        format (StreamFormat): The requested format.
+        accept (Optional[str]): The `Accept` header.
+
+    Raises:
+        HTTPException: 406 if `Accept` excludes the format's media type.
+
+    Returns:
+        StreamFormat: The format.
+    """
+    media_type = STREAM_MEDIA_TYPES[format]
+    if not accepts(accept, media_type):
+        raise HTTPException(
+            status_code=status.HTTP_406_NOT_ACCEPTABLE,
+            detail=f"This stream is only available as {media_type}",
+        )
+    return format
+
+
+class Summary:
+    """
+    Running count of streamed rows and sum of one of their fields.
+
+    Args:
+        field (str): The numeric field to sum.
+    """
+
+    def __init__(self, field: str) -> None:
+        self.field = field
+        self.count = 0
+        self.sum = 0.0
+
+    def add(self, rows: list[dict[str, Any]]) -> None:
+        """Account for a page of rows."""
+        self.count += len(rows)
+        self.sum += sum(row[self.field] or 0 for row in rows)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the summary as sent in the footer."""
+        return {"count": self.count, self.field: round(self.sum, 2)}
+
+
+def json_chunks(
+    message: str, pages: Iterable[list[dict[str, Any]]], summary: Optional[Summary]
+) -> Iterator[bytes]:
+    """Encode pages as chunks of an `APIResponse` JSON envelope."""
+    yield to_json({"message": message})[:-1] + b',"data":{"items":['
+    separator = b""
+    for page in pages:
+        if summary is not None:
+            summary.add(page)
+        yield separator + to_json(page)[1:-1]
+        separator = b","
+    if summary is not None:
+        yield b'],"summary":' + to_json(summary.as_dict()) + b"}}"
+    else:
+        yield b"]}}"
+
+
+def ndjson_chunks(
+    pages: Iterable[list[dict[str, Any]]], summary: Optional[Summary]
+) -> Iterator[bytes]:
+    """Encode pages as newline-delimited JSON, one chunk per page."""
+    for page in pages:
+        if summary is not None:
+            summary.add(page)
+        yield b"".join(to_json(row) + b"\n" for row in page)
+    if summary is not None:
+        yield to_json({"summary": summary.as_dict()}) + b"\n"
+
+
+class ItemStream(StreamingResponse):
+    """
+    A streamed list of rows, see the module documentation.
+
+    Args:
+        message (str): Message of the JSON envelope.
+        pages (Iterable[list[dict[str, Any]]]): Pages of rows, fetched lazily.
+        format (StreamFormat): `"json"` or `"ndjson"`.
+        summary_field (Optional[str]): Numeric field summed in the summary
+            footer; no summary is sent when None.
+    """
+
+    def __init__(
+        self,
+        message: str,
+        pages: Iterable[list[dict[str, Any]]],
+        format: StreamFormat = "json",
+        summary_field: Optional[str] = None,
+    ) -> None:
+        summary = Summary(summary_field) if summary_field is not None else None
+        chunks = (
+            ndjson_chunks(pages, summary)
+            if format == "ndjson"
+            else json_chunks(message, pages, summary)
+        )
+        super().__init__(chunks, media_type=STREAM_MEDIA_TYPES[format])
+
+
+class BodyStream(StreamingResponse):
+    """
+    Streamed response whose chunks are produced while reading the request body.
+
+    `StreamingResponse` listens for a disconnect on `receive` while it sends,
+    which would steal the body's messages from the iterator. Here the
+    iterator is the only reader: a disconnect ends the body, and so the
+    iterator and the response, as `Request.stream()` raises
+    `ClientDisconnect`.
+    """
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+
+async def ndjson_lines(
+    chunks: AsyncIterator[bytes], max_line_bytes: int
+) -> AsyncIterator[tuple[int, Optional[bytes]]]:
+    """
+    Split a streamed NDJSON body into lines as its chunks arrive.
+
+    At most one line is buffered: a line longer than `max_line_bytes` is
+    dropped while it is read and reported as None.
+
+    Args:
+        chunks (AsyncIterator[bytes]): The body, e.g. `Request.stream()`.
+        max_line_bytes (int): Longest accepted line.
+
+    Yields:
+        tuple[int, Optional[bytes]]: The 1-based line number and the line,
+        for every non-blank line.
+    """
+    buffer = bytearray()
+    too_long = False
+    number = 0
+
+    def take(piece: bytes) -> None:
+        nonlocal too_long
+        if not too_long:
+            buffer.extend(piece)
+            if len(buffer) > max_line_bytes:
+                too_long = True
+                buffer.clear()
+
+    def line() -> Optional[bytes]:
+        nonlocal too_long
+        value = None if too_long else bytes(buffer)
+        buffer.clear()
+        too_long = False
+        return value
+
+    async for chunk in chunks:
+        *complete, rest = chunk.split(b"\n")
+        for piece in complete:
+            take(piece)
+            number += 1
+            value = line()
+            if value is None or value.strip():
+                yield number, value
+        take(rest)
+    if too_long or buffer.strip():
+        yield number + 1, line()
@@ -4,6 +4,9 @@ from typing import Annotated
 
 from pydantic import BeforeValidator
 
+CATEGORIES = ("electronics", "clothes", "accessories", "food")
+"""Allowed product categories, in the order of their catalog codes."""
+
 
 def validate_category(value: str) -> str:
     """Validate that the category is one of the allowed options.
@@ -17,7 +20,7 @@ def validate_category(value: str) -> str:
     Returns:
         str: The validated category in lowercase.
     """
-    if value.lower() not in ["electronics", "clothes", "accessories", "food"]:
+    if value.lower() not in CATEGORIES:
         raise ValueError("Invalid category")
     return value.lower()
 
@@ -0,0 +1,32 @@
+"""Module for defining the EndOfDayDatetime type."""
+
+from datetime import date, datetime, time
+from typing import Annotated, Any
+
+from pydantic import BeforeValidator
+
+
+def end_of_day(value: Any) -> Any:
+    """Widen a date without a time to the last instant of that day.
+
+    An inclusive upper bound given as `2024-05-31` then covers the whole of
+    May 31st instead of stopping at its midnight.
+
+    Args:
+        value (Any): The value to validate.
+
+    Returns:
+        Any: The end of the day for a date-only string or a date, otherwise
+        the value unchanged for the datetime validation.
+    """
+    if isinstance(value, str) and len(value) == 10:
+        try:
+            value = date.fromisoformat(value)
+        except ValueError:
+            return value
+    if isinstance(value, date) and not isinstance(value, datetime):
+        return datetime.combine(value, time.max)
+    return value
+
+
+EndOfDayDatetime = Annotated[datetime, BeforeValidator(end_of_day)]
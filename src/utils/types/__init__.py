@@ -1,6 +1,14 @@
-from .CategoryStr import CategoryStr
+from .CategoryStr import CATEGORIES, CategoryStr
+from .EndOfDayDatetime import EndOfDayDatetime
 from .PasswordStr import PasswordStr
 from .RatingInt import RatingInt
 from .UuidStr import UuidStr
 
-__all__ = ["UuidStr", "PasswordStr", "RatingInt", "CategoryStr"]
+__all__ = [
+    "UuidStr",
+    "PasswordStr",
+    "RatingInt",
+    "CategoryStr",
+    "CATEGORIES",
+    "EndOfDayDatetime",
+]
@@ -0,0 +1,110 @@
+-- Partition "History" by month of purchase_date.
+--
+-- The `from`/`to` filters of the history endpoints become range conditions
+-- on purchase_date, which Postgres prunes to the overlapping monthly
+-- partitions. Every partition indexes (customer_id, purchase_date) and
+-- (product_id, purchase_date) for the per-customer and per-product queries.
+--
+-- A table cannot be partitioned in place: "History" is renamed, recreated as
+-- a partitioned table with the same columns, foreign keys and row-level
+-- security policies, and its rows are copied over. Drop
+-- "History_unpartitioned" once the copy is checked.
+--
+-- Rows outside the created months land in "History_default". Create the
+-- upcoming partitions ahead of time, e.g. monthly with pg_cron:
+--   select public.create_history_partition((now() + interval '1 month')::date);
+
+begin;
+
+alter table public."History"
+    add column if not exists purchase_date timestamptz default now();
+update public."History" set purchase_date = now() where purchase_date is null;
+
+alter table public."History" rename to "History_unpartitioned";
+
+create table public."History" (
+    like public."History_unpartitioned"
+        including defaults including constraints including identity including generated
+        including comments
+) partition by range (purchase_date);
+
+alter table public."History" alter column purchase_date set not null;
+alter table public."History" add primary key (id, purchase_date);
+create index on public."History" (customer_id, purchase_date);
+create index on public."History" (product_id, purchase_date);
+
+create table public."History_default" partition of public."History" default;
+
+create or replace function public.create_history_partition(month date)
+returns void
+language plpgsql
+as $$
+declare
+    first_day date := date_trunc('month', month)::date;
+begin
+    execute format(
+        'create table if not exists public.%I partition of public."History" '
+        'for values from (%L) to (%L)',
+        'History_' || to_char(first_day, 'YYYY_MM'),
+        to_char(first_day, 'YYYY-MM-DD') || ' 00:00:00+00',
+        to_char(first_day + interval '1 month', 'YYYY-MM-DD') || ' 00:00:00+00'
+    );
+end;
+$$;
+
+select public.create_history_partition(month::date)
+from generate_series(
+    date_trunc(
+        'month',
+        coalesce((select min(purchase_date) from public."History_unpartitioned"), now())
+    ),
+    date_trunc('month', now()) + interval '12 months',
+    interval '1 month'
+) as month;
+
+insert into public."History" select * from public."History_unpartitioned";
+
+do $$
+declare
+    foreign_key record;
+    policy record;
+begin
+    for foreign_key in
+        select conname, pg_get_constraintdef(oid) as definition
+        from pg_constraint
+        where conrelid = 'public."History_unpartitioned"'::regclass and contype = 'f'
+    loop
+        execute format(
+            'alter table public."History" add constraint %I %s',
+            foreign_key.conname,
+            foreign_key.definition
+        );
+    end loop;
+
+    if (
+        select relrowsecurity from pg_class
+        where oid = 'public."History_unpartitioned"'::regclass
+    ) then
+        alter table public."History" enable row level security;
+    end if;
+
+    for policy in
+        select * from pg_policies
+        where schemaname = 'public' and tablename = 'History_unpartitioned'
+    loop
+        execute format(
+            'create policy %I on public."History" as %s for %s to %s %s %s',
+            policy.policyname,
+            policy.permissive,
+            policy.cmd,
+            (select string_agg(quote_ident(role), ', ') from unnest(policy.roles) as role),
+            coalesce('using (' || policy.qual || ')', ''),
+            coalesce('with check (' || policy.with_check || ')', '')
+        );
+    end loop;
+end;
+$$;
+
+notify pgrst, 'reload schema';
+
+commit;
@@ -0,0 +1,55 @@
+-- Shared per-table write versions for ETags and the response cache.
+--
+-- Every insert, update or delete statement on the API tables bumps the
+-- table's row in "table_versions", whichever process, client or dashboard
+-- made the write. The API reads these versions to build ETags and response
+-- cache keys, so every uvicorn worker sees the same versions and a write
+-- handled by one worker invalidates the cached representations of all.
+
+begin;
+
+create table if not exists public.table_versions (
+    table_name text primary key,
+    version bigint not null default 0
+);
+
+alter table public.table_versions enable row level security;
+
+create policy "Table versions are readable by everyone"
+    on public.table_versions for select
+    to anon, authenticated
+    using (true);
+
+create or replace function public.bump_table_version()
+returns trigger
+language plpgsql
+security definer
+set search_path = public
+as $$
+begin
+    insert into public.table_versions as versions (table_name, version)
+    values (tg_table_name, 1)
+    on conflict (table_name) do update set version = versions.version + 1;
+    return null;
+end;
+$$;
+
+do $$
+declare
+    name text;
+begin
+    foreach name in array array['Customers', 'Inventory', 'History', 'Reviews'] loop
+        execute format(
+            'create trigger bump_table_version after insert or update or delete '
+            'on public.%I for each statement execute function public.bump_table_version()',
+            name
+        );
+        insert into public.table_versions (table_name) values (name)
+        on conflict do nothing;
+    end loop;
+end;
+$$;
+
+commit;
+
+notify pgrst, 'reload schema';
@@ -0,0 +1,168 @@
+-- Per-product rating histograms shared by every API process.
+--
+-- "rating_summaries" holds, for every reviewed product, the number of
+-- reviews of each rating from 1 to 5. A row-level trigger on "Reviews"
+-- keeps it current in the same transaction as the write, whichever process,
+-- client or dashboard made it, so every uvicorn worker serves the same
+-- summaries. The same trigger keeps "rating_totals", a single row holding
+-- the number and sum of all ratings, so the global mean the Bayesian average
+-- is pulled towards is read in O(1) instead of summing every histogram.
+--
+-- rebuild_rating_summaries() recomputes the histograms and totals from
+-- "Reviews"; it is restricted to admins (app_metadata.role = 'admin').
+-- add_rating() cannot be called through the API at all.
+
+begin;
+
+create table if not exists public.rating_summaries (
+    product_id uuid primary key,
+    rating_1 bigint not null default 0,
+    rating_2 bigint not null default 0,
+    rating_3 bigint not null default 0,
+    rating_4 bigint not null default 0,
+    rating_5 bigint not null default 0,
+    count bigint generated always as (
+        rating_1 + rating_2 + rating_3 + rating_4 + rating_5
+    ) stored,
+    sum bigint generated always as (
+        rating_1 + 2 * rating_2 + 3 * rating_3 + 4 * rating_4 + 5 * rating_5
+    ) stored
+);
+
+alter table public.rating_summaries enable row level security;
+
+create policy "Rating summaries are readable by everyone"
+    on public.rating_summaries for select
+    to anon, authenticated
+    using (true);
+
+drop view if exists public.rating_totals;
+
+create table if not exists public.rating_totals (
+    id boolean primary key default true check (id),
+    count bigint not null default 0,
+    sum bigint not null default 0
+);
+
+insert into public.rating_totals (id) values (true) on conflict (id) do nothing;
+
+alter table public.rating_totals enable row level security;
+
+create policy "Rating totals are readable by everyone"
+    on public.rating_totals for select
+    to anon, authenticated
+    using (true);
+
+create or replace function public.add_rating(product uuid, rating integer, delta integer)
+returns void
+language plpgsql
+security definer
+set search_path = public
+as $$
+declare
+    inserted boolean;
+    change integer;
+begin
+    if rating not between 1 and 5 then
+        return;
+    end if;
+    execute format(
+        'insert into public.rating_summaries as summaries (product_id, rating_%1$s) '
+        'values ($1, greatest($2, 0)) '
+        'on conflict (product_id) do update '
+        'set rating_%1$s = summaries.rating_%1$s + $2 '
+        'returning xmax = 0',
+        rating
+    ) into inserted using product, delta;
+    change := case when inserted then greatest(delta, 0) else delta end;
+    update public.rating_totals
+    set count = count + change, sum = sum + rating * change
+    where id;
+    delete from public.rating_summaries where product_id = product and count = 0;
+end;
+$$;
+
+create or replace function public.update_rating_summaries()
+returns trigger
+language plpgsql
+security definer
+set search_path = public
+as $$
+begin
+    if tg_op in ('UPDATE', 'DELETE') then
+        perform public.add_rating(old.product_id, old.rating, -1);
+    end if;
+    if tg_op in ('INSERT', 'UPDATE') then
+        perform public.add_rating(new.product_id, new.rating, 1);
+    end if;
+    return null;
+end;
+$$;
+
+create trigger update_rating_summaries
+    after insert or update of product_id, rating or delete on public."Reviews"
+    for each row execute function public.update_rating_summaries();
+
+create or replace function public.rebuild_rating_summaries()
+returns bigint
+language plpgsql
+security definer
+set search_path = public
+as $$
+declare
+    reviews bigint;
+begin
+    if coalesce(auth.jwt() -> 'app_metadata' ->> 'role', '') <> 'admin' then
+        raise exception 'Only admins may rebuild rating summaries'
+            using errcode = '42501';
+    end if;
+    lock table public.rating_summaries in exclusive mode;
+    delete from public.rating_summaries where true;
+    insert into public.rating_summaries
+        (product_id, rating_1, rating_2, rating_3, rating_4, rating_5)
+    select product_id,
+           count(*) filter (where rating = 1),
+           count(*) filter (where rating = 2),
+           count(*) filter (where rating = 3),
+           count(*) filter (where rating = 4),
+           count(*) filter (where rating = 5)
+    from public."Reviews"
+    group by product_id;
+    update public.rating_totals
+    set (count, sum) = (
+        select coalesce(sum(count), 0), coalesce(sum(sum), 0)
+        from public.rating_summaries
+    )
+    where id
+    returning count into reviews;
+    return reviews;
+end;
+$$;
+
+revoke execute on function public.add_rating(uuid, integer, integer)
+    from public, anon, authenticated;
+revoke execute on function public.rebuild_rating_summaries() from public, anon;
+grant execute on function public.rebuild_rating_summaries() to authenticated;
+
+insert into public.rating_summaries
+    (product_id, rating_1, rating_2, rating_3, rating_4, rating_5)
+select product_id,
+       count(*) filter (where rating = 1),
+       count(*) filter (where rating = 2),
+       count(*) filter (where rating = 3),
+       count(*) filter (where rating = 4),
+       count(*) filter (where rating = 5)
+from public."Reviews"
+group by product_id
+on conflict (product_id) do nothing;
+
+update public.rating_totals
+set (count, sum) = (
+    select coalesce(sum(count), 0), coalesce(sum(sum), 0)
+    from public.rating_summaries
+)
+where id;
+
+commit;
+
+notify pgrst, 'reload schema';
@@ -1,11 +1,12 @@
 import random
 import uuid
 from typing import Any
-from unittest.mock import Mock
+from unittest.mock import AsyncMock, Mock
 
 import pytest
 from fastapi import HTTPException
 from gotrue import AuthResponse as GoTrueAuthResponse  # type: ignore
+from gotrue.errors import AuthApiError  # type: ignore
 from gotrue.types import Session as GoTrueSession  # type: ignore
 from gotrue.types import User as GoTrueUser
 from pydantic import EmailStr, PositiveInt
@@ -13,6 +14,7 @@ from pydantic import EmailStr, PositiveInt
 from src.auth.auth import login, register
 from src.auth.schemas import LoginRequest, RegisterRequest
 from src.db.models import Customer
+from src.indexes.emails import EmailIndex
 from src.session import Session
 from src.utils.types import PasswordStr
 
@@ -103,16 +105,15 @@ class TestRegister:
         user1: Customer,
         gotrue_user: GoTrueUser,
     ) -> None:
-        user_dao = Mock()
-        user_dao.get_by_query.return_value = None
-        user_dao.client.auth.sign_up.return_value = GoTrueAuthResponse(
+        auth = AsyncMock()
+        auth.sign_up.return_value = GoTrueAuthResponse(
             user=gotrue_user,
             session=None,
         )
 
-        response = register(register_request, user_dao)
+        response = await register(register_request, auth)
 
-        assert user_dao.client.auth.sign_up.called
+        assert auth.sign_up.called
 
         assert response.customer == user1
         assert response.session is None
@@ -173,9 +174,8 @@ class TestRegister:
         marital_status: str,
         email: EmailStr,
     ) -> None:
-        user_dao = Mock()
-        user_dao.get_by_query.return_value = None
-        user_dao.client.auth.sign_up.return_value = GoTrueAuthResponse(
+        auth = AsyncMock()
+        auth.sign_up.return_value = GoTrueAuthResponse(
             user=GoTrueUser(
                 id=user1.id,
                 email=email,
@@ -195,27 +195,26 @@ class TestRegister:
         )
 
         with pytest.raises(Exception):
-            register(register_request, user_dao)
+            await register(register_request, auth)
 
     async def test_register_email_in_use(
         self, register_request: RegisterRequest, user1: Customer
     ) -> None:
-        user_dao = Mock()
-        user_dao.get_by_query.return_value = user1
+        auth = AsyncMock()
+        auth.sign_up.side_effect = AuthApiError("User already registered", 422, None)
 
-        with pytest.raises(Exception) as exc:
-            register(register_request, user_dao)
-            assert "Email already in use" in str(exc.value)
+        with pytest.raises(HTTPException) as exc:
+            await register(register_request, auth)
+        assert exc.value.detail == "Registration failed, please check your credentials"
 
     async def test_register_failed(
         self, register_request: RegisterRequest, user1: Customer
     ) -> None:
-        user_dao = Mock()
-        user_dao.get_by_query.return_value = None
-        user_dao.client.auth.sign_up.side_effect = Exception()
+        auth = AsyncMock()
+        auth.sign_up.side_effect = Exception()
 
         with pytest.raises(Exception) as exc:
-            register(register_request, user_dao)
+            await register(register_request, auth)
             assert "Registration failed, please check your credentials" in str(
                 exc.value
             )
@@ -241,23 +240,21 @@ class TestRegister:
     async def test_register_password_too_short(
         self, register_request: RegisterRequest, password: PasswordStr
     ) -> None:
-        user_dao = Mock()
-        user_dao.client.auth.sign_up.side_effect = Exception()
+        auth = AsyncMock()
+        auth.sign_up.side_effect = Exception()
         register_request.password = password
         with pytest.raises(Exception) as exc:
-            register(register_request, user_dao)
+            await register(register_request, auth)
             assert exc.type == HTTPException
 
     async def test_register_email_rate_limit_exceeded(
         self, register_request: RegisterRequest
     ) -> None:
-        user_dao = Mock()
-        user_dao.client.auth.sign_up.side_effect = Exception(
-            "Email rate limit exceeded"
-        )
+        auth = AsyncMock()
+        auth.sign_up.side_effect = Exception("Email rate limit exceeded")
 
         with pytest.raises(Exception) as exc:
-            register(register_request, user_dao)
+            await register(register_request, auth)
             assert "Email rate limit exceeded, please try again later" in str(exc.value)
 
 
@@ -272,32 +269,75 @@ class TestLogin:
         gotrue_session: GoTrueSession,
     ) -> None:
         user_dao = Mock()
-        user_dao.get_by_query.return_value = user1
-        user_dao.client.auth.sign_in_with_password.return_value = GoTrueAuthResponse(
+        auth = AsyncMock()
+        user_dao.get_by_query.return_value = [user1]
+        auth.sign_in_with_password.return_value = GoTrueAuthResponse(
             user=gotrue_user, session=gotrue_session
         )
 
-        response = login(login_request, user_dao)
+        response = await login(login_request, user_dao, auth)
 
         assert user_dao.get_by_query.called
-        assert user_dao.client.auth.sign_in_with_password.called
+        assert auth.sign_in_with_password.called
 
         assert response.customer == user1
         assert response.session == session
 
     async def test_login_user_not_found(self, login_request: LoginRequest) -> None:
         user_dao = Mock()
+        auth = AsyncMock()
         user_dao.get_by_query.return_value = None
 
         with pytest.raises(Exception) as exc:
-            login(login_request, user_dao)
+            await login(login_request, user_dao, auth)
             assert "User not found" in str(exc.value)
 
     async def test_login_failed(self, login_request: LoginRequest) -> None:
         user_dao = Mock()
+        auth = AsyncMock()
         user_dao.get_by_query.return_value = None
-        user_dao.client.auth.sign_in_with_password.side_effect = Exception()
+        auth.sign_in_with_password.side_effect = Exception()
 
         with pytest.raises(Exception) as exc:
-            login(login_request, user_dao)
+            await login(login_request, user_dao, auth)
             assert "Login failed, please check your credentials" in str(exc.value)
+
+    async def test_login_known_email_skips_lookup(
+        self,
+        login_request: LoginRequest,
+        user1: Customer,
+        gotrue_user: GoTrueUser,
+        gotrue_session: GoTrueSession,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        index = EmailIndex()
+        index.load([{"id": user1.id, "email": user1.email}])
+        monkeypatch.setattr("src.auth.auth.email_index", index)
+        user_dao = Mock()
+        auth = AsyncMock()
+        auth.sign_in_with_password.return_value = GoTrueAuthResponse(
+            user=gotrue_user, session=gotrue_session
+        )
+
+        response = await login(login_request, user_dao, auth)
+
+        assert not user_dao.get_by_query.called
+        assert response.customer == user1
+
+    async def test_login_unknown_email_skips_lookup(
+        self, login_request: LoginRequest, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        index = EmailIndex()
+        index.load([])
+        monkeypatch.setattr("src.auth.auth.email_index", index)
+        user_dao = Mock()
+        auth = AsyncMock()
+        auth.sign_in_with_password.side_effect = AuthApiError(
+            "Invalid login credentials", 400, None
+        )
+
+        with pytest.raises(HTTPException) as exc:
+            await login(login_request, user_dao, auth)
+
+        assert exc.value.detail == "Customer not found"
+        assert not user_dao.get_by_query.called
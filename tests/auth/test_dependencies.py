@@ -2,11 +2,17 @@ import time
 from unittest.mock import Mock, patch
 
 import pytest
-from fastapi import HTTPException
+from fastapi import HTTPException, Request
 from fastapi.security import HTTPAuthorizationCredentials
-from jwt import InvalidSignatureError, InvalidTokenError, encode
+from jwt import InvalidSignatureError, encode
 
-from src.auth.dependencies import decode_jwt, get_access_token, get_refresh_token
+from src.auth.dependencies import (
+    get_access_token,
+    get_refresh_token,
+    get_token_claims,
+    get_user_id,
+    require_admin,
+)
 
 
 @pytest.fixture
@@ -14,11 +20,6 @@ def valid_signature() -> str:
     return "SflKxwRJSMeKKF2QT4fwpMeJf36POk6yJV_adQssw5c"
 
 
-@pytest.fixture
-def invalid_signature() -> str:
-    return "invalid-signature"
-
-
 @pytest.fixture
 def valid_jwt(valid_signature: str) -> str:
     return encode(
@@ -50,65 +51,63 @@ def valid_refresh_token() -> str:
     return "iL5m3C43Qg_1FVq3mGCNdQ"
 
 
-@patch("src.auth.dependencies.Config")
-class TestDecodeJwt:
-    def test_decode_jwt(
-        self, mock_config: Mock, valid_jwt: str, valid_signature: str
-    ) -> None:
-        mock_config.JWT.SECRET = valid_signature
-        mock_config.JWT.ALGORITHM = "HS256"
-        mock_config.JWT.AUDIENCE = "authenticated"
-        decoded_data = decode_jwt(valid_jwt)
-        assert decoded_data["aud"] == "authenticated"
-        assert int(decoded_data["exp"]) > int(time.time())
-        assert int(decoded_data["iat"]) <= int(time.time())
-
-    def test_decode_jwt_invalid(
-        self, mock_config: Mock, invalid_signature: str, invalid_jwt: str
-    ) -> None:
-        mock_config.JWT.SECRET = invalid_signature
-        mock_config.JWT.ALGORITHM = "HS256"
-        mock_config.JWT.AUDIENCE = "authenticated"
-        with pytest.raises(InvalidTokenError):
-            decode_jwt(invalid_jwt)
-
-    def test_decode_jwt_expired(
-        self, mock_config: Mock, valid_signature: str, invalid_jwt: str
-    ) -> None:
-        mock_config.JWT.SECRET = valid_signature
-        mock_config.JWT.ALGORITHM = "HS256"
-        mock_config.JWT.AUDIENCE = "authenticated"
-        with pytest.raises(InvalidTokenError):
-            decode_jwt(invalid_jwt)
-
-
 class TestGetAccessToken:
     @pytest.mark.asyncio
-    @patch("src.auth.dependencies.decode_jwt")
-    async def test_get_access_token(
-        self, mock_decode_jwt: Mock, valid_jwt: str
-    ) -> None:
-        mock_decode_jwt.return_value = {
+    @patch("src.auth.dependencies.jwt_verifier")
+    async def test_get_access_token(self, mock_verifier: Mock, valid_jwt: str) -> None:
+        mock_verifier.verify.return_value = {
             "aud": "authenticated",
             "exp": 1718519256,
             "iat": 1718515656,
         }
         bearer = HTTPAuthorizationCredentials(scheme="Bearer", credentials=valid_jwt)
-        token = await get_access_token(bearer)
+        request = Request({"type": "http"})
+        token = await get_access_token(request, bearer)
         assert token == valid_jwt
+        claims = await get_token_claims(request, token)
+        assert claims == mock_verifier.verify.return_value
+        mock_verifier.verify.assert_called_once_with(valid_jwt)
 
     @pytest.mark.asyncio
-    @patch("src.auth.dependencies.decode_jwt")
+    @patch("src.auth.dependencies.jwt_verifier")
     async def test_get_access_token_invalid(
-        self, mock_decode_jwt: Mock, invalid_jwt: str
+        self, mock_verifier: Mock, invalid_jwt: str
     ) -> None:
         bearer = HTTPAuthorizationCredentials(scheme="Bearer", credentials=invalid_jwt)
-        mock_decode_jwt.side_effect = InvalidSignatureError
+        mock_verifier.verify.side_effect = InvalidSignatureError
         with pytest.raises(HTTPException) as e:
-            await get_access_token(bearer)
+            await get_access_token(Request({"type": "http"}), bearer)
         assert e.value.status_code == 401
 
 
+class TestGetUserId:
+    @pytest.mark.asyncio
+    async def test_get_user_id(self) -> None:
+        assert await get_user_id({"sub": "user-1"}) == "user-1"
+
+    @pytest.mark.asyncio
+    async def test_without_subject(self) -> None:
+        with pytest.raises(HTTPException) as e:
+            await get_user_id({})
+        assert e.value.status_code == 401
+
+
+class TestRequireAdmin:
+    @pytest.mark.asyncio
+    async def test_admin(self) -> None:
+        claims = {"app_metadata": {"role": "admin"}}
+        assert await require_admin(claims) == claims
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "claims", [{}, {"role": "admin"}, {"app_metadata": {"role": "user"}}]
+    )
+    async def test_not_admin(self, claims: dict) -> None:
+        with pytest.raises(HTTPException) as e:
+            await require_admin(claims)
+        assert e.value.status_code == 403
+
+
 class TestGetRefreshToken:
     @pytest.mark.asyncio
     async def test_get_refresh_token(self, valid_refresh_token: str) -> None:
@@ -0,0 +1,75 @@
+import anyio
+import httpx
+import pytest
+from fastapi import HTTPException, status
+from supabase import AuthRetryableError
+
+from src.auth.gotrue_client import get_gotrue_client, gotrue_call, gotrue_http_client
+from src.config import Config
+
+
+@pytest.fixture(autouse=True)
+def supabase(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(Config.SUPABASE, "URL", "http://localhost:54321")
+    monkeypatch.setattr(Config.SUPABASE, "KEY", "anon-key")
+
+
+class TestGetGotrueClient:
+    def test_clients_share_the_connection_pool(self) -> None:
+        first = get_gotrue_client()
+        second = get_gotrue_client()
+        assert first is not second
+        assert first._http_client is second._http_client is gotrue_http_client()
+
+    def test_url_and_key(self) -> None:
+        client = get_gotrue_client()
+        assert client._url == "http://localhost:54321/auth/v1"
+        assert client._headers["apikey"] == "anon-key"
+
+    def test_missing_settings(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(Config.SUPABASE, "KEY", None)
+        with pytest.raises(ValueError):
+            get_gotrue_client()
+
+    @pytest.mark.asyncio
+    async def test_sign_in(self) -> None:
+        requests: list[httpx.Request] = []
+
+        def handle(request: httpx.Request) -> httpx.Response:
+            requests.append(request)
+            return httpx.Response(400, json={"msg": "Invalid login credentials"})
+
+        client = get_gotrue_client()
+        client._http_client = httpx.AsyncClient(transport=httpx.MockTransport(handle))
+        with pytest.raises(Exception):
+            await client.sign_in_with_password(
+                {"email": "rayan@mail.com", "password": "Password123!"}
+            )
+        (request,) = requests
+        assert request.url.path == "/auth/v1/token"
+        assert request.headers["apikey"] == "anon-key"
+
+
+@pytest.mark.asyncio
+class TestGotrueCall:
+    async def test_result(self) -> None:
+        async def call() -> str:
+            return "ok"
+
+        assert await gotrue_call(call()) == "ok"
+
+    async def test_timeout(self) -> None:
+        async def call() -> None:
+            await anyio.sleep(1)
+
+        with pytest.raises(HTTPException) as exc:
+            await gotrue_call(call(), timeout=0.01)
+        assert exc.value.status_code == status.HTTP_504_GATEWAY_TIMEOUT
+
+    async def test_unreachable(self) -> None:
+        async def call() -> None:
+            raise AuthRetryableError("Connection refused", 0)
+
+        with pytest.raises(HTTPException) as exc:
+            await gotrue_call(call())
+        assert exc.value.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
@@ -0,0 +1,79 @@
+import time
+from typing import Any
+
+import pytest
+from jwt import ExpiredSignatureError, InvalidSignatureError, encode
+
+from src.auth.jwt_verifier import JWTVerifier
+from src.utils.metrics import metrics
+
+SECRET = "SflKxwRJSMeKKF2QT4fwpMeJf36POk6yJV_adQssw5c"
+
+
+def token(sub: str = "user", ttl: float = 3600, **claims: Any) -> str:
+    return encode(
+        {"aud": "authenticated", "sub": sub, "exp": int(time.time() + ttl), **claims},
+        SECRET,
+        algorithm="HS256",
+    )
+
+
+@pytest.fixture
+def verifier() -> JWTVerifier:
+    return JWTVerifier(SECRET, "HS256", "authenticated", max_entries=2)
+
+
+class TestJWTVerifier:
+    def test_verified_claims_are_cached(self, verifier: JWTVerifier) -> None:
+        hits = metrics.get("auth.jwt_cache_hits")
+        encoded = token()
+        assert verifier.verify(encoded)["sub"] == "user"
+        assert verifier.verify(encoded)["sub"] == "user"
+        assert metrics.get("auth.jwt_cache_hits") == hits + 1
+        assert len(verifier) == 1
+
+    def test_entries_expire_at_exp(
+        self, verifier: JWTVerifier, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        encoded = token(ttl=60)
+        verifier.verify(encoded)
+        misses = metrics.get("auth.jwt_cache_misses")
+        later = time.time() + 120
+        monkeypatch.setattr("src.auth.jwt_verifier.time.time", lambda: later)
+        verifier.verify(encoded)
+        assert metrics.get("auth.jwt_cache_misses") == misses + 1
+
+    def test_expired_tokens_are_rejected(self, verifier: JWTVerifier) -> None:
+        with pytest.raises(ExpiredSignatureError):
+            verifier.verify(token(ttl=-60))
+        assert len(verifier) == 0
+
+    def test_least_recently_used_is_evicted(self, verifier: JWTVerifier) -> None:
+        first, second, third = token("a"), token("b"), token("c")
+        verifier.verify(first)
+        verifier.verify(second)
+        verifier.verify(first)
+        verifier.verify(third)
+        misses = metrics.get("auth.jwt_cache_misses")
+        verifier.verify(first)
+        assert metrics.get("auth.jwt_cache_misses") == misses
+        verifier.verify(second)
+        assert metrics.get("auth.jwt_cache_misses") == misses + 1
+
+    def test_invalid_tokens_are_not_cached(self, verifier: JWTVerifier) -> None:
+        forged = encode(
+            {"aud": "authenticated", "exp": int(time.time()) + 60}, "other-secret"
+        )
+        for _ in range(2):
+            with pytest.raises(InvalidSignatureError):
+                verifier.verify(forged)
+        assert len(verifier) == 0
+
+    def test_tokens_without_exp_are_not_cached(self, verifier: JWTVerifier) -> None:
+        encoded = encode({"aud": "authenticated"}, SECRET, algorithm="HS256")
+        assert verifier.verify(encoded) == {"aud": "authenticated"}
+        assert len(verifier) == 0
+
+    def test_missing_secret(self) -> None:
+        with pytest.raises(ValueError):
+            JWTVerifier(None).verify(token())
@@ -1,7 +1,7 @@
 import random
 import uuid
 from typing import Any
-from unittest.mock import Mock
+from unittest.mock import AsyncMock, Mock
 
 import pytest
 from gotrue import AuthResponse as GoTrueAuthResponse  # type: ignore
@@ -77,22 +77,26 @@ def gotrue_user(user1: Customer) -> GoTrueUser:
     )
 
 
+@pytest.mark.asyncio
 class TestResetPassword:
-    def test_reset_password_successful(
+    async def test_reset_password_successful(
         self,
         reset_password_request: ResetPasswordRequest,
         user1: Customer,
         gotrue_user: GoTrueUser,
     ) -> None:
-        user_dao = Mock()
-        user_dao.client.auth.update_user.return_value = GoTrueAuthResponse(
+        auth = AsyncMock()
+        auth.update_user.return_value = GoTrueAuthResponse(
             user=gotrue_user,
             session=None,
         )
 
-        response = reset_password(reset_password_request, user_dao)
+        response = await reset_password(
+            reset_password_request, "access_token", "refresh_token", auth
+        )
 
-        assert user_dao.client.auth.update_user.called
+        auth.set_session.assert_awaited_once_with("access_token", "refresh_token")
+        auth.update_user.assert_awaited_once_with({"password": "newPasSword123"})
 
         assert response.customer == user1
 
@@ -114,18 +118,28 @@ class TestResetPassword:
             "Password1!",
         ],
     )
-    def test_reset_password_invalid_password(
+    async def test_reset_password_invalid_password(
         self, password: PasswordStr, reset_password_request: ResetPasswordRequest
     ) -> None:
-        user_dao = Mock()
-        user_dao.client.auth.update_user.side_effect = Exception()
+        auth = AsyncMock()
+        auth.update_user.side_effect = Exception()
 
         with pytest.raises(Exception):
-            reset_password(ResetPasswordRequest(password="password"), user_dao)
+            await reset_password(
+                ResetPasswordRequest(password="password"),
+                "access_token",
+                "refresh_token",
+                auth,
+            )
 
-    def test_reset_password_user_not_auth(self) -> None:
-        user_dao = Mock()
-        user_dao.get_by_query.return_value = None
+    async def test_reset_password_user_not_auth(self) -> None:
+        auth = AsyncMock()
+        auth.set_session.side_effect = Exception()
 
         with pytest.raises(Exception):
-            reset_password(ResetPasswordRequest(password="password"), user_dao)
+            await reset_password(
+                ResetPasswordRequest(password="password"),
+                "access_token",
+                "refresh_token",
+                auth,
+            )
@@ -1,7 +1,7 @@
 import random
 import uuid
-from typing import Any
-from unittest.mock import Mock
+from typing import Any, Iterator
+from unittest.mock import AsyncMock, Mock
 
 import pytest
 from fastapi import status
@@ -17,9 +17,16 @@ from src.auth.router import (
 )
 from src.auth.schemas import LoginRequest, RegisterRequest, ResetPasswordRequest
 from src.db.models import Customer
+from src.indexes.emails import email_index
 from src.session import Session
 
 
+@pytest.fixture(autouse=True)
+def unloaded_email_index() -> Iterator[None]:
+    yield
+    email_index.loaded_at = None
+
+
 @pytest.fixture
 def register_request() -> Any:
     return RegisterRequest(
@@ -112,12 +119,14 @@ class TestRegisterRoute:
         user1: Customer,
     ) -> None:
         user_dao = Mock()
-        user_dao.get_by_query.return_value = None
-        user_dao.client.auth.sign_up.return_value = GoTrueAuthResponse(
+        auth = AsyncMock()
+        user_dao.iter_pages.return_value = iter([])
+        user_dao.get_by_query.return_value = []
+        auth.sign_up.return_value = GoTrueAuthResponse(
             user=gotrue_user,
             session=None,
         )
-        response = await register_route(register_request, user_dao)
+        response = await register_route(register_request, user_dao, auth)
         res = eval(response.body, {"null": None})
 
         assert response.status_code == status.HTTP_200_OK
@@ -125,6 +134,24 @@ class TestRegisterRoute:
             "message": "Registration successful",
             "data": {"customer": user1.model_dump(), "session": None},
         }
+        # The index's "absent" is confirmed in the table.
+        user_dao.get_by_query.assert_called_once_with(email=register_request.email)
+        assert email_index.lookup(register_request.email) is True
+
+    async def test_register_route_email_in_use(
+        self, register_request: RegisterRequest, user1: Customer
+    ) -> None:
+        user_dao = Mock()
+        auth = AsyncMock()
+        user_dao.iter_pages.return_value = iter(
+            [[{"id": user1.id, "email": user1.email}]]
+        )
+        response = await register_route(register_request, user_dao, auth)
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert eval(response.body)["message"] == "Email already in use"
+        assert not user_dao.get_by_query.called
+        assert not auth.sign_up.called
 
 
 @pytest.mark.asyncio
@@ -138,11 +165,15 @@ class TestLoginRoute:
         session: Session,
     ) -> None:
         user_dao = Mock()
-        user_dao.client.auth.sign_in_with_password.return_value = GoTrueAuthResponse(
+        auth = AsyncMock()
+        user_dao.iter_pages.return_value = iter(
+            [[{"id": user1.id, "email": user1.email}]]
+        )
+        auth.sign_in_with_password.return_value = GoTrueAuthResponse(
             user=gotrue_user,
             session=gotrue_session,
         )
-        response = await login_route(login_request, user_dao)
+        response = await login_route(login_request, user_dao, auth)
         res = eval(response.body)
 
         assert response.status_code == status.HTTP_200_OK
@@ -153,6 +184,7 @@ class TestLoginRoute:
                 "session": session.model_dump(),
             },
         }
+        assert not user_dao.get_by_query.called
 
 
 @pytest.mark.asyncio
@@ -169,12 +201,12 @@ class TestRefreshTokenRoute:
         user1: Customer,
         session: Session,
     ) -> None:
-        user_dao = Mock()
-        user_dao.client.auth.refresh_session.return_value = GoTrueAuthResponse(
+        auth = AsyncMock()
+        auth.refresh_session.return_value = GoTrueAuthResponse(
             user=gotrue_user,
             session=gotrue_session,
         )
-        response = await refresh_token_route(user_dao)
+        response = await refresh_token_route("refresh_token", auth)
         res = eval(response.body)
 
         assert response.status_code == status.HTTP_200_OK
@@ -205,12 +237,14 @@ class TestResetPasswordRoute:
         gotrue_user: GoTrueUser,
         user1: Customer,
     ) -> None:
-        user_dao = Mock()
-        user_dao.client.auth.update_user.return_value = GoTrueAuthResponse(
+        auth = AsyncMock()
+        auth.update_user.return_value = GoTrueAuthResponse(
             user=gotrue_user,
             session=None,
         )
-        response = await reset_password_route(reset_password_request, user_dao)
+        response = await reset_password_route(
+            reset_password_request, "access_token", "refresh_token", auth
+        )
         res = eval(response.body, {"null": None})
 
         assert response.status_code == status.HTTP_200_OK
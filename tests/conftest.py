@@ -0,0 +1,31 @@
+from collections import defaultdict
+from pathlib import Path
+from typing import Iterable, Iterator
+
+import pytest
+
+from src.db.table_versions import table_versions
+from src.utils.rate_limit import SharedCounters, rate_limiter
+
+
+@pytest.fixture(autouse=True)
+def versions(monkeypatch: pytest.MonkeyPatch) -> defaultdict[str, int]:
+    """Table versions kept in memory instead of the `table_versions` table."""
+    versions: defaultdict[str, int] = defaultdict(int)
+
+    def get(tables: Iterable[str]) -> dict[str, int]:
+        return {table: versions[table] for table in tables}
+
+    monkeypatch.setattr(table_versions, "get", get)
+    return versions
+
+
+@pytest.fixture(autouse=True)
+def rate_limit_counters(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> Iterator[SharedCounters]:
+    """Rate limit counters of this test only, instead of the shared ones."""
+    counters = SharedCounters(str(tmp_path / "rate-limit"), slots=1024)
+    monkeypatch.setattr(rate_limiter, "counters", counters)
+    yield counters
+    counters.close()
@@ -1,17 +1,26 @@
+import asyncio
+import json
 import random
+import uuid
 from typing import Any, Optional, get_type_hints
 from unittest.mock import Mock
-import uuid
+
 import pytest
-from fastapi import Query, status
-from pydantic import BaseModel as PydanticBaseModel, create_model
+from fastapi import FastAPI, Query, status
+from fastapi.testclient import TestClient
+from pydantic import BaseModel as PydanticBaseModel
+from pydantic import create_model
 from supabase import Client
+
+from src.config import Config
+from src.controllers.routers import BaseRouter
 from src.db.dao import BaseDAO
 from src.db.models import BaseModel
 from src.utils.data.ValidData import ValidItems
-from src.controllers.routers import BaseRouter
 from src.utils.responses import APIResponse
 from src.utils.types import UuidStr
+
+
 # from tests.fixtures.db.dao._base_dao import TestDAO
 # from tests.fixtures.db.models._base_model import TestObject
 class TestObject(BaseModel):
@@ -37,6 +46,7 @@ def test_object1(test_objects: list[TestObject]) -> TestObject:
 def test_object2(test_objects: list[TestObject]) -> TestObject:
     return test_objects[1]
 
+
 class TestDAO(BaseDAO[TestObject]):
     __test__ = False
 
@@ -116,10 +126,12 @@ def router_error(test_dao_error: TestDAO) -> BaseRouter[TestObject]:
         get_dao=lambda: test_dao_error,
     )
 
+
 @pytest.fixture
 def uuid_generator() -> Mock:
     return Mock(side_effect=lambda: str(uuid.UUID(int=random.getrandbits(128))))
 
+
 @pytest.fixture
 def test_query() -> PydanticBaseModel:
     fields = dict(get_type_hints(TestObject))
@@ -215,3 +227,253 @@ class TestDelete:
 
         assert response.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
         assert res == {"message": "error", "data": {}}
+
+
+class TestRequestSchemas:
+    def test_create_schema(self, router_error: BaseRouter[TestObject]) -> None:
+        schema = router_error.create_schema
+        assert "id" not in schema.model_fields
+        assert schema(name="test_name").model_dump() == {"name": "test_name"}
+        with pytest.raises(ValueError):
+            schema()
+
+    def test_create_schema_cached(self) -> None:
+        assert TestObject.create_schema() is TestObject.create_schema()
+
+    def test_update_schema(self, router_error: BaseRouter[TestObject]) -> None:
+        schema = router_error.update_schema
+        assert schema().model_dump(exclude_unset=True) == {}
+        assert schema(name="new_name").model_dump(exclude_unset=True) == {
+            "name": "new_name"
+        }
+        with pytest.raises(ValueError):
+            schema(name=None)
+
+    def test_create_endpoint_validates_once(
+        self, test_dao_error: TestDAO, test_object1: TestObject
+    ) -> None:
+        dao = Mock(wraps=test_dao_error)
+        dao.create.return_value = test_object1
+        app = FastAPI()
+        app.include_router(
+            BaseRouter[TestObject](
+                prefix="/test",
+                tags=["test"],
+                name="test",
+                model=TestObject,
+                get_dao=lambda: dao,
+            ).build_router()
+        )
+        client = TestClient(app)
+
+        response = client.post("/test/", json={"name": "test_name"})
+        assert response.status_code == status.HTTP_201_CREATED
+        (request,), _ = dao.create.call_args
+        assert isinstance(request, TestObject.create_schema())
+
+        response = client.post("/test/", json={"wrong": "field"})
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+@pytest.mark.asyncio
+class TestPassthrough:
+    async def test_get_by_query_passthrough(
+        self, test_dao_error: TestDAO, test_query: PydanticBaseModel
+    ) -> None:
+        router = BaseRouter[TestObject](
+            prefix="/test",
+            tags=["test"],
+            name="test",
+            model=TestObject,
+            get_dao=lambda: test_dao_error,
+            passthrough=True,
+        )
+        raw = b'[{"id":null,"name":"test_name"}]'
+        test_dao_error.get_raw_by_query = Mock(return_value=raw)  # type: ignore[method-assign]
+
+        response = await router.get_by_query(test_query, test_dao_error)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert (
+            response.body == b'{"message":"tests found","data":{"items":' + raw + b"}}"
+        )
+
+    async def test_get_by_query_passthrough_empty(
+        self, test_dao_error: TestDAO, test_query: PydanticBaseModel
+    ) -> None:
+        router = BaseRouter[TestObject](
+            prefix="/test",
+            tags=["test"],
+            name="test",
+            model=TestObject,
+            get_dao=lambda: test_dao_error,
+            passthrough=True,
+        )
+        test_dao_error.get_raw_by_query = Mock(return_value=b"[]")  # type: ignore[method-assign]
+
+        response = await router.get_by_query(test_query, test_dao_error)
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+class TestExport:
+    def client(self, router: BaseRouter[TestObject]) -> TestClient:
+        app = FastAPI()
+        app.include_router(router.build_router())
+        return TestClient(app)
+
+    def test_export_route_precedes_id(
+        self,
+        router_successful: BaseRouter[TestObject],
+        test_dao_successful: TestDAO,
+        test_objects: list[TestObject],
+    ) -> None:
+        test_dao_successful.iter_pages = Mock(  # type: ignore[method-assign]
+            return_value=iter(
+                [[test_object.model_dump() for test_object in test_objects]]
+            )
+        )
+        response = self.client(router_successful).get("/test/export")
+        assert response.status_code == status.HTTP_200_OK
+        assert (
+            response.headers["content-disposition"] == 'attachment; filename="test.csv"'
+        )
+        assert response.text.splitlines() == [
+            "id,name",
+            *(f"{test_object.id},{test_object.name}" for test_object in test_objects),
+        ]
+
+    def test_export_error(
+        self, router_error: BaseRouter[TestObject], test_dao_error: TestDAO
+    ) -> None:
+        test_dao_error.iter_pages = Mock(side_effect=Exception("error"))  # type: ignore[method-assign]
+        response = self.client(router_error).get(
+            "/test/export", params={"format": "ndjson"}
+        )
+        assert response.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
+
+
+class TestCreateMany:
+    def client(self, dao: TestDAO) -> TestClient:
+        app = FastAPI()
+        app.include_router(
+            BaseRouter[TestObject](
+                prefix="/test",
+                tags=["test"],
+                name="test",
+                model=TestObject,
+                get_dao=lambda: dao,
+            ).build_router()
+        )
+        return TestClient(app)
+
+    def test_create_many_json(
+        self, test_dao_error: TestDAO, test_object1: TestObject
+    ) -> None:
+        test_dao_error.create_many = Mock(return_value=[test_object1])  # type: ignore[method-assign]
+        client = self.client(test_dao_error)
+
+        response = client.post("/test/many", json=[{"name": "test_name"}])
+        assert response.status_code == status.HTTP_201_CREATED
+
+        response = client.post("/test/many", json=[{"wrong": "field"}])
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+        assert response.json()["detail"][0]["loc"] == ["body", 0, "name"]
+
+        response = client.post(
+            "/test/many", content=b"[", headers={"Content-Type": "application/json"}
+        )
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+    def test_create_many_ndjson(
+        self,
+        test_dao_error: TestDAO,
+        test_object1: TestObject,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        monkeypatch.setattr(Config.INGEST, "BATCH_SIZE", 2)
+        batches = []
+
+        def create_many(items: list[Any]) -> list[TestObject]:
+            batches.append([item.name for item in items])
+            return [test_object1] * len(items)
+
+        test_dao_error.create_many = Mock(side_effect=create_many)  # type: ignore[method-assign]
+        body = b'{"name":"a"}\n{"wrong":1}\n\n{"name":"b"}\n{"name":"c"}'
+
+        response = self.client(test_dao_error).post(
+            "/test/many", content=body, headers={"Content-Type": "application/x-ndjson"}
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        results = [json.loads(line) for line in response.text.splitlines()]
+        assert batches == [["a"], ["b", "c"]]
+        assert [result.get("lines") for result in results[:-1]] == [[1, 2], [4, 5]]
+        assert [result.get("inserted") for result in results[:-1]] == [1, 2]
+        assert [result.get("rejected") for result in results[:-1]] == [1, 0]
+        assert [rejected["line"] for rejected in results[0]["rejected_lines"]] == [2]
+        assert results[-1] == {"summary": {"batches": 2, "inserted": 3, "rejected": 1}}
+
+    def test_create_many_ndjson_streams_batches(
+        self,
+        test_dao_error: TestDAO,
+        test_object1: TestObject,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        monkeypatch.setattr(Config.INGEST, "BATCH_SIZE", 2)
+        test_dao_error.create_many = Mock(return_value=[test_object1] * 2)  # type: ignore[method-assign]
+        app = self.client(test_dao_error).app
+        chunks = [b'{"name":"a"}\n{"name":"b"}\n', b'{"name":"c"}\n']
+        events: list[str] = []
+
+        async def receive() -> dict[str, Any]:
+            events.append("receive")
+            chunk = chunks.pop(0)
+            return {"type": "http.request", "body": chunk, "more_body": bool(chunks)}
+
+        async def send(message: dict[str, Any]) -> None:
+            if message["type"] == "http.response.body" and message["body"]:
+                events.append("send")
+
+        scope = {
+            "type": "http",
+            "method": "POST",
+            "path": "/test/many",
+            "raw_path": b"/test/many",
+            "query_string": b"",
+            "headers": [(b"content-type", b"application/x-ndjson")],
+        }
+        asyncio.run(app(scope, receive, send))
+
+        # The first batch is answered before the rest of the body is read.
+        assert events == ["receive", "send", "receive", "send", "send"]
+
+    def test_create_many_ndjson_caps_rejected_details(
+        self, test_dao_error: TestDAO, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        monkeypatch.setattr(Config.INGEST, "MAX_REJECTED_DETAILS", 2)
+        test_dao_error.create_many = Mock(return_value=[])  # type: ignore[method-assign]
+
+        response = self.client(test_dao_error).post(
+            "/test/many",
+            content=b'{"wrong":1}\n' * 5,
+            headers={"Content-Type": "application/x-ndjson"},
+        )
+
+        first, summary = [json.loads(line) for line in response.text.splitlines()]
+        assert first["rejected"] == 5
+        assert [rejected["line"] for rejected in first["rejected_lines"]] == [1, 2]
+        assert summary["summary"]["rejected"] == 5
+
+    def test_create_many_ndjson_error(self, test_dao_error: TestDAO) -> None:
+        test_dao_error.create_many = Mock(side_effect=Exception("error"))  # type: ignore[method-assign]
+
+        response = self.client(test_dao_error).post(
+            "/test/many",
+            content=b'{"name":"a"}\n',
+            headers={"Content-Type": "application/x-ndjson"},
+        )
+
+        first, summary = [json.loads(line) for line in response.text.splitlines()]
+        assert first["error"] == "error"
+        assert summary["summary"]["inserted"] == 0
@@ -0,0 +1,93 @@
+from typing import Iterator
+from unittest.mock import Mock
+
+import pytest
+from fastapi import FastAPI, status
+from fastapi.testclient import TestClient
+
+from src.auth.dependencies import get_access_token
+from src.controllers.routers.inventory import inventory_router
+from src.db.dependencies import get_inventory_dao
+from src.indexes import catalog
+
+
+@pytest.fixture
+def dao() -> Mock:
+    dao = Mock()
+    dao.iter_pages.return_value = iter([])
+    return dao
+
+
+@pytest.fixture
+def client(dao: Mock) -> Iterator[TestClient]:
+    catalog.load(
+        [
+            {
+                "id": f"00000000-0000-0000-0000-{i:012d}",
+                "product_name": f"Product {i}",
+                "category": "food" if i % 2 else "clothes",
+                "price": 1.5 * (i + 1),
+                "quantity": i,
+                "description": "",
+            }
+            for i in range(6)
+        ]
+    )
+    app = FastAPI()
+    app.include_router(inventory_router)
+    app.dependency_overrides[get_access_token] = lambda: "token"
+    app.dependency_overrides[get_inventory_dao] = lambda: dao
+    yield TestClient(app)
+    catalog.loaded_at = None
+
+
+class TestInventoryQuery:
+    def test_filtered_query_uses_catalog(self, client: TestClient, dao: Mock) -> None:
+        response = client.get(
+            "/inventory/",
+            params={
+                "category": "Food",
+                "min_price": 3,
+                "in_stock": True,
+                "sort": "-price",
+            },
+        )
+        assert response.status_code == status.HTTP_200_OK
+        items = response.json()["data"]["items"]
+        assert [item["product_name"] for item in items] == [
+            "Product 5",
+            "Product 3",
+            "Product 1",
+        ]
+        dao.iter_pages.assert_not_called()
+
+    def test_name_and_description(self, client: TestClient) -> None:
+        response = client.get(
+            "/inventory/", params={"product_name": "Product 2", "description": ""}
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert [item["product_name"] for item in response.json()["data"]["items"]] == [
+            "Product 2"
+        ]
+
+    def test_filtered_query_not_found(self, client: TestClient) -> None:
+        response = client.get("/inventory/", params={"min_price": 1000})
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_invalid_sort(self, client: TestClient) -> None:
+        response = client.get("/inventory/", params={"sort": "name"})
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+class TestFacets:
+    def test_facets(self, client: TestClient) -> None:
+        response = client.get(
+            "/inventory/facets", params={"in_stock": True, "max_price": 6}
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["data"] == {
+            "total": 3,
+            "categories": {"electronics": 0, "clothes": 1, "accessories": 0, "food": 2},
+            "stock": {"in_stock": 3, "out_of_stock": 1},
+        }
+        assert "etag" in response.headers
@@ -0,0 +1,77 @@
+from typing import Iterator
+from unittest.mock import Mock
+
+import pytest
+from fastapi import FastAPI, status
+from fastapi.testclient import TestClient
+
+from src.auth.dependencies import get_access_token, get_token_claims
+from src.controllers.routers.reviews import review_router
+from src.db.dependencies import get_review_dao
+
+PRODUCT = "00000000-0000-0000-0000-000000000001"
+OTHER = "00000000-0000-0000-0000-000000000002"
+
+
+@pytest.fixture
+def dao() -> Mock:
+    dao = Mock()
+    tables = {"rating_summaries": Mock(), "rating_totals": Mock()}
+    summaries = tables["rating_summaries"].select.return_value.in_.return_value
+    summaries.execute.return_value.data = [
+        {
+            "product_id": PRODUCT,
+            "rating_1": 0,
+            "rating_2": 1,
+            "rating_3": 0,
+            "rating_4": 1,
+            "rating_5": 0,
+        }
+    ]
+    totals = tables["rating_totals"].select.return_value
+    totals.execute.return_value.data = [{"count": 2, "sum": 6}]
+    dao.client.table.side_effect = tables.__getitem__
+    dao.client.rpc.return_value.execute.return_value.data = 2
+    return dao
+
+
+@pytest.fixture
+def app(dao: Mock) -> FastAPI:
+    app = FastAPI()
+    app.include_router(review_router)
+    app.dependency_overrides[get_access_token] = lambda: "token"
+    app.dependency_overrides[get_review_dao] = lambda: dao
+    return app
+
+
+@pytest.fixture
+def client(app: FastAPI) -> Iterator[TestClient]:
+    yield TestClient(app)
+
+
+class TestSummary:
+    def test_summary(self, client: TestClient) -> None:
+        response = client.get(f"/reviews/summary/{PRODUCT}")
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["data"]["average"] == 3.0
+
+    def test_batch(self, client: TestClient) -> None:
+        response = client.get(
+            "/reviews/summary", params={"product_id": [PRODUCT, OTHER]}
+        )
+        assert response.status_code == status.HTTP_200_OK
+        counts = [summary["count"] for summary in response.json()["data"]["summaries"]]
+        assert counts == [2, 0]
+
+    def test_rebuild(self, app: FastAPI, client: TestClient, dao: Mock) -> None:
+        app.dependency_overrides[get_token_claims] = lambda: {
+            "app_metadata": {"role": "admin"}
+        }
+        response = client.post("/reviews/summary/rebuild")
+        assert response.json()["data"] == {"reviews": 2}
+        dao.client.rpc.assert_called_once_with("rebuild_rating_summaries", {})
+
+    def test_rebuild_requires_admin(self, client: TestClient, dao: Mock) -> None:
+        response = client.post("/reviews/summary/rebuild")
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+        dao.client.rpc.assert_not_called()
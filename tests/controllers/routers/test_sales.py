@@ -0,0 +1,263 @@
+import json
+from datetime import datetime, timezone
+from typing import Iterator
+from unittest.mock import Mock
+
+import pytest
+from fastapi import FastAPI, status
+from fastapi.testclient import TestClient
+from pydantic_core import to_json
+
+from src.auth.dependencies import get_access_token, get_user_id, require_admin
+from src.controllers.routers.sales import sales_router
+from src.db.dependencies import (
+    get_customer_dao,
+    get_history_dao,
+    get_inventory_dao,
+    get_service_history_dao,
+)
+from src.indexes import catalog, sales_rollups
+
+
+@pytest.fixture
+def client() -> Iterator[TestClient]:
+    catalog.load(
+        [
+            {
+                "id": f"00000000-0000-0000-0000-{i:012d}",
+                "product_name": name,
+                "category": category,
+                "price": 5.0 + i,
+                "quantity": 3,
+                "description": description,
+            }
+            for i, (name, category, description) in enumerate(
+                [
+                    ("Red Apple", "food", "Fresh apple"),
+                    ("Apple Watch", "electronics", "Smart watch"),
+                    ("Apple Pie", "food", "Baked pie with apple filling"),
+                ]
+            )
+        ]
+    )
+    app = FastAPI()
+    app.include_router(sales_router)
+    app.dependency_overrides[get_access_token] = lambda: "token"
+    app.dependency_overrides[get_inventory_dao] = lambda: Mock()
+    history = Mock()
+    history.iter_pages.side_effect = lambda **kwargs: iter(
+        [
+            [
+                {
+                    "id": f"history-{i}",
+                    "customer_id": customer,
+                    "product_id": f"00000000-0000-0000-0000-{product:012d}",
+                    "quantity": 1,
+                    "total": total,
+                    "purchase_date": f"2024-05-{day:02d}T12:00:00+00:00",
+                }
+                for i, (customer, product, total, day) in enumerate(
+                    [("alice", 0, 5.0, 1), ("alice", 1, 6.0, 2), ("bob", 2, 7.0, 20)]
+                )
+            ]
+        ]
+    )
+    app.dependency_overrides[get_history_dao] = lambda: history
+    app.dependency_overrides[get_service_history_dao] = lambda: history
+    app.dependency_overrides[require_admin] = lambda: {}
+    yield TestClient(app)
+    catalog.loaded_at = None
+    sales_rollups.loaded_at = None
+
+
+class TestSearch:
+    def test_search(self, client: TestClient) -> None:
+        response = client.get(
+            "/sales/search", params={"q": "apple", "category": "food"}
+        )
+        assert response.status_code == status.HTTP_200_OK
+        names = [item["product_name"] for item in response.json()["data"]["items"]]
+        assert sorted(names) == ["Apple Pie", "Red Apple"]
+
+    def test_search_not_found(self, client: TestClient) -> None:
+        response = client.get("/sales/search", params={"q": "banana"})
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_search_requires_query(self, client: TestClient) -> None:
+        response = client.get("/sales/search", params={"q": ""})
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+class TestSuggest:
+    def test_suggest(self, client: TestClient) -> None:
+        response = client.get("/sales/suggest", params={"prefix": "app"})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["data"] == {"suggestions": ["Apple Pie", "Apple Watch"]}
+
+
+class TestAnalytics:
+    def test_admin_only(self, client: TestClient) -> None:
+        del client.app.dependency_overrides[require_admin]  # type: ignore[attr-defined]
+        for path in ("products", "customers", "categories", "timeline"):
+            response = client.get(f"/sales/analytics/{path}")
+            assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_products(self, client: TestClient) -> None:
+        response = client.get("/sales/analytics/products", params={"limit": 1})
+        assert response.status_code == status.HTTP_200_OK
+        products = response.json()["data"]["products"]
+        assert products == [
+            {
+                "product_id": "00000000-0000-0000-0000-000000000002",
+                "revenue": 7.0,
+                "quantity": 1,
+                "orders": 1,
+            }
+        ]
+
+    def test_customers(self, client: TestClient) -> None:
+        response = client.get("/sales/analytics/customers")
+        customers = response.json()["data"]["customers"]
+        assert [row["customer_id"] for row in customers] == ["alice", "bob"]
+
+    def test_categories(self, client: TestClient) -> None:
+        response = client.get("/sales/analytics/categories")
+        categories = {
+            row["category"]: row["revenue"]
+            for row in response.json()["data"]["categories"]
+        }
+        assert categories["food"] == 12.0
+        assert categories["electronics"] == 6.0
+
+    def test_timeline(self, client: TestClient) -> None:
+        response = client.get("/sales/analytics/timeline", params={"bucket": "month"})
+        assert response.json()["data"]["timeline"] == [
+            {"bucket": "2024-05-01", "revenue": 18.0, "quantity": 3, "orders": 3}
+        ]
+        response = client.get("/sales/analytics/timeline", params={"bucket": "year"})
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+class TestHistory:
+    ID = "00000000-0000-0000-0000-000000000009"
+    PAGES = [
+        [{"id": "h0", "total": 5.0}, {"id": "h1", "total": 2.5}],
+        [{"id": "h2", "total": 1.25}],
+    ]
+
+    @pytest.fixture
+    def history(self, client: TestClient) -> Mock:
+        dao = Mock()
+        dao.iter_pages.side_effect = lambda **kwargs: iter(self.PAGES)
+        client.app.dependency_overrides[get_history_dao] = lambda: dao  # type: ignore[attr-defined]
+        return dao
+
+    def test_json(self, client: TestClient, history: Mock) -> None:
+        response = client.get(f"/sales/customer={self.ID}/history")
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == {
+            "message": "History found",
+            "data": {"items": [row for page in self.PAGES for row in page]},
+        }
+
+    def test_ndjson_summary(self, client: TestClient, history: Mock) -> None:
+        response = client.get(
+            f"/sales/product={self.ID}/history",
+            params={"format": "ndjson", "summary": True},
+        )
+        assert response.headers["content-type"] == "application/x-ndjson"
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert [line["id"] for line in lines[:-1]] == ["h0", "h1", "h2"]
+        assert lines[-1] == {"summary": {"count": 3, "total": 8.75}}
+
+    def test_binary_accept_falls_back_to_json(
+        self, client: TestClient, history: Mock
+    ) -> None:
+        response = client.get(
+            f"/sales/customer={self.ID}/history",
+            headers={"Accept": "application/msgpack, application/json;q=0.5"},
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["content-type"] == "application/json"
+        assert "Accept" in response.headers["vary"]
+
+    def test_not_acceptable(self, client: TestClient, history: Mock) -> None:
+        response = client.get(
+            f"/sales/customer={self.ID}/history",
+            headers={"Accept": "application/msgpack"},
+        )
+        assert response.status_code == status.HTTP_406_NOT_ACCEPTABLE
+        history.iter_pages.assert_not_called()
+
+    def test_range(self, client: TestClient, history: Mock) -> None:
+        client.get(
+            f"/sales/customer={self.ID}/history",
+            params={"from": "2024-05-01T00:00:00", "to": "2024-05-31T23:59:59+02:00"},
+        )
+        history.iter_pages.assert_called_once_with(
+            order="purchase_date",
+            ranges={
+                "purchase_date": (
+                    datetime(2024, 5, 1, tzinfo=timezone.utc),
+                    datetime(2024, 5, 31, 21, 59, 59, tzinfo=timezone.utc),
+                )
+            },
+            customer_id=self.ID,
+        )
+
+    def test_date_only_to_covers_the_day(
+        self, client: TestClient, history: Mock
+    ) -> None:
+        client.get(
+            f"/sales/customer={self.ID}/history",
+            params={"from": "2024-05-01", "to": "2024-05-31"},
+        )
+        history.iter_pages.assert_called_once_with(
+            order="purchase_date",
+            ranges={
+                "purchase_date": (
+                    datetime(2024, 5, 1, tzinfo=timezone.utc),
+                    datetime(2024, 5, 31, 23, 59, 59, 999999, tzinfo=timezone.utc),
+                )
+            },
+            customer_id=self.ID,
+        )
+
+    def test_not_found(self, client: TestClient, history: Mock) -> None:
+        history.iter_pages.side_effect = lambda **kwargs: iter([])
+        response = client.get(f"/sales/product={self.ID}/history")
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+        history.iter_pages.assert_called_once_with(
+            order="purchase_date",
+            ranges={"purchase_date": (None, None)},
+            product_id=self.ID,
+        )
+
+    def test_inverted_range(self, client: TestClient, history: Mock) -> None:
+        response = client.get(
+            f"/sales/product={self.ID}/history",
+            params={"from": "2024-06-01", "to": "2024-05-01"},
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        history.iter_pages.assert_not_called()
+
+
+class TestPurchase:
+    CUSTOMER = "00000000-0000-0000-0000-0000000000c1"
+
+    def test_only_for_the_caller(self, client: TestClient) -> None:
+        customers = Mock()
+        client.app.dependency_overrides[get_customer_dao] = lambda: customers  # type: ignore[attr-defined]
+        client.app.dependency_overrides[get_user_id] = lambda: "someone-else"  # type: ignore[attr-defined]
+
+        response = client.post(
+            "/sales/purchase/1",
+            json={
+                "product_id": "00000000-0000-0000-0000-000000000000",
+                "customer_id": self.CUSTOMER,
+                "quantity": 1,
+            },
+        )
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+        assert not customers.get_by_id.called
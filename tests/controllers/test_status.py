@@ -0,0 +1,28 @@
+from fastapi import FastAPI, status
+from fastapi.testclient import TestClient
+
+from src.auth.dependencies import get_token_claims
+from src.controllers import status_router
+from src.utils.metrics import metrics
+
+
+def client(claims: dict) -> TestClient:
+    app = FastAPI()
+    app.include_router(status_router)
+    app.dependency_overrides[get_token_claims] = lambda: claims
+    return TestClient(app)
+
+
+class TestMetrics:
+    def test_admin_only(self) -> None:
+        response = client({"sub": "user-1"}).get("/status/metrics")
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_snapshot(self) -> None:
+        metrics.set("tests.gauge", 3)
+        response = client({"app_metadata": {"role": "admin"}}).get("/status/metrics")
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["data"]["tests.gauge"] == 3
+
+    def test_status_is_public(self) -> None:
+        assert client({}).get("/status").status_code == status.HTTP_200_OK
@@ -0,0 +1,84 @@
+from datetime import datetime, timezone
+from unittest.mock import Mock
+
+from postgrest import SyncPostgrestClient
+from pydantic_core import to_json
+
+from src.db.dao import BaseDAO
+from src.db.models import History
+
+
+def page(*rows: tuple[str, str]) -> Mock:
+    return Mock(
+        is_success=True,
+        content=to_json(
+            [{"id": id, "purchase_date": date, "total": 1.0} for id, date in rows]
+        ),
+    )
+
+
+class TestIterPages:
+    def dao(self, *responses: Mock) -> tuple[BaseDAO[History], Mock]:
+        client = SyncPostgrestClient("http://localhost")
+        request = Mock(side_effect=list(responses))
+        client.session.request = request  # type: ignore[method-assign]
+        return BaseDAO(client, "History", History), request  # type: ignore[arg-type]
+
+    def test_keyset_pagination(self) -> None:
+        dao, request = self.dao(
+            page(("a", "2024-05-01"), ("b", "2024-05-01")),
+            page(("c", "2024-05-02")),
+        )
+        pages = dao.iter_pages(
+            page_size=2,
+            order="purchase_date",
+            ranges={"purchase_date": (datetime(2024, 5, 1, tzinfo=timezone.utc), None)},
+            customer_id="alice",
+        )
+        assert [[row["id"] for row in rows] for rows in pages] == [["a", "b"], ["c"]]
+        first, second = (call.kwargs["params"] for call in request.call_args_list)
+        assert first["customer_id"] == "eq.alice"
+        assert first["purchase_date"] == "gte.2024-05-01T00:00:00+00:00"
+        assert first["order"] == "purchase_date,id"
+        assert first["limit"] == "2"
+        assert "or" not in first
+        assert second["or"] == (
+            '(purchase_date.gt."2024-05-01",purchase_date.is.null,'
+            'and(purchase_date.eq."2024-05-01",id.gt."b"))'
+        )
+
+    def test_pages_are_fetched_lazily(self) -> None:
+        dao, request = self.dao(page(("a", "2024-05-01")), page())
+        pages = dao.iter_pages(page_size=1)
+        assert next(pages)[0]["id"] == "a"
+        assert request.call_count == 1
+        assert list(pages) == []
+        assert request.call_args.kwargs["params"]["id"] == "gt.a"
+
+
+class TestInsertPayload:
+    CUSTOMER = "00000000-0000-0000-0000-000000000001"
+    PRODUCT = "00000000-0000-0000-0000-000000000002"
+
+    def test_omits_unset_purchase_date(self) -> None:
+        dao = BaseDAO(Mock(), "History", History)
+        history = History(
+            customer_id=self.CUSTOMER, product_id=self.PRODUCT, quantity=1, total=2.0
+        )
+        assert dao.insert_payload(history) == {
+            "customer_id": self.CUSTOMER,
+            "product_id": self.PRODUCT,
+            "quantity": 1,
+            "total": 2.0,
+        }
+
+    def test_keeps_purchase_date(self) -> None:
+        dao = BaseDAO(Mock(), "History", History)
+        history = History(
+            customer_id=self.CUSTOMER,
+            product_id=self.PRODUCT,
+            quantity=1,
+            total=2.0,
+            purchase_date=datetime(2024, 5, 1, tzinfo=timezone.utc),
+        )
+        assert dao.insert_payload(history)["purchase_date"] == "2024-05-01T00:00:00Z"
@@ -0,0 +1,68 @@
+import httpx
+import pytest
+
+from src.config import Config
+from src.db.base import (
+    BearerPostgrestClient,
+    get_anonymous_data_client,
+    get_service_data_client,
+    postgrest_transport,
+)
+
+
+@pytest.fixture(autouse=True)
+def supabase(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(Config.SUPABASE, "URL", "http://localhost:54321")
+    monkeypatch.setattr(Config.SUPABASE, "KEY", "anon-key")
+
+
+class TestBearerPostgrestClient:
+    def test_sends_the_access_token(self) -> None:
+        requests: list[httpx.Request] = []
+
+        def handle(request: httpx.Request) -> httpx.Response:
+            requests.append(request)
+            return httpx.Response(200, json=[])
+
+        client = BearerPostgrestClient("access-token")
+        client.session._transport = httpx.MockTransport(handle)
+        client.table("Inventory").select("id").execute()
+        (request,) = requests
+        assert request.url.path == "/rest/v1/Inventory"
+        assert request.headers["authorization"] == "Bearer access-token"
+        assert request.headers["apikey"] == "anon-key"
+
+    def test_clients_share_the_connection_pool(self) -> None:
+        first = BearerPostgrestClient("a")
+        second = BearerPostgrestClient("b")
+        assert first.session._transport is second.session._transport
+        assert first.session._transport is postgrest_transport()
+
+    def test_missing_settings(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(Config.SUPABASE, "KEY", None)
+        with pytest.raises(ValueError):
+            BearerPostgrestClient("token")
+
+
+class TestGetAnonymousDataClient:
+    def test_sends_the_anon_key(self) -> None:
+        client = get_anonymous_data_client()
+        assert client.session.headers["authorization"] == "Bearer anon-key"
+
+    def test_missing_settings(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(Config.SUPABASE, "KEY", None)
+        with pytest.raises(ValueError):
+            get_anonymous_data_client()
+
+
+class TestGetServiceDataClient:
+    def test_sends_the_service_key(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(Config.SUPABASE, "SERVICE_KEY", "service-key")
+        client = get_service_data_client()
+        assert client.session.headers["authorization"] == "Bearer service-key"
+        assert client.session.headers["apikey"] == "anon-key"
+
+    def test_missing_settings(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(Config.SUPABASE, "SERVICE_KEY", None)
+        with pytest.raises(ValueError):
+            get_service_data_client()
@@ -0,0 +1,98 @@
+import json
+import threading
+from pathlib import Path
+from typing import Any
+from unittest.mock import Mock
+
+import pytest
+
+from src.db.importer import Checkpoint, import_file, read_records
+from src.db.models import Inventory
+
+
+def product(i: int) -> dict[str, Any]:
+    return {
+        "product_name": f"Product {i}",
+        "category": "food",
+        "price": 1.0 + i,
+        "quantity": i,
+        "description": "",
+    }
+
+
+@pytest.fixture
+def jsonl(tmp_path: Path) -> Path:
+    path = tmp_path / "inventory.jsonl"
+    rows = [product(i) for i in range(10)]
+    rows[3]["category"] = "toys"
+    path.write_text("".join(json.dumps(row) + "\n" for row in rows))
+    return path
+
+
+def dao(fail_on: set[str] = set()) -> Mock:
+    inserted: list[str] = []
+    lock = threading.Lock()
+
+    def create_many(rows: list[Any]) -> list[Any]:
+        names = [row.product_name for row in rows]
+        if fail_on & set(names):
+            raise RuntimeError("insert failed")
+        with lock:
+            inserted.extend(names)
+        return rows
+
+    mock = Mock(table="Inventory", base_model=Inventory, inserted=inserted)
+    mock.create_many.side_effect = create_many
+    return mock
+
+
+class TestImporter:
+    def test_read_csv(self, tmp_path: Path) -> None:
+        path = tmp_path / "inventory.csv"
+        path.write_text("product_name,quantity,description\nA,1,\nB,2,x\n")
+        assert list(read_records(str(path), start=1)) == [
+            (1, {"product_name": "B", "quantity": "2", "description": "x"})
+        ]
+        assert list(read_records(str(path)))[0][1]["description"] is None
+
+    def test_import(self, jsonl: Path) -> None:
+        reports: list[dict[str, Any]] = []
+        target = dao()
+        progress = import_file(
+            target, str(jsonl), chunk_size=3, workers=2, report=reports.append
+        )
+        assert sorted(target.inserted) == sorted(
+            f"Product {i}" for i in range(10) if i != 3
+        )
+        assert progress["offset"] == 10
+        assert (progress["inserted"], progress["rejected"]) == (9, 1)
+        assert [report["offset"] for report in reports][-1] == 10
+        rejected = [
+            json.loads(line)
+            for line in Path(f"{jsonl}.rejected.jsonl").read_text().splitlines()
+        ]
+        assert rejected[0]["position"] == 3
+        assert not Path(f"{jsonl}.checkpoint").exists()
+
+    def test_resume(self, jsonl: Path) -> None:
+        Path(f"{jsonl}.checkpoint").write_text(
+            json.dumps({"table": "Inventory", "offset": 6})
+        )
+        target = dao()
+        import_file(target, str(jsonl), chunk_size=3)
+        assert target.inserted == ["Product 6", "Product 7", "Product 8", "Product 9"]
+
+    def test_failed_chunk_is_rejected(self, jsonl: Path) -> None:
+        target = dao(fail_on={"Product 4"})
+        progress = import_file(target, str(jsonl), chunk_size=3, workers=1)
+        assert progress["rejected"] == 1 + 2
+        assert "Product 4" not in target.inserted
+
+    def test_checkpoint_waits_for_earlier_chunks(self, tmp_path: Path) -> None:
+        checkpoint = Checkpoint(str(tmp_path / "file.csv"), "Inventory")
+        checkpoint.finish(6, 3)
+        assert checkpoint.offset == 0
+        checkpoint.finish(3, 3)
+        assert checkpoint.offset == 6
+        assert Checkpoint(str(tmp_path / "file.csv"), "Inventory").offset == 6
+        assert Checkpoint(str(tmp_path / "file.csv"), "History").offset == 0
@@ -0,0 +1,172 @@
+import threading
+from collections import defaultdict
+from typing import Any, Iterator
+from unittest.mock import Mock
+
+import pytest
+
+from src.db.dao import BaseDAO
+from src.db.hooks import WriteHooks
+from src.indexes.catalog import CatalogSnapshot
+
+
+def product(i: int, **overrides: object) -> dict:
+    row = {
+        "id": f"00000000-0000-0000-0000-{i:012d}",
+        "product_name": f"Product {i}",
+        "category": ("electronics", "clothes", "accessories", "food")[i % 4],
+        "price": float(10 * (i + 1)),
+        "quantity": i % 3,
+        "description": f"Description {i}",
+    }
+    row.update(overrides)
+    return row
+
+
+@pytest.fixture
+def snapshot() -> CatalogSnapshot:
+    snapshot = CatalogSnapshot(capacity=2)
+    snapshot.load([product(i) for i in range(8)])
+    return snapshot
+
+
+def names(snapshot: CatalogSnapshot, **filters: object) -> list[str]:
+    return [
+        record["product_name"]
+        for record in snapshot.records(snapshot.search(**filters))
+    ]
+
+
+class TestSearch:
+    def test_name_and_description(self, snapshot: CatalogSnapshot) -> None:
+        assert names(
+            snapshot, product_name="Product 2", description="Description 2"
+        ) == ["Product 2"]
+        assert names(snapshot, product_name="Product 2", description="Other") == []
+
+    def test_category(self, snapshot: CatalogSnapshot) -> None:
+        assert names(snapshot, category="clothes") == ["Product 1", "Product 5"]
+        assert names(snapshot, category="toys") == []
+
+    def test_price_range_and_stock(self, snapshot: CatalogSnapshot) -> None:
+        assert names(snapshot, min_price=20, max_price=50, in_stock=True) == [
+            "Product 1",
+            "Product 2",
+            "Product 4",
+        ]
+        assert names(snapshot, in_stock=False) == [
+            "Product 0",
+            "Product 3",
+            "Product 6",
+        ]
+
+    def test_sort(self, snapshot: CatalogSnapshot) -> None:
+        assert names(snapshot, category="food", sort="-price") == [
+            "Product 7",
+            "Product 3",
+        ]
+        assert names(snapshot, max_price=30, sort="quantity") == [
+            "Product 0",
+            "Product 1",
+            "Product 2",
+        ]
+
+    def test_exact_columns(self, snapshot: CatalogSnapshot) -> None:
+        assert names(snapshot, product_name="Product 3") == ["Product 3"]
+        assert names(snapshot, description="Description 6") == ["Product 6"]
+        assert names(snapshot, price=80.0, quantity=1) == ["Product 7"]
+
+    def test_records_round_trip(self, snapshot: CatalogSnapshot) -> None:
+        assert snapshot.records(snapshot.search(product_name="Product 5")) == [
+            product(5)
+        ]
+
+    def test_prices(self, snapshot: CatalogSnapshot) -> None:
+        assert snapshot.prices()["Product 2"] == 30.0
+        assert len(snapshot.prices()) == 8
+
+
+class TestIncrementalRefresh:
+    def test_upsert_and_delete(self, snapshot: CatalogSnapshot) -> None:
+        snapshot.apply("upsert", [product(1, product_name="Renamed", price=5.0)])
+        snapshot.apply("upsert", [product(20)])
+        snapshot.apply("delete", [product(0)])
+        assert names(snapshot, sort="price")[:2] == ["Renamed", "Product 2"]
+        assert names(snapshot, product_name="Product 1") == []
+        assert names(snapshot, product_name="Product 20") == ["Product 20"]
+        assert "Product 0" not in snapshot.prices()
+
+    def test_bad_row_invalidates(self, snapshot: CatalogSnapshot) -> None:
+        snapshot.apply("upsert", [{"id": "x"}])
+        assert snapshot.is_stale()
+
+    def test_write_through_dao_hooks(self) -> None:
+        hooks = WriteHooks()
+        snapshot = CatalogSnapshot()
+        snapshot.load([product(0)])
+        hooks.register("Inventory", snapshot.apply)
+        hooks.dispatch("Inventory", "upsert", [product(1)])
+        hooks.dispatch("Reviews", "delete", [product(1)])
+        assert len(snapshot.prices()) == 2
+
+
+class TestLoad:
+    def test_load_if_stale(self) -> None:
+        dao = Mock(spec=BaseDAO)
+        dao.iter_pages.return_value = iter([[product(0)], [product(1)]])
+        snapshot = CatalogSnapshot()
+        assert snapshot.load_if_stale(dao).prices() == {
+            "Product 0": 10.0,
+            "Product 1": 20.0,
+        }
+        snapshot.load_if_stale(dao)
+        assert dao.iter_pages.call_count == 1
+
+    def test_reloads_on_a_newer_version(self, versions: defaultdict[str, int]) -> None:
+        dao = Mock(spec=BaseDAO)
+        dao.iter_pages.side_effect = lambda **kwargs: iter([[product(0)]])
+        snapshot = CatalogSnapshot()
+        snapshot.load_if_stale(dao)
+
+        # A write through this process is applied and counted, not reloaded.
+        snapshot.apply("upsert", [product(1)])
+        versions["Inventory"] += 1
+        snapshot.load_if_stale(dao)
+        assert dao.iter_pages.call_count == 1
+
+        # A write made elsewhere only shows as a newer version.
+        versions["Inventory"] += 1
+        snapshot.load_if_stale(dao)
+        assert dao.iter_pages.call_count == 2
+        assert snapshot.prices() == {"Product 0": 10.0}
+        assert snapshot.version == 2
+
+    def test_writes_during_a_reload(self) -> None:
+        snapshot = CatalogSnapshot()
+        snapshot.load([product(0), product(1)])
+        snapshot.loaded_at = -1e9
+
+        def write(op: str, row: dict) -> None:
+            # Writes come from other threads and must not wait for the fetch.
+            writer = threading.Thread(target=snapshot.apply, args=(op, [row]))
+            writer.start()
+            writer.join(timeout=5)
+            assert not writer.is_alive()
+
+        def pages(**kwargs: Any) -> Iterator[list[dict]]:
+            yield [product(0)]
+            # Made after the fetch read these rows: missing from them.
+            write("update", product(0, price=1.0))
+            write("upsert", product(2))
+            yield [product(1)]
+
+        dao = Mock()
+        dao.iter_pages.side_effect = pages
+        snapshot.load_if_stale(dao)
+
+        assert snapshot.prices() == {
+            "Product 0": 1.0,
+            "Product 1": 20.0,
+            "Product 2": 30.0,
+        }
+        assert not snapshot.is_stale()
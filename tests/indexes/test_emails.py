@@ -0,0 +1,187 @@
+import threading
+from typing import Any, Iterator
+from unittest.mock import Mock
+
+import pytest
+
+from src.db.models import Customer
+from src.indexes.emails import BloomFilter, EmailIndex, digest_of
+from src.utils.metrics import metrics
+
+ALICE = "00000000-0000-0000-0000-000000000001"
+BOB = "00000000-0000-0000-0000-000000000002"
+
+
+def customer(id: str, email: str) -> Customer:
+    return Customer(
+        id=id,
+        fullname="Alice",
+        username="alice",
+        age=30,
+        gender="Female",
+        address="Beirut",
+        marital_status="Single",
+        email=email,
+    )
+
+
+@pytest.fixture
+def index() -> EmailIndex:
+    index = EmailIndex()
+    index.load(
+        [
+            {"id": ALICE, "email": "alice@mail.com"},
+            {"id": BOB, "email": "bob@mail.com"},
+        ]
+    )
+    return index
+
+
+class TestBloomFilter:
+    def test_no_false_negatives(self) -> None:
+        bloom = BloomFilter(1000, 0.01)
+        digests = [digest_of(f"user{i}@mail.com") for i in range(1000)]
+        for digest in digests:
+            bloom.add(digest)
+
+        assert all(digest in bloom for digest in digests)
+
+    def test_false_positive_rate(self) -> None:
+        bloom = BloomFilter(1000, 0.01)
+        for i in range(1000):
+            bloom.add(digest_of(f"user{i}@mail.com"))
+
+        false_positives = sum(
+            digest_of(f"other{i}@mail.com") in bloom for i in range(10000)
+        )
+
+        assert false_positives < 300
+
+
+class TestEmailIndex:
+    def test_lookup_before_load_is_unknown(self) -> None:
+        assert EmailIndex().lookup("alice@mail.com") is None
+
+    def test_lookup(self, index: EmailIndex) -> None:
+        assert index.lookup("alice@mail.com") is True
+        assert index.lookup(" Alice@Mail.com") is True
+        assert index.lookup("carol@mail.com") is False
+
+    def test_lookup_metrics(self, index: EmailIndex) -> None:
+        before = metrics.get("auth.email_index", outcome="absent")
+
+        index.lookup("carol@mail.com")
+
+        assert metrics.get("auth.email_index", outcome="absent") == before + 1
+
+    def test_bloom_only_email_is_unknown(self) -> None:
+        index = EmailIndex(verified_size=1)
+        index.load(
+            [
+                {"id": ALICE, "email": "alice@mail.com"},
+                {"id": BOB, "email": "bob@mail.com"},
+            ]
+        )
+
+        assert index.lookup("alice@mail.com") is None
+        assert index.lookup("bob@mail.com") is True
+
+    def test_add(self, index: EmailIndex) -> None:
+        index.add("carol@mail.com", "carol")
+
+        assert index.lookup("carol@mail.com") is True
+
+    def test_add_before_load_is_ignored(self) -> None:
+        index = EmailIndex()
+        index.add("carol@mail.com")
+
+        assert index.loaded_at is None
+
+    def test_apply_upsert_forgets_the_previous_email(self, index: EmailIndex) -> None:
+        index.apply("upsert", [{"id": ALICE, "email": "alice@new.com"}])
+
+        assert index.lookup("alice@new.com") is True
+        assert index.lookup("alice@mail.com") is None
+
+    def test_apply_delete(self, index: EmailIndex) -> None:
+        index.apply("delete", [{"id": BOB}])
+
+        assert index.lookup("bob@mail.com") is None
+
+    def test_apply_malformed_row_marks_stale(self, index: EmailIndex) -> None:
+        index.apply("upsert", [{"id": ALICE}])
+
+        assert index.is_stale()
+
+    def test_overflow_marks_stale(self) -> None:
+        index = EmailIndex()
+        index.load([])
+        for i in range(index.bloom.capacity + 1):
+            index.add(f"user{i}@mail.com")
+
+        assert index.is_stale()
+
+    def test_load_if_stale_reads_every_page(self) -> None:
+        dao = Mock()
+        dao.iter_pages.return_value = iter(
+            [
+                [{"id": ALICE, "email": "alice@mail.com"}],
+                [{"id": BOB, "email": "bob@mail.com"}],
+            ]
+        )
+        index = EmailIndex().load_if_stale(dao)
+
+        assert index.lookup("bob@mail.com") is True
+        assert index.load_if_stale(dao) is index
+        dao.iter_pages.assert_called_once()
+
+    def test_exists_skips_the_lookup_when_verified(self, index: EmailIndex) -> None:
+        dao = Mock()
+
+        assert index.exists("alice@mail.com", dao)
+        assert not dao.get_by_query.called
+
+    def test_exists_confirms_absent_emails(self, index: EmailIndex) -> None:
+        # Created by another worker since the load.
+        dao = Mock()
+        dao.get_by_query.return_value = [customer(ALICE, "carol@mail.com")]
+
+        assert index.exists("carol@mail.com", dao)
+        dao.get_by_query.assert_called_once_with(email="carol@mail.com")
+
+    def test_writes_during_a_reload(self, index: EmailIndex) -> None:
+        index.loaded_at = -1e9
+
+        def write(function: Any, *args: Any) -> None:
+            # Writes come from other threads and must not wait for the fetch.
+            writer = threading.Thread(target=function, args=args)
+            writer.start()
+            writer.join(timeout=5)
+            assert not writer.is_alive()
+
+        def pages(**kwargs: Any) -> Iterator[list[dict]]:
+            yield [{"id": ALICE, "email": "alice@mail.com"}]
+            # Made after the fetch read these rows: missing from them.
+            write(index.apply, "upsert", [{"id": BOB, "email": "bob@new.com"}])
+            write(index.add, "carol@mail.com")
+            yield []
+
+        dao = Mock()
+        dao.iter_pages.side_effect = pages
+        index.load_if_stale(dao)
+
+        assert index.lookup("bob@new.com") is True
+        assert index.lookup("carol@mail.com") is True
+        assert index.lookup("bob@mail.com") is False
+        assert not index.is_stale()
+
+    def test_exists_looks_up_and_records_unknown_emails(self) -> None:
+        index = EmailIndex(verified_size=0)
+        index.load([{"id": ALICE, "email": "alice@mail.com"}])
+        index.verified_size = 10
+        dao = Mock()
+        dao.get_by_query.return_value = [customer(ALICE, "alice@mail.com")]
+
+        assert index.exists("alice@mail.com", dao)
+        dao.get_by_query.assert_called_once_with(email="alice@mail.com")
+        assert index.lookup("alice@mail.com") is True
@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+from src.indexes.catalog import CatalogSnapshot
+from src.indexes.facets import FacetIndex
+
+
+def product(i: int, category: str, price: float, quantity: int) -> dict:
+    return {
+        "id": f"00000000-0000-0000-0000-{i:012d}",
+        "product_name": f"Product {i}",
+        "category": category,
+        "price": price,
+        "quantity": quantity,
+        "description": "",
+    }
+
+
+@pytest.fixture
+def snapshot() -> CatalogSnapshot:
+    snapshot = CatalogSnapshot(capacity=4)
+    snapshot.load(
+        [
+            product(0, "electronics", 30.0, 2),
+            product(1, "electronics", 80.0, 5),
+            product(2, "electronics", 45.0, 0),
+            product(3, "food", 3.0, 10),
+            product(4, "clothes", 25.0, 1),
+        ]
+    )
+    return snapshot
+
+
+@pytest.fixture
+def index(snapshot: CatalogSnapshot) -> FacetIndex:
+    return FacetIndex(snapshot)
+
+
+class TestFacetIndex:
+    def test_counts(self, index: FacetIndex) -> None:
+        assert index.counts(category="electronics", in_stock=True, max_price=50) == {
+            "total": 1,
+            "categories": {"electronics": 1, "clothes": 1, "accessories": 0, "food": 1},
+            "stock": {"in_stock": 1, "out_of_stock": 1},
+        }
+        assert index.counts()["total"] == 5
+
+    def test_rows(self, index: FacetIndex) -> None:
+        assert index.rows(category="electronics").tolist() == [0, 1, 2]
+        assert index.rows(in_stock=False).tolist() == [2]
+        assert index.rows(category="toys").size == 0
+
+    def test_matches_catalog_search(
+        self, snapshot: CatalogSnapshot, index: FacetIndex
+    ) -> None:
+        for filters in ({"min_price": 20}, {"category": "food", "in_stock": True}):
+            assert np.array_equal(index.rows(**filters), snapshot.search(**filters))
+
+    def test_incremental_updates(
+        self, snapshot: CatalogSnapshot, index: FacetIndex
+    ) -> None:
+        index.counts()
+        snapshot.apply("upsert", [product(2, "electronics", 45.0, 3)])
+        snapshot.apply("delete", [product(3, "food", 3.0, 10)])
+        snapshot.apply("upsert", [product(70, "accessories", 5.0, 1)])
+        assert not index.dirty
+        counts = index.counts(in_stock=True)
+        assert counts["total"] == 5
+        assert counts["categories"] == {
+            "electronics": 3,
+            "clothes": 1,
+            "accessories": 1,
+            "food": 0,
+        }
+        assert index.rows(category="accessories").tolist() == [5]
@@ -0,0 +1,66 @@
+from unittest.mock import Mock
+
+import pytest
+
+from src.indexes.ratings import RatingAggregates, summarize
+
+
+def fake_client(summaries: list[dict], totals: list[dict]) -> Mock:
+    client = Mock()
+    tables = {"rating_summaries": Mock(), "rating_totals": Mock()}
+    tables[
+        "rating_summaries"
+    ].select.return_value.in_.return_value.execute.return_value.data = summaries
+    tables["rating_totals"].select.return_value.execute.return_value.data = totals
+    client.table.side_effect = tables.__getitem__
+    return client
+
+
+def histogram(product: str, *counts: int) -> dict:
+    return {
+        "product_id": product,
+        **{f"rating_{i + 1}": n for i, n in enumerate(counts)},
+    }
+
+
+class TestSummarize:
+    def test_summary(self) -> None:
+        summary = summarize("a", [0, 0, 0, 1, 1], 4, 12)
+        assert summary["count"] == 2
+        assert summary["sum"] == 9
+        assert summary["average"] == 4.5
+        assert summary["bayesian_average"] == pytest.approx((5 * 3 + 9) / 7)
+        assert summary["histogram"] == {"1": 0, "2": 0, "3": 0, "4": 1, "5": 1}
+
+    def test_no_reviews(self) -> None:
+        summary = summarize("c", [0] * 5, 4, 12)
+        assert summary["count"] == 0
+        assert summary["average"] is None
+        assert summary["bayesian_average"] == 3.0
+        assert summarize("c", [0] * 5, 0, 0)["bayesian_average"] is None
+
+
+class TestRatingAggregates:
+    def test_summaries(self) -> None:
+        client = fake_client(
+            [histogram("b", 1, 1, 0, 0, 0), histogram("a", 0, 0, 0, 1, 1)],
+            [{"count": 4, "sum": 12}],
+        )
+        summaries = RatingAggregates().summaries(client, ["a", "b", "c"])
+        assert [summary["count"] for summary in summaries] == [2, 2, 0]
+        assert summaries[1]["average"] == 1.5
+        assert summaries[2]["bayesian_average"] == 3.0
+        query = client.table("rating_summaries").select.return_value.in_
+        query.assert_called_once_with("product_id", ["a", "b", "c"])
+
+    def test_no_reviews(self) -> None:
+        client = fake_client([], [])
+        summary = RatingAggregates().summary(client, "a")
+        assert summary["count"] == 0
+        assert summary["bayesian_average"] is None
+
+    def test_rebuild(self) -> None:
+        client = Mock()
+        client.rpc.return_value.execute.return_value.data = 7
+        assert RatingAggregates().rebuild(client) == 7
+        client.rpc.assert_called_once_with("rebuild_rating_summaries", {})
@@ -0,0 +1,197 @@
+import threading
+from typing import Any, Iterator
+from unittest.mock import Mock
+
+import pytest
+
+from src.indexes.catalog import CatalogSnapshot
+from src.indexes.sales import SalesRollups, day_of
+
+APPLE = "00000000-0000-0000-0000-000000000001"
+WATCH = "00000000-0000-0000-0000-000000000002"
+GONE = "00000000-0000-0000-0000-000000000003"
+
+
+def sale(
+    i: int, product: str, customer: str, quantity: int, total: float, date: str
+) -> dict:
+    return {
+        "id": f"history-{i}",
+        "customer_id": customer,
+        "product_id": product,
+        "quantity": quantity,
+        "total": total,
+        "purchase_date": date,
+    }
+
+
+@pytest.fixture
+def rollups() -> SalesRollups:
+    rollups = SalesRollups()
+    rollups.load(
+        [
+            sale(0, APPLE, "alice", 2, 4.0, "2024-05-06T10:00:00+00:00"),
+            sale(1, WATCH, "alice", 1, 200.0, "2024-05-08T10:00:00+00:00"),
+            sale(2, APPLE, "bob", 5, 10.0, "2024-05-13T23:30:00Z"),
+            sale(3, GONE, "bob", 1, 1.5, "2024-06-01T00:00:00+00:00"),
+        ]
+    )
+    return rollups
+
+
+@pytest.fixture
+def snapshot() -> CatalogSnapshot:
+    snapshot = CatalogSnapshot(capacity=2)
+    snapshot.load(
+        [
+            {
+                "id": id,
+                "product_name": name,
+                "category": category,
+                "price": 1.0,
+                "quantity": 1,
+                "description": "",
+            }
+            for id, name, category in [
+                (APPLE, "Apple", "food"),
+                (WATCH, "Watch", "electronics"),
+            ]
+        ]
+    )
+    return snapshot
+
+
+class TestSalesRollups:
+    def test_day_of(self) -> None:
+        assert day_of("1970-01-02T00:00:00Z") == 1
+        assert day_of("1970-01-01T23:00:00-02:00") == 1
+
+    def test_by_product(self, rollups: SalesRollups) -> None:
+        assert rollups.by_product() == [
+            {"product_id": WATCH, "revenue": 200.0, "quantity": 1, "orders": 1},
+            {"product_id": APPLE, "revenue": 14.0, "quantity": 7, "orders": 2},
+            {"product_id": GONE, "revenue": 1.5, "quantity": 1, "orders": 1},
+        ]
+        assert [row["product_id"] for row in rollups.by_product(limit=1)] == [WATCH]
+
+    def test_by_customer(self, rollups: SalesRollups) -> None:
+        assert [
+            (row["customer_id"], row["revenue"]) for row in rollups.by_customer()
+        ] == [
+            ("alice", 204.0),
+            ("bob", 11.5),
+        ]
+
+    def test_by_category(
+        self, rollups: SalesRollups, snapshot: CatalogSnapshot
+    ) -> None:
+        categories = {row["category"]: row for row in rollups.by_category(snapshot)}
+        assert categories["food"]["revenue"] == 14.0
+        assert categories["electronics"]["orders"] == 1
+        assert categories["clothes"]["orders"] == 0
+        assert categories["unknown"]["revenue"] == 1.5
+
+    def test_timeline(self, rollups: SalesRollups) -> None:
+        assert [row["bucket"] for row in rollups.timeline("day")] == [
+            "2024-05-06",
+            "2024-05-08",
+            "2024-05-13",
+            "2024-06-01",
+        ]
+        assert [
+            (row["bucket"], row["revenue"]) for row in rollups.timeline("week")
+        ] == [
+            ("2024-05-06", 204.0),
+            ("2024-05-13", 10.0),
+            ("2024-05-27", 1.5),
+        ]
+        assert [
+            (row["bucket"], row["orders"]) for row in rollups.timeline("month")
+        ] == [
+            ("2024-05-01", 3),
+            ("2024-06-01", 1),
+        ]
+        with pytest.raises(ValueError):
+            rollups.timeline("year")
+
+    def test_incremental_updates(self, rollups: SalesRollups) -> None:
+        rollups.apply(
+            "upsert", [sale(4, "new", "carol", 1, 50.0, "2024-05-06T12:00:00Z")]
+        )
+        rollups.apply("delete", [sale(3, GONE, "bob", 1, 1.5, "2024-06-01T00:00:00Z")])
+        expected = SalesRollups()
+        expected.load(
+            [
+                sale(0, APPLE, "alice", 2, 4.0, "2024-05-06T10:00:00+00:00"),
+                sale(1, WATCH, "alice", 1, 200.0, "2024-05-08T10:00:00+00:00"),
+                sale(2, APPLE, "bob", 5, 10.0, "2024-05-13T23:30:00Z"),
+                sale(4, "new", "carol", 1, 50.0, "2024-05-06T12:00:00Z"),
+            ]
+        )
+        assert rollups.by_product() == expected.by_product()
+        assert rollups.by_customer() == expected.by_customer()
+        assert rollups.timeline("month") == expected.timeline("month")
+
+    def test_update_invalidates(self, rollups: SalesRollups) -> None:
+        rollups.apply(
+            "update", [sale(1, WATCH, "alice", 1, 150.0, "2024-05-08T10:00:00Z")]
+        )
+        assert rollups.is_stale()
+
+    def test_undated_rows(self) -> None:
+        rollups = SalesRollups()
+        rollups.load([sale(0, APPLE, "alice", 1, 2.0, None)])  # type: ignore[arg-type]
+        assert rollups.by_product()[0]["revenue"] == 2.0
+        assert rollups.timeline() == []
+
+    def test_invalid_write_invalidates(self, rollups: SalesRollups) -> None:
+        rollups.apply("upsert", [{"id": "history-9", "product_id": APPLE}])
+        assert rollups.is_stale()
+
+    def test_load_if_stale_reads_every_page(self) -> None:
+        dao = Mock()
+        dao.iter_pages.return_value = iter(
+            [
+                [sale(0, APPLE, "alice", 1, 2.0, "2024-05-06T10:00:00+00:00")],
+                [sale(1, WATCH, "bob", 1, 3.0, "2024-05-06T11:00:00+00:00")],
+            ]
+        )
+        rollups = SalesRollups()
+        rollups.load_if_stale(dao)
+        rollups.load_if_stale(dao)
+        assert dao.iter_pages.call_count == 1
+        assert len(rollups.by_product()) == 2
+
+    def test_writes_during_a_reload(self) -> None:
+        rollups = SalesRollups()
+        rollups.load([sale(0, APPLE, "alice", 1, 2.0, "2024-05-06T10:00:00Z")])
+        rollups.loaded_at = -1e9
+        fetched = [
+            sale(0, APPLE, "alice", 1, 2.0, "2024-05-06T10:00:00Z"),
+            sale(1, WATCH, "bob", 1, 3.0, "2024-05-06T11:00:00Z"),
+        ]
+
+        def write(op: str, row: dict) -> None:
+            # Writes come from other threads and must not wait for the fetch.
+            writer = threading.Thread(target=rollups.apply, args=(op, [row]))
+            writer.start()
+            writer.join(timeout=5)
+            assert not writer.is_alive()
+
+        def pages(**kwargs: Any) -> Iterator[list[dict]]:
+            # Made before the fetch read it: already in the fetched rows.
+            write("upsert", fetched[1])
+            # Made after: missing from them.
+            write("upsert", sale(2, WATCH, "carol", 1, 5.0, "2024-05-07T10:00:00Z"))
+            write("delete", fetched[0])
+            yield fetched
+
+        dao = Mock()
+        dao.iter_pages.side_effect = pages
+        rollups.load_if_stale(dao)
+
+        assert rollups.by_customer() == [
+            {"customer_id": "carol", "revenue": 5.0, "quantity": 1, "orders": 1},
+            {"customer_id": "bob", "revenue": 3.0, "quantity": 1, "orders": 1},
+        ]
+        assert not rollups.is_stale()
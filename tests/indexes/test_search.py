@@ -0,0 +1,121 @@
+import pytest
+
+from src.indexes import search
+from src.indexes.catalog import CatalogSnapshot
+from src.indexes.search import SearchIndex, tokenize
+
+
+def product(i: int, name: str, description: str, category: str = "electronics") -> dict:
+    return {
+        "id": f"00000000-0000-0000-0000-{i:012d}",
+        "product_name": name,
+        "category": category,
+        "price": 10.0,
+        "quantity": 1,
+        "description": description,
+    }
+
+
+@pytest.fixture
+def snapshot() -> CatalogSnapshot:
+    snapshot = CatalogSnapshot()
+    snapshot.load(
+        [
+            product(0, "Wireless Mouse", "A small mouse for laptops"),
+            product(1, "Gaming Keyboard", "Mechanical keyboard with a wireless dongle"),
+            product(2, "Cotton Shirt", "Soft shirt", category="clothes"),
+            product(3, "Mouse Pad", "Large pad for any mouse", category="accessories"),
+        ]
+    )
+    return snapshot
+
+
+@pytest.fixture
+def index(snapshot: CatalogSnapshot) -> SearchIndex:
+    return SearchIndex(snapshot)
+
+
+def names(snapshot: CatalogSnapshot, rows: object) -> list[str]:
+    return [record["product_name"] for record in snapshot.records(rows)]  # type: ignore[arg-type]
+
+
+class TestSearchIndex:
+    def test_tokenize(self) -> None:
+        assert tokenize("Wireless-Mouse, 2.4GHz!") == ["wireless", "mouse", "2", "4ghz"]
+
+    def test_ranking(self, snapshot: CatalogSnapshot, index: SearchIndex) -> None:
+        assert names(snapshot, index.search("wireless")) == [
+            "Wireless Mouse",
+            "Gaming Keyboard",
+        ]
+        assert names(snapshot, index.search("MOUSE pad")) == [
+            "Mouse Pad",
+            "Wireless Mouse",
+        ]
+        assert index.search("nothing").size == 0
+
+    def test_category_and_limit(
+        self, snapshot: CatalogSnapshot, index: SearchIndex
+    ) -> None:
+        assert names(snapshot, index.search("mouse", category="accessories")) == [
+            "Mouse Pad"
+        ]
+        assert index.search("mouse", category="toys").size == 0
+        assert index.search("mouse wireless keyboard shirt", limit=2).size == 2
+
+    def test_incremental_updates(
+        self, snapshot: CatalogSnapshot, index: SearchIndex
+    ) -> None:
+        index.search("mouse")
+        snapshot.apply("upsert", [product(0, "Trackball", "Ergonomic trackball")])
+        snapshot.apply("upsert", [product(4, "Wireless Headset", "Over-ear")])
+        snapshot.apply("delete", [product(3, "", "")])
+        assert names(snapshot, index.search("mouse")) == []
+        assert names(snapshot, index.search("trackball")) == ["Trackball"]
+        assert names(snapshot, index.search("wireless")) == [
+            "Wireless Headset",
+            "Gaming Keyboard",
+        ]
+
+    def test_reload_rebuilds(
+        self, snapshot: CatalogSnapshot, index: SearchIndex
+    ) -> None:
+        index.search("mouse")
+        snapshot.load([product(0, "Desk Lamp", "Bright")])
+        assert names(snapshot, index.search("lamp")) == ["Desk Lamp"]
+        assert index.search("mouse").size == 0
+
+    def test_reload_is_reconciled(
+        self, snapshot: CatalogSnapshot, index: SearchIndex
+    ) -> None:
+        index.search("mouse")
+        snapshot.load(
+            [
+                product(0, "Trackball", "Ergonomic trackball"),
+                product(
+                    1, "Gaming Keyboard", "Mechanical keyboard with a wireless dongle"
+                ),
+                product(2, "Cotton Shirt", "Soft shirt", category="clothes"),
+                product(
+                    3, "Mouse Pad", "Large pad for any mouse", category="accessories"
+                ),
+            ]
+        )
+        assert not index.dirty
+        assert names(snapshot, index.search("trackball")) == ["Trackball"]
+        assert names(snapshot, index.search("mouse")) == ["Mouse Pad"]
+
+    def test_changes_during_rebuild_are_replayed(
+        self,
+        snapshot: CatalogSnapshot,
+        index: SearchIndex,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        def tokenize_and_write(text: str) -> list[str]:
+            monkeypatch.setattr(search, "tokenize", tokenize)
+            snapshot.apply("upsert", [product(0, "Trackball", "Ergonomic trackball")])
+            return tokenize(text)
+
+        monkeypatch.setattr(search, "tokenize", tokenize_and_write)
+        assert names(snapshot, index.search("trackball")) == ["Trackball"]
+        assert index.missed is None
@@ -0,0 +1,86 @@
+import threading
+
+import pytest
+
+from src.indexes.catalog import CatalogSnapshot
+from src.indexes.suggest import SuggestIndex
+
+
+def product(i: int, name: str, quantity: int) -> dict:
+    return {
+        "id": f"00000000-0000-0000-0000-{i:012d}",
+        "product_name": name,
+        "category": "food",
+        "price": 1.0,
+        "quantity": quantity,
+        "description": "",
+    }
+
+
+@pytest.fixture
+def snapshot() -> CatalogSnapshot:
+    snapshot = CatalogSnapshot()
+    snapshot.load(
+        [
+            product(0, "Apple", 5),
+            product(1, "Apricot", 9),
+            product(2, "apple juice", 1),
+            product(3, "Banana", 7),
+            product(4, "Apple", 6),
+        ]
+    )
+    return snapshot
+
+
+@pytest.fixture
+def index(snapshot: CatalogSnapshot) -> SuggestIndex:
+    return SuggestIndex(snapshot, cache_size=2)
+
+
+class TestSuggestIndex:
+    def test_prefix_ranked_by_stock(self, index: SuggestIndex) -> None:
+        assert index.suggest("ap") == ["Apple", "Apricot", "apple juice"]
+        assert index.suggest("APPLE") == ["Apple", "apple juice"]
+        assert index.suggest("c") == []
+
+    def test_limit_uses_cache(self, index: SuggestIndex) -> None:
+        assert index.suggest("a", limit=2) == ["Apple", "Apricot"]
+        assert ("a", 2) in index.cache
+        assert index.suggest("a", limit=2) == ["Apple", "Apricot"]
+
+    def test_stock_patch(self, snapshot: CatalogSnapshot, index: SuggestIndex) -> None:
+        index.suggest("a", limit=2)
+        snapshot.apply("upsert", [product(2, "apple juice", 50)])
+        assert not index.dirty
+        assert ("a", 2) not in index.cache
+        assert index.suggest("a", limit=2) == ["apple juice", "Apple"]
+
+    def test_new_and_deleted_names(
+        self, snapshot: CatalogSnapshot, index: SuggestIndex
+    ) -> None:
+        index.suggest("a")
+        snapshot.apply("upsert", [product(5, "Avocado", 3)])
+        snapshot.apply("delete", [product(1, "Apricot", 9)])
+        assert index.suggest("a") == ["Apple", "Avocado", "apple juice"]
+
+    def test_rename(self, snapshot: CatalogSnapshot, index: SuggestIndex) -> None:
+        index.suggest("a")
+        snapshot.apply("upsert", [product(0, "Banana", 5)])
+        assert not index.dirty
+        assert index.suggest("apple") == ["Apple", "apple juice"]
+        assert index.stock[index.position["Banana"]] == 12
+        assert index.stock[index.position["Apple"]] == 6
+
+    def test_rebuild_waits_for_catalog_writes(
+        self, snapshot: CatalogSnapshot, index: SuggestIndex
+    ) -> None:
+        with snapshot._lock:
+            rebuild = threading.Thread(target=index.rebuild)
+            rebuild.start()
+            rebuild.join(timeout=0.1)
+            # Blocked on the catalog's lock, not iterating its names meanwhile.
+            assert rebuild.is_alive()
+            snapshot.apply("upsert", [product(5, "Avocado", 3)])
+        rebuild.join(timeout=5)
+        assert not rebuild.is_alive()
+        assert index.suggest("av") == ["Avocado"]
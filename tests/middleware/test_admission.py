@@ -0,0 +1,177 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from src.middleware.admission import (
+    AdmissionController,
+    AdmissionMiddleware,
+    RouteClass,
+    classify,
+)
+from src.utils.metrics import metrics
+
+CLASSES = {
+    "critical": RouteClass(0, limit=2, queue_size=4, deadline=1),
+    "point": RouteClass(1, limit=2, queue_size=4, deadline=1),
+    "bulk": RouteClass(2, limit=1, queue_size=1, deadline=0.05),
+}
+
+
+@pytest.mark.parametrize(
+    "method, path, route_class",
+    [
+        ("POST", "/sales/purchase/1", "critical"),
+        ("POST", "/auth/login", "critical"),
+        ("PUT", "/customers/add_money/1", "critical"),
+        ("PUT", "/inventory/deduct/1", "critical"),
+        ("GET", "/customers/1", "point"),
+        ("PUT", "/customers/1", "point"),
+        ("GET", "/sales/good", "point"),
+        ("GET", "/sales/search", "point"),
+        ("GET", "/reviews/summary/1", "point"),
+        ("GET", "/customers/", "bulk"),
+        ("GET", "/inventory", "bulk"),
+        ("GET", "/customers/export", "bulk"),
+        ("POST", "/inventory/many", "bulk"),
+        ("GET", "/sales/goods", "bulk"),
+        ("GET", "/sales/analytics/products", "bulk"),
+        ("GET", "/sales/customer=1/history", "bulk"),
+        ("GET", "/reviews/summary", "bulk"),
+        ("POST", "/reviews/summary/rebuild", "bulk"),
+        ("GET", "/status/metrics", None),
+        ("GET", "/docs", None),
+        ("GET", "/", None),
+    ],
+)
+def test_classify(method: str, path: str, route_class: str) -> None:
+    assert classify(method, path) == route_class
+
+
+@pytest.mark.asyncio
+class TestAdmissionController:
+    async def test_limit_per_class(self) -> None:
+        controller = AdmissionController(CLASSES, max_concurrency=10)
+
+        assert await controller.acquire("bulk") is None
+        assert await controller.acquire("point") is None
+        waiting = asyncio.create_task(controller.acquire("bulk"))
+        await asyncio.sleep(0)
+        assert controller.queued["bulk"] == 1
+
+        controller.release("bulk")
+
+        assert await waiting is None
+        assert controller.running == {"critical": 0, "point": 1, "bulk": 1}
+
+    async def test_priority_order(self) -> None:
+        controller = AdmissionController(CLASSES, max_concurrency=1)
+        admitted: list[str] = []
+
+        async def request(route_class: str) -> None:
+            assert await controller.acquire(route_class) is None
+            admitted.append(route_class)
+
+        assert await controller.acquire("point") is None
+        tasks = []
+        for route_class in ("bulk", "point", "critical", "critical"):
+            tasks.append(asyncio.create_task(request(route_class)))
+            await asyncio.sleep(0)
+        holder = "point"
+        for _ in tasks:
+            controller.release(holder)
+            await asyncio.sleep(0)
+            holder = admitted[-1]
+        await asyncio.gather(*tasks)
+
+        assert admitted == ["critical", "critical", "point", "bulk"]
+
+    async def test_queue_full(self) -> None:
+        controller = AdmissionController(CLASSES, max_concurrency=10)
+        before = metrics.get("admission.shed", route_class="bulk", reason="queue_full")
+
+        assert await controller.acquire("bulk") is None
+        waiting = asyncio.create_task(controller.acquire("bulk"))
+        await asyncio.sleep(0)
+
+        assert await controller.acquire("bulk") == "queue_full"
+        assert (
+            metrics.get("admission.shed", route_class="bulk", reason="queue_full")
+            == before + 1
+        )
+        controller.release("bulk")
+        assert await waiting is None
+
+    async def test_deadline(self) -> None:
+        controller = AdmissionController(CLASSES, max_concurrency=10)
+        before = metrics.get("admission.shed", route_class="bulk", reason="deadline")
+
+        assert await controller.acquire("bulk") is None
+        assert await controller.acquire("bulk") == "deadline"
+
+        assert controller.queued["bulk"] == 0
+        assert metrics.get("admission.queue_depth", route_class="bulk") == 0
+        assert (
+            metrics.get("admission.shed", route_class="bulk", reason="deadline")
+            == before + 1
+        )
+        # The shed request left the queue: the next one is admitted directly.
+        controller.release("bulk")
+        assert await controller.acquire("bulk") is None
+
+    async def test_cancelled_waiter_leaves_the_queue(self) -> None:
+        controller = AdmissionController(CLASSES, max_concurrency=10)
+
+        assert await controller.acquire("point") is None
+        assert await controller.acquire("point") is None
+        waiting = asyncio.create_task(controller.acquire("point"))
+        await asyncio.sleep(0)
+        waiting.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+
+        assert controller.queued["point"] == 0
+        controller.release("point")
+        assert controller.running["point"] == 1
+
+
+@pytest.mark.asyncio
+class TestAdmissionMiddleware:
+    async def test_bulk_requests_do_not_delay_critical_ones(self) -> None:
+        app = FastAPI()
+        release = asyncio.Event()
+
+        @app.get("/customers/")
+        async def list_customers() -> list[str]:
+            await release.wait()
+            return []
+
+        @app.post("/sales/purchase/{id}")
+        async def purchase(id: str) -> str:
+            return id
+
+        @app.get("/status")
+        async def status_check() -> str:
+            return "ok"
+
+        app.add_middleware(
+            AdmissionMiddleware, classes=CLASSES, max_concurrency=2, retry_after=3
+        )
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://api"
+        ) as client:
+            listing = asyncio.create_task(client.get("/customers/"))
+            await asyncio.sleep(0.01)
+
+            shed = await client.get("/customers/")
+            purchase_response = await client.post("/sales/purchase/1")
+            status_response = await client.get("/status")
+
+            release.set()
+            assert (await listing).status_code == 200
+
+        assert shed.status_code == 503
+        assert shed.headers["retry-after"] == "3"
+        assert purchase_response.status_code == 200
+        assert status_response.status_code == 200
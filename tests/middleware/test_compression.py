@@ -0,0 +1,121 @@
+import zlib
+from typing import Callable, Optional
+
+import brotli
+import pytest
+import zstandard
+from fastapi import FastAPI, Response
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from src.middleware.compression import (
+    CompressionMiddleware,
+    StreamCompressor,
+    negotiate_encoding,
+)
+from src.utils.metrics import metrics
+
+BODY = b"x" * 4096
+
+
+@pytest.fixture
+def client() -> TestClient:
+    app = FastAPI()
+
+    @app.get("/large")
+    async def large() -> Response:
+        return Response(BODY, headers={"ETag": '"v1"'})
+
+    @app.get("/small")
+    async def small() -> Response:
+        return Response(b"small")
+
+    @app.get("/stream")
+    async def stream() -> StreamingResponse:
+        return StreamingResponse(iter([BODY, BODY]))
+
+    app.add_middleware(CompressionMiddleware, minimum_size=1024, cache_size=4)
+    return TestClient(app)
+
+
+class TestNegotiateEncoding:
+    @pytest.mark.parametrize(
+        "accept_encoding, expected",
+        [
+            (None, None),
+            ("identity", None),
+            ("gzip", "gzip"),
+            ("gzip, br", "br"),
+            ("gzip, zstd;q=0.5", "gzip"),
+            ("br;q=0, *", "zstd"),
+            ("gzip;q=0", None),
+        ],
+    )
+    def test_negotiate_encoding(
+        self, accept_encoding: Optional[str], expected: Optional[str]
+    ) -> None:
+        assert negotiate_encoding(accept_encoding) == expected
+
+
+class TestCompressionMiddleware:
+    def test_gzip(self, client: TestClient) -> None:
+        response = client.get("/large", headers={"Accept-Encoding": "gzip"})
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.headers["etag"] == 'W/"v1"'
+        assert "Accept-Encoding" in response.headers["vary"]
+        assert response.content == BODY
+
+    def test_compressed_once(self, client: TestClient) -> None:
+        hits = metrics.get("compression.cache_hits", encoding="gzip")
+        first = client.get("/large", headers={"Accept-Encoding": "gzip"})
+        second = client.get("/large", headers={"Accept-Encoding": "gzip"})
+        assert first.content == second.content == BODY
+        assert metrics.get("compression.cache_hits", encoding="gzip") >= hits + 1
+
+    def test_below_threshold(self, client: TestClient) -> None:
+        response = client.get("/small", headers={"Accept-Encoding": "gzip"})
+        assert "content-encoding" not in response.headers
+        assert response.content == b"small"
+
+    @pytest.mark.parametrize(
+        "encoding, decompress",
+        [
+            ("gzip", lambda body: zlib.decompress(body, 16 + zlib.MAX_WBITS)),
+            ("br", brotli.decompress),
+            (
+                "zstd",
+                lambda body: zstandard.ZstdDecompressor()
+                .decompressobj()
+                .decompress(body),
+            ),
+        ],
+    )
+    def test_streaming(
+        self, client: TestClient, encoding: str, decompress: Callable[[bytes], bytes]
+    ) -> None:
+        with client.stream(
+            "GET", "/stream", headers={"Accept-Encoding": encoding}
+        ) as response:
+            assert response.headers["content-encoding"] == encoding
+            assert "content-length" not in response.headers
+            assert "Accept-Encoding" in response.headers["vary"]
+            body = b"".join(response.iter_raw())
+        assert len(body) < len(BODY)
+        assert decompress(body) == BODY * 2
+
+    def test_streaming_chunks_decode_on_arrival(self) -> None:
+        first = StreamCompressor("gzip").compress(BODY)
+        assert zlib.decompressobj(16 + zlib.MAX_WBITS).decompress(first) == BODY
+
+    def test_identity(self, client: TestClient) -> None:
+        response = client.get("/large", headers={"Accept-Encoding": "identity"})
+        assert "content-encoding" not in response.headers
+        assert response.headers["etag"] == '"v1"'
+
+    def test_metrics(self, client: TestClient) -> None:
+        before = metrics.get("compression.bytes_in", encoding="br")
+        client.get("/large", headers={"Accept-Encoding": "br"})
+        assert metrics.get("compression.bytes_in", encoding="br") == before + len(BODY)
+        assert metrics.get("compression.bytes_out", encoding="br") < metrics.get(
+            "compression.bytes_in", encoding="br"
+        )
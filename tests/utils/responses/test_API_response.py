@@ -0,0 +1,41 @@
+import json
+
+import pytest
+from fastapi import status
+
+from src.controllers.schemas._base_schemas import BaseResponse
+from src.db.models import Inventory
+from src.utils.responses import APIResponse
+
+
+@pytest.fixture
+def inventory() -> Inventory:
+    return Inventory(
+        id="00000000-0000-0000-0000-000000000001",
+        product_name="Café",
+        category="food",
+        price=2.5,
+        quantity=3,
+        description="Coffee",
+    )
+
+
+class TestAPIResponse:
+    def test_dict_data(self) -> None:
+        response = APIResponse(message="ok", data={"a": 1})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.body == b'{"message":"ok","data":{"a":1}}'
+        assert response.headers["content-type"] == "application/json"
+
+    def test_model_data(self, inventory: Inventory) -> None:
+        data = BaseResponse[Inventory](items=[inventory])
+        response = APIResponse(message="ok", data=data)
+        assert json.loads(response.body) == {
+            "message": "ok",
+            "data": {"items": [inventory.model_dump()]},
+        }
+        assert "Café".encode() in response.body
+
+    def test_message_required(self) -> None:
+        with pytest.raises(ValueError):
+            APIResponse(message="")
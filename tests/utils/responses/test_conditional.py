@@ -0,0 +1,140 @@
+from collections import defaultdict
+from typing import Optional
+from unittest.mock import Mock
+
+import pytest
+from fastapi import FastAPI, status
+from fastapi.testclient import TestClient
+
+from src.auth.dependencies import get_access_token
+from src.controllers.routers import BaseRouter
+from src.db.hooks import WriteHooks
+from src.db.models import BaseModel
+from src.db.table_versions import TableVersions, table_versions
+from src.utils.responses.conditional import etag_matches
+from src.utils.types import UuidStr
+
+
+class TestObject(BaseModel):
+    __test__ = False
+    id: Optional[UuidStr] = None
+    name: str
+
+
+@pytest.fixture
+def dao() -> Mock:
+    dao = Mock()
+    dao.get_by_query.return_value = [TestObject(name="test_name")]
+    return dao
+
+
+@pytest.fixture
+def get_dao(dao: Mock) -> Mock:
+    return Mock(return_value=dao)
+
+
+@pytest.fixture
+def client(get_dao: Mock) -> TestClient:
+    app = FastAPI()
+    app.include_router(
+        BaseRouter[TestObject](
+            prefix="/test",
+            tags=["test"],
+            name="test",
+            model=TestObject,
+            get_dao=lambda: get_dao(),
+            table="TESTS",
+        ).build_router()
+    )
+    app.dependency_overrides[get_access_token] = lambda: "token"
+    return TestClient(app)
+
+
+class TestEtagMatches:
+    @pytest.mark.parametrize(
+        "if_none_match, expected",
+        [
+            (None, False),
+            ('"a"', True),
+            ('W/"a"', True),
+            ('"b", "a"', True),
+            ('"b"', False),
+            ("*", True),
+        ],
+    )
+    def test_etag_matches(self, if_none_match: Optional[str], expected: bool) -> None:
+        assert etag_matches('"a"', if_none_match) is expected
+
+
+class TestTableVersions:
+    def test_get_reads_versions_table(self) -> None:
+        client = Mock()
+        query = client.table.return_value.select.return_value.in_.return_value
+        query.execute.return_value.data = [{"table_name": "TESTS", "version": 3}]
+        versions = TableVersions(get_client=lambda: client)
+
+        assert versions.get(["TESTS", "OTHER"]) == {"TESTS": 3, "OTHER": 0}
+        client.table.assert_called_with("table_versions")
+        client.table.return_value.select.return_value.in_.assert_called_with(
+            "table_name", ["TESTS", "OTHER"]
+        )
+
+    def test_versions_are_reused_until_stale_or_written(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        hooks = WriteHooks()
+        versions = TableVersions(max_age=60)
+        read = Mock(side_effect=lambda tables: dict.fromkeys(tables, 1))
+        monkeypatch.setattr(versions, "read", read)
+        hooks.register("TESTS", versions.invalidator("TESTS"))
+
+        assert versions.get(["TESTS", "OTHER"]) == {"TESTS": 1, "OTHER": 1}
+        assert versions.get(["TESTS"]) == {"TESTS": 1}
+        assert read.call_count == 1
+
+        hooks.dispatch("TESTS", "update", [{"id": "1"}])
+        versions.get(["TESTS", "OTHER"])
+        read.assert_called_with(["TESTS"])
+
+        versions.max_age = -1
+        versions.get(["TESTS", "OTHER"])
+        read.assert_called_with(["TESTS", "OTHER"])
+        assert read.call_count == 3
+
+    def test_etag_changes_with_version(self, versions: defaultdict[str, int]) -> None:
+        etag = table_versions.etag(["TESTS"])
+        assert table_versions.etag(["TESTS"]) == etag
+        assert table_versions.etag(["TESTS"], variant="application/msgpack") != etag
+        versions["TESTS"] += 1
+        assert table_versions.etag(["TESTS"]) != etag
+
+
+class TestConditionalGet:
+    def test_not_modified_skips_dao(self, client: TestClient, get_dao: Mock) -> None:
+        response = client.get("/test/")
+        assert response.status_code == status.HTTP_200_OK
+        etag = response.headers["etag"]
+        assert get_dao.call_count == 1
+
+        response = client.get("/test/", headers={"If-None-Match": etag})
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response.headers["etag"] == etag
+        assert get_dao.call_count == 1
+
+    def test_write_invalidates(
+        self, client: TestClient, versions: defaultdict[str, int]
+    ) -> None:
+        etag = client.get("/test/").headers["etag"]
+        versions["TESTS"] += 1
+
+        response = client.get("/test/", headers={"If-None-Match": etag})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["etag"] != etag
+
+    def test_versions_unavailable(
+        self, client: TestClient, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        monkeypatch.setattr(table_versions, "get", Mock(side_effect=Exception("down")))
+        response = client.get("/test/", headers={"If-None-Match": "*"})
+        assert response.status_code == status.HTTP_200_OK
+        assert "etag" not in response.headers
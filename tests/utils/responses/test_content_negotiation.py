@@ -0,0 +1,137 @@
+from typing import Any, Optional
+
+import msgpack  # type: ignore
+import pytest
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+from pydantic import BaseModel as PydanticBaseModel
+
+from src.utils.responses import APIResponse, NegotiatedRoute, RawItems
+from src.utils.responses.content_negotiation import (
+    CBOR,
+    JSON,
+    MSGPACK,
+    accepts,
+    decode,
+    encode,
+    negotiate,
+)
+
+
+class Item(PydanticBaseModel):
+    name: str
+
+
+@pytest.fixture
+def client() -> TestClient:
+    router = APIRouter(prefix="/test", route_class=NegotiatedRoute)
+
+    @router.get("/")
+    async def get_items() -> APIResponse:
+        return APIResponse(message="found", data={"items": [{"name": "a"}]})
+
+    @router.get("/raw")
+    async def get_raw() -> APIResponse:
+        return APIResponse(message="found", data=RawItems(b'[{"name":"a"}]'))
+
+    @router.post("/many")
+    async def create_many(request: list[Item]) -> APIResponse:
+        return APIResponse(message="created", data={"count": len(request)})
+
+    app = FastAPI()
+    app.include_router(router)
+    return TestClient(app)
+
+
+class TestNegotiate:
+    @pytest.mark.parametrize(
+        "accept, expected",
+        [
+            (None, JSON),
+            ("*/*", JSON),
+            ("application/msgpack", MSGPACK),
+            ("application/x-msgpack", MSGPACK),
+            ("application/cbor", CBOR),
+            ("application/msgpack;q=0.5, application/json", JSON),
+            ("application/json;q=0.5, application/msgpack", MSGPACK),
+            ("application/msgpack;q=0", JSON),
+            ("text/html", JSON),
+            ("application/*", JSON),
+            ("application/msgpack;q=0.5, */*", JSON),
+            ("application/json;q=0.1, application/*;q=0.5", MSGPACK),
+            ("application/json;q=0, */*", MSGPACK),
+            ("application/cbor, */*;q=0.1", CBOR),
+        ],
+    )
+    def test_negotiate(self, accept: Optional[str], expected: str) -> None:
+        assert negotiate(accept) == expected
+
+    @pytest.mark.parametrize(
+        "accept, media_type, expected",
+        [
+            (None, JSON, True),
+            ("*/*", "application/x-ndjson", True),
+            ("application/msgpack", JSON, False),
+            ("application/msgpack, application/json;q=0.5", JSON, True),
+            (
+                "application/*;q=0.5, application/x-ndjson;q=0",
+                "application/x-ndjson",
+                False,
+            ),
+        ],
+    )
+    def test_accepts(
+        self, accept: Optional[str], media_type: str, expected: bool
+    ) -> None:
+        assert accepts(accept, media_type) is expected
+
+    @pytest.mark.parametrize("media_type", [JSON, MSGPACK, CBOR])
+    def test_round_trip(self, media_type: str) -> None:
+        content: dict[str, Any] = {"message": "ok", "data": {"items": [Item(name="a")]}}
+        assert decode(encode(content, media_type), media_type) == {
+            "message": "ok",
+            "data": {"items": [{"name": "a"}]},
+        }
+
+
+class TestNegotiatedRoute:
+    def test_json_by_default(self, client: TestClient) -> None:
+        response = client.get("/test/")
+        assert response.headers["content-type"] == JSON
+        assert response.headers["vary"] == "Accept"
+        assert response.json() == {
+            "message": "found",
+            "data": {"items": [{"name": "a"}]},
+        }
+
+    def test_msgpack_response(self, client: TestClient) -> None:
+        response = client.get("/test/", headers={"Accept": MSGPACK})
+        assert response.headers["content-type"] == MSGPACK
+        assert msgpack.unpackb(response.content) == {
+            "message": "found",
+            "data": {"items": [{"name": "a"}]},
+        }
+
+    def test_msgpack_raw_items(self, client: TestClient) -> None:
+        response = client.get("/test/raw", headers={"Accept": MSGPACK})
+        assert msgpack.unpackb(response.content)["data"] == {"items": [{"name": "a"}]}
+
+    def test_cbor_response(self, client: TestClient) -> None:
+        response = client.get("/test/", headers={"Accept": CBOR})
+        assert response.headers["content-type"] == CBOR
+        assert decode(response.content, CBOR)["message"] == "found"
+
+    def test_msgpack_request_body(self, client: TestClient) -> None:
+        body = msgpack.packb([{"name": "a"}, {"name": "b"}])
+        response = client.post(
+            "/test/many", content=body, headers={"Content-Type": MSGPACK}
+        )
+        assert response.status_code == 200
+        assert response.json()["data"] == {"count": 2}
+
+    def test_msgpack_request_body_invalid(self, client: TestClient) -> None:
+        body = msgpack.packb([{"wrong": "a"}])
+        response = client.post(
+            "/test/many", content=body, headers={"Content-Type": MSGPACK}
+        )
+        assert response.status_code == 422
@@ -0,0 +1,52 @@
+import io
+from datetime import datetime, timezone
+
+import pyarrow.parquet
+import pytest
+
+from src.db.models import History
+from src.utils.responses.export import ExportStream, csv_chunks, parquet_chunks
+
+ROWS = [
+    {
+        "id": f"history-{i}",
+        "customer_id": "customer",
+        "product_id": "product",
+        "quantity": i + 1,
+        "total": 2.5 * (i + 1),
+        "purchase_date": f"2024-05-0{i + 1}T12:00:00+00:00" if i else None,
+    }
+    for i in range(5)
+]
+
+
+class TestExport:
+    def test_csv_chunks(self) -> None:
+        chunks = list(csv_chunks([ROWS[:2], ROWS[2:]], list(History.model_fields)))
+        assert len(chunks) == 3
+        lines = b"".join(chunks).decode().splitlines()
+        assert lines[0] == "id,customer_id,product_id,quantity,total,purchase_date"
+        assert lines[1] == "history-0,customer,product,1,2.5,"
+        assert len(lines) == len(ROWS) + 1
+
+    def test_parquet_row_groups(self) -> None:
+        chunks = list(parquet_chunks([ROWS[:3], ROWS[3:]], History, row_group_size=2))
+        assert len(chunks) == 4
+        assert chunks[0].startswith(b"PAR1")
+        file = pyarrow.parquet.ParquetFile(io.BytesIO(b"".join(chunks)))
+        assert file.num_row_groups == 3
+        rows = file.read().to_pylist()
+        assert [row["quantity"] for row in rows] == [1, 2, 3, 4, 5]
+        assert rows[0]["purchase_date"] is None
+        assert rows[1]["purchase_date"] == datetime(2024, 5, 2, 12, tzinfo=timezone.utc)
+
+    def test_parquet_empty(self) -> None:
+        file = pyarrow.parquet.ParquetFile(
+            io.BytesIO(b"".join(parquet_chunks([], History)))
+        )
+        assert file.metadata.num_rows == 0
+        assert file.schema_arrow.names == list(History.model_fields)
+
+    def test_unsupported_format(self) -> None:
+        with pytest.raises(ValueError):
+            ExportStream([], History, "xlsx", "history")  # type: ignore[arg-type]
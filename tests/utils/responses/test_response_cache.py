@@ -0,0 +1,199 @@
+import asyncio
+import inspect
+from collections import defaultdict
+from typing import Optional
+from unittest.mock import Mock
+
+import pytest
+from fastapi import FastAPI, Request, Response, status
+from fastapi.testclient import TestClient
+
+from src.auth.dependencies import get_access_token
+from src.controllers.routers import BaseRouter
+from src.db.models import BaseModel
+from src.db.table_versions import table_versions
+from src.utils.responses.response_cache import CachedResponse, ResponseCache, auth_scope
+from src.utils.types import UuidStr
+
+
+class TestObject(BaseModel):
+    __test__ = False
+    id: Optional[UuidStr] = None
+    name: str
+
+
+@pytest.fixture
+def dao() -> Mock:
+    dao = Mock()
+    dao.get_by_query.return_value = [TestObject(name="test_name")]
+    return dao
+
+
+@pytest.fixture
+def client(dao: Mock) -> TestClient:
+    app = FastAPI()
+    app.include_router(
+        BaseRouter[TestObject](
+            prefix="/cached",
+            tags=["test"],
+            name="test",
+            model=TestObject,
+            get_dao=lambda: dao,
+            table="CACHED_TESTS",
+            cache_ttl=60,
+            cache_scope="role",
+        ).build_router()
+    )
+    app.dependency_overrides[get_access_token] = lambda: "token"
+    return TestClient(app)
+
+
+class TestResponseCache:
+    def test_concurrent_misses_are_coalesced(self) -> None:
+        cache = ResponseCache(max_entries=8, beta=0)
+        calls = 0
+
+        async def compute() -> Response:
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return Response(content=b"body")
+
+        async def run() -> list[Response]:
+            return await asyncio.gather(
+                *(cache.get_or_compute(("key",), compute, ttl=60) for _ in range(10))
+            )
+
+        responses = asyncio.run(run())
+        assert calls == 1
+        assert all(response.body == b"body" for response in responses)
+
+    def test_waiter_takes_over_from_a_cancelled_leader(self) -> None:
+        cache = ResponseCache(max_entries=8, beta=0)
+        started = 0
+
+        async def compute() -> Response:
+            nonlocal started
+            started += 1
+            await asyncio.sleep(0.01)
+            return Response(content=f"body {started}".encode())
+
+        async def run() -> list[bytes]:
+            leader = asyncio.create_task(cache.get_or_compute(("key",), compute, 60))
+            await asyncio.sleep(0)
+            waiters = [
+                asyncio.create_task(cache.get_or_compute(("key",), compute, 60))
+                for _ in range(3)
+            ]
+            await asyncio.sleep(0)
+            leader.cancel()
+            return [(await waiter).body for waiter in waiters]
+
+        assert asyncio.run(run()) == [b"body 2"] * 3
+        assert started == 2
+
+    def test_expired_entry_is_recomputed(self) -> None:
+        cache = ResponseCache(max_entries=8, beta=0)
+        calls = 0
+
+        async def compute() -> Response:
+            nonlocal calls
+            calls += 1
+            return Response(content=str(calls).encode())
+
+        async def run() -> bytes:
+            await cache.get_or_compute(("key",), compute, ttl=60)
+            cache._entries[("key",)].expires_at = 0
+            return (await cache.get_or_compute(("key",), compute, ttl=60)).body
+
+        assert asyncio.run(run()) == b"2"
+
+    def test_errors_are_not_cached(self) -> None:
+        cache = ResponseCache(max_entries=8, beta=0)
+
+        async def compute() -> Response:
+            return Response(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+        asyncio.run(cache.get_or_compute(("key",), compute, ttl=60))
+        assert ("key",) not in cache._entries
+
+    def test_early_refresh_near_expiry(self) -> None:
+        cache = ResponseCache(max_entries=8, beta=1)
+        entry = CachedResponse(200, b"", [], expires_at=100, compute_seconds=1)
+        assert not cache.should_refresh(entry, now=0)
+        assert cache.should_refresh(entry, now=100)
+        assert any(cache.should_refresh(entry, now=99.9) for _ in range(100))
+
+    def test_lru_eviction(self) -> None:
+        cache = ResponseCache(max_entries=2, beta=0)
+
+        async def compute() -> Response:
+            return Response(content=b"body")
+
+        async def run() -> None:
+            for key in ("a", "b", "c"):
+                await cache.get_or_compute((key,), compute, ttl=60)
+
+        asyncio.run(run())
+        assert list(cache._entries) == [("b",), ("c",)]
+
+    def test_wrapper_signature_takes_request(self) -> None:
+        async def endpoint(name: str = "x") -> Response:
+            return Response()
+
+        parameters = inspect.signature(ResponseCache().cached()(endpoint)).parameters
+        assert list(parameters) == [
+            "name",
+            "_response_cache_request",
+            "_response_cache_claims",
+        ]
+        assert parameters["_response_cache_request"].annotation is Request
+        public = ResponseCache().cached(scope="public")(endpoint)
+        assert "_response_cache_claims" not in inspect.signature(public).parameters
+
+    @pytest.mark.parametrize(
+        "claims, scope, expected",
+        [
+            (None, "public", "public"),
+            ({"sub": "u1", "role": "admin"}, "role", "role:admin"),
+            ({}, "role", "role:authenticated"),
+            ({"sub": "u1"}, "user", "user:u1"),
+            ({}, "user", "anonymous"),
+        ],
+    )
+    def test_auth_scope(
+        self, claims: Optional[dict[str, str]], scope: str, expected: str
+    ) -> None:
+        assert auth_scope(claims, scope) == expected
+
+
+class TestCachedRouter:
+    def test_hit_skips_dao(self, client: TestClient, dao: Mock) -> None:
+        first = client.get("/cached/", params={"name": "test_name"})
+        second = client.get("/cached/", params={"name": "test_name"})
+        assert first.status_code == second.status_code == status.HTTP_200_OK
+        assert first.content == second.content
+        assert first.headers["etag"] == second.headers["etag"]
+        assert dao.get_by_query.call_count == 1
+
+    def test_query_is_part_of_key(self, client: TestClient, dao: Mock) -> None:
+        client.get("/cached/", params={"name": "a"})
+        client.get("/cached/", params={"name": "b"})
+        assert dao.get_by_query.call_count == 2
+
+    def test_write_invalidates(
+        self, client: TestClient, dao: Mock, versions: defaultdict[str, int]
+    ) -> None:
+        client.get("/cached/")
+        versions["CACHED_TESTS"] += 1
+        client.get("/cached/")
+        assert dao.get_by_query.call_count == 2
+
+    def test_versions_read_once_per_request(
+        self, client: TestClient, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        get = Mock(wraps=table_versions.get)
+        monkeypatch.setattr(table_versions, "get", get)
+        client.get("/cached/")
+        client.get("/cached/")
+        assert get.call_count == 2
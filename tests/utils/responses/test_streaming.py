@@ -0,0 +1,69 @@
+import json
+
+import pytest
+
+from src.utils.responses.streaming import (
+    Summary,
+    json_chunks,
+    ndjson_chunks,
+    ndjson_lines,
+)
+
+PAGES = [[{"id": 1, "total": 2.0}, {"id": 2, "total": None}], [{"id": 3, "total": 0.5}]]
+
+
+class TestStreaming:
+    def test_json_chunks(self) -> None:
+        chunks = list(json_chunks("Found", iter(PAGES), Summary("total")))
+        assert len(chunks) == len(PAGES) + 2
+        assert json.loads(b"".join(chunks)) == {
+            "message": "Found",
+            "data": {
+                "items": [row for page in PAGES for row in page],
+                "summary": {"count": 3, "total": 2.5},
+            },
+        }
+
+    def test_json_chunks_without_rows(self) -> None:
+        body = b"".join(json_chunks("Found", iter([]), None))
+        assert json.loads(body) == {"message": "Found", "data": {"items": []}}
+
+    def test_ndjson_chunks(self) -> None:
+        lines = b"".join(ndjson_chunks(iter(PAGES), None)).splitlines()
+        assert [json.loads(line)["id"] for line in lines] == [1, 2, 3]
+
+    def test_pages_are_consumed_lazily(self) -> None:
+        fetched = []
+
+        def pages():
+            for page in PAGES:
+                fetched.append(page)
+                yield page
+
+        chunks = ndjson_chunks(pages(), None)
+        next(chunks)
+        assert fetched == PAGES[:1]
+
+
+@pytest.mark.asyncio
+class TestNdjsonLines:
+    async def lines(self, chunks: list[bytes], max_line_bytes: int = 10) -> list:
+        async def body():
+            for chunk in chunks:
+                yield chunk
+
+        return [line async for line in ndjson_lines(body(), max_line_bytes)]
+
+    async def test_lines_split_across_chunks(self) -> None:
+        assert await self.lines([b'{"a"', b':1}\n\n{"b":2}\n', b'{"c":3}']) == [
+            (1, b'{"a":1}'),
+            (3, b'{"b":2}'),
+            (4, b'{"c":3}'),
+        ]
+
+    async def test_long_lines_are_dropped(self) -> None:
+        assert await self.lines([b'{"a":1}\n{"long":', b'"xxxxxxxx"}\n{"c":3}\n']) == [
+            (1, b'{"a":1}'),
+            (2, None),
+            (3, b'{"c":3}'),
+        ]
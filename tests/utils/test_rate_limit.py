@@ -0,0 +1,260 @@
+import ipaddress
+import multiprocessing
+from typing import Any
+from unittest.mock import Mock
+
+import pytest
+from fastapi import Depends, FastAPI, Request
+from fastapi.testclient import TestClient
+
+from src.auth.dependencies import get_access_token
+from src.utils.metrics import metrics
+from src.utils.rate_limit import (
+    RateLimiter,
+    SharedCounters,
+    SlidingWindow,
+    TokenBucket,
+    client_ip,
+    rate_limit,
+)
+
+
+class TestTokenBucket:
+    def test_burst_then_refill(self) -> None:
+        bucket = TokenBucket("ip", capacity=2, rate=0.5)
+        wait, state = bucket.take(None, 100.0)
+        assert wait is None
+        wait, state = bucket.take(state, 100.0)
+        assert wait is None
+        wait, state = bucket.take(state, 100.0)
+        assert wait == pytest.approx(2.0)
+        wait, state = bucket.take(state, 102.0)
+        assert wait is None
+
+    def test_refill_is_capped(self) -> None:
+        bucket = TokenBucket("ip", capacity=2, rate=1)
+        _, state = bucket.take(None, 0.0)
+        _, state = bucket.take(state, 1000.0)
+        assert state[0] == 1
+
+
+class TestSlidingWindow:
+    def test_limit_within_a_window(self) -> None:
+        window = SlidingWindow("email", limit=2, window=60)
+        wait, state = window.take(None, 600.0)
+        assert wait is None
+        wait, state = window.take(state, 610.0)
+        assert wait is None
+        wait, state = window.take(state, 620.0)
+        assert wait == pytest.approx(40.0)
+
+    def test_previous_window_is_weighted(self) -> None:
+        window = SlidingWindow("email", limit=2, window=60)
+        _, state = window.take(None, 600.0)
+        _, state = window.take(state, 610.0)
+        # 15 s into the next window, the previous one still counts 2 * 0.75.
+        wait, state = window.take(state, 675.0)
+        assert wait == pytest.approx(15.0)
+        # Halfway through, it counts 1: one more request fits.
+        wait, state = window.take(state, 690.0)
+        assert wait is None
+
+    def test_old_windows_are_forgotten(self) -> None:
+        window = SlidingWindow("email", limit=1, window=60)
+        _, state = window.take(None, 600.0)
+        wait, _ = window.take(state, 800.0)
+        assert wait is None
+
+
+PROXIES = (ipaddress.ip_network("10.0.0.0/8"),)
+
+
+def make_request(peer: str, *forwarded: str) -> Request:
+    return Request(
+        {
+            "type": "http",
+            "client": (peer, 1234),
+            "headers": [(b"x-forwarded-for", header.encode()) for header in forwarded],
+        }
+    )
+
+
+class TestClientIp:
+    def test_direct_client(self) -> None:
+        request = make_request("203.0.113.7")
+        assert client_ip(request, PROXIES) == "203.0.113.7"
+
+    def test_header_of_untrusted_peers_is_ignored(self) -> None:
+        request = make_request("203.0.113.7", "198.51.100.1")
+        assert client_ip(request, PROXIES) == "203.0.113.7"
+
+    def test_forwarded_by_trusted_proxies(self) -> None:
+        request = make_request("10.0.0.2", "198.51.100.1, 203.0.113.7", "10.0.0.1")
+        assert client_ip(request, PROXIES) == "203.0.113.7"
+
+    def test_only_trusted_hops(self) -> None:
+        assert client_ip(make_request("10.0.0.2", "10.0.0.1"), PROXIES) == "10.0.0.1"
+        assert client_ip(make_request("10.0.0.2"), PROXIES) == "10.0.0.2"
+
+
+class TestRateLimiter:
+    def test_all_or_nothing(self, rate_limit_counters: SharedCounters) -> None:
+        limiter = RateLimiter(rate_limit_counters)
+        ip = TokenBucket("ip", capacity=10, rate=0.001)
+        email = SlidingWindow("email", limit=1, window=60)
+
+        assert limiter.acquire("login", [(ip, "1.2.3.4"), (email, "a")], 0.0) is None
+        assert limiter.acquire("login", [(ip, "1.2.3.4"), (email, "a")], 1.0)
+        # The rejected request took no token from the IP bucket.
+        for _ in range(9):
+            assert limiter.acquire("login", [(ip, "1.2.3.4")], 1.0) is None
+        assert limiter.acquire("login", [(ip, "1.2.3.4")], 1.0)
+
+    def test_keys_and_routes_are_separate(
+        self, rate_limit_counters: SharedCounters
+    ) -> None:
+        limiter = RateLimiter(rate_limit_counters)
+        ip = TokenBucket("ip", capacity=1, rate=1)
+
+        assert limiter.acquire("login", [(ip, "1.2.3.4")], 0.0) is None
+        assert limiter.acquire("login", [(ip, "5.6.7.8")], 0.0) is None
+        assert limiter.acquire("register", [(ip, "1.2.3.4")], 0.0) is None
+        assert limiter.acquire("login", [(ip, "1.2.3.4")], 0.0)
+
+    def test_full_probe_sequence_evicts_the_oldest(self, tmp_path: Any) -> None:
+        counters = SharedCounters(str(tmp_path / "small"), slots=1, probes=1)
+        limiter = RateLimiter(counters)
+        ip = TokenBucket("ip", capacity=1, rate=0.001)
+
+        assert limiter.acquire("login", [(ip, "1.2.3.4")], 0.0) is None
+        assert limiter.acquire("login", [(ip, "5.6.7.8")], 1.0) is None
+        assert limiter.acquire("login", [(ip, "1.2.3.4")], 2.0) is None
+        counters.close()
+
+    def test_rejections_are_counted(self, rate_limit_counters: SharedCounters) -> None:
+        limiter = RateLimiter(rate_limit_counters)
+        ip = TokenBucket("ip", capacity=1, rate=1)
+        before = metrics.get("rate_limit.rejected", route="metered", key="ip")
+
+        limiter.acquire("metered", [(ip, "1.2.3.4")], 0.0)
+        limiter.acquire("metered", [(ip, "1.2.3.4")], 0.0)
+
+        assert metrics.get("rate_limit.rejected", route="metered", key="ip") == (
+            before + 1
+        )
+
+
+def take_in_child(path: str, results: Any) -> None:
+    limiter = RateLimiter(SharedCounters(path, slots=1024))
+    bucket = TokenBucket("ip", capacity=5, rate=0.001)
+    results.put(
+        [limiter.acquire("login", [(bucket, "1.2.3.4")], 0.0) for _ in range(3)]
+    )
+
+
+class TestSharedCounters:
+    def test_counters_are_shared_across_processes(self, tmp_path: Any) -> None:
+        path = str(tmp_path / "shared")
+        context = multiprocessing.get_context("fork")
+        results = context.Queue()
+        children = [
+            context.Process(target=take_in_child, args=(path, results))
+            for _ in range(2)
+        ]
+        for child in children:
+            child.start()
+        taken = [results.get(timeout=10) for _ in children]
+        for child in children:
+            child.join()
+
+        outcomes = [wait is None for waits in taken for wait in waits]
+        assert outcomes.count(True) == 5
+        assert outcomes.count(False) == 1
+
+    def test_clear(self, rate_limit_counters: SharedCounters) -> None:
+        limiter = RateLimiter(rate_limit_counters)
+        ip = TokenBucket("ip", capacity=1, rate=0.001)
+        limiter.acquire("login", [(ip, "1.2.3.4")], 0.0)
+
+        rate_limit_counters.clear()
+
+        assert limiter.acquire("login", [(ip, "1.2.3.4")], 0.0) is None
+
+
+@pytest.fixture
+def upstream() -> Mock:
+    return Mock()
+
+
+@pytest.fixture
+def client(upstream: Mock) -> TestClient:
+    app = FastAPI()
+
+    @app.post(
+        "/login",
+        dependencies=[
+            Depends(
+                rate_limit(
+                    "test.login",
+                    TokenBucket("ip", capacity=3, rate=0.001),
+                    SlidingWindow("email", limit=2, window=3600),
+                )
+            )
+        ],
+    )
+    async def login(body: dict[str, Any]) -> dict[str, Any]:
+        upstream(body)
+        return body
+
+    @app.post(
+        "/purchase",
+        dependencies=[
+            Depends(rate_limit("test.purchase", TokenBucket("customer", 1, rate=0.001)))
+        ],
+    )
+    async def purchase() -> None:
+        upstream()
+
+    def access_token(request: Request) -> str:
+        request.state.token_claims = {"sub": request.headers.get("x-user")}
+        return "token"
+
+    app.dependency_overrides[get_access_token] = access_token
+    return TestClient(app)
+
+
+class TestRateLimitDependency:
+    def test_email_limit(self, client: TestClient, upstream: Mock) -> None:
+        for _ in range(2):
+            response = client.post("/login", json={"email": "Rayan@mail.com"})
+            assert response.status_code == 200
+
+        response = client.post("/login", json={"email": " rayan@mail.com"})
+
+        assert response.status_code == 429
+        assert 1 <= int(response.headers["retry-after"]) <= 3600
+        assert upstream.call_count == 2
+
+    def test_ip_limit(self, client: TestClient, upstream: Mock) -> None:
+        statuses = [
+            client.post("/login", json={"email": f"user{i}@mail.com"}).status_code
+            for i in range(4)
+        ]
+
+        assert statuses == [200, 200, 200, 429]
+        assert upstream.call_count == 3
+
+    def test_body_without_email(self, client: TestClient) -> None:
+        statuses = [client.post("/login", json={}).status_code for _ in range(4)]
+
+        assert statuses == [200, 200, 200, 429]
+
+    def test_customer_limit(self, client: TestClient, upstream: Mock) -> None:
+        assert client.post("/purchase", headers={"x-user": "alice"}).status_code == 200
+        assert client.post("/purchase", headers={"x-user": "bob"}).status_code == 200
+        assert client.post("/purchase", headers={"x-user": "alice"}).status_code == 429
+        assert upstream.call_count == 2
+
+    def test_unknown_key(self) -> None:
+        with pytest.raises(ValueError):
+            rate_limit("test", TokenBucket("country", 1, 1))